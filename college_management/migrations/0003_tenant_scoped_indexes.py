@@ -0,0 +1,107 @@
+# Generated by Django 5.0 on 2026-10-19 00:06
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("college_management", "0002_uuid7_primary_keys"),
+        ("core", "0006_tenant_scoped_indexes"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="announcement",
+            name="announcemen_tenant__79ebe8_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="examschedule",
+            name="exam_schedu_tenant__7ac1de_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="holiday",
+            name="holidays_tenant__d92347_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="timetable",
+            name="timetables_tenant__c35ebc_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="timetable",
+            name="timetables_teacher_bde50f_idx",
+        ),
+        migrations.AddField(
+            model_name="announcement",
+            name="is_deleted",
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name="collegesettings",
+            name="is_deleted",
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name="examschedule",
+            name="is_deleted",
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name="examslot",
+            name="is_deleted",
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name="holiday",
+            name="is_deleted",
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name="timetable",
+            name="is_deleted",
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddIndex(
+            model_name="announcement",
+            index=models.Index(
+                fields=["tenant", "is_deleted", "is_active", "created_at"],
+                name="announcemen_tenant__07a4dd_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="examschedule",
+            index=models.Index(
+                fields=["tenant", "is_deleted", "academic_year"],
+                name="exam_schedu_tenant__18f675_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="examschedule",
+            index=models.Index(
+                fields=["tenant", "is_deleted", "start_date"],
+                name="exam_schedu_tenant__bbb743_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="holiday",
+            index=models.Index(
+                fields=["tenant", "is_deleted", "date"],
+                name="holidays_tenant__bc9422_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="timetable",
+            index=models.Index(
+                fields=["tenant", "is_deleted", "section", "day_of_week"],
+                name="timetables_tenant__ab715e_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="timetable",
+            index=models.Index(
+                fields=["tenant", "is_deleted", "teacher", "day_of_week"],
+                name="timetables_tenant__3705f6_idx",
+            ),
+        ),
+    ]
@@ -5,6 +5,7 @@ Tenant admin specific models and configurations
 from django.db import models
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.utils import timezone
+from core.managers import tenant_index
 from core.models import BaseModel, Tenant, UserAccount, Department, Section, AcademicYear
 
 
@@ -100,7 +101,7 @@ class Holiday(BaseModel):
         db_table = 'holidays'
         ordering = ['date']
         indexes = [
-            models.Index(fields=['tenant', 'date']),
+            tenant_index('date'),
         ]
     
     def __str__(self):
@@ -171,7 +172,7 @@ class Announcement(BaseModel):
         db_table = 'announcements'
         ordering = ['-created_at']
         indexes = [
-            models.Index(fields=['tenant', 'is_active']),
+            tenant_index('is_active', 'created_at'),
             models.Index(fields=['target_audience']),
         ]
     
@@ -235,8 +236,8 @@ class Timetable(BaseModel):
         ordering = ['day_of_week', 'period_number']
         unique_together = [['section', 'day_of_week', 'period_number', 'academic_year']]
         indexes = [
-            models.Index(fields=['tenant', 'section', 'day_of_week']),
-            models.Index(fields=['teacher', 'day_of_week']),
+            tenant_index('section', 'day_of_week'),
+            tenant_index('teacher', 'day_of_week'),
         ]
     
     def __str__(self):
@@ -286,7 +287,8 @@ class ExamSchedule(BaseModel):
         db_table = 'exam_schedules'
         ordering = ['-start_date']
         indexes = [
-            models.Index(fields=['tenant', 'academic_year']),
+            tenant_index('academic_year'),
+            tenant_index('start_date'),
             models.Index(fields=['department', 'start_date']),
         ]
     
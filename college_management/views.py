@@ -5,13 +5,17 @@ Tenant admin interface for college administrators
 from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
+from django.core.exceptions import ValidationError
 from django.db.models import Q, Count, Avg
 from django.utils import timezone
 from django.core.paginator import Paginator
 from datetime import timedelta
 
+from core.concurrency import gather_queries
 from core.models import Tenant, UserAccount, Department, Section, AcademicYear, Subject
-from core.decorators import role_required
+from core.decorators import query_budget, role_required
+from core.notifications import notify_announcement
+from core.utils import validate_tenant_limits
 from .models import (
     CollegeSettings,
     Holiday,
@@ -22,66 +26,44 @@ from .models import (
 )
 
 
+def dashboard_queries(tenant_id):
+    """
+    Independent queries behind the tenant admin dashboard
+    Each evaluates its queryset so it can run on a pool thread
+    """
+    active_users = UserAccount.objects.filter(tenant_id=tenant_id, is_active=True)
+    return {
+        'total_departments': lambda: Department.objects.filter(tenant_id=tenant_id).count(),
+        'total_sections': lambda: Section.objects.filter(tenant_id=tenant_id).count(),
+        'total_teachers': lambda: active_users.filter(role__name='teacher').count(),
+        'total_students': lambda: active_users.filter(role__name='student').count(),
+        # Recent announcements
+        'recent_announcements': lambda: list(Announcement.objects.filter(
+            tenant_id=tenant_id,
+            is_active=True
+        ).order_by('-created_at')[:5]),
+        # Upcoming holidays
+        'upcoming_holidays': lambda: list(Holiday.objects.filter(
+            tenant_id=tenant_id,
+            date__gte=timezone.now().date()
+        ).order_by('date')[:5]),
+        # Active academic year
+        'current_academic_year': lambda: AcademicYear.objects.filter(
+            tenant_id=tenant_id,
+            is_active=True
+        ).first(),
+    }
+
+
 @login_required
 @role_required(['tenant_admin'])
+@query_budget(16)
 def dashboard(request):
     """
     Tenant admin dashboard with college overview
+    Key metrics may be queried concurrently (see core.concurrency)
     """
-    tenant = request.user.tenant
-    
-    # Get key metrics
-    total_departments = Department.objects.filter(
-        tenant=tenant,
-        is_deleted=False
-    ).count()
-    
-    total_sections = Section.objects.filter(
-        tenant=tenant,
-        is_deleted=False
-    ).count()
-    
-    total_teachers = UserAccount.objects.filter(
-        tenant=tenant,
-        role__name='teacher',
-        is_active=True,
-        is_deleted=False
-    ).count()
-    
-    total_students = UserAccount.objects.filter(
-        tenant=tenant,
-        role__name='student',
-        is_active=True,
-        is_deleted=False
-    ).count()
-    
-    # Recent announcements
-    recent_announcements = Announcement.objects.filter(
-        tenant=tenant,
-        is_active=True
-    ).order_by('-created_at')[:5]
-    
-    # Upcoming holidays
-    upcoming_holidays = Holiday.objects.filter(
-        tenant=tenant,
-        date__gte=timezone.now().date()
-    ).order_by('date')[:5]
-    
-    # Active academic year
-    current_academic_year = AcademicYear.objects.filter(
-        tenant=tenant,
-        is_active=True
-    ).first()
-    
-    context = {
-        'total_departments': total_departments,
-        'total_sections': total_sections,
-        'total_teachers': total_teachers,
-        'total_students': total_students,
-        'recent_announcements': recent_announcements,
-        'upcoming_holidays': upcoming_holidays,
-        'current_academic_year': current_academic_year,
-    }
+    context = gather_queries(dashboard_queries(request.user.tenant_id))
     
     return render(request, 'college_management/dashboard.html', context)
 
@@ -96,7 +78,6 @@ def department_list(request):
     
     departments = Department.objects.filter(
         tenant=tenant,
-        is_deleted=False
     ).annotate(
         section_count=Count('sections')
     ).order_by('name')
@@ -124,6 +105,7 @@ def department_list(request):
 
 @login_required
 @role_required(['tenant_admin'])
+@query_budget(10)
 def department_create(request):
     """
     Create new department
@@ -136,11 +118,16 @@ def department_create(request):
         description = request.POST.get('description', '')
         hod_id = request.POST.get('hod')
         
-        # Check if department code already exists
-        if Department.objects.filter(tenant=tenant, code=code, is_deleted=False).exists():
+        # Check if department code already exists (soft-deleted ones keep theirs)
+        if Department.all_objects.filter(tenant=tenant, code=code).exists():
             messages.error(request, f'Department with code "{code}" already exists.')
             return redirect('college_management:department_create')
         
+        is_valid, error = validate_tenant_limits(tenant, 'departments')
+        if not is_valid:
+            messages.error(request, error)
+            return redirect('college_management:department_list')
+        
         department = Department.objects.create(
             tenant=tenant,
             name=name,
@@ -157,7 +144,6 @@ def department_create(request):
         tenant=request.user.tenant,
         role__name='teacher',
         is_active=True,
-        is_deleted=False
     ).order_by('first_name', 'last_name')
     
     context = {
@@ -177,13 +163,11 @@ def department_detail(request, dept_id):
         Department,
         id=dept_id,
         tenant=request.user.tenant,
-        is_deleted=False
     )
     
     # Get sections
     sections = Section.objects.filter(
         department=department,
-        is_deleted=False
     ).annotate(
         student_count=Count('student_enrollments')
     ).order_by('name')
@@ -193,7 +177,6 @@ def department_detail(request, dept_id):
         tenant=request.user.tenant,
         role__name='teacher',
         is_active=True,
-        is_deleted=False
     ).filter(
         Q(teaching_subjects__department=department)
     ).distinct()[:10]
@@ -202,7 +185,6 @@ def department_detail(request, dept_id):
     subjects = Subject.objects.filter(
         tenant=request.user.tenant,
         department=department,
-        is_deleted=False
     ).order_by('name')
     
     context = {
@@ -225,7 +207,6 @@ def department_edit(request, dept_id):
         Department,
         id=dept_id,
         tenant=request.user.tenant,
-        is_deleted=False
     )
     
     if request.method == 'POST':
@@ -243,7 +224,6 @@ def department_edit(request, dept_id):
         tenant=request.user.tenant,
         role__name='teacher',
         is_active=True,
-        is_deleted=False
     ).order_by('first_name', 'last_name')
     
     context = {
@@ -265,7 +245,6 @@ def section_list(request):
     
     sections = Section.objects.filter(
         tenant=tenant,
-        is_deleted=False
     ).select_related('department', 'class_teacher').annotate(
         student_count=Count('student_enrollments')
     ).order_by('department__name', 'name')
@@ -283,7 +262,6 @@ def section_list(request):
     # For filter dropdown
     departments = Department.objects.filter(
         tenant=tenant,
-        is_deleted=False
     ).order_by('name')
     
     context = {
@@ -297,6 +275,7 @@ def section_list(request):
 
 @login_required
 @role_required(['tenant_admin'])
+@query_budget(11)
 def section_create(request):
     """
     Create new section
@@ -322,14 +301,12 @@ def section_create(request):
     
     departments = Department.objects.filter(
         tenant=request.user.tenant,
-        is_deleted=False
     ).order_by('name')
     
     teachers = UserAccount.objects.filter(
         tenant=request.user.tenant,
         role__name='teacher',
         is_active=True,
-        is_deleted=False
     ).order_by('first_name', 'last_name')
     
     context = {
@@ -350,15 +327,15 @@ def section_detail(request, section_id):
         Section,
         id=section_id,
         tenant=request.user.tenant,
-        is_deleted=False
     )
     
     # Get students
     from core.models import StudentEnrollment
     enrollments = StudentEnrollment.objects.filter(
         section=section,
-        is_deleted=False
-    ).select_related('student').order_by('roll_number')[:50]
+    )
+    student_count = enrollments.count()
+    enrollments = enrollments.select_related('student').order_by('roll_number')[:50]
     
     # Get timetable for current week
     current_academic_year = AcademicYear.objects.filter(
@@ -376,7 +353,7 @@ def section_detail(request, section_id):
     context = {
         'section': section,
         'enrollments': enrollments,
-        'student_count': enrollments.count(),
+        'student_count': student_count,
         'timetable': timetable,
     }
     
@@ -393,7 +370,6 @@ def user_list(request):
     
     users = UserAccount.objects.filter(
         tenant=tenant,
-        is_deleted=False
     ).select_related('role').order_by('-created_at')
     
     # Filters
@@ -433,6 +409,7 @@ def user_list(request):
 
 @login_required
 @role_required(['tenant_admin'])
+@query_budget(9)
 def user_create(request):
     """
     Create new user
@@ -456,7 +433,6 @@ def user_detail(request, user_id):
         UserAccount,
         id=user_id,
         tenant=request.user.tenant,
-        is_deleted=False
     )
     
     context = {
@@ -468,6 +444,7 @@ def user_detail(request, user_id):
 
 @login_required
 @role_required(['tenant_admin'])
+@query_budget(13)
 def timetable_view(request):
     """
     View timetable for all sections
@@ -499,8 +476,8 @@ def timetable_view(request):
     timetable_entries = timetable_entries.order_by('day_of_week', 'period_number')
     
     # For filters
-    departments = Department.objects.filter(tenant=tenant, is_deleted=False)
-    sections = Section.objects.filter(tenant=tenant, is_deleted=False)
+    departments = Department.objects.filter(tenant=tenant)
+    sections = Section.objects.filter(tenant=tenant).select_related('department')
     
     context = {
         'timetable_entries': timetable_entries,
@@ -515,6 +492,7 @@ def timetable_view(request):
 
 @login_required
 @role_required(['tenant_admin'])
+@query_budget(9)
 def timetable_create(request):
     """
     Create timetable entry
@@ -528,6 +506,7 @@ def timetable_create(request):
 
 @login_required
 @role_required(['tenant_admin'])
+@query_budget(10)
 def exam_list(request):
     """
     List all exam schedules
@@ -552,6 +531,7 @@ def exam_list(request):
 
 @login_required
 @role_required(['tenant_admin'])
+@query_budget(9)
 def exam_create(request):
     """
     Create exam schedule
@@ -590,6 +570,7 @@ def exam_detail(request, exam_id):
 
 @login_required
 @role_required(['tenant_admin'])
+@query_budget(10)
 def announcement_list(request):
     """
     List all announcements
@@ -612,19 +593,63 @@ def announcement_list(request):
     return render(request, 'college_management/announcement_list.html', context)
 
 
+def announcement_target(request, tenant):
+    """
+    Audience of a posted announcement form
+
+    Returns:
+        tuple: (target_audience, target_department, target_section)
+
+    Raises:
+        ValueError: 'department' or 'section' audience without a valid
+            department or section of the tenant
+    """
+    target_audience = request.POST.get('target_audience', 'all')
+    target_department = target_section = None
+    try:
+        if target_audience == 'department':
+            target_department = Department.objects.filter(
+                tenant=tenant, id=request.POST.get('target_department') or None
+            ).first()
+        elif target_audience == 'section':
+            target_section = Section.objects.filter(
+                tenant=tenant, id=request.POST.get('target_section') or None
+            ).first()
+    except ValidationError:
+        pass
+    if target_audience == 'department' and target_department is None:
+        raise ValueError('Choose the department the announcement is for.')
+    if target_audience == 'section' and target_section is None:
+        raise ValueError('Choose the section the announcement is for.')
+    return target_audience, target_department, target_section
+
+
+def announcement_form_context(tenant, **context):
+    return {
+        'departments': Department.objects.filter(tenant=tenant).order_by('name'),
+        'sections': Section.objects.filter(tenant=tenant).select_related('department').order_by('department__name', 'name'),
+        **context,
+    }
+
+
 @login_required
 @role_required(['tenant_admin'])
+@query_budget(11)
 def announcement_create(request):
     """
     Create announcement
     """
+    tenant = request.user.tenant
+    
     if request.method == 'POST':
-        tenant = request.user.tenant
-        
         title = request.POST.get('title')
         content = request.POST.get('content')
         announcement_type = request.POST.get('announcement_type')
-        target_audience = request.POST.get('target_audience', 'all')
+        try:
+            target_audience, target_department, target_section = announcement_target(request, tenant)
+        except ValueError as e:
+            messages.error(request, str(e))
+            return render(request, 'college_management/announcement_form.html', announcement_form_context(tenant))
         
         announcement = Announcement.objects.create(
             tenant=tenant,
@@ -632,13 +657,16 @@ def announcement_create(request):
             title=title,
             content=content,
             announcement_type=announcement_type,
-            target_audience=target_audience
+            target_audience=target_audience,
+            target_department=target_department,
+            target_section=target_section,
         )
+        recipients = notify_announcement(announcement)
         
-        messages.success(request, 'Announcement created successfully.')
+        messages.success(request, f'Announcement created and sent to {recipients} users.')
         return redirect('college_management:announcement_list')
     
-    return render(request, 'college_management/announcement_form.html')
+    return render(request, 'college_management/announcement_form.html', announcement_form_context(tenant))
 
 
 @login_required
@@ -652,27 +680,30 @@ def announcement_edit(request, announcement_id):
         id=announcement_id,
         tenant=request.user.tenant
     )
+    context = announcement_form_context(request.user.tenant, announcement=announcement, is_edit=True)
     
     if request.method == 'POST':
+        try:
+            target = announcement_target(request, request.user.tenant)
+        except ValueError as e:
+            messages.error(request, str(e))
+            return render(request, 'college_management/announcement_form.html', context)
+        
         announcement.title = request.POST.get('title')
         announcement.content = request.POST.get('content')
         announcement.announcement_type = request.POST.get('announcement_type')
-        announcement.target_audience = request.POST.get('target_audience', 'all')
+        announcement.target_audience, announcement.target_department, announcement.target_section = target
         announcement.save()
         
         messages.success(request, 'Announcement updated successfully.')
         return redirect('college_management:announcement_list')
     
-    context = {
-        'announcement': announcement,
-        'is_edit': True,
-    }
-    
     return render(request, 'college_management/announcement_form.html', context)
 
 
 @login_required
 @role_required(['tenant_admin'])
+@query_budget(9)
 def reports_dashboard(request):
     """
     Reports dashboard
@@ -682,6 +713,7 @@ def reports_dashboard(request):
 
 @login_required
 @role_required(['tenant_admin'])
+@query_budget(9)
 def attendance_report(request):
     """
     Attendance report
@@ -691,6 +723,7 @@ def attendance_report(request):
 
 @login_required
 @role_required(['tenant_admin'])
+@query_budget(9)
 def academic_report(request):
     """
     Academic performance report
@@ -700,6 +733,7 @@ def academic_report(request):
 
 @login_required
 @role_required(['tenant_admin'])
+@query_budget(13)
 def college_settings(request):
     """
     College settings management
@@ -729,6 +763,7 @@ def college_settings(request):
 
 @login_required
 @role_required(['tenant_admin'])
+@query_budget(10)
 def holiday_list(request):
     """
     List all holidays
@@ -0,0 +1,51 @@
+# Generated by Django 5.0 on 2026-10-19 00:06
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("company_admin", "0003_uuid7_primary_keys"),
+        ("core", "0006_tenant_scoped_indexes"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="supportticket",
+            name="support_tic_tenant__041828_idx",
+        ),
+        migrations.AddField(
+            model_name="announcementglobal",
+            name="is_deleted",
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name="supportticket",
+            name="is_deleted",
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name="systemmetrics",
+            name="is_deleted",
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name="systemsettings",
+            name="is_deleted",
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name="ticketcomment",
+            name="is_deleted",
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddIndex(
+            model_name="supportticket",
+            index=models.Index(
+                fields=["tenant", "is_deleted", "status"],
+                name="support_tic_tenant__2018a2_idx",
+            ),
+        ),
+    ]
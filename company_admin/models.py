@@ -4,6 +4,7 @@ Super admin specific models for system management
 """
 from django.db import models
 from django.utils import timezone
+from core.managers import tenant_index
 from core.models import BaseModel, Tenant, UserAccount
 
 
@@ -71,7 +72,7 @@ class SupportTicket(BaseModel):
         ordering = ['-created_at']
         indexes = [
             models.Index(fields=['ticket_number']),
-            models.Index(fields=['tenant', 'status']),
+            tenant_index('status'),
             models.Index(fields=['status', 'priority']),
             models.Index(fields=['assigned_to']),
         ]
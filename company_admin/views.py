@@ -8,10 +8,15 @@ from django.contrib import messages
 from django.db.models import Q, Count, Sum, Avg
 from django.utils import timezone
 from django.core.paginator import Paginator
-from datetime import timedelta
+from django.conf import settings as django_settings
+from django.utils.dateparse import parse_date
+from datetime import datetime, time, timedelta
+from itertools import islice
 
+from core.concurrency import gather_queries
 from core.models import Tenant, UserAccount, AuditLog
-from core.decorators import role_required
+from core.audit import attach_related, query_audit_logs
+from core.decorators import query_budget, role_required
 from tenant_subscription.models import (
     TenantSubscription as Subscription,
     Payment,
@@ -24,77 +29,66 @@ from .models import (
 )
 
 
+def dashboard_queries():
+    """
+    Independent queries behind the super admin dashboard
+    Each evaluates its queryset so it can run on a pool thread
+    """
+    today = timezone.now().date()
+    thirty_days_ago = timezone.now() - timedelta(days=30)
+    return {
+        'total_tenants': lambda: Tenant.objects.count(),
+        'active_tenants': lambda: Tenant.objects.filter(is_active=True).count(),
+        'total_users': lambda: UserAccount.objects.count(),
+        'active_users': lambda: UserAccount.objects.filter(is_active=True).count(),
+        # Subscription stats
+        'active_subscriptions': lambda: Subscription.objects.filter(status='active').count(),
+        'trial_subscriptions': lambda: Subscription.objects.filter(status='trial').count(),
+        # Revenue (last 30 days)
+        'recent_revenue': lambda: Payment.objects.filter(
+            status='succeeded',
+            created_at__gte=thirty_days_ago
+        ).aggregate(total=Sum('amount'))['total'] or 0,
+        # Open support tickets
+        'open_tickets': lambda: SupportTicket.objects.filter(
+            status__in=['open', 'in_progress']
+        ).count(),
+        # Recent activity
+        'recent_tenants': lambda: list(Tenant.objects.order_by('-created_at')[:5]),
+        'recent_tickets': lambda: list(SupportTicket.objects.order_by('-created_at')[:5]),
+        # Metrics of the last 7 days, keyed by date
+        'daily_metrics': lambda: {
+            metrics.metric_date: metrics
+            for metrics in SystemMetrics.objects.filter(
+                metric_date__range=(today - timedelta(days=6), today)
+            )
+        },
+    }
+
+
 @login_required
 @role_required(['super_admin'])
+@query_budget(19)
 def dashboard(request):
     """
     Super admin dashboard with system overview
+    Key metrics may be queried concurrently (see core.concurrency)
     """
-    # Get key metrics
-    total_tenants = Tenant.objects.filter(is_deleted=False).count()
-    active_tenants = Tenant.objects.filter(
-        is_active=True,
-        is_deleted=False
-    ).count()
-    
-    total_users = UserAccount.objects.filter(is_deleted=False).count()
-    active_users = UserAccount.objects.filter(
-        is_active=True,
-        is_deleted=False
-    ).count()
-    
-    # Subscription stats
-    active_subscriptions = Subscription.objects.filter(
-        status='active'
-    ).count()
-    trial_subscriptions = Subscription.objects.filter(
-        status='trial'
-    ).count()
-    
-    # Revenue (last 30 days)
-    thirty_days_ago = timezone.now() - timedelta(days=30)
-    recent_revenue = Payment.objects.filter(
-        status='succeeded',
-        created_at__gte=thirty_days_ago
-    ).aggregate(total=Sum('amount'))['total'] or 0
-    
-    # Open support tickets
-    open_tickets = SupportTicket.objects.filter(
-        status__in=['open', 'in_progress']
-    ).count()
-    
-    # Recent activity
-    recent_tenants = Tenant.objects.filter(
-        is_deleted=False
-    ).order_by('-created_at')[:5]
-    
-    recent_tickets = SupportTicket.objects.all().order_by('-created_at')[:5]
+    context = gather_queries(dashboard_queries())
     
     # Chart data - last 7 days
+    daily_metrics = context.pop('daily_metrics')
     chart_data = []
     for i in range(6, -1, -1):
         date = timezone.now().date() - timedelta(days=i)
-        metrics = SystemMetrics.objects.filter(metric_date=date).first()
+        metrics = daily_metrics.get(date)
         chart_data.append({
             'date': date.strftime('%m/%d'),
             'tenants': metrics.active_tenants if metrics else 0,
             'users': metrics.active_users if metrics else 0,
             'revenue': float(metrics.daily_revenue) if metrics else 0
         })
-    
-    context = {
-        'total_tenants': total_tenants,
-        'active_tenants': active_tenants,
-        'total_users': total_users,
-        'active_users': active_users,
-        'active_subscriptions': active_subscriptions,
-        'trial_subscriptions': trial_subscriptions,
-        'recent_revenue': recent_revenue,
-        'open_tickets': open_tickets,
-        'recent_tenants': recent_tenants,
-        'recent_tickets': recent_tickets,
-        'chart_data': chart_data,
-    }
+    context['chart_data'] = chart_data
     
     return render(request, 'company_admin/dashboard.html', context)
 
@@ -105,7 +99,7 @@ def tenant_list(request):
     """
     List all tenants with filtering
     """
-    tenants = Tenant.objects.filter(is_deleted=False)
+    tenants = Tenant.objects.all()
     
     # Filters
     status_filter = request.GET.get('status', '')
@@ -150,7 +144,6 @@ def tenant_detail(request, tenant_id):
     # Users
     users = UserAccount.objects.filter(
         tenant=tenant,
-        is_deleted=False
     ).order_by('-created_at')[:10]
     
     # Subscription
@@ -169,7 +162,7 @@ def tenant_detail(request, tenant_id):
     # Recent audit logs
     audit_logs = AuditLog.objects.filter(
         tenant=tenant
-    ).order_by('-created_at')[:10]
+    ).select_related('user').order_by('-timestamp')[:10]
     
     context = {
         'tenant': tenant,
@@ -240,7 +233,7 @@ def user_management(request):
     """
     Global user management
     """
-    users = UserAccount.objects.filter(is_deleted=False).select_related(
+    users = UserAccount.objects.select_related(
         'tenant', 'role'
     )
     
@@ -276,7 +269,7 @@ def user_management(request):
     users_page = paginator.get_page(page)
     
     # For filters
-    tenants = Tenant.objects.filter(is_deleted=False, is_active=True)
+    tenants = Tenant.objects.filter(is_active=True)
     
     context = {
         'users': users_page,
@@ -292,6 +285,7 @@ def user_management(request):
 
 @login_required
 @role_required(['super_admin'])
+@query_budget(11)
 def analytics_reporting(request):
     """
     Analytics and reporting dashboard
@@ -350,6 +344,7 @@ def analytics_reporting(request):
 
 @login_required
 @role_required(['super_admin'])
+@query_budget(9)
 def system_settings(request):
     """
     Manage system settings
@@ -385,6 +380,7 @@ def system_settings(request):
 
 @login_required
 @role_required(['super_admin'])
+@query_budget(9)
 def support_tickets(request):
     """
     List and manage support tickets
@@ -489,7 +485,6 @@ def ticket_detail(request, ticket_id):
     super_admins = UserAccount.objects.filter(
         role__name='super_admin',
         is_active=True,
-        is_deleted=False
     )
     
     context = {
@@ -547,6 +542,7 @@ def billing_management(request):
 def audit_trail(request):
     """
     View system-wide audit logs
+    Archived logs are included with include_archived, which requires a start date
     """
     logs = AuditLog.objects.select_related(
         'user', 'tenant'
@@ -556,31 +552,72 @@ def audit_trail(request):
     action_filter = request.GET.get('action', '')
     tenant_filter = request.GET.get('tenant', '')
     user_filter = request.GET.get('user', '')
-    
-    if action_filter:
-        logs = logs.filter(action=action_filter)
-    
-    if tenant_filter:
-        logs = logs.filter(tenant_id=tenant_filter)
-    
-    if user_filter:
-        logs = logs.filter(user_id=user_filter)
-    
-    logs = logs.order_by('-created_at')
+    start_filter = request.GET.get('start', '')
+    end_filter = request.GET.get('end', '')
+    include_archived = request.GET.get('include_archived') == 'on'
+    
+    try:
+        start = parse_date(start_filter) if start_filter else None
+        end = parse_date(end_filter) if end_filter else None
+    except ValueError:
+        # Well-formed but impossible dates such as 2024-02-30
+        messages.error(request, 'Enter valid dates for the date range.')
+        start = end = None
+    start = timezone.make_aware(datetime.combine(start, time.min)) if start else None
+    end = timezone.make_aware(datetime.combine(end, time.max)) if end else None
+    
+    if include_archived and not start:
+        # Without a start date the lookup would read every archive segment
+        messages.error(request, 'Choose a start date to include archived logs.')
+        include_archived = False
+    
+    if include_archived:
+        # Compliance lookup spanning hot rows and archive segments
+        logs = list(islice(
+            query_audit_logs(
+                tenant_id=tenant_filter or None,
+                user_id=user_filter or None,
+                action=action_filter or None,
+                start=start,
+                end=end,
+            ),
+            django_settings.AUDIT_QUERY_MAX_RESULTS
+        ))
+    else:
+        if action_filter:
+            logs = logs.filter(action=action_filter)
+        
+        if tenant_filter:
+            logs = logs.filter(tenant_id=tenant_filter)
+        
+        if user_filter:
+            logs = logs.filter(user_id=user_filter)
+        
+        if start:
+            logs = logs.filter(timestamp__gte=start)
+        
+        if end:
+            logs = logs.filter(timestamp__lte=end)
+        
+        logs = logs.order_by('-timestamp')
     
     # Pagination
     paginator = Paginator(logs, 50)
     page = request.GET.get('page', 1)
     logs_page = paginator.get_page(page)
+    attach_related(logs_page.object_list)
     
     # For filters
-    tenants = Tenant.objects.filter(is_deleted=False, is_active=True)
+    tenants = Tenant.objects.filter(is_active=True)
     
     context = {
         'logs': logs_page,
         'action_filter': action_filter,
         'tenant_filter': tenant_filter,
         'user_filter': user_filter,
+        'start_filter': start_filter,
+        'end_filter': end_filter,
+        'include_archived': include_archived,
         'tenants': tenants,
     }
     
@@ -6,6 +6,7 @@ Attendance, Assignments, Assessments, Grades, Messages, Notifications
 from django.db import models
 from django.utils import timezone
 from core.models import BaseModel, Tenant, UserAccount, Subject, Section, AcademicYear
+from core.models import Message, Notification  # noqa: F401  (moved to core.models)
 
 
 class Attendance(BaseModel):
@@ -201,69 +202,6 @@ class Grade(BaseModel):
             return 'F'
 
 
-class Message(BaseModel):
-    """Internal messaging system"""
-    tenant = models.ForeignKey(Tenant, on_delete=models.CASCADE, related_name='messages')
-    
-    sender = models.ForeignKey(UserAccount, on_delete=models.CASCADE, related_name='messages_sent')
-    recipient = models.ForeignKey(UserAccount, on_delete=models.CASCADE, related_name='messages_received')
-    
-    subject = models.CharField(max_length=200)
-    body = models.TextField()
-    
-    is_read = models.BooleanField(default=False)
-    read_at = models.DateTimeField(null=True, blank=True)
-    
-    parent_message = models.ForeignKey('self', on_delete=models.CASCADE, null=True, blank=True, related_name='replies')
-    
-    class Meta:
-        db_table = 'messages'
-        ordering = ['-created_at']
-        indexes = [
-            models.Index(fields=['tenant', 'recipient', 'is_read']),
-            models.Index(fields=['sender']),
-        ]
-    
-    def __str__(self):
-        return f"{self.sender.get_full_name()} to {self.recipient.get_full_name()} - {self.subject}"
-
-
-class Notification(BaseModel):
-    """System notifications"""
-    tenant = models.ForeignKey(Tenant, on_delete=models.CASCADE, null=True, blank=True, related_name='notifications')
-    user = models.ForeignKey(UserAccount, on_delete=models.CASCADE, related_name='notifications')
-    
-    title = models.CharField(max_length=200)
-    message = models.TextField()
-    
-    notification_type = models.CharField(
-        max_length=20,
-        choices=[
-            ('info', 'Information'),
-            ('success', 'Success'),
-            ('warning', 'Warning'),
-            ('error', 'Error'),
-            ('announcement', 'Announcement'),
-        ],
-        default='info'
-    )
-    
-    link = models.CharField(max_length=500, null=True, blank=True)
-    is_read = models.BooleanField(default=False)
-    read_at = models.DateTimeField(null=True, blank=True)
-    
-    class Meta:
-        db_table = 'notifications'
-        ordering = ['-created_at']
-        indexes = [
-            models.Index(fields=['user', 'is_read']),
-            models.Index(fields=['tenant', 'created_at']),
-        ]
-    
-    def __str__(self):
-        return f"{self.user.get_full_name()} - {self.title}"
-
-
 class Announcement(BaseModel):
     """Announcements/Notices"""
     tenant = models.ForeignKey(Tenant, on_delete=models.CASCADE, related_name='announcements')
@@ -8,7 +8,7 @@ from django.utils.html import format_html
 from .models import (
     Tenant, TenantDomain, Role, UserAccount, Department, Subject,
     AcademicYear, Section, TeacherSubjectAssignment, StudentEnrollment,
-    ParentStudentLink, AuditLog
+    ParentStudentLink, AuditLog, AuditLogArchive, Notification, Message
 )
 
 
@@ -183,6 +183,22 @@ class ParentStudentLinkAdmin(admin.ModelAdmin):
     readonly_fields = ['id', 'created_at', 'updated_at']
 
 
+@admin.register(Notification)
+class NotificationAdmin(admin.ModelAdmin):
+    list_display = ['user', 'title', 'notification_type', 'is_read', 'created_at']
+    list_filter = ['notification_type', 'is_read', 'created_at']
+    search_fields = ['user__email', 'title']
+    readonly_fields = ['id', 'created_at', 'updated_at', 'read_at']
+
+
+@admin.register(Message)
+class MessageAdmin(admin.ModelAdmin):
+    list_display = ['sender', 'recipient', 'subject', 'is_read', 'created_at']
+    list_filter = ['is_read', 'created_at']
+    search_fields = ['sender__email', 'recipient__email', 'subject']
+    readonly_fields = ['id', 'created_at', 'updated_at', 'read_at']
+
+
 @admin.register(AuditLog)
 class AuditLogAdmin(admin.ModelAdmin):
     list_display = ['user', 'action', 'resource_type', 'status', 'timestamp']
@@ -199,3 +215,18 @@ class AuditLogAdmin(admin.ModelAdmin):
     
     def has_delete_permission(self, request, obj=None):
         return False
+
+
+@admin.register(AuditLogArchive)
+class AuditLogArchiveAdmin(admin.ModelAdmin):
+    list_display = ['tenant', 'period_start', 'period_end', 'row_count', 'size_bytes', 'created_at']
+    list_filter = ['created_at']
+    search_fields = ['tenant__name', 'storage_path']
+    readonly_fields = ['id', 'created_at', 'tenant', 'period_start', 'period_end', 'storage_path',
+                       'row_count', 'size_bytes', 'checksum']
+    
+    def has_add_permission(self, request):
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
@@ -0,0 +1,228 @@
+"""
+Audit Log Storage Lifecycle
+- Archiver: moves audit rows past the retention window into gzip-compressed
+  JSONL segments on the configured archive storage (local filesystem or
+  S3-compatible / MinIO). Each batch writes one segment per tenant and
+  calendar month it contains, so a busy tenant-month spans several segments
+- Query API: reads hot rows and archived segments as a single stream
+"""
+
+from collections import defaultdict
+from datetime import timedelta
+from functools import lru_cache
+from operator import attrgetter
+import gzip
+import hashlib
+import heapq
+import io
+import json
+import logging
+import uuid
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from django.utils.module_loading import import_string
+
+from .db.sharding import directory, each_shard
+from .models import AuditLog, AuditLogArchive, Tenant, UserAccount
+
+logger = logging.getLogger(__name__)
+
+# Fields written to each JSONL record (FKs are stored by id)
+ARCHIVED_FIELDS = [
+    'id', 'timestamp', 'user_id', 'tenant_id', 'action', 'resource_type',
+    'resource_id', 'description', 'ip_address', 'user_agent', 'changes', 'status',
+]
+
+
+@lru_cache(maxsize=1)
+def get_archive_storage():
+    """Instantiate the storage backend configured for audit archives"""
+    storage_class = import_string(settings.AUDIT_ARCHIVE_STORAGE)
+    return storage_class(**settings.AUDIT_ARCHIVE_STORAGE_OPTIONS)
+
+
+def serialize_audit_log(log):
+    """Convert an AuditLog instance into a JSON-serializable dict"""
+    return {field: getattr(log, field) for field in ARCHIVED_FIELDS}
+
+
+def deserialize_audit_log(record):
+    """Rebuild an (unsaved) AuditLog instance from an archived record"""
+    data = dict(record)
+    data['id'] = uuid.UUID(data['id'])
+    data['timestamp'] = parse_datetime(data['timestamp'])
+    log = AuditLog(**data)
+    log.is_archived = True
+    return log
+
+
+def _month_start(value):
+    return value.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def _write_segment(tenant_id, month, logs, using=None):
+    """Write one archive segment and remove its rows from the hot table"""
+    buffer = io.BytesIO()
+    with gzip.GzipFile(fileobj=buffer, mode='wb') as gz:
+        for log in logs:
+            line = json.dumps(serialize_audit_log(log), cls=DjangoJSONEncoder)
+            gz.write(line.encode('utf-8') + b'\n')
+    payload = buffer.getvalue()
+
+    path = (
+        f"audit/{tenant_id or 'system'}/{month:%Y/%m}/"
+        f"{logs[0].timestamp:%Y%m%dT%H%M%S}-{uuid.uuid4().hex[:12]}.jsonl.gz"
+    )
+
+    # The file is written first; the manifest row and the delete commit together,
+    # so a failed run leaves at worst an orphan file, never lost rows.
+    storage_path = get_archive_storage().save(path, ContentFile(payload))
+
+    with transaction.atomic(using=using):
+        AuditLogArchive.objects.using(using).create(
+            tenant_id=tenant_id,
+            period_start=logs[0].timestamp,
+            period_end=logs[-1].timestamp,
+            storage_path=storage_path,
+            row_count=len(logs),
+            size_bytes=len(payload),
+            checksum=hashlib.sha256(payload).hexdigest(),
+        )
+        AuditLog.objects.using(using).filter(pk__in=[log.pk for log in logs]).delete()
+
+    return storage_path
+
+
+def archive_audit_logs(older_than_days=None, batch_size=None, max_batches=None):
+    """
+    Move audit logs older than the retention window to archive storage
+
+    Args:
+        older_than_days: Retention window in days (default AUDIT_LOG_RETENTION_DAYS)
+        batch_size: Rows read per batch (default AUDIT_ARCHIVE_BATCH_SIZE)
+        max_batches: Stop after this many batches (default: run until done)
+
+    Each batch is split into one segment per tenant and calendar month, so a
+    tenant-month larger than a batch spans several segments.
+
+    Returns:
+        dict: {'rows': archived row count, 'segments': segment files written}
+    """
+    if older_than_days is None:
+        older_than_days = settings.AUDIT_LOG_RETENTION_DAYS
+    batch_size = batch_size or settings.AUDIT_ARCHIVE_BATCH_SIZE
+    cutoff = timezone.now() - timedelta(days=older_than_days)
+
+    totals = {'rows': 0, 'segments': 0}
+    batches = 0
+
+    # Each shard holds the audit rows of its tenants; copies left behind by a
+    # move are skipped
+    for alias in each_shard():
+        logs = AuditLog.objects.using(alias).filter(timestamp__lt=cutoff).exclude(
+            tenant_id__in=directory.tenants_elsewhere(alias)
+        )
+        while max_batches is None or batches < max_batches:
+            batch = list(logs.order_by('timestamp', 'id')[:batch_size])
+            if not batch:
+                break
+
+            segments = defaultdict(list)
+            for log in batch:
+                segments[(log.tenant_id, _month_start(log.timestamp))].append(log)
+
+            for (tenant_id, month), segment in segments.items():
+                _write_segment(tenant_id, month, segment, using=alias)
+                totals['segments'] += 1
+
+            totals['rows'] += len(batch)
+            batches += 1
+
+    logger.info(f"Archived {totals['rows']} audit logs into {totals['segments']} segments (cutoff {cutoff:%Y-%m-%d})")
+    return totals
+
+
+def _matches(log, tenant_id, user_id, action, start, end):
+    if tenant_id and str(log.tenant_id) != str(tenant_id):
+        return False
+    if user_id and str(log.user_id) != str(user_id):
+        return False
+    if action and log.action != action:
+        return False
+    if start and log.timestamp < start:
+        return False
+    if end and log.timestamp > end:
+        return False
+    return True
+
+
+def _iter_archive(archive, tenant_id, user_id, action, start, end):
+    """Yield matching records from one segment, newest first"""
+    with get_archive_storage().open(archive.storage_path, 'rb') as fh:
+        with gzip.GzipFile(fileobj=fh, mode='rb') as gz:
+            logs = [deserialize_audit_log(json.loads(line)) for line in gz if line.strip()]
+
+    logs = [log for log in logs if _matches(log, tenant_id, user_id, action, start, end)]
+    logs.sort(key=attrgetter('timestamp'), reverse=True)
+    yield from logs
+
+
+def attach_related(logs):
+    """Resolve user and tenant for archived entries with one query each"""
+    archived = [log for log in logs if getattr(log, 'is_archived', False)]
+    users = UserAccount.objects.in_bulk({log.user_id for log in archived if log.user_id})
+    tenants = Tenant.objects.in_bulk({log.tenant_id for log in archived if log.tenant_id})
+    for log in archived:
+        log.user = users.get(uuid.UUID(str(log.user_id))) if log.user_id else None
+        log.tenant = tenants.get(uuid.UUID(str(log.tenant_id))) if log.tenant_id else None
+    return logs
+
+
+def query_audit_logs(tenant_id=None, user_id=None, action=None, start=None, end=None, include_archived=True):
+    """
+    Query audit logs across the hot table and archive segments
+
+    Args:
+        tenant_id: Restrict to one tenant
+        user_id: Restrict to one actor
+        action: Restrict to one action type
+        start: Earliest timestamp (inclusive)
+        end: Latest timestamp (inclusive)
+        include_archived: Also read archived segments overlapping the range
+
+    Returns:
+        iterator: AuditLog instances ordered newest first. Archived entries are
+        unsaved instances with ``is_archived = True``.
+    """
+    hot = AuditLog.objects.select_related('user', 'tenant')
+    if tenant_id:
+        hot = hot.filter(tenant_id=tenant_id)
+    if user_id:
+        hot = hot.filter(user_id=user_id)
+    if action:
+        hot = hot.filter(action=action)
+    if start:
+        hot = hot.filter(timestamp__gte=start)
+    if end:
+        hot = hot.filter(timestamp__lte=end)
+
+    streams = [hot.order_by('-timestamp').iterator(chunk_size=500)]
+
+    if include_archived:
+        archives = AuditLogArchive.objects.all()
+        if tenant_id:
+            archives = archives.filter(tenant_id=tenant_id)
+        if start:
+            archives = archives.filter(period_end__gte=start)
+        if end:
+            archives = archives.filter(period_start__lte=end)
+
+        for archive in archives.order_by('-period_start'):
+            streams.append(_iter_archive(archive, tenant_id, user_id, action, start, end))
+
+    return heapq.merge(*streams, key=attrgetter('timestamp'), reverse=True)
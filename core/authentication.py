@@ -0,0 +1,25 @@
+"""
+User Loading
+UserModelBackend loads the session's user with select_related('role',
+'tenant') in a single query, so a request dereferencing request.user,
+user.role and user.tenant costs one query instead of three. The row is read
+fresh on every request: a cached copy would outlive queryset .update() calls
+(deactivations, tenant suspensions) and be written back by
+request.user.save(). Role permission checks go through the versioned role
+registry (core.roles).
+"""
+
+from django.contrib.auth.backends import ModelBackend
+
+from .models import UserAccount
+
+
+class UserModelBackend(ModelBackend):
+    """ModelBackend whose session user comes with role and tenant"""
+
+    def get_user(self, user_id):
+        try:
+            user = UserAccount._default_manager.select_related('role', 'tenant').get(pk=user_id)
+        except (UserAccount.DoesNotExist, ValueError):
+            return None
+        return user if self.user_can_authenticate(user) else None
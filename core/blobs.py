@@ -0,0 +1,259 @@
+"""
+Content-Addressed File Storage
+File fields of resources, assignments and submissions use BlobStorage: a
+TenantStorage that names each file by the SHA-256 of its content. The first
+upload of some content in a tenant writes one object under
+tenants/<tenant_id>/blobs/ and records a FileBlob row; every later upload of
+the same bytes (the same slide deck for ten sections) only increments the
+blob's ref_count and gets the existing name, so it costs no storage and is
+not metered again.
+
+Deleting a field's file decrements ref_count but leaves the object in place.
+collect_garbage() (manage.py gc_blobs, the nightly collect_blob_garbage
+task) recounts the references held by every content-addressed field and
+by finished uploads, then removes blobs that have had none for
+BLOB_GC_GRACE_HOURS and releases their bytes from the tenant's usage.
+adopt_existing() moves files saved before this storage into blobs.
+"""
+
+from collections import Counter
+from datetime import timedelta
+import hashlib
+import logging
+import posixpath
+
+from django.apps import apps
+from django.conf import settings
+from django.core.files.base import File
+from django.db import IntegrityError, models, transaction
+from django.db.models import Count, F
+from django.utils import timezone
+from django.utils.deconstruct import deconstructible
+
+from .db.sharding import directory, each_shard
+from .models import FileBlob, Tenant, UploadSession
+from .storage import StorageQuotaExceeded, TenantStorage, TENANT_PREFIX, tenant_id_from_path
+from .usage import adjust_usage, check_limit
+
+logger = logging.getLogger(__name__)
+
+BLOB_DIR = 'blobs'
+
+
+def blob_name(tenant_id, digest, filename=''):
+    """tenants/<tenant_id>/blobs/<ab>/<sha256><ext>"""
+    ext = posixpath.splitext(filename)[1].lower()[:10]
+    return posixpath.join(TENANT_PREFIX, str(tenant_id), BLOB_DIR, digest[:2], f'{digest}{ext}')
+
+
+def is_blob_name(name):
+    return bool(tenant_id_from_path(name)) and f'/{BLOB_DIR}/' in name
+
+
+def content_digest(content):
+    """
+    SHA-256 of a file, read in chunks and rewound
+
+    Forward-only streams must carry a precomputed `sha256` attribute.
+    """
+    digest = getattr(content, 'sha256', None) or getattr(getattr(content, 'file', None), 'sha256', None)
+    if digest:
+        return digest
+    hasher = hashlib.sha256()
+    for block in content.chunks():
+        hasher.update(block)
+    content.seek(0)
+    return hasher.hexdigest()
+
+
+@deconstructible
+class BlobStorage(TenantStorage):
+    """TenantStorage storing one object per distinct content per tenant"""
+
+    # Callers that stream (core.uploads) hash the content before saving
+    content_addressed = True
+
+    def save_for_tenant(self, tenant, name, content, max_length=None):
+        # Without a tenant there is nobody to count references for
+        if tenant is None or tenant_id_from_path(name):
+            return super().save_for_tenant(tenant, name, content, max_length)
+
+        digest = content_digest(content)
+        if not hasattr(content, 'chunks'):
+            content = File(content, name)
+
+        stored = self._reference(tenant, digest)
+        if stored:
+            return stored
+
+        size = content.size
+        if not check_limit(tenant, 'storage', size):
+            raise StorageQuotaExceeded(f"Storage limit exceeded. Maximum: {tenant.max_storage_gb} GB")
+        stored = self.backend.save(blob_name(tenant.pk, digest, name), content, max_length=max_length)
+        try:
+            with transaction.atomic():
+                FileBlob.all_objects.create(
+                    tenant=tenant, sha256=digest, size=size, storage_name=stored, ref_count=1
+                )
+        except IntegrityError:
+            # A concurrent upload of the same content created the blob first
+            self.backend.delete(stored)
+            return self._reference(tenant, digest)
+        adjust_usage(tenant, 'storage', size)
+        return stored
+
+    def _reference(self, tenant, digest):
+        """Take a reference on an existing blob; its name, or None"""
+        blobs = FileBlob.all_objects.filter(tenant_id=tenant.pk, sha256=digest)
+        if blobs.update(ref_count=F('ref_count') + 1, updated_at=timezone.now()):
+            return blobs.values_list('storage_name', flat=True).first()
+        return None
+
+    def delete(self, name):
+        if not is_blob_name(name):
+            return super().delete(name)
+        # The object stays until collect_garbage() finds no references
+        FileBlob.all_objects.filter(storage_name=name, ref_count__gt=0).update(
+            ref_count=F('ref_count') - 1, updated_at=timezone.now()
+        )
+
+
+blob_storage = BlobStorage()
+
+
+def get_blob_storage():
+    """Storage callable for FileField(storage=...)"""
+    return blob_storage
+
+
+def blob_fields():
+    """Every concrete file field stored through BlobStorage"""
+    return [
+        field
+        for model in apps.get_models()
+        for field in model._meta.concrete_fields
+        if isinstance(field, models.FileField) and getattr(field.storage, 'content_addressed', False)
+    ]
+
+
+def count_references():
+    """
+    Rows pointing at each blob name, soft-deleted rows included (they can be
+    restored) and finished uploads not yet attached to a row
+
+    Returns:
+        Counter: {storage_name: references}
+    """
+    references = Counter()
+    sources = [(field.model, field.attname) for field in blob_fields()]
+    sources.append((UploadSession, 'stored_name'))
+    for model, column in sources:
+        rows = model._base_manager.filter(**{f'{column}__contains': f'/{BLOB_DIR}/'})
+        if model is UploadSession:
+            rows = rows.filter(status='complete')
+        for name, count in rows.values_list(column).annotate(count=Count('pk')).order_by():
+            references[name] += count
+    return references
+
+
+def _collect_shard(blobs, cutoff, dry_run, batch_size):
+    """collect_garbage() over the blobs of the bound shard; (recounted, removed, bytes)"""
+    references = count_references()
+
+    changed = []
+    recounted = 0
+    for blob in blobs.only('pk', 'storage_name', 'ref_count').iterator(chunk_size=batch_size):
+        count = references.get(blob.storage_name, 0)
+        if blob.ref_count != count:
+            blob.ref_count = count
+            changed.append(blob)
+            recounted += 1
+        if len(changed) >= batch_size:
+            if not dry_run:
+                FileBlob.all_objects.bulk_update(changed, ['ref_count'])
+            changed = []
+    if changed and not dry_run:
+        FileBlob.all_objects.bulk_update(changed, ['ref_count'])
+
+    removed = released = 0
+    unreferenced = blobs.filter(ref_count=0, updated_at__lt=cutoff)
+    if dry_run:
+        unreferenced = [
+            blob for blob in blobs.filter(updated_at__lt=cutoff).iterator(chunk_size=batch_size)
+            if references.get(blob.storage_name, 0) == 0
+        ]
+    else:
+        unreferenced = unreferenced.iterator(chunk_size=batch_size)
+    for blob in unreferenced:
+        # Only if no upload took a reference since the recount
+        if not dry_run:
+            if not FileBlob.all_objects.filter(pk=blob.pk, ref_count=0).delete()[0]:
+                continue
+            blob_storage.backend.delete(blob.storage_name)
+            adjust_usage(blob.tenant_id, 'storage', -blob.size)
+        removed += 1
+        released += blob.size
+    return recounted, removed, released
+
+
+def collect_garbage(grace_hours=None, dry_run=False, batch_size=1000):
+    """
+    Recount blob references and remove blobs nobody points at, shard by
+    shard (blobs and the rows referencing them live on the tenant's shard)
+
+    Args:
+        grace_hours: Keep unreferenced blobs touched within this window
+            (uploads in flight) (default BLOB_GC_GRACE_HOURS)
+        dry_run: Report without changing anything
+
+    Returns:
+        dict: recounted (blobs whose count was corrected), removed, bytes
+    """
+    if grace_hours is None:
+        grace_hours = settings.BLOB_GC_GRACE_HOURS
+    cutoff = timezone.now() - timedelta(hours=grace_hours)
+
+    totals = {'recounted': 0, 'removed': 0, 'bytes': 0}
+    for alias in each_shard():
+        # Copies left behind by a move must not release the tenant's objects
+        blobs = FileBlob.all_objects.exclude(tenant_id__in=directory.tenants_elsewhere(alias))
+        for key, count in zip(totals, _collect_shard(blobs, cutoff, dry_run, batch_size)):
+            totals[key] += count
+
+    logger.info(f"Blob GC: {totals['recounted']} recounted, {totals['removed']} removed ({totals['bytes']} bytes)")
+    return totals
+
+
+def adopt_existing(batch_size=500):
+    """
+    Move files saved before content addressing into blobs: each file is
+    hashed, rows are repointed at the blob and the old copy is deleted
+
+    Returns:
+        int: Files adopted
+    """
+    adopted = 0
+    tenants = {}
+    for field in blob_fields():
+        rows = (
+            field.model._base_manager.exclude(**{f'{field.attname}__contains': f'/{BLOB_DIR}/'})
+            .exclude(**{field.attname: ''}).exclude(**{f'{field.attname}__isnull': True})
+            .filter(**{f'{field.attname}__startswith': f'{TENANT_PREFIX}/'})
+            .values_list(field.attname, flat=True).distinct()
+        )
+        for name in rows.iterator(chunk_size=batch_size):
+            tenant_id = tenant_id_from_path(name)
+            if tenant_id not in tenants:
+                tenants[tenant_id] = Tenant.objects.filter(pk=tenant_id).first()
+            if tenants[tenant_id] is None or not blob_storage.backend.exists(name):
+                continue
+            with blob_storage.backend.open(name, 'rb') as fh:
+                stored = blob_storage.save_for_tenant(tenants[tenant_id], posixpath.basename(name), File(fh))
+            references = field.model._base_manager.filter(**{field.attname: name}).update(**{field.attname: stored})
+            # The first reference was taken by the save
+            if references > 1:
+                FileBlob.all_objects.filter(storage_name=stored).update(ref_count=F('ref_count') + references - 1)
+            TenantStorage.delete(blob_storage, name)
+            adopted += 1
+    logger.info(f"Adopted {adopted} files into content-addressed storage")
+    return adopted
@@ -0,0 +1,74 @@
+"""
+Concurrent Dashboard Queries
+Dashboards run many independent COUNT/SUM queries. With
+DASHBOARD_CONCURRENT_QUERIES on they are submitted to a bounded thread pool
+(DASHBOARD_QUERY_WORKERS threads, each with its own database connection)
+and waited for together, so the page costs roughly its slowest query rather
+than the sum of all of them. It is off by default: on SQLite the pool is
+slower, and manage.py benchmark_dashboards should show a gain on the
+production database before it is turned on. The dashboards themselves are
+sync views; there is no async view mode.
+
+Queries are given as {name: callable}; each callable must evaluate its
+queryset (count(), aggregate(), list(...)) so no lazy query escapes.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+import contextvars
+from functools import lru_cache
+
+from django.conf import settings
+from django.db import close_old_connections
+
+from .query_budget import current_recorder
+
+
+@lru_cache(maxsize=1)
+def get_query_executor():
+    """Process-wide pool for dashboard queries"""
+    return ThreadPoolExecutor(
+        max_workers=settings.DASHBOARD_QUERY_WORKERS,
+        thread_name_prefix='dashboard-query',
+    )
+
+
+def _run(query):
+    # Pool threads keep their connection between tasks; drop it when stale,
+    # as the request cycle does for request threads
+    close_old_connections()
+    recorder = current_recorder.get()
+    if recorder is None:
+        return query()
+    with recorder.attach():
+        return query()
+
+
+def gather_queries(queries):
+    """
+    Run independent queries, concurrently when DASHBOARD_CONCURRENT_QUERIES is on
+
+    Args:
+        queries: dict of {name: zero-argument callable}
+
+    Returns:
+        dict: {name: result}; the first exception raised is propagated
+    """
+    if not settings.DASHBOARD_CONCURRENT_QUERIES:
+        return run_queries(queries)
+    return run_concurrently(queries)
+
+
+def run_concurrently(queries):
+    """Run queries on the dashboard query pool and wait for all of them"""
+    executor = get_query_executor()
+    # Each task runs in a copy of the request context (query recorder, shard)
+    futures = {
+        name: executor.submit(contextvars.copy_context().run, _run, query)
+        for name, query in queries.items()
+    }
+    return {name: future.result() for name, future in futures.items()}
+
+
+def run_queries(queries):
+    """Run queries one after another (the default)"""
+    return {name: query() for name, query in queries.items()}
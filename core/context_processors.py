@@ -4,6 +4,9 @@ Context Processors for Templates
 
 from django.conf import settings
 
+from .inbox import unread_counts
+from .roles import get_user_role
+
 
 def site_context(request):
     """Add site-wide context variables"""
@@ -12,6 +15,7 @@ def site_context(request):
         'SITE_URL': settings.SITE_URL,
         'COMPANY_EMAIL': settings.COMPANY_EMAIL,
         'COMPANY_PHONE': settings.COMPANY_PHONE,
+        'INBOX_BADGE_POLL_SECONDS': settings.INBOX_BADGE_POLL_SECONDS,
     }
 
 
@@ -32,8 +36,9 @@ def tenant_context(request):
         context['tenant'] = request.tenant
     
     # Add user role information
-    if request.user.is_authenticated and request.user.role:
-        role_name = request.user.role.name
+    role = getattr(request, 'role', None) or get_user_role(request.user)
+    if role:
+        role_name = role.name
         context['is_super_admin'] = role_name == 'super_admin' or request.user.is_superuser
         context['is_tenant_admin'] = role_name == 'tenant_admin'
         context['is_department_admin'] = role_name == 'department_admin'
@@ -41,6 +46,10 @@ def tenant_context(request):
         context['is_student'] = role_name == 'student'
         context['is_parent'] = role_name == 'parent'
         context['user_role'] = role_name
-        context['user_role_display'] = request.user.role.display_name
+        context['user_role_display'] = role.display_name
+        # Cached counters: no query per page (core.inbox)
+        inbox_unread = unread_counts(request.user)
+        context['unread_notifications_count'] = inbox_unread['notifications']
+        context['inbox_unread_count'] = inbox_unread['total']
     
     return context
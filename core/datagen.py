@@ -0,0 +1,510 @@
+"""
+Synthetic Dataset Generator
+Builds production-scale tenants for benchmarking: departments, sections,
+users of every role, enrollments, and years of attendance, grades, audit
+logs and subscription payments. Structural rows go through bulk_create;
+the high-volume history tables are streamed as parameter tuples straight
+into executemany, skipping model instantiation. Every value (including
+primary keys) comes from a seeded RNG, so the same seed and end date always
+produce the same dataset.
+
+Attendance dominates the volume: roughly students x school days per year
+x years. 4 tenants x 2000 students x 2 years is about 2M attendance rows.
+"""
+
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from itertools import islice
+import logging
+import random
+import uuid
+
+from django.contrib.auth.hashers import make_password
+from django.core.management import call_command
+from django.db import connections, router, transaction
+from django.utils import timezone
+
+from .ids import uuid7_at
+from .models import (
+    AcademicYear, AuditLog, Department, ParentStudentLink, Role, Section, StudentEnrollment,
+    Subject, Tenant, UserAccount
+)
+from .usage import reconcile_usage
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PASSWORD = 'benchmark123'
+
+DEPARTMENT_NAMES = [
+    ('CSE', 'Computer Science'), ('ECE', 'Electronics & Communication'), ('ME', 'Mechanical'),
+    ('CE', 'Civil'), ('EEE', 'Electrical & Electronics'), ('IT', 'Information Technology'),
+    ('CHE', 'Chemical'), ('BT', 'Biotechnology'),
+]
+FIRST_NAMES = [
+    'Aarav', 'Vivaan', 'Aditya', 'Ananya', 'Diya', 'Isha', 'Kabir', 'Meera', 'Rohan', 'Saanvi',
+    'Arjun', 'Priya', 'Rahul', 'Sneha', 'Vikram', 'Neha', 'Karan', 'Pooja', 'Siddharth', 'Tara',
+]
+LAST_NAMES = [
+    'Sharma', 'Patel', 'Reddy', 'Iyer', 'Nair', 'Gupta', 'Singh', 'Kumar', 'Das', 'Rao',
+    'Menon', 'Joshi', 'Verma', 'Chopra', 'Bose', 'Pillai',
+]
+ATTENDANCE_STATUSES = ['present', 'absent', 'late', 'excused']
+AUDIT_ACTIONS = [('login', 50), ('view', 30), ('update', 12), ('create', 6), ('delete', 2)]
+EXAMS = [('Mid-term', 0.4), ('Final', 0.9)]
+STUDY_YEARS = 4
+SUBJECTS_PER_YEAR = 5
+
+
+@dataclass
+class DatasetOptions:
+    """Shape of the generated dataset"""
+    tenants: int = 1
+    students: int = 2000
+    departments: int = 6
+    sections_per_year: int = 2
+    years: int = 1
+    audit_events_per_user: int = 10
+    seed: int = 42
+    end_date: date = None
+    chunk_size: int = 5000
+    prefix: str = 'synthetic'
+    password: str = DEFAULT_PASSWORD
+
+
+@dataclass
+class DatasetSummary:
+    """Rows created per model"""
+    counts: dict = field(default_factory=dict)
+    tenant_ids: list = field(default_factory=list)
+
+    def add(self, name, count):
+        self.counts[name] = self.counts.get(name, 0) + count
+
+
+@contextmanager
+def explicit_timestamps(model, *field_names):
+    """Let bulk_create keep the given auto_now/auto_now_add values"""
+    fields = [model._meta.get_field(name) for name in field_names]
+    saved = [(f.auto_now, f.auto_now_add) for f in fields]
+    for f in fields:
+        f.auto_now = f.auto_now_add = False
+    try:
+        yield
+    finally:
+        for f, (auto_now, auto_now_add) in zip(fields, saved):
+            f.auto_now, f.auto_now_add = auto_now, auto_now_add
+
+
+def bulk_insert(model, objects, chunk_size):
+    """Stream objects into bulk_create chunk by chunk; returns rows inserted"""
+    total = 0
+    iterator = iter(objects)
+    while chunk := list(islice(iterator, chunk_size)):
+        model.objects.bulk_create(chunk, batch_size=chunk_size)
+        total += len(chunk)
+    return total
+
+
+def insert_rows(model, field_names, rows, chunk_size):
+    """
+    Stream value tuples into the model's table with executemany
+
+    Args:
+        model: Model class
+        field_names: Field attnames, in the order of each row tuple
+        rows: Iterable of tuples
+        chunk_size: Rows per executemany call
+
+    Returns:
+        int: Rows inserted
+    """
+    connection = connections[router.db_for_write(model)]
+    fields = [model._meta.get_field(name) for name in field_names]
+    quote = connection.ops.quote_name
+    sql = (
+        f"INSERT INTO {quote(model._meta.db_table)} ({', '.join(quote(f.column) for f in fields)}) "
+        f"VALUES ({', '.join(['%s'] * len(fields))})"
+    )
+    total = 0
+    iterator = iter(rows)
+    with connection.cursor() as cursor:
+        while chunk := list(islice(iterator, chunk_size)):
+            cursor.executemany(sql, [
+                tuple(f.get_db_prep_save(value, connection) for f, value in zip(fields, row)) for row in chunk
+            ])
+            total += len(chunk)
+    return total
+
+
+def school_days(start, end, holidays):
+    """Weekdays between start and end (inclusive) that are not holidays"""
+    day = start
+    while day <= end:
+        if day.weekday() < 5 and day not in holidays:
+            yield day
+        day += timedelta(days=1)
+
+
+def letter_grade(percentage):
+    for threshold, letter in ((90, 'A+'), (80, 'A'), (70, 'B+'), (60, 'B'), (50, 'C'), (40, 'D')):
+        if percentage >= threshold:
+            return letter
+    return 'F'
+
+
+def aware(day, rng=None):
+    """Timezone-aware datetime on a day (random working hour when rng is given)"""
+    hour = rng.randint(8, 17) if rng else 9
+    minute = rng.randint(0, 59) if rng else 0
+    return timezone.make_aware(datetime.combine(day, time(hour, minute)))
+
+
+class TenantGenerator:
+    """Generates one tenant; every random choice comes from its own seeded RNG"""
+
+    def __init__(self, index, options, roles, password_hash, summary):
+        self.index = index
+        self.options = options
+        self.roles = roles
+        self.password_hash = password_hash
+        self.summary = summary
+        self.rng = random.Random(f'{options.seed}:{index}')
+        self.end_date = options.end_date or timezone.now().date()
+        self.slug = f'{options.prefix}-college-{index + 1}'
+
+    def uuid(self, at=None):
+        # History rows get time-ordered keys from their timestamp, as they would in production
+        if at is not None:
+            return uuid7_at(at, self.rng.getrandbits)
+        return uuid.UUID(int=self.rng.getrandbits(128), version=4)
+
+    def insert(self, model, objects):
+        count = bulk_insert(model, objects, self.options.chunk_size)
+        self.summary.add(model.__name__, count)
+        return count
+
+    def insert_rows(self, model, field_names, rows):
+        count = insert_rows(model, field_names, rows, self.options.chunk_size)
+        self.summary.add(model.__name__, count)
+        return count
+
+    def generate(self):
+        with transaction.atomic():
+            self.create_tenant()
+            self.create_departments()
+            self.create_users()
+            self.create_academic_years()
+            self.create_enrollments()
+            self.create_attendance()
+            self.create_grades()
+            self.create_audit_logs()
+            self.create_payments()
+        return self.tenant
+
+    # Structure
+
+    def create_tenant(self):
+        students = self.options.students
+        self.tenant = Tenant(
+            id=self.uuid(),
+            name=f'{self.options.prefix.title()} College {self.index + 1}',
+            slug=self.slug,
+            subdomain=self.slug,
+            email=f'admin@{self.slug}.example.edu',
+            phone='0000000000',
+            address_line1=f'{self.index + 1} Campus Road',
+            city='Bengaluru',
+            state='Karnataka',
+            country='India',
+            postal_code='560001',
+            subscription_status='active',
+            subscription_plan=self.rng.choice(['basic', 'professional', 'enterprise']),
+            max_students=students * 2,
+            max_teachers=max(100, students // 5),
+            max_departments=max(10, self.options.departments),
+            max_storage_gb=100,
+        )
+        self.insert(Tenant, [self.tenant])
+        self.summary.tenant_ids.append(self.tenant.pk)
+
+    def create_departments(self):
+        names = DEPARTMENT_NAMES[:self.options.departments]
+        self.departments = [
+            Department(id=self.uuid(), tenant=self.tenant, name=name, code=code,
+                       established_year=self.rng.randint(1980, 2015))
+            for code, name in names
+        ]
+        self.insert(Department, self.departments)
+
+        self.subjects = {}
+        subjects = []
+        for department in self.departments:
+            for study_year in range(1, STUDY_YEARS + 1):
+                self.subjects[department.pk, study_year] = [
+                    Subject(
+                        id=self.uuid(), tenant=self.tenant, department=department,
+                        name=f'{department.name} {study_year}0{number}',
+                        code=f'{department.code}{study_year}0{number}',
+                        semester=study_year * 2 - 1, year=study_year,
+                        subject_type=self.rng.choice(['theory', 'theory', 'theory', 'practical']),
+                    )
+                    for number in range(1, SUBJECTS_PER_YEAR + 1)
+                ]
+                subjects.extend(self.subjects[department.pk, study_year])
+        self.insert(Subject, subjects)
+
+    def user(self, role, number, **fields):
+        first_name = self.rng.choice(FIRST_NAMES)
+        last_name = self.rng.choice(LAST_NAMES)
+        return UserAccount(
+            id=self.uuid(),
+            email=f'{role}{number}@{self.slug}.example.edu',
+            first_name=first_name,
+            last_name=last_name,
+            password=self.password_hash,
+            tenant=self.tenant,
+            role=self.roles[role],
+            email_verified=True,
+            date_joined=aware(self.start_of_range()),
+            **fields,
+        )
+
+    def create_users(self):
+        students = self.options.students
+        self.admin = self.user('tenant_admin', 1)
+        self.hods = [self.user('department_admin', n + 1) for n in range(len(self.departments))]
+        self.teachers = [self.user('teacher', n + 1) for n in range(max(len(self.departments), students // 20))]
+        self.students = [
+            self.user('student', n + 1, gender=self.rng.choice(['male', 'female']))
+            for n in range(students)
+        ]
+        # Siblings share parents: roughly 1.3 students per parent
+        self.parents = [self.user('parent', n + 1) for n in range(max(1, int(students / 1.3)))]
+
+        self.insert(UserAccount, [self.admin, *self.hods, *self.teachers, *self.students, *self.parents])
+
+        for department, hod in zip(self.departments, self.hods):
+            department.hod = hod
+        Department.objects.bulk_update(self.departments, ['hod'])
+
+        # Each student's department and ability (drives attendance and marks)
+        self.profiles = {
+            student.pk: (
+                self.rng.choice(self.departments),
+                self.rng.randint(1, STUDY_YEARS),
+                self.rng.betavariate(18, 2),
+                min(0.98, max(0.2, self.rng.gauss(0.68, 0.14))),
+            )
+            for student in self.students
+        }
+
+        links = []
+        for number, student in enumerate(self.students):
+            parent = self.parents[number % len(self.parents)]
+            links.append(ParentStudentLink(
+                id=self.uuid(), tenant=self.tenant, parent=parent, student=student,
+                relationship=self.rng.choice(['father', 'mother', 'guardian']),
+                is_primary_contact=True,
+            ))
+        self.insert(ParentStudentLink, links)
+
+    def start_of_range(self):
+        """First day of the oldest generated academic year"""
+        month = self.tenant.academic_year_start_month
+        start_year = self.end_date.year if self.end_date.month >= month else self.end_date.year - 1
+        return date(start_year - self.options.years + 1, month, 1)
+
+    def create_academic_years(self):
+        first = self.start_of_range()
+        self.academic_years = []
+        for offset in range(self.options.years):
+            start = first.replace(year=first.year + offset)
+            end = start.replace(year=start.year + 1) - timedelta(days=1)
+            current = offset == self.options.years - 1
+            self.academic_years.append(AcademicYear(
+                id=self.uuid(), tenant=self.tenant, name=f'{start.year}-{start.year + 1}',
+                start_date=start, end_date=end, is_current=current, is_active=current,
+            ))
+        self.insert(AcademicYear, self.academic_years)
+
+        self.sections = {}
+        sections = []
+        for year in self.academic_years:
+            for department in self.departments:
+                for study_year in range(1, STUDY_YEARS + 1):
+                    for number in range(self.options.sections_per_year):
+                        letter = chr(ord('A') + number)
+                        section = Section(
+                            id=self.uuid(), tenant=self.tenant, department=department, academic_year=year,
+                            name=f'Year {study_year} Section {letter}', code=f'{department.code}{study_year}{letter}',
+                            semester=study_year * 2 - 1, year=study_year,
+                            max_students=max(60, self.options.students // (len(self.departments) * STUDY_YEARS)),
+                        )
+                        self.sections.setdefault((year.pk, department.pk, study_year), []).append(section)
+                        sections.append(section)
+        self.insert(Section, sections)
+
+        # One class teacher per section, drawn from teachers of the department
+        self.section_teachers = {section.pk: self.rng.choice(self.teachers) for section in sections}
+
+    def student_section(self, student, year_index):
+        """Section of a student in a given academic year (students move up a year annually)"""
+        department, first_study_year, _, _ = self.profiles[student.pk]
+        study_year = first_study_year + year_index - (self.options.years - 1)
+        if study_year < 1 or study_year > STUDY_YEARS:
+            return None, study_year
+        year = self.academic_years[year_index]
+        choices = self.sections[year.pk, department.pk, study_year]
+        return choices[student.pk.int % len(choices)], study_year
+
+    def create_enrollments(self):
+        def enrollments():
+            for year_index, year in enumerate(self.academic_years):
+                for number, student in enumerate(self.students):
+                    section, _ = self.student_section(student, year_index)
+                    if section is not None:
+                        yield StudentEnrollment(
+                            id=self.uuid(), tenant=self.tenant, student=student, section=section,
+                            academic_year=year, enrollment_date=year.start_date,
+                            roll_number=f'{section.code}{number + 1:05d}',
+                        )
+        self.insert(StudentEnrollment, enrollments())
+
+    # Activity
+
+    def holidays(self, year):
+        """About 5% of weekdays off, fixed per tenant and year"""
+        days = list(school_days(year.start_date, year.end_date, set()))
+        return set(self.rng.sample(days, len(days) // 20))
+
+    def create_attendance(self):
+        from teacher.models import Attendance
+
+        fields = ['id', 'created_at', 'updated_at', 'is_active', 'is_deleted', 'tenant_id', 'teacher_id', 'student_id',
+                  'section_id', 'subject_id', 'date', 'status', 'remarks']
+
+        def rows():
+            for year_index, year in enumerate(self.academic_years):
+                days = list(school_days(year.start_date, min(year.end_date, self.end_date), self.holidays(year)))
+                marked = [aware(day) for day in days]
+                for student in self.students:
+                    section, _ = self.student_section(student, year_index)
+                    if section is None:
+                        continue
+                    presence = self.profiles[student.pk][2]
+                    teacher = self.section_teachers[section.pk]
+                    weights = (presence, (1 - presence) * 0.6, (1 - presence) * 0.3, (1 - presence) * 0.1)
+                    statuses = self.rng.choices(ATTENDANCE_STATUSES, weights=weights, k=len(days))
+                    for day, at, status in zip(days, marked, statuses):
+                        yield (self.uuid(at), at, at, True, False, self.tenant.pk, teacher.pk, student.pk,
+                               section.pk, None, day, status, '')
+
+        self.insert_rows(Attendance, fields, rows())
+
+    def create_grades(self):
+        from teacher.models import Grade
+
+        fields = ['id', 'created_at', 'updated_at', 'is_active', 'is_deleted', 'tenant_id', 'student_id', 'subject_id',
+                  'teacher_id', 'academic_year_id', 'exam_name', 'exam_date', 'marks_obtained', 'max_marks',
+                  'grade', 'percentage', 'remarks', 'is_published']
+
+        def rows():
+            for year_index, year in enumerate(self.academic_years):
+                length = (year.end_date - year.start_date).days
+                exams = [
+                    (name, year.start_date + timedelta(days=int(length * fraction)))
+                    for name, fraction in EXAMS
+                ]
+                exams = [(name, day) for name, day in exams if day <= self.end_date]
+                for student in self.students:
+                    section, study_year = self.student_section(student, year_index)
+                    if section is None:
+                        continue
+                    ability = self.profiles[student.pk][3]
+                    teacher = self.section_teachers[section.pk]
+                    for subject in self.subjects[section.department_id, study_year]:
+                        for exam_name, exam_date in exams:
+                            marks = min(100, max(0, round(self.rng.gauss(ability * 100, 10))))
+                            graded = aware(exam_date + timedelta(days=7))
+                            yield (self.uuid(graded), graded, graded, True, False, self.tenant.pk, student.pk, subject.pk,
+                                   teacher.pk, year.pk, exam_name, exam_date, Decimal(marks), Decimal(100),
+                                   letter_grade(marks), Decimal(marks), '', True)
+
+        self.insert_rows(Grade, fields, rows())
+
+    def create_audit_logs(self):
+        users = [self.admin, *self.hods, *self.teachers, *self.students, *self.parents]
+        start = self.start_of_range()
+        span = (self.end_date - start).days
+        actions, weights = zip(*AUDIT_ACTIONS)
+        fields = ['id', 'timestamp', 'user_id', 'tenant_id', 'action', 'resource_type', 'resource_id',
+                  'description', 'ip_address', 'user_agent', 'changes', 'status']
+
+        def rows():
+            for user in users:
+                for action in self.rng.choices(actions, weights=weights, k=self.options.audit_events_per_user):
+                    day = start + timedelta(days=self.rng.randint(0, span))
+                    resource_type = 'UserAccount' if action == 'login' else self.rng.choice(
+                        ['Attendance', 'Grade', 'Assignment', 'Announcement']
+                    )
+                    ip_address = f'10.{self.index % 256}.{self.rng.randint(0, 255)}.{self.rng.randint(1, 254)}'
+                    at = aware(day, self.rng)
+                    yield (self.uuid(at), at, user.pk, self.tenant.pk, action, resource_type,
+                           str(user.pk), f'{action} by {user.email}', ip_address, None, None, 'success')
+
+        self.insert_rows(AuditLog, fields, rows())
+
+    def create_payments(self):
+        from tenant_subscription.models import Payment
+
+        amount = {'basic': Decimal('99.00'), 'professional': Decimal('299.00'), 'enterprise': Decimal('999.00')}[
+            self.tenant.subscription_plan
+        ]
+
+        def rows():
+            month = self.start_of_range()
+            while month <= self.end_date:
+                status = self.rng.choices(['succeeded', 'failed', 'refunded'], weights=(95, 4, 1))[0]
+                paid = aware(month, self.rng)
+                yield Payment(
+                    id=self.uuid(), tenant=self.tenant, amount=amount, currency='USD', status=status,
+                    payment_method='stripe', transaction_id=f'txn_{self.uuid().hex}',
+                    payment_date=paid if status != 'failed' else None,
+                    description=f'{self.tenant.subscription_plan.title()} plan - {month:%B %Y}',
+                    refund_amount=amount if status == 'refunded' else Decimal('0.00'),
+                    created_at=paid, updated_at=paid,
+                )
+                month = (month.replace(day=28) + timedelta(days=4)).replace(day=1)
+
+        with explicit_timestamps(Payment, 'created_at', 'updated_at'):
+            self.insert(Payment, rows())
+
+
+def generate_dataset(options=None, stdout=None):
+    """
+    Generate synthetic tenants for benchmarking
+
+    Args:
+        options: DatasetOptions (defaults: one tenant of 2000 students)
+        stdout: Optional stream for progress lines
+
+    Returns:
+        DatasetSummary: Rows created per model and the new tenant IDs
+    """
+    options = options or DatasetOptions()
+    if Role.objects.count() < 6:
+        call_command('init_roles', stdout=stdout)
+    roles = {role.name: role for role in Role.objects.all()}
+    password_hash = make_password(options.password)
+    summary = DatasetSummary()
+
+    for index in range(options.tenants):
+        tenant = TenantGenerator(index, options, roles, password_hash, summary).generate()
+        if stdout:
+            stdout.write(f'  {tenant.slug}: {options.students} students')
+
+    reconcile_usage(summary.tenant_ids)
+    logger.info(f"Generated {options.tenants} synthetic tenants: {summary.counts}")
+    return summary
@@ -0,0 +1,12 @@
+"""
+MySQL backend with a process-wide connection pool (see core.db.pool)
+ENGINE: 'core.db.backends.mysql'
+"""
+
+from django.db.backends.mysql import base
+
+from core.db.pool import PooledDatabaseWrapperMixin
+
+
+class DatabaseWrapper(PooledDatabaseWrapperMixin, base.DatabaseWrapper):
+    pass
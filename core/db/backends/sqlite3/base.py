@@ -0,0 +1,25 @@
+"""
+SQLite backend with a process-wide connection pool (see core.db.pool)
+ENGINE: 'core.db.backends.sqlite3'; in-memory databases are never pooled
+"""
+
+from django.db.backends.sqlite3 import base
+
+from core.db.pool import PooledDatabaseWrapperMixin, record_connection_opened
+
+
+class DatabaseWrapper(PooledDatabaseWrapperMixin, base.DatabaseWrapper):
+
+    def get_new_connection(self, conn_params):
+        if self.is_in_memory_db():
+            # Django never closes in-memory connections (the database would be
+            # lost), so they could never be handed back to the pool
+            raw = base.DatabaseWrapper.get_new_connection(self, conn_params)
+            record_connection_opened(self.alias)
+            return raw
+        return super().get_new_connection(conn_params)
+
+    def _close(self):
+        if self.is_in_memory_db():
+            return base.DatabaseWrapper._close(self)
+        return super()._close()
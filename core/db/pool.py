@@ -0,0 +1,276 @@
+"""
+Database Connection Pool
+Django keeps one connection per thread, so gthread workers and the dashboard
+query pool (core.concurrency) open a connection for every thread that ever
+touches the database. The pooled backends (core.db.backends.*) instead check
+raw connections out of a bounded per-process pool when a thread connects and
+hand them back when Django closes them at the end of the request.
+
+At most POOL['SIZE'] connections exist per process and alias; a thread that
+finds them all in use waits up to POOL['TIMEOUT'] seconds and then gets
+PoolTimeout. Idle connections are pinged on checkout (CONN_HEALTH_CHECKS) and
+replaced after POOL['RECYCLE'] seconds, before MySQL's wait_timeout.
+
+Wait times and connection churn are counted per process and reported by the
+health endpoint (connection_stats).
+"""
+
+from collections import deque
+import os
+import threading
+import time
+
+from django.db import connections
+from django.db.utils import OperationalError
+
+# Connections opened per alias in this process, pooled or not
+_opened = {}
+_opened_lock = threading.Lock()
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+class PoolTimeout(OperationalError):
+    """No pooled connection became free within POOL['TIMEOUT']"""
+
+
+class ConnectionPool:
+    """
+    Bounded pool of raw DB-API connections for one alias
+
+    Usage:
+        raw = pool.acquire(connect, ping)
+        ...
+        pool.release(raw, reset)
+    """
+
+    def __init__(self, alias, size, timeout=10.0, recycle=1800, health_checks=True):
+        self.alias = alias
+        self.size = size
+        self.timeout = timeout
+        self.recycle = recycle
+        self.health_checks = health_checks
+        self._idle = deque()
+        self._created = {}
+        self._in_use = 0
+        self._condition = threading.Condition()
+        # Metrics
+        self.checkouts = 0
+        self.waits = 0
+        self.wait_time = 0.0
+        self.max_wait = 0.0
+        self.timeouts = 0
+        self.opened = 0
+        self.reused = 0
+        self.closed = 0
+
+    def _expired(self, raw):
+        return self.recycle is not None and time.monotonic() - self._created[id(raw)] > self.recycle
+
+    def _discard(self, raw):
+        self._created.pop(id(raw), None)
+        self.closed += 1
+        try:
+            raw.close()
+        except Exception:
+            pass
+
+    def acquire(self, connect, ping=None):
+        """
+        Check out a connection, waiting for a free slot when the pool is full
+
+        Args:
+            connect: callable opening a new raw connection
+            ping: callable(raw) -> bool checking an idle connection still works
+
+        Returns:
+            Raw DB-API connection
+        """
+        start = time.perf_counter()
+        with self._condition:
+            if self._in_use >= self.size:
+                self.waits += 1
+                if not self._condition.wait_for(lambda: self._in_use < self.size, self.timeout):
+                    self.timeouts += 1
+                    raise PoolTimeout(
+                        f"No '{self.alias}' database connection free after {self.timeout}s "
+                        f"({self.size} in use)"
+                    )
+            self._in_use += 1
+            waited = time.perf_counter() - start
+            self.checkouts += 1
+            self.wait_time += waited
+            self.max_wait = max(self.max_wait, waited)
+
+        try:
+            while True:
+                with self._condition:
+                    raw = self._idle.pop() if self._idle else None
+                if raw is None:
+                    break
+                if self._expired(raw) or (self.health_checks and ping and not ping(raw)):
+                    with self._condition:
+                        self._discard(raw)
+                    continue
+                with self._condition:
+                    self.reused += 1
+                return raw
+
+            raw = connect()
+            with self._condition:
+                self._created[id(raw)] = time.monotonic()
+                self.opened += 1
+            return raw
+        except BaseException:
+            with self._condition:
+                self._in_use -= 1
+                self._condition.notify()
+            raise
+
+    def release(self, raw, reset=None, discard=False):
+        """
+        Return a connection; it is closed instead when expired, when reset
+        (rolling back leftover work) fails, or when discard is set
+        """
+        keep = not discard and id(raw) in self._created and not self._expired(raw)
+        if keep and reset:
+            try:
+                reset(raw)
+            except Exception:
+                keep = False
+
+        with self._condition:
+            if keep:
+                # Most recently used on top, so idle connections at the bottom age out
+                self._idle.append(raw)
+            else:
+                self._discard(raw)
+            self._in_use -= 1
+            self._condition.notify()
+
+    def close_idle(self):
+        """Close every idle connection (e.g. at worker shutdown)"""
+        with self._condition:
+            while self._idle:
+                self._discard(self._idle.pop())
+
+    def stats(self):
+        with self._condition:
+            return {
+                'size': self.size,
+                'in_use': self._in_use,
+                'idle': len(self._idle),
+                'checkouts': self.checkouts,
+                'waits': self.waits,
+                'timeouts': self.timeouts,
+                'wait_ms_total': round(self.wait_time * 1000, 2),
+                'wait_ms_avg': round(self.wait_time * 1000 / self.checkouts, 3) if self.checkouts else 0.0,
+                'wait_ms_max': round(self.max_wait * 1000, 2),
+                'opened': self.opened,
+                'reused': self.reused,
+                'closed': self.closed,
+            }
+
+
+def get_pool(alias, settings_dict):
+    """
+    Pool for an alias in the current process
+
+    Pools are keyed by PID so forked workers never share a parent's sockets;
+    the parent's pool is kept referenced rather than closed, as closing would
+    end the parent's sessions too.
+    """
+    key = (os.getpid(), alias)
+    pool = _pools.get(key)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.get(key)
+            if pool is None:
+                options = settings_dict.get('POOL') or {}
+                pool = _pools[key] = ConnectionPool(
+                    alias,
+                    size=options.get('SIZE') or 10,
+                    timeout=options.get('TIMEOUT', 10.0),
+                    recycle=options.get('RECYCLE', 1800),
+                    health_checks=settings_dict.get('CONN_HEALTH_CHECKS', True),
+                )
+    return pool
+
+
+class PooledDatabaseWrapperMixin:
+    """Take raw connections from the process pool instead of opening them"""
+
+    def get_pool(self):
+        return get_pool(self.alias, self.settings_dict)
+
+    def get_new_connection(self, conn_params):
+        connect = super().get_new_connection
+
+        def open_connection():
+            raw = connect(conn_params)
+            # connection_created fires on every checkout; count real opens here
+            record_connection_opened(self.alias)
+            return raw
+
+        return self.get_pool().acquire(open_connection, self.ping_pooled)
+
+    def ping_pooled(self, raw):
+        try:
+            cursor = raw.cursor()
+            try:
+                cursor.execute('SELECT 1')
+            finally:
+                cursor.close()
+            return True
+        except Exception:
+            return False
+
+    def _close(self):
+        if self.connection is None:
+            return
+        # Django keeps its handle on a connection closed inside atomic(); it
+        # must not be handed to another thread meanwhile
+        self.get_pool().release(self.connection, reset=lambda raw: raw.rollback(),
+                                discard=self.in_atomic_block)
+
+
+def record_connection_opened(alias):
+    """Count a newly opened connection (pooled backends on open, others on connection_created)"""
+    with _opened_lock:
+        _opened[alias] = _opened.get(alias, 0) + 1
+
+
+def connection_stats():
+    """
+    Persistent connection settings, churn and pool metrics per alias
+
+    Returns:
+        dict: {alias: {...}} for the current process
+    """
+    pid = os.getpid()
+    stats = {}
+    for alias in connections:
+        settings_dict = connections.settings[alias]
+        pool = _pools.get((pid, alias))
+        stats[alias] = {
+            'conn_max_age': settings_dict.get('CONN_MAX_AGE'),
+            'health_checks': settings_dict.get('CONN_HEALTH_CHECKS'),
+            'connections_opened': _opened.get(alias, 0),
+            'pool': pool.stats() if pool else None,
+        }
+    return stats
+
+
+def configure_worker_connections(conn_max_age, pool_size):
+    """
+    Apply Celery worker connection tuning
+
+    Worker processes run one task at a time, so they keep their connection
+    for longer than web workers and need only a small pool.
+    """
+    for alias in connections:
+        settings_dict = connections.settings[alias]
+        settings_dict['CONN_MAX_AGE'] = conn_max_age
+        if settings_dict.get('POOL'):
+            settings_dict['POOL'] = {**settings_dict['POOL'], 'SIZE': pool_size}
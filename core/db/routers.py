@@ -0,0 +1,155 @@
+"""
+Database Routing
+TenantShardRouter sends tenant-scoped models to the shard bound to the
+current request or task (core.db.sharding) and leaves everything else to
+the next router.
+
+ReplicaRouter sends reads made while handling GET/HEAD requests (reports,
+dashboards, listings) to the DATABASE_REPLICAS aliases and everything else
+to the primary ('default'). Reads stay on the primary:
+
+- once the request has written (and for REPLICA_PIN_SECONDS afterwards, via
+  a cookie, so the user reads their own writes after a redirect),
+- for unsafe requests (POST, PUT, PATCH, DELETE) as a whole,
+- inside a transaction on the primary,
+- for models of REPLICA_EXCLUDED_APPS (e.g. sessions),
+- inside force_primary().
+
+Outside requests (Celery tasks, commands) reads use the primary unless
+wrapped in use_replicas().
+"""
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+import random
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from .sharding import get_current_shard, is_shard, is_sharded_model
+
+
+@dataclass
+class RoutingState:
+    """Routing state of one request or use_replicas() block"""
+    pinned: bool = False
+    wrote: bool = False
+
+
+_state = ContextVar('replica_routing_state', default=None)
+_force_primary = ContextVar('replica_force_primary', default=False)
+
+
+@contextmanager
+def force_primary():
+    """
+    Send every query to the primary
+
+    Usage:
+        with force_primary():
+            ...
+
+        @force_primary()
+        def view(request):
+            ...
+    """
+    token = _force_primary.set(True)
+    try:
+        yield
+    finally:
+        _force_primary.reset(token)
+
+
+@contextmanager
+def use_replicas(pinned=False):
+    """
+    Route reads to replicas until the block writes (requests get one per
+    request from ReplicaRoutingMiddleware; analytics tasks and commands
+    opt in with it)
+    """
+    state = RoutingState(pinned=pinned)
+    token = _state.set(state)
+    try:
+        yield state
+    finally:
+        _state.reset(token)
+
+
+def pin_to_primary():
+    """Keep the rest of the current request (and the pin window) on the primary"""
+    state = _state.get()
+    if state is not None:
+        state.pinned = True
+        state.wrote = True
+
+
+class TenantShardRouter:
+    """Database router for tenant shards"""
+
+    def _shard(self, model, hints):
+        if not is_sharded_model(model):
+            return None
+        instance = hints.get('instance')
+        if instance is not None and is_shard(instance._state.db):
+            # Related lookups stay on the shard the instance came from
+            return instance._state.db
+        shard = get_current_shard()
+        # The default database (and its replicas) is left to the replica router
+        return shard if is_shard(shard) else None
+
+    def db_for_read(self, model, **hints):
+        return self._shard(model, hints)
+
+    def db_for_write(self, model, **hints):
+        return self._shard(model, hints)
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Rows on a shard may point at global rows on the default database
+        if not is_sharded_model(obj1.__class__) or not is_sharded_model(obj2.__class__):
+            return True
+        return obj1._state.db == obj2._state.db
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Every shard carries the full schema (global tables hold reference copies)
+        return None
+
+
+class ReplicaRouter:
+    """Database router spreading reads over DATABASE_REPLICAS"""
+
+    def _replicas(self):
+        return getattr(settings, 'DATABASE_REPLICAS', None) or []
+
+    def db_for_read(self, model, **hints):
+        replicas = self._replicas()
+        state = _state.get()
+        if (
+            not replicas
+            or state is None
+            or state.pinned
+            or _force_primary.get()
+            or model._meta.app_label in settings.REPLICA_EXCLUDED_APPS
+            or connections[DEFAULT_DB_ALIAS].in_atomic_block
+        ):
+            return DEFAULT_DB_ALIAS
+        return random.choice(replicas)
+
+    def db_for_write(self, model, **hints):
+        # Excluded apps (sessions) always read from the primary anyway
+        if model._meta.app_label not in settings.REPLICA_EXCLUDED_APPS:
+            pin_to_primary()
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same data as the primary
+        aliases = {DEFAULT_DB_ALIAS, *self._replicas()}
+        if obj1._state.db in aliases and obj2._state.db in aliases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Replicas receive schema changes through replication
+        if db in self._replicas():
+            return False
+        return None
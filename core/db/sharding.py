@@ -0,0 +1,414 @@
+"""
+Tenant Sharding
+Each tenant's rows live on one database alias (a shard). The directory table
+(core.TenantShard) maps tenants to shards and is cached per process; a
+version key in the shared cache is bumped whenever it changes and processes
+reload at most every SHARD_DIRECTORY_CHECK_SECONDS. Tenants without an entry
+live on SHARD_DEFAULT.
+
+TenantMiddleware binds each request to its tenant's shard (tenant_shard());
+core.db.routers.TenantShardRouter then sends tenant-scoped models there.
+Tasks bind the tenant they were enqueued for the same way, and maintenance
+jobs spanning every tenant walk the shards with each_shard().
+Global models (tenants, users, roles, billing, the directory itself) always
+live on the default database; every shard also holds reference copies of the
+rows its tenants point at (tenant, roles, users) so foreign keys hold.
+
+move_tenant() copies a tenant to another shard in batches and switches the
+directory over (manage.py move_tenant).
+
+Isolated tenants are the largest colleges moved to a database of their own
+(MySQL's equivalent of a schema) so their queries walk small per-tenant
+indexes: isolate_tenant() creates the database, builds the schema and moves
+the tenant there (manage.py isolate_tenant). Their aliases
+(ISOLATED_TENANT_ALIAS_PREFIX + tenant ID) are registered on the fly from
+the directory, so no DATABASES entry is needed.
+"""
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+import threading
+import time
+import uuid
+
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.utils import timezone
+
+SHARD_VERSION_KEY = 'shards:version'
+
+_current_shard = ContextVar('current_shard', default=None)
+_sharded_models = {}
+
+
+class ShardDirectory:
+    """Process-local copy of the tenant -> shard directory"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._version = None
+        self._checked_at = 0.0
+        self._entries = {}
+
+    def _load(self, version):
+        from core.models import TenantShard
+
+        entries = {
+            tenant_id: (alias, status)
+            for tenant_id, alias, status in TenantShard.objects.using(DEFAULT_DB_ALIAS).values_list(
+                'tenant_id', 'alias', 'status'
+            )
+        }
+        for alias, _ in entries.values():
+            if is_isolated_alias(alias):
+                register_tenant_database(alias)
+        self._entries = entries
+        self._version = version
+
+    def _ensure_current(self):
+        now = time.monotonic()
+        if self._version is not None and now - self._checked_at < settings.SHARD_DIRECTORY_CHECK_SECONDS:
+            return
+        self._checked_at = now
+
+        version = cache.get(SHARD_VERSION_KEY)
+        if version is None:
+            version = uuid.uuid4().hex
+            if not cache.add(SHARD_VERSION_KEY, version, timeout=None):
+                version = cache.get(SHARD_VERSION_KEY)
+        if version != self._version:
+            with self._lock:
+                if version != self._version:
+                    self._load(version)
+
+    def _entry(self, tenant_id):
+        if tenant_id is None:
+            return None
+        tenant_id = tenant_id if isinstance(tenant_id, uuid.UUID) else uuid.UUID(str(tenant_id))
+        self._ensure_current()
+        return self._entries.get(tenant_id)
+
+    def shard_for(self, tenant_id):
+        """Alias holding a tenant's rows"""
+        entry = self._entry(tenant_id)
+        return entry[0] if entry else settings.SHARD_DEFAULT
+
+    def is_moving(self, tenant_id):
+        entry = self._entry(tenant_id)
+        return bool(entry) and entry[1] == 'moving'
+
+    def aliases(self):
+        """Every alias holding tenant rows"""
+        self._ensure_current()
+        return {settings.SHARD_DEFAULT, *(alias for alias, _ in self._entries.values())}
+
+    def tenants_elsewhere(self, alias):
+        """Tenants living on another alias (rows of theirs on alias are stale copies)"""
+        self._ensure_current()
+        return {tenant_id for tenant_id, (entry_alias, _) in self._entries.items() if entry_alias != alias}
+
+    def invalidate(self):
+        """Publish a new version so every process reloads"""
+        cache.set(SHARD_VERSION_KEY, uuid.uuid4().hex, timeout=None)
+        self._version = None
+
+
+directory = ShardDirectory()
+
+
+def is_isolated_alias(alias):
+    return bool(alias) and alias.startswith(settings.ISOLATED_TENANT_ALIAS_PREFIX)
+
+
+def is_shard(alias):
+    """Whether an alias is a shard (configured or an isolated tenant's database)"""
+    return alias in settings.DATABASE_SHARDS or is_isolated_alias(alias)
+
+
+def isolated_alias(tenant):
+    """Alias of a tenant's own database"""
+    return f'{settings.ISOLATED_TENANT_ALIAS_PREFIX}{tenant.pk.hex[:12]}'
+
+
+def register_tenant_database(alias):
+    """Add an isolated tenant's database to the connections (same server as default)"""
+    if alias in connections.settings:
+        return
+    default = connections.settings[DEFAULT_DB_ALIAS]
+    name = settings.ISOLATED_TENANT_DB_NAME.format(default=default['NAME'], alias=alias)
+    connections.settings[alias] = {**default, 'NAME': name, 'TEST': {**default.get('TEST', {}), 'NAME': name}}
+
+
+def is_sharded_model(model):
+    """Whether a model's rows live on the tenant's shard"""
+    label = model._meta.label
+    sharded = _sharded_models.get(label)
+    if sharded is None:
+        concrete = model._meta.concrete_model._meta
+        if concrete.auto_created:
+            # M2M through tables follow the model declaring the field
+            sharded = any(
+                field.is_relation and is_sharded_model(field.related_model) for field in concrete.fields
+            )
+        else:
+            sharded = (
+                concrete.app_label in settings.SHARDED_APPS
+                and concrete.label not in settings.SHARD_GLOBAL_MODELS
+            )
+        _sharded_models[label] = sharded
+    return sharded
+
+
+def get_current_shard():
+    """Shard bound to the current request or task, or None"""
+    return _current_shard.get()
+
+
+@contextmanager
+def tenant_shard(tenant):
+    """
+    Route tenant-scoped models to the tenant's shard
+
+    Usage:
+        with tenant_shard(tenant_id):
+            Department.objects.count()
+    """
+    tenant_id = getattr(tenant, 'pk', tenant)
+    token = _current_shard.set(directory.shard_for(tenant_id) if tenant_id else None)
+    try:
+        yield
+    finally:
+        _current_shard.reset(token)
+
+
+@contextmanager
+def bind_shard(alias):
+    """Route tenant-scoped models to an alias"""
+    token = _current_shard.set(alias)
+    try:
+        yield
+    finally:
+        _current_shard.reset(token)
+
+
+def each_shard():
+    """
+    Bind every alias holding tenant rows in turn
+
+    Usage:
+        for alias in each_shard():
+            AuditLog.objects.exclude(tenant_id__in=directory.tenants_elsewhere(alias))
+    """
+    for alias in sorted(directory.aliases()):
+        with bind_shard(alias):
+            yield alias
+
+
+def sharded_models():
+    """Concrete sharded models, including auto-created M2M tables"""
+    models = []
+    for model in apps.get_models(include_auto_created=True):
+        if not model._meta.proxy and is_sharded_model(model):
+            models.append(model)
+    return models
+
+
+def tenant_lookup(model, depth=3):
+    """
+    ORM path from a model to its tenant ('tenant', 'assignment__tenant', ...)
+
+    Returns:
+        str or None when the model has no path to a tenant
+    """
+    from core.models import Tenant
+
+    paths = [(model, '')]
+    for _ in range(depth):
+        next_paths = []
+        for current, prefix in paths:
+            for field in current._meta.concrete_fields:
+                if not field.is_relation or not field.many_to_one and not field.one_to_one:
+                    continue
+                path = f'{prefix}{field.name}'
+                if field.related_model is Tenant:
+                    return path
+                next_paths.append((field.related_model, f'{path}__'))
+        paths = next_paths
+    return None
+
+
+def upsert(model, objs, alias):
+    """Insert rows on an alias, overwriting rows with the same key (no signals)"""
+    if not objs:
+        return
+    fields = [field.name for field in model._meta.concrete_fields if not field.primary_key]
+    model._base_manager.using(alias).bulk_create(
+        objs, update_conflicts=bool(fields), update_fields=fields or None,
+        unique_fields=[model._meta.pk.name],
+    )
+
+
+def sync_reference_rows(tenant_id, alias, users=True, roles=True):
+    """
+    Copy the global rows a tenant's data points at to a shard
+
+    Args:
+        tenant_id: Tenant whose row (and users) to copy, or None
+        alias: Target shard
+        users: True for all the tenant's users, or a list of UserAccount PKs
+        roles: Copy the roles table too
+    """
+    from core.models import Role, Tenant, UserAccount
+
+    if alias == DEFAULT_DB_ALIAS:
+        return
+    if tenant_id:
+        upsert(Tenant, list(Tenant.objects.using(DEFAULT_DB_ALIAS).filter(pk=tenant_id)), alias)
+    if roles:
+        upsert(Role, list(Role.objects.using(DEFAULT_DB_ALIAS).all()), alias)
+    if users:
+        queryset = UserAccount.objects.using(DEFAULT_DB_ALIAS).filter(tenant_id=tenant_id)
+        if users is not True:
+            queryset = queryset.filter(pk__in=users)
+        upsert(UserAccount, list(queryset), alias)
+
+
+def _tenant_rows(model, tenant_id, alias):
+    """Queryset of a tenant's rows of a sharded model on an alias"""
+    concrete = model._meta
+    if concrete.auto_created:
+        # Through table: rows whose owning side belongs to the tenant
+        for field in concrete.fields:
+            if field.is_relation and is_sharded_model(field.related_model):
+                owner_lookup = tenant_lookup(field.related_model)
+                if owner_lookup:
+                    owners = field.related_model._base_manager.using(alias).filter(**{owner_lookup: tenant_id})
+                    return model._base_manager.using(alias).filter(**{f'{field.name}__in': owners.values('pk')})
+        return None
+    lookup = tenant_lookup(model)
+    if lookup is None:
+        return None
+    return model._base_manager.using(alias).filter(**{lookup: tenant_id})
+
+
+def _set_directory(tenant_id, alias, status):
+    from core.models import TenantShard
+
+    TenantShard.objects.using(DEFAULT_DB_ALIAS).update_or_create(
+        tenant_id=tenant_id,
+        defaults={'alias': alias, 'status': status, 'moved_at': timezone.now() if status == 'active' else None},
+    )
+    directory.invalidate()
+
+
+def move_tenant(tenant, target, batch_size=1000, purge_source=False, stdout=None):
+    """
+    Copy a tenant's rows to another shard and switch the directory over
+
+    The tenant is marked 'moving' while rows are copied (TenantMiddleware
+    answers its requests with 503) and switched to the target once every
+    model's row count matches. Copying starts one
+    SHARD_DIRECTORY_CHECK_SECONDS interval after the mark, once every
+    process has reloaded the directory and stopped writing to the source.
+
+    Args:
+        tenant: Tenant instance
+        target: Destination alias
+        batch_size: Rows per insert batch
+        purge_source: Delete the tenant's rows from the old shard afterwards
+        stdout: Optional stream for progress lines
+
+    Returns:
+        dict: {model label: rows copied}
+    """
+    source = directory.shard_for(tenant.pk)
+    if target == source:
+        raise ValueError(f"Tenant '{tenant.slug}' already lives on '{target}'")
+    if target not in connections:
+        raise ValueError(f"Unknown database alias '{target}'")
+
+    _set_directory(tenant.pk, source, 'moving')
+    copied = {}
+    try:
+        if stdout:
+            stdout.write(f'Waiting {settings.SHARD_DIRECTORY_CHECK_SECONDS}s for processes to see the move...')
+        time.sleep(settings.SHARD_DIRECTORY_CHECK_SECONDS)
+        sync_reference_rows(tenant.pk, target)
+        with connections[target].constraint_checks_disabled():
+            for model in sharded_models():
+                rows = _tenant_rows(model, tenant.pk, source)
+                if rows is None:
+                    continue
+                count = 0
+                last_pk = None
+                while True:
+                    batch = rows.order_by('pk')
+                    if last_pk is not None:
+                        batch = batch.filter(pk__gt=last_pk)
+                    batch = list(batch[:batch_size])
+                    if not batch:
+                        break
+                    with transaction.atomic(using=target):
+                        upsert(model, batch, target)
+                    count += len(batch)
+                    last_pk = batch[-1].pk
+                copied[model._meta.label] = count
+                if stdout and count:
+                    stdout.write(f'  {model._meta.label}: {count} rows')
+
+        for label, count in copied.items():
+            target_count = _tenant_rows(apps.get_model(label), tenant.pk, target).count()
+            if target_count != count:
+                raise RuntimeError(f'{label}: copied {count} rows but {target} holds {target_count}')
+    except BaseException:
+        _set_directory(tenant.pk, source, 'active')
+        raise
+
+    _set_directory(tenant.pk, target, 'active')
+    if purge_source:
+        purge_tenant(tenant.pk, source)
+    return copied
+
+
+def isolate_tenant(tenant, batch_size=1000, purge_source=False, stdout=None):
+    """
+    Move a tenant to a database of its own
+
+    Creates the database next to the default one, builds the full schema and
+    copies the tenant over with move_tenant(). Moving the tenant back to a
+    shared database is a plain move_tenant() call.
+
+    Returns:
+        tuple: (alias, {model label: rows copied})
+    """
+    alias = isolated_alias(tenant)
+    register_tenant_database(alias)
+    connection = connections[alias]
+    if connection.vendor == 'mysql':
+        with connections[DEFAULT_DB_ALIAS].cursor() as cursor:
+            cursor.execute(
+                f"CREATE DATABASE IF NOT EXISTS {connection.ops.quote_name(connection.settings_dict['NAME'])} "
+                f"CHARACTER SET utf8mb4"
+            )
+    if stdout:
+        stdout.write(f"Building schema on '{alias}'...")
+    call_command('migrate', database=alias, run_syncdb=True, verbosity=0)
+    return alias, move_tenant(tenant, alias, batch_size=batch_size, purge_source=purge_source, stdout=stdout)
+
+
+def purge_tenant(tenant_id, alias, batch_size=1000):
+    """Delete a tenant's rows of sharded models from an alias (no signals)"""
+    with connections[alias].constraint_checks_disabled():
+        for model in reversed(sharded_models()):
+            rows = _tenant_rows(model, tenant_id, alias)
+            if rows is None:
+                continue
+            while True:
+                pks = list(rows.values_list('pk', flat=True)[:batch_size])
+                if not pks:
+                    break
+                with transaction.atomic(using=alias):
+                    model._base_manager.using(alias).filter(pk__in=pks)._raw_delete(alias)
@@ -19,7 +19,8 @@ def role_required(allowed_roles):
                 messages.error(request, 'Please login to continue.')
                 return redirect('auth:login')
             
-            user_role = request.user.role.name if hasattr(request.user, 'role') else None
+            role = getattr(request, 'role', None) or request.user.role_descriptor
+            user_role = role.name if role else None
             
             if user_role not in allowed_roles:
                 messages.error(request, 'You do not have permission to access this page.')
@@ -28,3 +29,16 @@ def role_required(allowed_roles):
             return view_func(request, *args, **kwargs)
         return wrapper
     return decorator
+
+
+def query_budget(max_queries):
+    """
+    Declare the most SQL queries a view may run per request
+    Reported by QueryInstrumentationMiddleware and enforced by the query
+    budget benchmark (tests/test_query_budget.py)
+    Usage: @query_budget(12)
+    """
+    def decorator(view_func):
+        view_func.query_budget = max_queries
+        return view_func
+    return decorator
@@ -0,0 +1,13 @@
+"""
+Download Gateway URLs
+"""
+
+from django.urls import path
+from . import download_views
+
+app_name = 'files'
+
+urlpatterns = [
+    path('<str:kind>/<uuid:pk>/', download_views.download, name='download'),
+    path('<str:kind>/<uuid:pk>/renditions/<str:filename>', download_views.rendition, name='rendition'),
+]
@@ -0,0 +1,54 @@
+"""
+Download gateway endpoint (see core.downloads)
+"""
+
+from django.contrib.auth.views import redirect_to_login
+from django.http import Http404
+from django.views.decorators.http import require_http_methods
+
+from .downloads import DOWNLOAD_TARGETS, authorize, download_filename, rendition_entry, serve
+
+
+@require_http_methods(["GET", "HEAD"])
+def download(request, kind, pk):
+    """Authorize once, then hand the transfer to nginx, S3 or a streamed response"""
+    target = DOWNLOAD_TARGETS.get(kind)
+    if target is None:
+        raise Http404
+    if not target.public and not request.user.is_authenticated:
+        return redirect_to_login(request.get_full_path())
+
+    target, obj = authorize(request.user, kind, pk)
+    field_file = getattr(obj, target.field)
+    return serve(
+        request,
+        field_file.storage,
+        field_file.name,
+        download_filename(target, obj, field_file.name),
+        public=target.public,
+        inline=request.GET.get('inline') == '1',
+    )
+
+
+@require_http_methods(["GET", "HEAD"])
+def rendition(request, kind, pk, filename):
+    """A resized variant of a logo or profile picture; names are fingerprinted"""
+    target = DOWNLOAD_TARGETS.get(kind)
+    if target is None:
+        raise Http404
+    if not target.public and not request.user.is_authenticated:
+        return redirect_to_login(request.get_full_path())
+
+    target, obj = authorize(request.user, kind, pk)
+    entry = rendition_entry(target, obj, filename)
+    if entry is None:
+        raise Http404
+    return serve(
+        request,
+        getattr(obj, target.field).storage,
+        entry['name'],
+        filename,
+        public=target.public,
+        inline=True,
+        immutable=True,
+    )
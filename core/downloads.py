@@ -0,0 +1,341 @@
+"""
+Download Gateway
+Every stored file is downloaded through /files/<kind>/<id>/. The view loads
+the row, checks tenant, role and ownership once, and then hands the byte
+transfer off according to DOWNLOAD_BACKEND:
+- 'accel': an empty response with X-Accel-Redirect; nginx streams the file
+  from its internal DOWNLOAD_ACCEL_PREFIX location (docker/nginx), with
+  Range support, while the worker is already free
+- 'signed': a redirect to a presigned S3 URL valid for DOWNLOAD_URL_EXPIRY
+  seconds; S3 serves the bytes and the Range requests
+- 'django': the worker streams the file itself, honouring single Range
+  requests (development and tests)
+Responses carry Cache-Control and, for content-addressed blobs, an ETag
+taken from the content hash, so revalidation is answered with a 304
+without touching storage. Image renditions (core.renditions) have
+fingerprinted names and are served as immutable for a year.
+Files are uploaded by users, so only raster images and PDFs may be shown
+inline; anything else (HTML, SVG, ...) is always an attachment, and every
+response is sandboxed by CSP and must not be sniffed.
+"""
+
+from dataclasses import dataclass
+import mimetypes
+import posixpath
+import re
+from typing import Callable
+from urllib.parse import quote
+
+from django.apps import apps
+from django.conf import settings
+from django.http import (
+    FileResponse, Http404, HttpResponse, HttpResponseNotModified, HttpResponseRedirect, StreamingHttpResponse
+)
+from django.utils.http import content_disposition_header
+from django.utils.text import slugify
+
+from .blobs import is_blob_name
+from .models import ParentStudentLink, StudentEnrollment
+from .renditions import renditions_field
+
+ADMIN_ROLES = ('tenant_admin', 'department_admin')
+# Types a browser may render inline from the portal origin (no scripting)
+INLINE_TYPES = frozenset({'image/png', 'image/jpeg', 'image/gif', 'image/webp', 'application/pdf'})
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+
+_RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+_BLOB_DIGEST_RE = re.compile(r'/([0-9a-f]{64})(?:\.\w+)?$')
+
+
+# ---------------------------------------------------------------------------
+# Authorization
+# ---------------------------------------------------------------------------
+
+def _is_parent_of(user, student_id):
+    return ParentStudentLink.objects.filter(parent=user, student_id=student_id, is_active=True).exists()
+
+
+def _enrolled(user, section_id):
+    """Section students, and parents of section students"""
+    if user.role_name == 'student':
+        return StudentEnrollment.objects.filter(student=user, section_id=section_id, is_active=True).exists()
+    if user.role_name == 'parent':
+        return StudentEnrollment.objects.filter(
+            section_id=section_id, is_active=True,
+            student__parents_links__parent=user, student__parents_links__is_active=True,
+        ).exists()
+    return False
+
+
+def _can_read_assignment(user, assignment):
+    if assignment.teacher_id == user.pk or user.role_name in ADMIN_ROLES:
+        return True
+    return assignment.status in ('published', 'closed') and _enrolled(user, assignment.section_id)
+
+
+def _can_read_submission(user, submission):
+    if submission.student_id == user.pk or submission.assignment.teacher_id == user.pk:
+        return True
+    return user.role_name in ADMIN_ROLES or (user.role_name == 'parent' and _is_parent_of(user, submission.student_id))
+
+
+def _can_read_teacher_resource(user, resource):
+    if resource.teacher_id == user.pk or user.role_name in ADMIN_ROLES:
+        return True
+    if not resource.is_public or user.role_name not in ('student', 'parent'):
+        return False
+    return resource.section_id is None or _enrolled(user, resource.section_id)
+
+
+def _can_read_student_resource(user, resource):
+    if resource.student_id == user.pk or user.role_name in ADMIN_ROLES:
+        return True
+    return user.role_name == 'parent' and _is_parent_of(user, resource.student_id)
+
+
+def _can_read_department_resource(user, resource):
+    if resource.uploaded_by_id == user.pk or user.role_name in ADMIN_ROLES:
+        return True
+    return resource.is_public and user.role_name == 'teacher'
+
+
+def _anyone_in_tenant(user, obj):
+    return True
+
+
+@dataclass(frozen=True)
+class DownloadTarget:
+    """A downloadable file field and who may read it"""
+    model: str
+    field: str
+    tenant: str  # Lookup of the owning tenant's ID
+    allow: Callable
+    title: str = ''  # Attribute naming the download
+    select_related: tuple = ()
+    public: bool = False  # No login needed (branding)
+
+
+DOWNLOAD_TARGETS = {
+    'assignment': DownloadTarget('teacher.Assignment', 'attachment', 'tenant_id', _can_read_assignment, 'title'),
+    'submission': DownloadTarget(
+        'teacher.AssignmentSubmission', 'attachment', 'assignment.tenant_id', _can_read_submission,
+        'assignment.title', select_related=('assignment',),
+    ),
+    'teacher_resource': DownloadTarget(
+        'teacher.TeacherResource', 'file', 'tenant_id', _can_read_teacher_resource, 'title'
+    ),
+    'student_resource': DownloadTarget(
+        'student.StudentResource', 'file', 'student.tenant_id', _can_read_student_resource, 'resource_title',
+        select_related=('student',),
+    ),
+    'department_resource': DownloadTarget(
+        'department_management.DepartmentResource', 'file', 'tenant_id', _can_read_department_resource, 'title'
+    ),
+    'profile_picture': DownloadTarget('core.UserAccount', 'profile_picture', 'tenant_id', _anyone_in_tenant),
+    'tenant_logo': DownloadTarget('core.Tenant', 'logo', 'pk', _anyone_in_tenant, public=True),
+    'college_logo': DownloadTarget(
+        'college_management.CollegeSettings', 'logo', 'tenant_id', _anyone_in_tenant, public=True
+    ),
+}
+
+
+def _resolve(obj, path):
+    for attr in path.split('.'):
+        obj = getattr(obj, attr)
+    return obj
+
+
+def authorize(user, kind, pk):
+    """
+    Load a downloadable row the user may read
+
+    Returns:
+        tuple: (DownloadTarget, row)
+
+    Raises:
+        Http404: Unknown row, other tenant, or no access (existence is not revealed)
+    """
+    target = DOWNLOAD_TARGETS.get(kind)
+    if target is None:
+        raise Http404
+    rows = apps.get_model(target.model)._default_manager.select_related(*target.select_related)
+    obj = rows.filter(pk=pk).first()
+    if obj is None or not getattr(obj, target.field):
+        raise Http404
+    if target.public:
+        return target, obj
+
+    if not user.is_authenticated:
+        raise Http404
+    role = user.role_descriptor
+    if not (role and role.is_super_admin):
+        if str(_resolve(obj, target.tenant)) != str(user.tenant_id) or not target.allow(user, obj):
+            raise Http404
+    return target, obj
+
+
+# ---------------------------------------------------------------------------
+# Serving
+# ---------------------------------------------------------------------------
+
+def download_filename(target, obj, name):
+    """Readable file name: the row's title with the stored extension"""
+    ext = posixpath.splitext(name)[1]
+    base = posixpath.basename(name)
+    if target.title:
+        title = slugify(_resolve(obj, target.title))
+        if title:
+            return f'{title}{ext}'
+    return base
+
+
+def etag_for(name):
+    """Strong ETag for content-addressed names (the SHA-256 is in the name)"""
+    match = _BLOB_DIGEST_RE.search(name) if is_blob_name(name) else None
+    return f'"{match.group(1)}"' if match else None
+
+
+def cache_control(public, immutable=False):
+    scope = 'public' if public else 'private'
+    if immutable:
+        return f'{scope}, max-age={IMMUTABLE_MAX_AGE}, immutable'
+    return f'{scope}, max-age={settings.DOWNLOAD_CACHE_MAX_AGE}'
+
+
+def rendition_entry(target, obj, filename):
+    """Recorded rendition of the row's image with this file name, or None"""
+    renditions = getattr(obj, renditions_field(target.field), None) or {}
+    for size, entry in renditions.items():
+        if size != 'source' and posixpath.basename(entry['name']) == filename:
+            return entry
+    return None
+
+
+def _backend(storage):
+    return getattr(storage, 'backend', storage)
+
+
+def accel_response(name):
+    response = HttpResponse()
+    response['X-Accel-Redirect'] = settings.DOWNLOAD_ACCEL_PREFIX.rstrip('/') + '/' + quote(name)
+    return response
+
+
+def signed_response(storage, name, disposition, cache, content_type):
+    """Redirect to a presigned URL that also sets the download headers"""
+    backend = _backend(storage)
+    params = {
+        'ResponseContentDisposition': disposition,
+        'ResponseCacheControl': cache,
+        'ResponseContentType': content_type,
+    }
+    if hasattr(backend, 'bucket'):
+        # Sign even when a public custom domain is configured for media URLs
+        url = backend.bucket.meta.client.generate_presigned_url(
+            'get_object',
+            Params={'Bucket': backend.bucket.name, 'Key': backend._normalize_name(name), **params},
+            ExpiresIn=settings.DOWNLOAD_URL_EXPIRY,
+        )
+    else:
+        url = backend.url(name)
+    response = HttpResponseRedirect(url)
+    # The redirect may be reused while the signature is still valid
+    response['Cache-Control'] = f'private, max-age={settings.DOWNLOAD_URL_EXPIRY // 2}'
+    return response
+
+
+def parse_range(header, size):
+    """
+    (start, end) of a single `bytes=` range, inclusive
+
+    Returns None for no/unsupported ranges; raises ValueError when unsatisfiable
+    """
+    match = _RANGE_RE.match(header or '')
+    if not match or match.groups() == ('', ''):
+        return None
+    first, last = match.groups()
+    if first:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+    else:
+        # Suffix range: the last N bytes
+        start = max(size - int(last), 0)
+        end = size - 1
+    if start > end or start >= size:
+        raise ValueError(header)
+    return start, end
+
+
+def _stream(fh, length):
+    try:
+        while length > 0:
+            data = fh.read(min(settings.UPLOAD_STREAM_BLOCK_SIZE, length))
+            if not data:
+                break
+            length -= len(data)
+            yield data
+    finally:
+        fh.close()
+
+
+def streamed_response(request, storage, name, etag):
+    """Serve the file from the worker, honouring a single Range"""
+    size = storage.size(name)
+    requested = request.META.get('HTTP_RANGE')
+    if_range = request.META.get('HTTP_IF_RANGE')
+    if requested and if_range and if_range != etag:
+        requested = None  # Representation changed: send it whole
+    try:
+        byte_range = parse_range(requested, size)
+    except ValueError:
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{size}'
+        return response
+
+    fh = storage.open(name, 'rb')
+    if byte_range is None:
+        response = FileResponse(fh)
+        response['Content-Length'] = size
+    else:
+        start, end = byte_range
+        fh.seek(start)
+        response = StreamingHttpResponse(_stream(fh, end - start + 1), status=206)
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+        response['Content-Length'] = end - start + 1
+    response['Accept-Ranges'] = 'bytes'
+    return response
+
+
+def serve(request, storage, name, filename, public=False, inline=False, immutable=False):
+    """Response for an authorized download, per DOWNLOAD_BACKEND"""
+    etag = etag_for(name)
+    cache = cache_control(public, immutable)
+    if etag and etag in [tag.strip() for tag in request.META.get('HTTP_IF_NONE_MATCH', '').split(',')]:
+        response = HttpResponseNotModified()
+        response['ETag'] = etag
+        response['Cache-Control'] = cache
+        return response
+
+    content_type = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+    inline = inline and content_type in INLINE_TYPES
+    disposition = content_disposition_header(not inline, filename)
+    backend = settings.DOWNLOAD_BACKEND
+    if backend == 'signed':
+        return signed_response(storage, name, disposition, cache, content_type)
+    if backend == 'accel':
+        response = accel_response(name)
+    else:
+        response = streamed_response(request, storage, name, etag)
+        if response.status_code == 416:
+            return response
+
+    response['Content-Type'] = content_type
+    response['Content-Disposition'] = disposition
+    response['Content-Security-Policy'] = 'sandbox'
+    response['X-Content-Type-Options'] = 'nosniff'
+    response['Cache-Control'] = cache
+    if etag:
+        response['ETag'] = etag
+    if not public:
+        response['Vary'] = 'Cookie'
+    return response
@@ -0,0 +1,12 @@
+"""
+Live Event URLs
+"""
+
+from django.urls import path
+from . import event_views
+
+app_name = 'events'
+
+urlpatterns = [
+    path('', event_views.stream, name='stream'),
+]
@@ -0,0 +1,45 @@
+"""
+Server-sent events endpoint (see core.events)
+"""
+
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.db import connections
+from django.http import HttpResponse, StreamingHttpResponse
+from django.views.decorators.http import require_http_methods
+
+from .events import StreamLimitExceeded, event_stream, get_hub, tenant_channel, user_channel
+
+
+@require_http_methods(["GET"])
+async def stream(request):
+    """
+    The user's live event stream
+
+    Only served under ASGI; elsewhere a 204 tells EventSource not to
+    reconnect, and pages fall back to polling the inbox badge.
+    """
+    if not isinstance(request, ASGIRequest):
+        return HttpResponse(status=204)
+    user = await request.auser()
+    if not user.is_authenticated:
+        return HttpResponse(status=401)
+
+    channels = [user_channel(user.pk)]
+    if user.tenant_id:
+        channels.append(tenant_channel(user.tenant_id))
+    hub = get_hub()
+    try:
+        opened = await hub.open(user.pk, channels)
+    except StreamLimitExceeded as e:
+        response = HttpResponse(str(e), status=e.status, content_type='text/plain')
+        response['Retry-After'] = 30
+        return response
+
+    # The stream never queries: don't keep a database connection for hours
+    await sync_to_async(connections.close_all)()
+
+    response = StreamingHttpResponse(event_stream(hub, opened), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'  # nginx: pass events through unbuffered
+    return response
@@ -0,0 +1,347 @@
+"""
+Live Events
+Portal pages keep one server-sent events stream open (/events/, served by
+saas_platform.asgi under uvicorn) and receive notifications, messages,
+announcements and grade publications as they happen instead of polling.
+- Channels: every stream listens to its user's channel and its tenant's
+  channel; publish() is called from signals and fan-out after commit
+- Brokers (EVENTS_BROKER): 'redis' publishes through Redis pub/sub so every
+  worker process sees every event; 'memory' delivers inside the process
+  (development and tests)
+- Hub: one per worker process. It holds a single broker subscription for
+  all of the process's streams and subscribes to a channel only while a
+  local stream listens to it, so an idle stream costs a coroutine and a
+  small queue, not a Redis connection or a thread
+- Backpressure: each stream buffers at most EVENTS_QUEUE_SIZE events. A
+  client too slow to drain it is sent `resync` and closed; it reconnects
+  and reloads its counts instead of the worker buffering without bound
+- Caps: EVENTS_MAX_CONNECTIONS streams per process and EVENTS_MAX_PER_USER
+  per user; streams end after about EVENTS_MAX_STREAM_SECONDS so clients
+  reconnect and spread over workers
+"""
+
+import asyncio
+from collections import Counter, defaultdict
+import json
+import logging
+import random
+import weakref
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+CHANNEL_PREFIX = 'events'
+
+
+def user_channel(user_id):
+    return f'{CHANNEL_PREFIX}:user:{user_id}'
+
+
+def tenant_channel(tenant_id):
+    return f'{CHANNEL_PREFIX}:tenant:{tenant_id}'
+
+
+def encode(event, data):
+    return json.dumps({'event': event, 'data': data}, default=str)
+
+
+def format_event(payload):
+    """SSE frame of an encoded event"""
+    message = json.loads(payload)
+    return f"event: {message['event']}\ndata: {json.dumps(message['data'])}\n\n"
+
+
+class StreamLimitExceeded(Exception):
+    """Refused stream; status is the HTTP status to answer with"""
+
+    def __init__(self, message, status=503):
+        super().__init__(message)
+        self.status = status
+
+
+# ---------------------------------------------------------------------------
+# Brokers
+# ---------------------------------------------------------------------------
+
+class MemoryBroker:
+    """Delivers to the hubs of this process only"""
+
+    def publish(self, channels, payload):
+        for hub in list(_hubs.values()):
+            hub.dispatch_threadsafe(channels, payload)
+
+    async def subscribe(self, hub, channel):
+        pass
+
+    async def unsubscribe(self, hub, channel):
+        pass
+
+    def close(self, hub):
+        pass
+
+
+class RedisBroker:
+    """Redis pub/sub; one subscriber connection per hub"""
+
+    def __init__(self, url):
+        self.url = url
+        self._client = None
+        self._listeners = weakref.WeakKeyDictionary()  # hub -> (pubsub, reader task)
+
+    def publish(self, channels, payload):
+        if self._client is None:
+            import redis
+            self._client = redis.Redis.from_url(self.url)
+        pipeline = self._client.pipeline(transaction=False)
+        for channel in channels:
+            pipeline.publish(channel, payload)
+        pipeline.execute()
+
+    async def _listener(self, hub):
+        if hub not in self._listeners:
+            import redis.asyncio
+            pubsub = redis.asyncio.from_url(self.url).pubsub(ignore_subscribe_messages=True)
+            task = asyncio.get_running_loop().create_task(self._read(hub, pubsub))
+            self._listeners[hub] = (pubsub, task)
+        return self._listeners[hub][0]
+
+    async def _read(self, hub, pubsub):
+        while True:
+            try:
+                if not pubsub.subscribed:
+                    await asyncio.sleep(0.1)
+                    continue
+                message = await pubsub.get_message(timeout=1.0)
+                if message and message['type'] == 'message':
+                    channel = message['channel'].decode()
+                    hub.dispatch([channel], message['data'].decode())
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Event subscription lost, resubscribing: {e}")
+                await asyncio.sleep(1)
+                try:
+                    await pubsub.aclose()
+                    if hub.channels:
+                        await pubsub.subscribe(*hub.channels)
+                except Exception:
+                    pass
+                # Streams may have missed events while disconnected
+                hub.resync_all()
+
+    async def subscribe(self, hub, channel):
+        await (await self._listener(hub)).subscribe(channel)
+
+    async def unsubscribe(self, hub, channel):
+        if hub in self._listeners:
+            await self._listeners[hub][0].unsubscribe(channel)
+
+    def close(self, hub):
+        listener = self._listeners.pop(hub, None)
+        if listener:
+            listener[1].cancel()
+
+
+def _create_broker():
+    if settings.EVENTS_BROKER == 'redis':
+        return RedisBroker(settings.EVENTS_REDIS_URL)
+    if settings.EVENTS_BROKER == 'memory':
+        return MemoryBroker()
+    raise ValueError(f"Unknown EVENTS_BROKER: {settings.EVENTS_BROKER}")
+
+
+_broker = None
+
+
+def get_broker():
+    global _broker
+    if _broker is None:
+        _broker = _create_broker()
+    return _broker
+
+
+def reset_broker():
+    """Drop the broker and hubs (settings changed, tests)"""
+    global _broker
+    for hub in list(_hubs.values()):
+        hub.close()
+    _hubs.clear()
+    _broker = None
+
+
+def publish(channels, event, data):
+    """
+    Send one event to channels; never raises (the write that triggered it
+    has already committed)
+
+    Args:
+        channels: Channel names (user_channel(), tenant_channel())
+        event: Event name, e.g. 'notification'
+        data: JSON-serializable payload
+
+    Returns:
+        int: Channels published to
+    """
+    channels = list(channels)
+    if not channels:
+        return 0
+    try:
+        get_broker().publish(channels, encode(event, data))
+    except Exception as e:
+        logger.error(f"Error publishing {event} to {len(channels)} channels: {str(e)}")
+        return 0
+    return len(channels)
+
+
+# ---------------------------------------------------------------------------
+# Streams
+# ---------------------------------------------------------------------------
+
+class Stream:
+    """One open connection: its channels and bounded event queue"""
+
+    def __init__(self, user_id, channels):
+        self.user_id = user_id
+        self.channels = tuple(channels)
+        self.queue = asyncio.Queue(maxsize=settings.EVENTS_QUEUE_SIZE)
+        self.overflowed = False
+        self.closed = False
+
+    def put(self, payload):
+        try:
+            self.queue.put_nowait(payload)
+        except asyncio.QueueFull:
+            self.overflowed = True
+
+
+class Hub:
+    """Streams of one event loop (worker process), by channel"""
+
+    def __init__(self, loop, broker):
+        self.loop = loop
+        self.broker = broker
+        self.streams = defaultdict(set)
+        self.per_user = Counter()
+        self.count = 0
+
+    @property
+    def channels(self):
+        return list(self.streams)
+
+    async def open(self, user_id, channels):
+        """
+        Register a stream
+
+        Raises:
+            StreamLimitExceeded: Process or per-user cap reached
+        """
+        if self.count >= settings.EVENTS_MAX_CONNECTIONS:
+            raise StreamLimitExceeded('Too many open event streams', status=503)
+        if self.per_user[user_id] >= settings.EVENTS_MAX_PER_USER:
+            raise StreamLimitExceeded('Too many event streams for this user', status=429)
+
+        stream = Stream(user_id, channels)
+        self.count += 1
+        self.per_user[user_id] += 1
+        for channel in stream.channels:
+            first = not self.streams[channel]
+            self.streams[channel].add(stream)
+            if first:
+                try:
+                    await self.broker.subscribe(self, channel)
+                except Exception as e:
+                    self.close_stream(stream)
+                    logger.error(f"Error subscribing to {channel}: {str(e)}")
+                    raise StreamLimitExceeded('Event broker unavailable', status=503)
+        return stream
+
+    def close_stream(self, stream):
+        """Unregister a stream; channels nobody listens to are unsubscribed"""
+        if stream.closed:
+            return
+        stream.closed = True
+        self.count -= 1
+        self.per_user[stream.user_id] -= 1
+        if self.per_user[stream.user_id] <= 0:
+            del self.per_user[stream.user_id]
+        for channel in stream.channels:
+            listeners = self.streams.get(channel)
+            if listeners is None:
+                continue
+            listeners.discard(stream)
+            if not listeners:
+                del self.streams[channel]
+                self.loop.create_task(self._unsubscribe(channel))
+
+    async def _unsubscribe(self, channel):
+        try:
+            if channel not in self.streams:
+                await self.broker.unsubscribe(self, channel)
+        except Exception as e:
+            logger.warning(f"Error unsubscribing from {channel}: {e}")
+
+    def dispatch(self, channels, payload):
+        for channel in channels:
+            for stream in list(self.streams.get(channel, ())):
+                stream.put(payload)
+
+    def dispatch_threadsafe(self, channels, payload):
+        if self.loop.is_closed():
+            return
+        try:
+            self.loop.call_soon_threadsafe(self.dispatch, channels, payload)
+        except RuntimeError:
+            pass  # Loop closed meanwhile
+
+    def resync_all(self):
+        payload = encode('resync', {})
+        for listeners in list(self.streams.values()):
+            for stream in list(listeners):
+                stream.put(payload)
+
+    def close(self):
+        self.broker.close(self)
+
+
+# Event loop -> its hub
+_hubs = weakref.WeakKeyDictionary()
+
+
+def get_hub():
+    """Hub of the running event loop"""
+    loop = asyncio.get_running_loop()
+    if loop not in _hubs:
+        _hubs[loop] = Hub(loop, get_broker())
+    return _hubs[loop]
+
+
+async def event_stream(hub, stream):
+    """
+    SSE frames for an open stream: a retry hint, then events, with
+    heartbeat comments while idle; ends on overflow or after the stream's
+    lifetime and always unregisters the stream
+    """
+    loop = asyncio.get_running_loop()
+    # Jitter so a deploy's reconnects don't all expire together again
+    lifetime = settings.EVENTS_MAX_STREAM_SECONDS * random.uniform(0.8, 1.0)
+    deadline = loop.time() + lifetime
+    try:
+        yield f'retry: {settings.EVENTS_RETRY_MS}\n\n'
+        while True:
+            if stream.overflowed:
+                yield format_event(encode('resync', {}))
+                break
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                payload = await asyncio.wait_for(
+                    stream.queue.get(), min(settings.EVENTS_HEARTBEAT_SECONDS, remaining)
+                )
+            except asyncio.TimeoutError:
+                yield ': keep-alive\n\n'
+                continue
+            yield format_event(payload)
+    finally:
+        hub.close_stream(stream)
@@ -5,6 +5,7 @@ Health check views for Docker and monitoring
 from django.http import JsonResponse
 from django.db import connection
 from django.core.cache import cache
+from core.db.pool import connection_stats
 import redis
 import os
 
@@ -31,6 +32,9 @@ def health_check(request):
         health_status['services']['database'] = f'unhealthy: {str(e)}'
         is_healthy = False
     
+    # Connection persistence, churn and pool waits (this worker process)
+    health_status['database_connections'] = connection_stats()
+    
     # Check Redis cache
     try:
         cache.set('health_check', 'ok', 10)
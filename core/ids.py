@@ -0,0 +1,160 @@
+"""
+Time-Ordered Identifiers
+uuid7() returns RFC 9562 version 7 UUIDs: a 48-bit millisecond timestamp
+followed by a per-process counter and random bits. New keys sort after
+older ones, so InnoDB appends rows at the end of the clustered index instead
+of splitting pages all over it as random uuid4 keys do (Django stores UUIDs
+as char(32) hex on MySQL, whose order matches the timestamp order).
+
+rewrite_primary_keys() converts existing uuid4 keys of a table to uuid7
+keys derived from each row's creation time, updating every foreign key that
+points at them (manage.py rewrite_primary_keys).
+"""
+
+from datetime import datetime, timezone as dt_timezone
+import secrets
+import threading
+import time
+import uuid
+
+from django.apps import apps
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+
+_lock = threading.Lock()
+_last_ms = 0
+_counter = 0
+
+# Tables whose keys are also held outside the database (sessions, cache keys,
+# storage paths) and must not be rewritten
+PROTECTED_MODELS = {'core.Tenant', 'core.UserAccount', 'core.Role'}
+
+
+def _build(ms, counter, rand_b):
+    value = (ms & 0xFFFFFFFFFFFF) << 80 | 0x7 << 76 | (counter & 0xFFF) << 64 | 0b10 << 62 | rand_b
+    return uuid.UUID(int=value)
+
+
+def uuid7():
+    """
+    New time-ordered UUID
+
+    Keys from one process are strictly increasing: within a millisecond the
+    12-bit counter (started at a random point) increments, borrowing from
+    the next millisecond when it overflows.
+    """
+    global _last_ms, _counter
+    with _lock:
+        ms = time.time_ns() // 1_000_000
+        if ms > _last_ms:
+            _last_ms = ms
+            # Leave headroom for increments within the millisecond
+            _counter = secrets.randbits(11)
+        else:
+            _counter += 1
+            if _counter > 0xFFF:
+                _last_ms += 1
+                _counter = 0
+        ms, counter = _last_ms, _counter
+    return _build(ms, counter, secrets.randbits(62))
+
+
+def uuid7_at(when, randbits=secrets.randbits):
+    """
+    Time-ordered UUID for a given moment (backfills and generated data)
+
+    Args:
+        when: Aware datetime
+        randbits: Source of random bits, e.g. a seeded random.Random().getrandbits
+    """
+    ms = int(when.timestamp() * 1000)
+    return _build(ms, randbits(12), randbits(62))
+
+
+def uuid7_time(value):
+    """Creation time encoded in a version 7 UUID"""
+    return datetime.fromtimestamp((value.int >> 80) / 1000, tz=dt_timezone.utc)
+
+
+def _time_field(model):
+    for name in ('created_at', 'timestamp'):
+        try:
+            return model._meta.get_field(name)
+        except Exception:
+            continue
+    return None
+
+
+def referencing_fields(model):
+    """Concrete foreign keys (including M2M tables) pointing at a model's primary key"""
+    return [
+        field
+        for related in apps.get_models(include_auto_created=True)
+        for field in related._meta.concrete_fields
+        if field.is_relation and field.related_model is model and field.target_field.primary_key
+    ]
+
+
+def rewrite_primary_keys(model, using=DEFAULT_DB_ALIAS, batch_size=1000, stdout=None):
+    """
+    Replace a table's non-v7 UUID keys with uuid7 keys in batches
+
+    Each batch runs in one transaction with constraint checks off: referencing
+    foreign keys are repointed first, then the keys themselves. Keys already
+    at version 7 are left alone, so an interrupted run can be resumed.
+
+    Args:
+        model: Model with a UUID primary key
+        using: Database alias
+        batch_size: Rows per transaction
+        stdout: Optional stream for progress lines
+
+    Returns:
+        int: Number of keys rewritten
+    """
+    label = model._meta.label
+    pk = model._meta.pk
+    if label in PROTECTED_MODELS:
+        raise ValueError(f'{label} keys are referenced outside the database and cannot be rewritten')
+    if pk.get_internal_type() != 'UUIDField':
+        raise ValueError(f'{label} does not have a UUID primary key')
+
+    time_field = _time_field(model)
+    connection = connections[using]
+    quote = connection.ops.quote_name
+    statements = [
+        f'UPDATE {quote(field.model._meta.db_table)} SET {quote(field.column)} = %s WHERE {quote(field.column)} = %s'
+        for field in referencing_fields(model)
+    ]
+    statements.append(f'UPDATE {quote(model._meta.db_table)} SET {quote(pk.column)} = %s WHERE {quote(pk.column)} = %s')
+
+    columns = ['pk'] + ([time_field.name] if time_field else [])
+    rewritten = 0
+    last_pk = None
+    while True:
+        rows = model._base_manager.using(using).order_by('pk')
+        if last_pk is not None:
+            rows = rows.filter(pk__gt=last_pk)
+        rows = list(rows.values_list(*columns)[:batch_size])
+        if not rows:
+            break
+        last_pk = rows[-1][0]
+
+        params = []
+        for row in rows:
+            old = row[0]
+            if old.version == 7:
+                continue
+            new = uuid7_at(row[1]) if time_field and row[1] else uuid7()
+            params.append((pk.get_db_prep_value(new, connection), pk.get_db_prep_value(old, connection)))
+        if not params:
+            continue
+
+        with connection.constraint_checks_disabled():
+            with transaction.atomic(using=using):
+                with connection.cursor() as cursor:
+                    for statement in statements:
+                        cursor.executemany(statement, params)
+        rewritten += len(params)
+        if stdout:
+            stdout.write(f'  {label}: {rewritten} keys rewritten')
+    return rewritten
@@ -0,0 +1,185 @@
+"""
+Notification Inbox
+A user's inbox holds two kinds of items: notifications (fanned out by
+core.notifications) and direct messages.
+- Unread counters: one cache counter per user and kind, seeded from an
+  indexed COUNT on a miss and then kept current with atomic INCR/DECR when
+  items are created (fan-out, post_save; applied after commit, so rolled
+  back creates never count) and marked read, so the badge on every page
+  costs no query. Counters expire after NOTIFICATION_UNREAD_CACHE_TIMEOUT,
+  which bounds any drift (soft deletes) to one recount
+- Listing: keyset pagination on (created_at, id) over the
+  (tenant, is_deleted, owner, created_at, id) indexes; the cursor is the
+  last row seen, so deep pages cost the same as the first and rows arriving
+  meanwhile never shift a page
+- Bulk mark-read: one UPDATE of the rows still unread, whose row count is
+  subtracted from the counter, so concurrent mark-reads never double count
+"""
+
+import base64
+from datetime import datetime
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import Message, Notification
+
+# Inbox kind -> (model, owner field)
+INBOX_KINDS = {
+    'notifications': (Notification, 'user'),
+    'messages': (Message, 'recipient'),
+}
+
+UNREAD_CACHE_KEY = 'inbox:unread:{kind}:{user_id}'
+
+
+def _kind(kind):
+    try:
+        return INBOX_KINDS[kind]
+    except KeyError:
+        raise ValueError(f"Unknown inbox kind: {kind}")
+
+
+def _key(kind, user_id):
+    return UNREAD_CACHE_KEY.format(kind=kind, user_id=user_id)
+
+
+def _items(user, kind):
+    model, owner = _kind(kind)
+    return model.objects.filter(**{owner: user})
+
+
+# ---------------------------------------------------------------------------
+# Unread counters
+# ---------------------------------------------------------------------------
+
+def unread_counts(user):
+    """
+    Unread items per kind, plus their total
+
+    Returns:
+        dict: {'notifications': int, 'messages': int, 'total': int}
+    """
+    keys = {kind: _key(kind, user.pk) for kind in INBOX_KINDS}
+    cached = cache.get_many(keys.values())
+    counts = {}
+    for kind, key in keys.items():
+        if key in cached:
+            counts[kind] = cached[key]
+            continue
+        counts[kind] = _items(user, kind).filter(is_read=False).count()
+        # add(): an INCR that seeded the counter meanwhile wins
+        cache.add(key, counts[kind], settings.NOTIFICATION_UNREAD_CACHE_TIMEOUT)
+    counts['total'] = sum(counts.values())
+    return counts
+
+
+def unread_count(user, kind='notifications'):
+    """Unread items of one kind"""
+    return unread_counts(user)[kind]
+
+
+def adjust_unread(kind, user_ids, delta):
+    """
+    Atomically add delta to users' unread counters
+
+    Missing counters are left missing (the next read recounts); a counter
+    that would go negative has drifted and is dropped.
+    """
+    _kind(kind)
+    if not delta:
+        return
+    for user_id in user_ids:
+        key = _key(kind, user_id)
+        try:
+            if cache.incr(key, delta) < 0:
+                cache.delete(key)
+        except ValueError:
+            pass
+
+
+def invalidate_unread(kind, user_ids):
+    """Drop users' unread counters; the next read recounts"""
+    cache.delete_many([_key(kind, user_id) for user_id in user_ids])
+
+
+# ---------------------------------------------------------------------------
+# Listing
+# ---------------------------------------------------------------------------
+
+def encode_cursor(item):
+    raw = f'{item.created_at.isoformat()}|{item.pk}'
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """
+    (created_at, id) of a cursor
+
+    Raises:
+        ValueError: Malformed cursor
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+        created_at, pk = raw.split('|', 1)
+        return datetime.fromisoformat(created_at), uuid.UUID(pk)
+    except (TypeError, ValueError, UnicodeDecodeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+
+def inbox_page(user, kind='notifications', cursor=None, unread_only=False, limit=None):
+    """
+    One page of the inbox, newest first
+
+    Args:
+        user: Inbox owner
+        kind: Key of INBOX_KINDS
+        cursor: next_cursor of the previous page (None for the first page)
+        unread_only: Skip items already read
+        limit: Page size (default INBOX_PAGE_SIZE)
+
+    Returns:
+        tuple: (list of items, next_cursor or None on the last page)
+    """
+    limit = limit or settings.INBOX_PAGE_SIZE
+    items = _items(user, kind)
+    if kind == 'messages':
+        items = items.select_related('sender')
+    if unread_only:
+        items = items.filter(is_read=False)
+    if cursor:
+        created_at, pk = decode_cursor(cursor)
+        items = items.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=pk))
+
+    page = list(items.order_by('-created_at', '-id')[:limit + 1])
+    if len(page) > limit:
+        return page[:limit], encode_cursor(page[limit - 1])
+    return page, None
+
+
+# ---------------------------------------------------------------------------
+# Marking read
+# ---------------------------------------------------------------------------
+
+def mark_read(user, kind='notifications', ids=None):
+    """
+    Mark a user's items as read in one UPDATE
+
+    Args:
+        user: Inbox owner
+        kind: Key of INBOX_KINDS
+        ids: Specific items (default: everything unread)
+
+    Returns:
+        int: Number of items that were unread
+    """
+    items = _items(user, kind).filter(is_read=False)
+    if ids is not None:
+        items = items.filter(id__in=list(ids))
+
+    updated = items.update(is_read=True, read_at=timezone.now())
+    adjust_unread(kind, [user.pk], -updated)
+    return updated
@@ -0,0 +1,14 @@
+"""
+Inbox URLs
+"""
+
+from django.urls import path
+from . import inbox_views
+
+app_name = 'inbox'
+
+urlpatterns = [
+    path('', inbox_views.index, name='index'),
+    path('read/', inbox_views.mark_read_view, name='mark_read'),
+    path('badge/', inbox_views.badge, name='badge'),
+]
@@ -0,0 +1,77 @@
+"""
+Inbox pages and the unread badge endpoint (see core.inbox)
+"""
+
+import uuid
+
+from django.contrib.auth.decorators import login_required
+from django.http import HttpResponseBadRequest, JsonResponse
+from django.shortcuts import redirect, render
+from django.urls import reverse
+from django.utils.http import url_has_allowed_host_and_scheme
+from django.views.decorators.cache import never_cache
+from django.views.decorators.http import require_http_methods
+
+from .inbox import INBOX_KINDS, inbox_page, mark_read, unread_counts
+
+
+def _kind(data):
+    kind = data.get('kind', 'notifications')
+    return kind if kind in INBOX_KINDS else None
+
+
+@login_required
+@require_http_methods(["GET"])
+def index(request):
+    """One keyset page of notifications or messages, newest first"""
+    kind = _kind(request.GET)
+    if kind is None:
+        return HttpResponseBadRequest('Unknown inbox kind')
+    unread_only = request.GET.get('unread') == '1'
+    try:
+        items, next_cursor = inbox_page(
+            request.user, kind, cursor=request.GET.get('cursor'), unread_only=unread_only
+        )
+    except ValueError:
+        return HttpResponseBadRequest('Invalid cursor')
+
+    return render(request, 'inbox/index.html', {
+        'page_title': 'Inbox',
+        'kind': kind,
+        'items': items,
+        'next_cursor': next_cursor,
+        'unread_only': unread_only,
+        'counts': unread_counts(request.user),
+    })
+
+
+@login_required
+@require_http_methods(["POST"])
+def mark_read_view(request):
+    """Mark the posted `ids` of one kind as read, or all of them with all=1"""
+    kind = _kind(request.POST)
+    if kind is None:
+        return HttpResponseBadRequest('Unknown inbox kind')
+    ids = None
+    if request.POST.get('all') != '1':
+        try:
+            ids = [uuid.UUID(pk) for pk in request.POST.getlist('ids')]
+        except ValueError:
+            return HttpResponseBadRequest('Invalid item ID')
+
+    updated = mark_read(request.user, kind, ids)
+    if 'application/json' in request.headers.get('Accept', ''):
+        return JsonResponse({'updated': updated, **unread_counts(request.user)})
+
+    next_url = request.POST.get('next')
+    if not url_has_allowed_host_and_scheme(next_url, {request.get_host()}, request.is_secure()):
+        next_url = None
+    return redirect(next_url or f"{reverse('inbox:index')}?kind={kind}")
+
+
+@never_cache
+@login_required
+@require_http_methods(["GET"])
+def badge(request):
+    """Unread counts for polling; served from the cached counters"""
+    return JsonResponse(unread_counts(request.user))
@@ -0,0 +1,316 @@
+"""
+Role-Based Load Testing
+Virtual users log in as synthetic users of each role (see core.datagen) and
+replay weighted journeys through their portal, either in-process through the
+WSGI stack (django.test.Client) or over HTTP against a running server.
+Every request is timed; the report gives p50/p95/p99 latency, error counts
+and throughput per portal and per URL, and can be saved as JSON and
+compared against a previous run.
+
+In-process runs authenticate with LOADTEST_AUTHENTICATION_BACKENDS only:
+the lockout and object-permission backends of AUTHENTICATION_BACKENDS
+need their apps installed and would count the run's logins as attacks.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+import http.cookiejar
+import json
+import math
+import random
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+
+from django.db import connections
+from django.test import override_settings
+from django.urls import reverse
+
+from .datagen import DEFAULT_PASSWORD
+
+LOADTEST_AUTHENTICATION_BACKENDS = ['core.authentication.UserModelBackend']
+
+# Role -> weighted journey steps (URL names within the role's portal)
+JOURNEYS = {
+    'student': [
+        ('student:dashboard', 30), ('student:attendance', 15), ('student:grades', 15),
+        ('student:assignments', 15), ('student:timetable', 10), ('student:announcements', 10),
+        ('student:fees', 5),
+    ],
+    'parent': [
+        ('parent:dashboard', 50), ('parent:announcements', 20), ('parent:communication', 15),
+        ('parent:reports', 15),
+    ],
+    'teacher': [
+        ('teacher:dashboard', 30), ('teacher:attendance_marking', 20), ('teacher:my_classes', 15),
+        ('teacher:grade_management', 10), ('teacher:assignments', 10), ('teacher:timetable', 10),
+        ('teacher:resources', 5),
+    ],
+    'department_admin': [
+        ('department:dashboard', 30), ('department:faculty_list', 15), ('department:students_list', 15),
+        ('department:attendance_overview', 15), ('department:exam_results', 10), ('department:timetable', 10),
+        ('department:reports', 5),
+    ],
+    'tenant_admin': [
+        ('college:dashboard', 30), ('college:user_list', 20), ('college:department_list', 10),
+        ('college:section_list', 10), ('college:announcement_list', 10), ('college:reports', 10),
+        ('college:timetable', 10),
+    ],
+    'super_admin': [
+        ('company_admin:dashboard', 30), ('company_admin:tenant_list', 25),
+        ('company_admin:subscription_oversight', 15), ('company_admin:analytics_reporting', 15),
+        ('company_admin:audit_trail', 15),
+    ],
+}
+
+# Share of virtual users per role, roughly matching production traffic
+ROLE_MIX = {
+    'student': 55,
+    'parent': 20,
+    'teacher': 15,
+    'department_admin': 5,
+    'tenant_admin': 4,
+    'super_admin': 1,
+}
+
+# Generated users per role and tenant that virtual users rotate through
+ROLE_POOL = {
+    'tenant_admin': 1,
+    'department_admin': 1,
+}
+DEFAULT_POOL = 50
+
+
+@dataclass
+class LoadTestOptions:
+    """Shape of a load test run"""
+    users: int = 10
+    duration: float = 30.0
+    iterations: int = None
+    think_time: float = 0.0
+    base_url: str = None
+    tenants: int = 1
+    prefix: str = 'synthetic'
+    password: str = DEFAULT_PASSWORD
+    admin_email: str = None
+    admin_password: str = None
+    seed: int = 42
+
+
+@dataclass
+class Sample:
+    role: str
+    url_name: str
+    status: int
+    seconds: float
+
+    @property
+    def ok(self):
+        return 0 < self.status < 400
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a list of numbers"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def summarize(samples, elapsed):
+    """Latency (ms), errors and throughput for a group of samples"""
+    latencies = [sample.seconds * 1000 for sample in samples]
+    return {
+        'requests': len(samples),
+        'errors': sum(1 for sample in samples if not sample.ok),
+        'rps': round(len(samples) / elapsed, 2) if elapsed else 0.0,
+        'mean_ms': round(sum(latencies) / len(latencies), 2) if latencies else 0.0,
+        'p50_ms': round(percentile(latencies, 50), 2),
+        'p95_ms': round(percentile(latencies, 95), 2),
+        'p99_ms': round(percentile(latencies, 99), 2),
+        'max_ms': round(max(latencies), 2) if latencies else 0.0,
+    }
+
+
+@dataclass
+class LoadTestResult:
+    """Samples of one run, with the report built from them"""
+    samples: list = field(default_factory=list)
+    logins: dict = field(default_factory=dict)
+    elapsed: float = 0.0
+
+    def report(self):
+        by_role, by_url = {}, {}
+        for sample in self.samples:
+            by_role.setdefault(sample.role, []).append(sample)
+            by_url.setdefault(sample.url_name, []).append(sample)
+        return {
+            'elapsed_s': round(self.elapsed, 2),
+            'logins': self.logins,
+            'overall': summarize(self.samples, self.elapsed),
+            'portals': {role: summarize(samples, self.elapsed) for role, samples in sorted(by_role.items())},
+            'urls': {name: summarize(samples, self.elapsed) for name, samples in sorted(by_url.items())},
+        }
+
+
+class WSGITransport:
+    """Requests through the in-process WSGI stack"""
+
+    def __init__(self):
+        from django.conf import settings
+        from django.test import Client
+
+        # Use a configured host so ALLOWED_HOSTS accepts the requests
+        host = next((h for h in settings.ALLOWED_HOSTS if h not in ('*', '') and not h.startswith('.')), 'localhost')
+        # Server errors are recorded as 500s, not raised
+        self.client = Client(raise_request_exception=False, HTTP_HOST=host)
+
+    def get(self, path):
+        return self.client.get(path).status_code
+
+    def post(self, path, data):
+        return self.client.post(path, data).status_code
+
+
+class _NoRedirect(urllib.request.HTTPRedirectHandler):
+    def redirect_request(self, *args, **kwargs):
+        return None
+
+
+class HTTPTransport:
+    """Requests over HTTP to a running server, with its own cookie jar"""
+
+    def __init__(self, base_url):
+        self.base_url = base_url.rstrip('/')
+        self.cookies = http.cookiejar.CookieJar()
+        self.opener = urllib.request.build_opener(
+            urllib.request.HTTPCookieProcessor(self.cookies), _NoRedirect()
+        )
+
+    def _open(self, request):
+        try:
+            with self.opener.open(request, timeout=60) as response:
+                response.read()
+                return response.status
+        except urllib.error.HTTPError as e:
+            return e.code
+        except OSError:
+            return 0
+
+    def get(self, path):
+        return self._open(urllib.request.Request(self.base_url + path))
+
+    def post(self, path, data):
+        # Fetch the form first so the CSRF cookie is set
+        self.get(path)
+        token = next((cookie.value for cookie in self.cookies if cookie.name == 'csrftoken'), '')
+        body = urllib.parse.urlencode({**data, 'csrfmiddlewaretoken': token}).encode()
+        return self._open(urllib.request.Request(
+            self.base_url + path, data=body, headers={'Referer': self.base_url + path}
+        ))
+
+
+def credentials(role, number, options):
+    """Login for a virtual user (generated users, or the given super admin)"""
+    if role == 'super_admin':
+        return options.admin_email, options.admin_password
+    tenant = number % options.tenants + 1
+    user = (number // options.tenants) % ROLE_POOL.get(role, DEFAULT_POOL) + 1
+    return f'{role}{user}@{options.prefix}-college-{tenant}.example.edu', options.password
+
+
+def run_load_test(options):
+    """
+    Run virtual users concurrently until the duration or iterations run out
+
+    Args:
+        options: LoadTestOptions
+
+    Returns:
+        LoadTestResult
+    """
+    mix = {role: weight for role, weight in ROLE_MIX.items() if role != 'super_admin' or options.admin_email}
+    rng = random.Random(options.seed)
+    roles = rng.choices(list(mix), weights=list(mix.values()), k=options.users)
+    login_path = reverse('auth:login')
+    journeys = {
+        role: ([reverse(name) for name, _ in steps], [name for name, _ in steps], [weight for _, weight in steps])
+        for role, steps in JOURNEYS.items()
+    }
+
+    result = LoadTestResult()
+    lock = threading.Lock()
+    deadline = time.monotonic() + options.duration
+
+    def virtual_user(number):
+        role = roles[number]
+        user_rng = random.Random(f'{options.seed}:{number}')
+        transport = HTTPTransport(options.base_url) if options.base_url else WSGITransport()
+        samples = []
+        try:
+            email, password = credentials(role, number, options)
+            start = time.perf_counter()
+            status = transport.post(login_path, {'email': email, 'password': password})
+            samples.append(Sample(role, 'auth:login', status, time.perf_counter() - start))
+            # A successful login redirects to the dashboard
+            logged_in = status == 302
+
+            paths, names, weights = journeys[role]
+            iteration = 0
+            while logged_in and time.monotonic() < deadline:
+                if options.iterations is not None and iteration >= options.iterations:
+                    break
+                index = user_rng.choices(range(len(paths)), weights=weights)[0]
+                start = time.perf_counter()
+                status = transport.get(paths[index])
+                samples.append(Sample(role, names[index], status, time.perf_counter() - start))
+                iteration += 1
+                if options.think_time:
+                    time.sleep(user_rng.uniform(0, options.think_time))
+        finally:
+            if not options.base_url:
+                connections.close_all()
+            with lock:
+                result.samples.extend(samples)
+                key = 'succeeded' if samples and samples[0].status == 302 else 'failed'
+                result.logins[key] = result.logins.get(key, 0) + 1
+
+    backends = {} if options.base_url else {'AUTHENTICATION_BACKENDS': LOADTEST_AUTHENTICATION_BACKENDS}
+    started = time.monotonic()
+    with override_settings(**backends):
+        if options.users == 1:
+            virtual_user(0)
+        else:
+            with ThreadPoolExecutor(max_workers=options.users) as pool:
+                list(pool.map(virtual_user, range(options.users)))
+    result.elapsed = time.monotonic() - started
+    return result
+
+
+def compare_reports(current, baseline):
+    """
+    Per-portal change against a previous report
+
+    Returns:
+        dict: {portal: {'p95_ms': (before, after, pct change), 'rps': (...)}}
+    """
+    def change(before, after):
+        pct = round((after - before) / before * 100, 1) if before else None
+        return before, after, pct
+
+    changes = {}
+    for portal, stats in current['portals'].items():
+        before = baseline.get('portals', {}).get(portal)
+        if before:
+            changes[portal] = {
+                metric: change(before[metric], stats[metric]) for metric in ('p50_ms', 'p95_ms', 'p99_ms', 'rps')
+            }
+    return changes
+
+
+def load_report(path):
+    with open(path) as report_file:
+        return json.load(report_file)
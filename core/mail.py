@@ -0,0 +1,137 @@
+"""
+Mail Dispatch
+- Compiled email templates are cached per process
+- Batches share one backend connection (one SMTP session per batch)
+- Sending is rate limited; a dropped connection is reopened once, right
+  away. Backoff between attempts belongs to Celery tasks (see
+  core.tasks.deliver_notification_emails), never to web requests
+- Any Django email backend works; use the console/file/locmem backends locally
+"""
+
+from functools import lru_cache
+import logging
+import smtplib
+import time
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.template import TemplateDoesNotExist
+from django.template.loader import get_template
+from django.utils.html import strip_tags
+
+logger = logging.getLogger(__name__)
+
+# Errors worth retrying: dropped connections, throttling, temporary failures
+RETRYABLE_ERRORS = (smtplib.SMTPException, OSError)
+
+
+@lru_cache(maxsize=None)
+def get_email_templates(template_name):
+    """
+    Load and compile the templates for an email once per process
+
+    Returns:
+        tuple: (html_template, text_template); text_template is None when
+        there is no .txt variant and the plain body is derived from the HTML
+    """
+    html_template = get_template(f'emails/{template_name}.html')
+    try:
+        text_template = get_template(f'emails/{template_name}.txt')
+    except TemplateDoesNotExist:
+        text_template = None
+    return html_template, text_template
+
+
+def build_email(subject, recipient_list, template_name, context, from_email=None):
+    """
+    Render a templated email without sending it
+
+    Args:
+        subject: Email subject
+        recipient_list: List of recipient emails
+        template_name: Template name under templates/emails (without extension)
+        context: Context dictionary for template
+        from_email: From email address (optional)
+
+    Returns:
+        EmailMultiAlternatives: Message ready for send_mass_email
+    """
+    html_template, text_template = get_email_templates(template_name)
+    html_content = html_template.render(context)
+    text_content = text_template.render(context) if text_template else strip_tags(html_content).strip()
+
+    email = EmailMultiAlternatives(
+        subject=subject,
+        body=text_content,
+        from_email=from_email or settings.DEFAULT_FROM_EMAIL,
+        to=recipient_list
+    )
+    email.attach_alternative(html_content, "text/html")
+    return email
+
+
+class RateLimiter:
+    """Spaces out calls to stay under a messages-per-second limit"""
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate if rate else 0
+        self.next_at = 0.0
+
+    def wait(self):
+        if not self.interval:
+            return
+        now = time.monotonic()
+        if now < self.next_at:
+            time.sleep(self.next_at - now)
+            now = self.next_at
+        self.next_at = now + self.interval
+
+
+def _send_with_reconnect(connection, message):
+    """Send one message on an open connection, reopening it once on failure"""
+    try:
+        return connection.send_messages([message])
+    except RETRYABLE_ERRORS as e:
+        logger.warning(f"Email to {message.to} failed ({str(e)}), reconnecting")
+        connection.close()
+        connection.open()
+        return connection.send_messages([message])
+
+
+def send_mass_email(messages, batch_size=None, on_sent=None):
+    """
+    Send messages in batches, one backend connection per batch
+
+    Args:
+        messages: Iterable of EmailMessage instances
+        batch_size: Messages per connection (default EMAIL_BATCH_SIZE)
+        on_sent: Optional callable, called with each message once sent (so
+            a retry can skip the messages that went out)
+
+    Returns:
+        int: Number of messages sent
+
+    Raises:
+        The SMTP/socket error of a message that failed after a reconnect
+    """
+    messages = list(messages)
+    batch_size = batch_size or settings.EMAIL_BATCH_SIZE
+    limiter = RateLimiter(settings.EMAIL_RATE_LIMIT)
+    sent = 0
+
+    for start in range(0, len(messages), batch_size):
+        connection = get_connection()
+        connection.open()
+        try:
+            for message in messages[start:start + batch_size]:
+                limiter.wait()
+                message.connection = connection
+                if _send_with_reconnect(connection, message):
+                    sent += 1
+                    if on_sent:
+                        on_sent(message)
+        finally:
+            connection.close()
+
+    logger.info(f"Sent {sent}/{len(messages)} emails")
+    return sent
@@ -0,0 +1,86 @@
+"""
+Management Command to Capture Query Plans and Advise Indexes
+Replays the portal journeys against synthetic users (see core.datagen),
+EXPLAINs every distinct statement and proposes composite indexes for full
+scans, filesorts and temporary tables (see core.query_plans)
+"""
+
+import json
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+from core.datagen import DEFAULT_PASSWORD
+from core.query_plans import advise, draft_migrations, replay_portals
+
+
+class Command(BaseCommand):
+    help = 'Replay the portals, EXPLAIN their queries and draft migrations for missing indexes'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tenants', type=int, default=1, help='Synthetic tenants to replay')
+        parser.add_argument('--prefix', default='synthetic', help='Synthetic tenant slug prefix')
+        parser.add_argument('--password', default=DEFAULT_PASSWORD, help='Password of the synthetic users')
+        parser.add_argument('--admin-email', help='Super admin login (company portal is skipped without it)')
+        parser.add_argument('--admin-password', help='Super admin password')
+        parser.add_argument('--min-rows', type=int, default=1000,
+                            help='Ignore scans and sorts on tables smaller than this')
+        parser.add_argument('--output-dir', help='Write draft migrations (one per app) to this directory')
+        parser.add_argument('--report', help='Write every statement with its plan to this JSON file')
+
+    def handle(self, *args, **options):
+        self.stdout.write('Replaying portal journeys...')
+        capture, statuses = replay_portals(
+            tenants=options['tenants'],
+            prefix=options['prefix'],
+            password=options['password'],
+            admin_email=options['admin_email'],
+            admin_password=options['admin_password'],
+        )
+        if not capture.queries:
+            raise CommandError('No queries captured; run generate_dataset first')
+        failed = statuses.get('auth:login', [])
+        if failed:
+            self.stdout.write(self.style.WARNING(f'{len(failed)} logins failed: {", ".join(failed[:3])}'))
+
+        suggestions = advise(capture, min_rows=options['min_rows'])
+        flagged = [query for query in capture.queries.values() if query.problems]
+        self.stdout.write(
+            f'{len(capture.queries)} distinct statements, {capture.count} executions, {len(flagged)} flagged\n'
+        )
+        for query in sorted(flagged, key=lambda query: -query.count):
+            problems = ', '.join(sorted({f'{problem} on {table}' for table, problem in query.problems}))
+            self.stdout.write(f'{query.count:>5}x  {problems}')
+            self.stdout.write(f'        {query.fingerprint[:160]}')
+            self.stdout.write(f"        from {', '.join(sorted(query.urls))}")
+
+        if not suggestions:
+            self.stdout.write(self.style.SUCCESS('\n✓ Every flagged statement is already served by an index'))
+        else:
+            self.stdout.write('\nSuggested indexes:')
+            for suggestion in suggestions:
+                self.stdout.write(
+                    f"  {suggestion.label}  [{', '.join(sorted(suggestion.problems))}; {suggestion.queries} queries]"
+                )
+
+        if options['output_dir'] and suggestions:
+            os.makedirs(options['output_dir'], exist_ok=True)
+            for app_label, (name, source) in draft_migrations(suggestions).items():
+                path = os.path.join(options['output_dir'], f'{app_label}_{name}')
+                with open(path, 'w') as f:
+                    f.write(source)
+                self.stdout.write(self.style.SUCCESS(f'✓ Draft migration for {app_label}: {path}'))
+
+        if options['report']:
+            with open(options['report'], 'w') as f:
+                json.dump([
+                    {
+                        'fingerprint': query.fingerprint,
+                        'count': query.count,
+                        'duration_ms': round(query.duration * 1000, 2),
+                        'urls': sorted(query.urls),
+                        'problems': [list(problem) for problem in query.problems],
+                        'plan': query.plan,
+                    }
+                    for query in capture.queries.values()
+                ], f, indent=2, default=str)
+            self.stdout.write(self.style.SUCCESS(f"✓ Plans written to {options['report']}"))
@@ -0,0 +1,36 @@
+"""
+Management Command to Archive Audit Logs
+Moves audit logs older than the retention window to compressed archive storage
+"""
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from core.audit import archive_audit_logs
+
+
+class Command(BaseCommand):
+    help = 'Archive audit logs older than the retention window'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--older-than-days', type=int, default=None,
+            help=f'Retention window in days (default: {settings.AUDIT_LOG_RETENTION_DAYS})'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=None,
+            help=f'Rows per batch (default: {settings.AUDIT_ARCHIVE_BATCH_SIZE})'
+        )
+        parser.add_argument('--max-batches', type=int, default=None, help='Stop after N batches')
+
+    def handle(self, *args, **options):
+        self.stdout.write('Archiving audit logs...')
+
+        totals = archive_audit_logs(
+            older_than_days=options['older_than_days'],
+            batch_size=options['batch_size'],
+            max_batches=options['max_batches'],
+        )
+
+        self.stdout.write(self.style.SUCCESS(
+            f"✓ Archived {totals['rows']} rows into {totals['segments']} segments"
+        ))
@@ -0,0 +1,65 @@
+"""
+Management Command to Benchmark Dashboard Queries
+Times the dashboard aggregates run one after another against the same
+queries run concurrently on the dashboard query pool and reports wall-clock
+latency for both; turn DASHBOARD_CONCURRENT_QUERIES on only where the
+concurrent mode wins
+"""
+
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from college_management.views import dashboard_queries as college_dashboard_queries
+from company_admin.views import dashboard_queries as company_dashboard_queries
+from core.concurrency import run_concurrently, run_queries
+from core.loadtest import percentile
+from core.models import Tenant
+
+
+class Command(BaseCommand):
+    help = 'Compare sequential and concurrent dashboard query latency'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=20, help='Timed runs per mode')
+        parser.add_argument('--warmup', type=int, default=2, help='Untimed runs per mode')
+        parser.add_argument('--tenant', help='Tenant slug for the college dashboard (default: largest)')
+
+    def handle(self, *args, **options):
+        if options['tenant']:
+            tenant = Tenant.objects.filter(slug=options['tenant']).first()
+            if tenant is None:
+                raise CommandError(f"Tenant '{options['tenant']}' not found")
+        else:
+            tenant = Tenant.objects.order_by('-current_students_count').first()
+            if tenant is None:
+                raise CommandError('No tenants; run generate_dataset first')
+
+        dashboards = {
+            f'college:dashboard ({tenant.slug})': lambda: college_dashboard_queries(tenant.id),
+            'company_admin:dashboard': company_dashboard_queries,
+        }
+
+        self.stdout.write(
+            f"\n{'Dashboard':<40} {'mode':<11} {'mean ms':>9} {'p50 ms':>9} {'p95 ms':>9}"
+        )
+        for name, build in dashboards.items():
+            sequential = self.measure(lambda: run_queries(build()), options)
+            concurrent = self.measure(lambda: run_concurrently(build()), options)
+            for mode, timings in (('sequential', sequential), ('concurrent', concurrent)):
+                self.stdout.write(
+                    f"{name:<40} {mode:<11} {sum(timings) / len(timings):>9.2f} "
+                    f"{percentile(timings, 50):>9.2f} {percentile(timings, 95):>9.2f}"
+                )
+            speedup = percentile(sequential, 50) / percentile(concurrent, 50)
+            self.stdout.write(self.style.SUCCESS(f'✓ {name}: {speedup:.2f}x p50 speedup'))
+
+    def measure(self, run, options):
+        """Wall-clock milliseconds of each timed run"""
+        for _ in range(options['warmup']):
+            run()
+        timings = []
+        for _ in range(max(1, options['iterations'])):
+            start = time.perf_counter()
+            run()
+            timings.append((time.perf_counter() - start) * 1000)
+        return timings
@@ -0,0 +1,105 @@
+"""
+Management Command to Benchmark UUID Key Insert Throughput
+Inserts the same rows into two scratch tables keyed by random (uuid4) and
+time-ordered (uuid7) UUIDs and reports rows per second as the tables grow.
+On MySQL it also reports each table's data and index size, where page
+splits from random keys show up as a larger, fragmented clustered index.
+"""
+
+import time
+import uuid
+
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.utils import timezone
+from core.ids import uuid7
+
+SCHEMES = {'uuid4': uuid.uuid4, 'uuid7': uuid7}
+
+
+class Command(BaseCommand):
+    help = 'Compare insert throughput of uuid4 and uuid7 primary keys'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=200000, help='Rows inserted per scheme')
+        parser.add_argument('--batch-size', type=int, default=1000, help='Rows per insert transaction')
+        parser.add_argument('--reports', type=int, default=4, help='Throughput samples per scheme')
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS, help='Database alias')
+
+    def handle(self, *args, **options):
+        connection = connections[options['database']]
+        self.stdout.write(f"\n{'scheme':<8} {'rows':>10} {'rows/s':>10}")
+        results = {}
+        for scheme in SCHEMES:
+            table = f'benchmark_{scheme}_keys'
+            self.create_table(connection, table)
+            try:
+                results[scheme] = self.insert(connection, table, scheme, options)
+                size = self.table_size(connection, table)
+                if size:
+                    self.stdout.write(f'{scheme:<8} table size {size / 1024 / 1024:.1f} MB')
+            finally:
+                with connection.cursor() as cursor:
+                    cursor.execute(f'DROP TABLE {connection.ops.quote_name(table)}')
+
+        speedup = results['uuid7'] / results['uuid4']
+        self.stdout.write(self.style.SUCCESS(
+            f"✓ uuid7 {results['uuid7']:.0f} rows/s vs uuid4 {results['uuid4']:.0f} rows/s ({speedup:.2f}x)"
+        ))
+
+    def create_table(self, connection, table):
+        """Scratch table shaped like a history table: UUID key, tenant and date index"""
+        quote = connection.ops.quote_name
+        with connection.cursor() as cursor:
+            cursor.execute(f'DROP TABLE IF EXISTS {quote(table)}')
+            cursor.execute(
+                f'CREATE TABLE {quote(table)} (id char(32) NOT NULL PRIMARY KEY, tenant_id char(32) NOT NULL, '
+                f'created_at datetime NOT NULL, payload varchar(200) NOT NULL)'
+            )
+            cursor.execute(f'CREATE INDEX {quote(table + "_tenant")} ON {quote(table)} (tenant_id, created_at)')
+
+    def insert(self, connection, table, scheme, options):
+        """Insert the rows in batches; returns overall rows per second"""
+        statement = (
+            f'INSERT INTO {connection.ops.quote_name(table)} (id, tenant_id, created_at, payload) '
+            f'VALUES (%s, %s, %s, %s)'
+        )
+        generate = SCHEMES[scheme]
+        tenants = [uuid.uuid4().hex for _ in range(8)]
+        total = max(1, options['rows'])
+        report_every = max(1, total // max(1, options['reports']))
+        inserted = 0
+        sample_start = start = time.perf_counter()
+        sample_rows = 0
+        while inserted < total:
+            batch = min(options['batch_size'], total - inserted)
+            now = timezone.now()
+            rows = [
+                (generate().hex, tenants[(inserted + i) % len(tenants)], now, 'x' * 120)
+                for i in range(batch)
+            ]
+            with transaction.atomic(using=connection.alias):
+                with connection.cursor() as cursor:
+                    cursor.executemany(statement, rows)
+            inserted += batch
+            sample_rows += batch
+            if sample_rows >= report_every or inserted == total:
+                elapsed = time.perf_counter() - sample_start
+                self.stdout.write(f'{scheme:<8} {inserted:>10} {sample_rows / elapsed:>10.0f}')
+                sample_start, sample_rows = time.perf_counter(), 0
+        return total / (time.perf_counter() - start)
+
+    def table_size(self, connection, table):
+        """Data plus index bytes (MySQL only)"""
+        if connection.vendor != 'mysql':
+            return None
+        with connection.cursor() as cursor:
+            cursor.execute(f'ANALYZE TABLE {connection.ops.quote_name(table)}')
+            cursor.fetchall()
+            cursor.execute(
+                'SELECT data_length + index_length FROM information_schema.tables '
+                'WHERE table_schema = DATABASE() AND table_name = %s',
+                [table],
+            )
+            row = cursor.fetchone()
+        return row[0] if row else None
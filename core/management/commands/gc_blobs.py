@@ -0,0 +1,32 @@
+"""
+Management Command for Content-Addressed Storage Garbage Collection
+Recounts the references to every stored blob and removes blobs that no
+file field or finished upload points at
+"""
+
+from django.core.management.base import BaseCommand
+from core.blobs import adopt_existing, collect_garbage
+
+
+class Command(BaseCommand):
+    help = 'Remove unreferenced content-addressed blobs'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--grace-hours', type=int, help='Keep blobs touched within this window (default BLOB_GC_GRACE_HOURS)')
+        parser.add_argument('--dry-run', action='store_true', help='Report without deleting')
+        parser.add_argument('--adopt-existing', action='store_true',
+                            help='First move files saved before content addressing into blobs')
+
+    def handle(self, *args, **options):
+        if options['adopt_existing']:
+            self.stdout.write('Adopting existing files...')
+            adopted = adopt_existing()
+            self.stdout.write(self.style.SUCCESS(f'✓ Adopted {adopted} files'))
+
+        self.stdout.write('Collecting unreferenced blobs...')
+        result = collect_garbage(grace_hours=options['grace_hours'], dry_run=options['dry_run'])
+        prefix = 'Would remove' if options['dry_run'] else 'Removed'
+        self.stdout.write(self.style.SUCCESS(
+            f"✓ {prefix} {result['removed']} blobs ({result['bytes']} bytes), "
+            f"{result['recounted']} reference counts corrected"
+        ))
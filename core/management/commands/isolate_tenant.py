@@ -0,0 +1,53 @@
+"""
+Management Command to Isolate a Tenant
+Moves one of the largest tenants from the shared tables to a database of its
+own (see core.db.sharding.isolate_tenant)
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+from core.db.sharding import directory, isolate_tenant, is_isolated_alias
+from core.models import Tenant
+
+
+class Command(BaseCommand):
+    help = 'Move a tenant to its own database; --list shows the largest shared tenants'
+
+    def add_arguments(self, parser):
+        parser.add_argument('tenant', nargs='?', help='Tenant slug')
+        parser.add_argument('--list', type=int, metavar='N', help='List the N largest tenants still on shared tables')
+        parser.add_argument('--batch-size', type=int, default=1000, help='Rows per insert batch')
+        parser.add_argument('--purge-source', action='store_true',
+                            help="Delete the tenant's rows from the shared tables after the switch")
+
+    def handle(self, *args, **options):
+        if options['list']:
+            shared = [
+                tenant for tenant in Tenant.objects.order_by('-current_students_count')
+                if not is_isolated_alias(directory.shard_for(tenant.pk))
+            ][:options['list']]
+            for tenant in shared:
+                self.stdout.write(
+                    f'{tenant.slug:<40} {tenant.current_students_count:>8} students  '
+                    f'({directory.shard_for(tenant.pk)})'
+                )
+            return
+
+        if not options['tenant']:
+            raise CommandError('Give a tenant slug or --list N')
+        tenant = Tenant.objects.filter(slug=options['tenant']).first()
+        if tenant is None:
+            raise CommandError(f"Tenant '{options['tenant']}' not found")
+
+        try:
+            alias, copied = isolate_tenant(
+                tenant,
+                batch_size=options['batch_size'],
+                purge_source=options['purge_source'],
+                stdout=self.stdout,
+            )
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        self.stdout.write(self.style.SUCCESS(
+            f"✓ Copied {sum(copied.values())} rows; {tenant.name} now has its own database '{alias}'"
+        ))
@@ -0,0 +1,92 @@
+"""
+Management Command to Load Test the Portals
+Replays weighted role journeys against synthetic users (see core.loadtest)
+and reports latency percentiles and throughput per portal
+"""
+
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from core.datagen import DEFAULT_PASSWORD
+from core.loadtest import LoadTestOptions, compare_reports, load_report, run_load_test
+
+
+class Command(BaseCommand):
+    help = 'Load test the role portals and report p50/p95/p99 latency and throughput'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=10, help='Concurrent virtual users')
+        parser.add_argument('--duration', type=float, default=30.0, help='Seconds to run')
+        parser.add_argument('--iterations', type=int, help='Requests per virtual user (stops earlier)')
+        parser.add_argument('--think-time', type=float, default=0.0, help='Max random pause between requests (s)')
+        parser.add_argument('--url', dest='base_url', help='Server to test, e.g. http://localhost:8000 '
+                                                           '(default: in-process WSGI)')
+        parser.add_argument('--tenants', type=int, default=1, help='Synthetic tenants to spread users over')
+        parser.add_argument('--prefix', default='synthetic', help='Synthetic tenant slug prefix')
+        parser.add_argument('--password', default=DEFAULT_PASSWORD, help='Password of the synthetic users')
+        parser.add_argument('--admin-email', help='Super admin login (company portal is skipped without it)')
+        parser.add_argument('--admin-password', help='Super admin password')
+        parser.add_argument('--seed', type=int, default=42, help='Random seed for roles and journeys')
+        parser.add_argument('--output', help='Write the JSON report to this file')
+        parser.add_argument('--compare', help='Previous JSON report to compare against')
+        parser.add_argument('--max-regression', type=float,
+                            help='Fail when any portal p95 is this many percent slower than --compare')
+
+    def handle(self, *args, **options):
+        baseline = load_report(options['compare']) if options['compare'] else None
+
+        run = LoadTestOptions(
+            users=options['users'],
+            duration=options['duration'],
+            iterations=options['iterations'],
+            think_time=options['think_time'],
+            base_url=options['base_url'],
+            tenants=options['tenants'],
+            prefix=options['prefix'],
+            password=options['password'],
+            admin_email=options['admin_email'],
+            admin_password=options['admin_password'],
+            seed=options['seed'],
+        )
+        target = run.base_url or 'in-process WSGI'
+        self.stdout.write(f'Load testing {target} with {run.users} users for up to {run.duration:g}s...')
+        report = run_load_test(run).report()
+
+        self.stdout.write(f"\nLogins: {report['logins']}")
+        self.write_table('Portal', report['portals'])
+        self.write_table('URL', report['urls'])
+        overall = report['overall']
+        self.stdout.write(self.style.SUCCESS(
+            f"\n✓ {overall['requests']} requests in {report['elapsed_s']}s "
+            f"({overall['rps']} req/s, {overall['errors']} errors, p95 {overall['p95_ms']} ms)"
+        ))
+
+        if options['output']:
+            with open(options['output'], 'w') as report_file:
+                json.dump(report, report_file, indent=2)
+            self.stdout.write(f"Report written to {options['output']}")
+
+        if baseline:
+            self.compare(report, baseline, options['max_regression'])
+
+    def write_table(self, title, rows):
+        self.stdout.write(
+            f"\n{title:<40} {'reqs':>6} {'errs':>5} {'rps':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}"
+        )
+        for name, stats in rows.items():
+            self.stdout.write(
+                f"{name:<40} {stats['requests']:>6} {stats['errors']:>5} {stats['rps']:>8} "
+                f"{stats['p50_ms']:>9} {stats['p95_ms']:>9} {stats['p99_ms']:>9}"
+            )
+
+    def compare(self, report, baseline, max_regression):
+        self.stdout.write(f"\n{'Portal':<20} {'p95 before':>11} {'p95 after':>10} {'change':>8}")
+        regressions = []
+        for portal, changes in compare_reports(report, baseline).items():
+            before, after, pct = changes['p95_ms']
+            self.stdout.write(f"{portal:<20} {before:>11} {after:>10} {'' if pct is None else f'{pct:+}%':>8}")
+            if max_regression is not None and pct is not None and pct > max_regression:
+                regressions.append(portal)
+
+        if regressions:
+            raise CommandError(f"p95 regressed more than {max_regression}% for: {', '.join(regressions)}")
@@ -0,0 +1,44 @@
+"""
+Management Command to Move a Tenant Between Shards
+Copies the tenant's rows to another database alias in batches and switches
+the shard directory over (see core.db.sharding)
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+from core.db.sharding import directory, move_tenant
+from core.models import Tenant
+
+
+class Command(BaseCommand):
+    help = "Copy a tenant's data to another shard and route it there"
+
+    def add_arguments(self, parser):
+        parser.add_argument('tenant', help='Tenant slug')
+        parser.add_argument('target', help='Destination database alias (e.g. shard2)')
+        parser.add_argument('--batch-size', type=int, default=1000, help='Rows per insert batch')
+        parser.add_argument('--purge-source', action='store_true',
+                            help="Delete the tenant's rows from the old shard after the switch")
+
+    def handle(self, *args, **options):
+        tenant = Tenant.objects.filter(slug=options['tenant']).first()
+        if tenant is None:
+            raise CommandError(f"Tenant '{options['tenant']}' not found")
+
+        source = directory.shard_for(tenant.pk)
+        self.stdout.write(f"Moving {tenant.name} from '{source}' to '{options['target']}'...")
+        try:
+            copied = move_tenant(
+                tenant,
+                options['target'],
+                batch_size=options['batch_size'],
+                purge_source=options['purge_source'],
+                stdout=self.stdout,
+            )
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        self.stdout.write(self.style.SUCCESS(
+            f"✓ Copied {sum(copied.values())} rows; {tenant.name} now lives on '{options['target']}'"
+        ))
+        if options['purge_source']:
+            self.stdout.write(self.style.SUCCESS(f"✓ Purged the tenant's rows from '{source}'"))
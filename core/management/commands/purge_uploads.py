@@ -0,0 +1,17 @@
+"""
+Management Command to Purge Expired Uploads
+Deletes the chunks of unfinished resumable uploads and assembled files that
+were never attached once their session has expired
+"""
+
+from django.core.management.base import BaseCommand
+from core.uploads import purge_expired
+
+
+class Command(BaseCommand):
+    help = 'Remove expired resumable upload sessions'
+
+    def handle(self, *args, **options):
+        self.stdout.write('Purging expired uploads...')
+        count = purge_expired()
+        self.stdout.write(self.style.SUCCESS(f'✓ Purged {count} upload sessions'))
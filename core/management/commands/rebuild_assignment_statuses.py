@@ -0,0 +1,28 @@
+"""
+Management Command to Rebuild Student Assignment Statuses
+Recomputes the per-student assignment status projection from assignments,
+enrollments and submissions (see teacher.assignment_status), e.g. after a
+deploy that adds it or bulk updates that bypassed signals
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+from core.models import Tenant
+from teacher.assignment_status import rebuild
+
+
+class Command(BaseCommand):
+    help = 'Recompute the per-student assignment status rows'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tenant', help='Tenant slug (default: all tenants)')
+
+    def handle(self, *args, **options):
+        tenant = None
+        if options['tenant']:
+            tenant = Tenant.objects.filter(slug=options['tenant']).first()
+            if tenant is None:
+                raise CommandError(f"Tenant '{options['tenant']}' not found")
+
+        self.stdout.write(f"Rebuilding assignment statuses for {tenant.name if tenant else 'all tenants'}...")
+        written = rebuild(tenant=tenant, stdout=self.stdout)
+        self.stdout.write(self.style.SUCCESS(f'✓ {written} student assignment statuses written'))
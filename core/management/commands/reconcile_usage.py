@@ -0,0 +1,26 @@
+"""
+Management Command to Reconcile Tenant Usage
+Recomputes usage counters from the database and persists them on each tenant
+"""
+
+from django.core.management.base import BaseCommand
+from core.storage import reconcile_storage
+from core.usage import reconcile_usage
+
+
+class Command(BaseCommand):
+    help = 'Recompute tenant usage counters from real counts'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tenant', action='append', dest='tenants', help='Tenant ID (repeatable)')
+        parser.add_argument('--storage', action='store_true', help='Also rescan file storage')
+
+    def handle(self, *args, **options):
+        if options['storage']:
+            self.stdout.write('Scanning tenant storage...')
+            totals = reconcile_storage(tenant_ids=options['tenants'])
+            self.stdout.write(self.style.SUCCESS(f'✓ Scanned storage for {len(totals)} tenants'))
+
+        self.stdout.write('Reconciling tenant usage...')
+        count = reconcile_usage(tenant_ids=options['tenants'])
+        self.stdout.write(self.style.SUCCESS(f'✓ Reconciled {count} tenants'))
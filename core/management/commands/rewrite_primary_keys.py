@@ -0,0 +1,39 @@
+"""
+Management Command to Rewrite Primary Keys as UUIDv7
+Converts existing random (uuid4) keys of the selected tables to time-ordered
+keys derived from each row's creation time, repointing every foreign key
+(see core.ids)
+"""
+
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS
+from core.ids import rewrite_primary_keys
+
+
+class Command(BaseCommand):
+    help = 'Rewrite uuid4 primary keys of the given tables as time-ordered uuid7 keys'
+
+    def add_arguments(self, parser):
+        parser.add_argument('models', nargs='+', help='Model labels, e.g. teacher.Attendance core.AuditLog')
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS, help='Database alias (e.g. shard2)')
+        parser.add_argument('--batch-size', type=int, default=1000, help='Keys rewritten per transaction')
+
+    def handle(self, *args, **options):
+        try:
+            models = [apps.get_model(label) for label in options['models']]
+        except (LookupError, ValueError) as e:
+            raise CommandError(str(e))
+
+        for model in models:
+            self.stdout.write(f"Rewriting {model._meta.label} keys on '{options['database']}'...")
+            try:
+                rewritten = rewrite_primary_keys(
+                    model,
+                    using=options['database'],
+                    batch_size=options['batch_size'],
+                    stdout=self.stdout,
+                )
+            except ValueError as e:
+                raise CommandError(str(e))
+            self.stdout.write(self.style.SUCCESS(f'✓ {model._meta.label}: {rewritten} keys rewritten'))
@@ -0,0 +1,101 @@
+"""
+Tenant-Scoped Managers
+BaseModel.objects hides soft-deleted rows and, while a tenant is bound to
+the request or task (TenantMiddleware, tenant_scope()), restricts models
+with a tenant foreign key to that tenant. The predicates always come out as
+tenant_id = ? AND is_deleted = false, which is the prefix of the composite
+indexes on tenant-owned tables (see tenant_index()), so portal queries are
+served from an index range instead of a filtered scan.
+
+BaseModel.all_objects sees every row of every tenant, for admin tooling.
+"""
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.db import models
+from django.utils import timezone
+
+# Tenant ID bound to the current request or task
+_current_tenant = ContextVar('current_tenant', default=None)
+
+
+def get_current_tenant():
+    """Tenant ID bound to the current request or task, or None"""
+    return _current_tenant.get()
+
+
+@contextmanager
+def tenant_scope(tenant):
+    """
+    Restrict tenant-owned models to one tenant
+
+    Usage:
+        with tenant_scope(tenant_id):
+            Department.objects.count()  # only this tenant's departments
+    """
+    token = _current_tenant.set(getattr(tenant, 'pk', tenant))
+    try:
+        yield
+    finally:
+        _current_tenant.reset(token)
+
+
+def is_tenant_owned(model):
+    """Whether the model has a direct tenant foreign key to scope on"""
+    try:
+        field = model._meta.get_field('tenant')
+    except Exception:
+        return False
+    return field.many_to_one or field.one_to_one
+
+
+def tenant_index(*fields, name=None):
+    """
+    Composite index led by the manager's scope predicates
+
+    Usage:
+        indexes = [tenant_index('department')]  # (tenant, is_deleted, department)
+    """
+    return models.Index(fields=['tenant', 'is_deleted', *fields], name=name)
+
+
+class TenantScopedQuerySet(models.QuerySet):
+    """QuerySet with the tenant and soft-delete predicates in index order"""
+
+    def for_tenant(self, tenant):
+        """Rows of one tenant that are not soft-deleted"""
+        return self.filter(tenant=tenant, is_deleted=False)
+
+    def alive(self):
+        """Rows that are not soft-deleted"""
+        return self.filter(is_deleted=False)
+
+    def active(self):
+        """Rows that are not soft-deleted and are active"""
+        return self.filter(is_deleted=False, is_active=True)
+
+    def deleted(self):
+        """Soft-deleted rows (use on all_objects)"""
+        return self.filter(is_deleted=True)
+
+    def soft_delete(self):
+        """Mark rows deleted without removing them; returns the row count"""
+        return self.update(is_deleted=True, updated_at=timezone.now())
+
+
+class TenantScopedManager(models.Manager.from_queryset(TenantScopedQuerySet)):
+    """Default manager applying the bound tenant and hiding soft-deleted rows"""
+
+    def get_queryset(self):
+        tenant_id = get_current_tenant()
+        if tenant_id is not None and is_tenant_owned(self.model):
+            return super().get_queryset().filter(tenant_id=tenant_id, is_deleted=False)
+        return super().get_queryset().filter(is_deleted=False)
+
+    def unscoped(self):
+        """Rows of every tenant that are not soft-deleted"""
+        return super().get_queryset().filter(is_deleted=False)
+
+
+AllObjectsManager = models.Manager.from_queryset(TenantScopedQuerySet)
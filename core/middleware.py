@@ -2,17 +2,24 @@
 Middleware for Multi-Tenant SaaS Platform
 - TenantMiddleware: Identifies and sets current tenant
 - RoleBasedAccessMiddleware: Enforces role-based access control
+- StorageAccountingMiddleware: Charges uploads to the request's tenant
+- QueryInstrumentationMiddleware: Reports SQL query count, time and duplicates per view
+- ReplicaRoutingMiddleware: Scopes read replica routing and primary stickiness to requests
 """
 
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
 from django.utils.functional import SimpleLazyObject
 from django.shortcuts import redirect
 from django.urls import reverse
-from django.http import HttpResponseForbidden, JsonResponse
+from django.http import HttpResponse, HttpResponseForbidden, JsonResponse
 from django.core.cache import cache
 from .models import Tenant, TenantDomain
+from .roles import get_user_role
 import logging
 
 logger = logging.getLogger(__name__)
+query_logger = logging.getLogger('core.queries')
 
 
 def get_tenant_from_request(request):
@@ -107,7 +114,22 @@ class TenantMiddleware:
                     else:
                         return redirect('subscription:expired')
         
-        response = self.get_response(request)
+        # Bind tenant-scoped queries to the tenant's shard (core.db.sharding)
+        # and default managers to the tenant (core.managers); requests without
+        # a tenant in the URL use the user's tenant. The session user is
+        # resolved first so users of other tenants still authenticate.
+        from .db.sharding import directory, tenant_shard
+        from .managers import tenant_scope
+        
+        user_tenant_id = getattr(getattr(request, 'user', None), 'tenant_id', None)
+        tenant_id = tenant.pk if tenant else user_tenant_id
+        if tenant_id and directory.is_moving(tenant_id):
+            response = HttpResponse('This college is being moved; please retry shortly.', status=503)
+            response['Retry-After'] = '60'
+            return response
+        
+        with tenant_shard(tenant_id), tenant_scope(tenant_id):
+            response = self.get_response(request)
         
         # Add tenant info to response headers (for debugging)
         if tenant and hasattr(response, '__setitem__'):
@@ -150,6 +172,9 @@ class RoleBasedAccessMiddleware:
         self.get_response = get_response
     
     def __call__(self, request):
+        # Attach the frozen role descriptor (registry lookup, no query)
+        request.role = get_user_role(request.user)
+        
         # Check if URL is public
         if self._is_public_url(request.path):
             return self.get_response(request)
@@ -161,11 +186,11 @@ class RoleBasedAccessMiddleware:
             return redirect(f"{reverse('login')}?next={request.path}")
         
         # Super admins have access to everything
-        if request.user.is_superuser or (request.user.role and request.user.is_super_admin()):
+        if request.user.is_superuser or (request.role and request.role.is_super_admin):
             return self.get_response(request)
         
         # Check role-based access
-        user_role = request.user.role.name if request.user.role else None
+        user_role = request.role.name if request.role else None
         
         if not user_role:
             logger.warning(f"User {request.user.email} has no role assigned")
@@ -261,3 +286,122 @@ class AuditLogMiddleware:
             )
         except Exception as e:
             logger.error(f"Error logging audit trail: {str(e)}")
+
+
+class StorageAccountingMiddleware:
+    """
+    Middleware exposing the current request to TenantStorage so uploads are
+    charged to the right tenant, and turning quota errors into responses
+    """
+    
+    def __init__(self, get_response):
+        self.get_response = get_response
+    
+    def __call__(self, request):
+        from .storage import current_request
+        
+        token = current_request.set(request)
+        try:
+            return self.get_response(request)
+        finally:
+            current_request.reset(token)
+    
+    def process_exception(self, request, exception):
+        from django.contrib import messages
+        from .storage import StorageQuotaExceeded
+        
+        if not isinstance(exception, StorageQuotaExceeded):
+            return None
+        
+        if request.path.startswith('/api/'):
+            return JsonResponse({'error': str(exception), 'code': 'STORAGE_QUOTA_EXCEEDED'}, status=413)
+        
+        messages.error(request, str(exception), fail_silently=True)
+        return redirect(request.META.get('HTTP_REFERER') or '/')
+
+
+
+class QueryInstrumentationMiddleware:
+    """
+    Middleware recording SQL query count, DB time and duplicate statements
+    per view and tenant (QUERY_INSTRUMENTATION). Numbers go to the
+    core.queries logger and, with QUERY_INSTRUMENTATION_HEADERS, to
+    X-DB-* response headers. Views over their declared budget log a warning.
+    """
+    
+    def __init__(self, get_response):
+        if not settings.QUERY_INSTRUMENTATION:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+    
+    def __call__(self, request):
+        from .query_budget import QueryRecorder
+        
+        with QueryRecorder() as recorder:
+            response = self.get_response(request)
+        
+        view_name = getattr(request, '_query_view_name', None)
+        if view_name is None:
+            return response
+        budget = request._query_budget
+        
+        if settings.QUERY_INSTRUMENTATION_HEADERS:
+            response['X-DB-Query-Count'] = str(recorder.count)
+            response['X-DB-Time-Ms'] = str(recorder.duration_ms)
+            response['X-DB-Duplicate-Queries'] = str(recorder.duplicate_count)
+            response['X-DB-Query-Budget'] = str(budget)
+        
+        user = getattr(request, 'user', None)
+        tenant_id = getattr(user, 'tenant_id', None) or getattr(getattr(request, 'tenant', None), 'pk', None)
+        summary = (
+            f"{view_name} tenant={tenant_id} queries={recorder.count}/{budget} "
+            f"db_ms={recorder.duration_ms} duplicates={recorder.duplicate_count}"
+        )
+        if recorder.count > budget:
+            top = '; '.join(f"{count}x {sql[:200]}" for sql, count in recorder.duplicates(limit=3))
+            query_logger.warning(f"Query budget exceeded: {summary} top_duplicates=[{top}]")
+        else:
+            query_logger.debug(summary)
+        
+        return response
+    
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        from .query_budget import get_view_budget
+        
+        match = request.resolver_match
+        request._query_view_name = match.view_name if match else view_func.__qualname__
+        request._query_budget = get_view_budget(view_func)
+        return None
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Middleware letting core.db.routers.ReplicaRouter send this request's
+    reads to replicas. Unsafe methods, requests that write and requests
+    carrying the pin cookie (set after a write, for REPLICA_PIN_SECONDS)
+    read from the primary.
+    """
+    
+    SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+    
+    def __init__(self, get_response):
+        if not getattr(settings, 'DATABASE_REPLICAS', None):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+    
+    def __call__(self, request):
+        from .db.routers import use_replicas
+        
+        pinned = request.method not in self.SAFE_METHODS or settings.REPLICA_PIN_COOKIE in request.COOKIES
+        with use_replicas(pinned=pinned) as state:
+            response = self.get_response(request)
+        
+        if state.wrote:
+            response.set_cookie(
+                settings.REPLICA_PIN_COOKIE, '1',
+                max_age=settings.REPLICA_PIN_SECONDS,
+                httponly=True,
+                samesite='Lax',
+                secure=request.is_secure(),
+            )
+        return response
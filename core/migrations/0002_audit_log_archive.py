@@ -0,0 +1,73 @@
+# Generated by Django 5.0 on 2026-10-18 22:54
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("core", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="AuditLogArchive",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("period_start", models.DateTimeField()),
+                ("period_end", models.DateTimeField()),
+                ("storage_path", models.CharField(max_length=500, unique=True)),
+                ("row_count", models.IntegerField(default=0)),
+                ("size_bytes", models.BigIntegerField(default=0)),
+                (
+                    "checksum",
+                    models.CharField(
+                        help_text="SHA-256 of the compressed file", max_length=64
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "audit_log_archives",
+                "ordering": ["-period_start"],
+            },
+        ),
+        migrations.AddIndex(
+            model_name="auditlog",
+            index=models.Index(
+                fields=["timestamp"], name="audit_logs_timesta_423be6_idx"
+            ),
+        ),
+        migrations.AddField(
+            model_name="auditlogarchive",
+            name="tenant",
+            field=models.ForeignKey(
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="audit_archives",
+                to="core.tenant",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="auditlogarchive",
+            index=models.Index(
+                fields=["tenant", "period_start"], name="audit_log_a_tenant__a1595a_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="auditlogarchive",
+            index=models.Index(
+                fields=["period_start", "period_end"],
+                name="audit_log_a_period__2e9c55_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,61 @@
+# Generated by Django 5.0 on 2026-10-18 23:51
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("core", "0003_notification"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TenantShard",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                ("is_active", models.BooleanField(default=True)),
+                (
+                    "alias",
+                    models.CharField(
+                        help_text="DATABASES alias holding the tenant's rows",
+                        max_length=50,
+                    ),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[("active", "Active"), ("moving", "Moving")],
+                        default="active",
+                        max_length=20,
+                    ),
+                ),
+                ("moved_at", models.DateTimeField(blank=True, null=True)),
+                (
+                    "tenant",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="shard",
+                        to="core.tenant",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "tenant_shards",
+                "indexes": [
+                    models.Index(fields=["alias"], name="tenant_shar_alias_9bb479_idx")
+                ],
+            },
+        ),
+    ]
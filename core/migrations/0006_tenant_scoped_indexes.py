@@ -0,0 +1,209 @@
+# Generated by Django 5.0 on 2026-10-19 00:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("auth", "0012_alter_user_first_name_max_length"),
+        ("core", "0005_uuid7_primary_keys"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="notification",
+            name="notificatio_tenant__f87df4_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="parentstudentlink",
+            name="parent_stud_tenant__be0c67_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="parentstudentlink",
+            name="parent_stud_tenant__df171c_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="section",
+            name="sections_tenant__d8bbdd_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="studentenrollment",
+            name="student_enr_tenant__8ef8b5_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="studentenrollment",
+            name="student_enr_tenant__5ecacb_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="subject",
+            name="subjects_tenant__0fbedd_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="teachersubjectassignment",
+            name="teacher_sub_tenant__956b51_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="teachersubjectassignment",
+            name="teacher_sub_tenant__87517a_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="useraccount",
+            name="user_accoun_tenant__5581af_idx",
+        ),
+        migrations.AddField(
+            model_name="academicyear",
+            name="is_deleted",
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name="department",
+            name="is_deleted",
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name="notification",
+            name="is_deleted",
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name="parentstudentlink",
+            name="is_deleted",
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name="role",
+            name="is_deleted",
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name="section",
+            name="is_deleted",
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name="studentenrollment",
+            name="is_deleted",
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name="subject",
+            name="is_deleted",
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name="teachersubjectassignment",
+            name="is_deleted",
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name="tenant",
+            name="is_deleted",
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name="tenantdomain",
+            name="is_deleted",
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name="tenantshard",
+            name="is_deleted",
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name="useraccount",
+            name="is_deleted",
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddIndex(
+            model_name="academicyear",
+            index=models.Index(
+                fields=["tenant", "is_deleted", "is_active", "start_date"],
+                name="academic_ye_tenant__6346fb_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="department",
+            index=models.Index(
+                fields=["tenant", "is_deleted", "name"],
+                name="departments_tenant__3564d4_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="notification",
+            index=models.Index(
+                fields=["tenant", "is_deleted", "created_at"],
+                name="notificatio_tenant__90ba70_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="parentstudentlink",
+            index=models.Index(
+                fields=["tenant", "is_deleted", "parent"],
+                name="parent_stud_tenant__2f161f_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="parentstudentlink",
+            index=models.Index(
+                fields=["tenant", "is_deleted", "student"],
+                name="parent_stud_tenant__f456cd_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="section",
+            index=models.Index(
+                fields=["tenant", "is_deleted", "department"],
+                name="sections_tenant__2e69c7_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="studentenrollment",
+            index=models.Index(
+                fields=["tenant", "is_deleted", "student"],
+                name="student_enr_tenant__1009f3_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="studentenrollment",
+            index=models.Index(
+                fields=["tenant", "is_deleted", "section", "roll_number"],
+                name="student_enr_tenant__9356c6_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="subject",
+            index=models.Index(
+                fields=["tenant", "is_deleted", "department"],
+                name="subjects_tenant__e82344_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="teachersubjectassignment",
+            index=models.Index(
+                fields=["tenant", "is_deleted", "teacher"],
+                name="teacher_sub_tenant__6c696f_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="teachersubjectassignment",
+            index=models.Index(
+                fields=["tenant", "is_deleted", "section"],
+                name="teacher_sub_tenant__21347b_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="useraccount",
+            index=models.Index(
+                fields=["tenant", "is_deleted", "role"],
+                name="user_accoun_tenant__cf8513_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="useraccount",
+            index=models.Index(
+                fields=["tenant", "is_deleted", "created_at"],
+                name="user_accoun_tenant__5d7fa9_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,55 @@
+# Generated by Django 5.0 on 2026-10-19 00:28
+
+import core.ids
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("core", "0007_upload_sessions"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="FileBlob",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=core.ids.uuid7,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                ("is_active", models.BooleanField(default=True)),
+                ("is_deleted", models.BooleanField(default=False)),
+                ("sha256", models.CharField(max_length=64)),
+                ("size", models.BigIntegerField()),
+                ("storage_name", models.CharField(max_length=500, unique=True)),
+                ("ref_count", models.IntegerField(default=0)),
+                (
+                    "tenant",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="file_blobs",
+                        to="core.tenant",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "file_blobs",
+                "ordering": ["-created_at"],
+                "indexes": [
+                    models.Index(
+                        fields=["ref_count", "updated_at"],
+                        name="file_blobs_ref_cou_186701_idx",
+                    )
+                ],
+                "unique_together": {("tenant", "sha256")},
+            },
+        ),
+    ]
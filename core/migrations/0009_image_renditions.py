@@ -0,0 +1,22 @@
+# Generated by Django 5.0 on 2026-10-19 00:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("core", "0008_content_addressed_files"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="tenant",
+            name="logo_renditions",
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+        migrations.AddField(
+            model_name="useraccount",
+            name="profile_picture_renditions",
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.0 on 2026-10-19 01:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("core", "0010_inbox"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="notification",
+            name="email_sent_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -5,21 +5,58 @@ Contains: Tenant, UserAccount, Role, Permission, and related models
 
 from django.db import models
 from django.contrib.auth.models import AbstractBaseUser, BaseUserManager, PermissionsMixin
+from django.core.exceptions import NON_FIELD_ERRORS
 from django.core.validators import EmailValidator
 from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 import uuid
 
+from .ids import uuid7
+from .managers import AllObjectsManager, TenantScopedManager, tenant_index
+
 
 class BaseModel(models.Model):
     """Abstract base model with common fields"""
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     is_active = models.BooleanField(default=True)
+    is_deleted = models.BooleanField(default=False)
+    
+    # Scoped to the bound tenant, soft-deleted rows hidden (core.managers)
+    objects = TenantScopedManager()
+    all_objects = AllObjectsManager()
     
     class Meta:
         abstract = True
+    
+    def soft_delete(self):
+        """Hide the row from the default manager without removing it"""
+        self.is_deleted = True
+        self.save(update_fields=['is_deleted', 'updated_at'])
+
+    def _perform_unique_checks(self, unique_checks):
+        """
+        Unique checks also see soft-deleted rows
+
+        The default manager (used by Model.validate_unique and ModelForms)
+        hides them, but they keep their values in the unique indexes, so
+        re-creating one must fail validation instead of the INSERT.
+        """
+        errors = super()._perform_unique_checks(unique_checks)
+        for model_class, unique_check in unique_checks:
+            if self._meta.pk.name in unique_check or not hasattr(model_class, 'all_objects'):
+                continue
+            lookup = {name: getattr(self, self._meta.get_field(name).attname) for name in unique_check}
+            if any(value is None for value in lookup.values()):
+                continue
+            deleted = model_class.all_objects.deleted().filter(**lookup)
+            if not self._state.adding:
+                deleted = deleted.exclude(pk=self.pk)
+            if deleted.exists():
+                key = unique_check[0] if len(unique_check) == 1 else NON_FIELD_ERRORS
+                errors.setdefault(key, []).append(self.unique_error_message(model_class, unique_check))
+        return errors
 
 
 class Tenant(BaseModel):
@@ -46,6 +83,7 @@ class Tenant(BaseModel):
     
     # Branding
     logo = models.ImageField(upload_to='tenant_logos/', null=True, blank=True)
+    logo_renditions = models.JSONField(default=dict, blank=True, editable=False)  # core.renditions
     primary_color = models.CharField(max_length=7, default='#007bff')
     secondary_color = models.CharField(max_length=7, default='#6c757d')
     
@@ -133,6 +171,33 @@ class TenantDomain(BaseModel):
         return f"{self.domain} -> {self.tenant.name}"
 
 
+class TenantShard(BaseModel):
+    """
+    Shard directory entry: the database alias holding a tenant's data
+    Tenants without an entry live on SHARD_DEFAULT (see core.db.sharding)
+    """
+    tenant = models.OneToOneField(Tenant, on_delete=models.CASCADE, related_name='shard')
+    alias = models.CharField(max_length=50, help_text="DATABASES alias holding the tenant's rows")
+    status = models.CharField(
+        max_length=20,
+        choices=[
+            ('active', 'Active'),
+            ('moving', 'Moving'),  # Copy in progress: requests get 503
+        ],
+        default='active'
+    )
+    moved_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = 'tenant_shards'
+        indexes = [
+            models.Index(fields=['alias']),
+        ]
+
+    def __str__(self):
+        return f"{self.tenant_id} -> {self.alias}"
+
+
 class Role(BaseModel):
     """
     Role Model - Defines user roles in the system
@@ -175,9 +240,13 @@ class Role(BaseModel):
         return self.display_name
 
 
-class UserAccountManager(BaseUserManager):
+class UserAccountManager(TenantScopedManager, BaseUserManager):
     """Custom manager for UserAccount"""
     
+    def get_by_natural_key(self, username):
+        # Logins resolve users of any tenant (still skipping soft-deleted ones)
+        return self.unscoped().get(**{self.model.USERNAME_FIELD: username})
+    
     def create_user(self, email, password=None, **extra_fields):
         if not email:
             raise ValueError('Email is required')
@@ -206,6 +275,7 @@ class UserAccount(AbstractBaseUser, PermissionsMixin, BaseModel):
     
     # Profile
     profile_picture = models.ImageField(upload_to='profile_pictures/', null=True, blank=True)
+    profile_picture_renditions = models.JSONField(default=dict, blank=True, editable=False)  # core.renditions
     date_of_birth = models.DateField(null=True, blank=True)
     gender = models.CharField(
         max_length=10,
@@ -258,7 +328,8 @@ class UserAccount(AbstractBaseUser, PermissionsMixin, BaseModel):
         ordering = ['-created_at']
         indexes = [
             models.Index(fields=['email']),
-            models.Index(fields=['tenant', 'role']),
+            tenant_index('role'),
+            tenant_index('created_at'),
         ]
     
     def __str__(self):
@@ -270,23 +341,39 @@ class UserAccount(AbstractBaseUser, PermissionsMixin, BaseModel):
     def get_short_name(self):
         return self.first_name
     
+    @property
+    def role_descriptor(self):
+        """Cached role snapshot from the in-process registry (no query)"""
+        from .roles import get_role
+        return get_role(self.role_id)
+    
+    @property
+    def role_name(self):
+        descriptor = self.role_descriptor
+        return descriptor.name if descriptor else None
+    
+    def has_role_permission(self, permission_name):
+        """Bitmask check of a can_* role flag"""
+        descriptor = self.role_descriptor
+        return bool(descriptor) and descriptor.has_permission(permission_name)
+    
     def is_super_admin(self):
-        return self.role and self.role.name == 'super_admin'
+        return self.role_name == 'super_admin'
     
     def is_tenant_admin(self):
-        return self.role and self.role.name == 'tenant_admin'
+        return self.role_name == 'tenant_admin'
     
     def is_department_admin(self):
-        return self.role and self.role.name == 'department_admin'
+        return self.role_name == 'department_admin'
     
     def is_teacher(self):
-        return self.role and self.role.name == 'teacher'
+        return self.role_name == 'teacher'
     
     def is_student(self):
-        return self.role and self.role.name == 'student'
+        return self.role_name == 'student'
     
     def is_parent(self):
-        return self.role and self.role.name == 'parent'
+        return self.role_name == 'parent'
 
 
 class Department(BaseModel):
@@ -319,6 +406,7 @@ class Department(BaseModel):
         ordering = ['name']
         indexes = [
             models.Index(fields=['tenant', 'code']),
+            tenant_index('name'),
         ]
     
     def __str__(self):
@@ -361,7 +449,7 @@ class Subject(BaseModel):
         unique_together = ['tenant', 'department', 'code']
         ordering = ['department', 'semester', 'name']
         indexes = [
-            models.Index(fields=['tenant', 'department']),
+            tenant_index('department'),
         ]
     
     def __str__(self):
@@ -381,6 +469,9 @@ class AcademicYear(BaseModel):
         db_table = 'academic_years'
         unique_together = ['tenant', 'name']
         ordering = ['-start_date']
+        indexes = [
+            tenant_index('is_active', 'start_date'),
+        ]
     
     def __str__(self):
         return f"{self.name} - {self.tenant.name}"
@@ -416,7 +507,7 @@ class Section(BaseModel):
         unique_together = ['tenant', 'department', 'academic_year', 'code']
         ordering = ['department', 'year', 'semester', 'name']
         indexes = [
-            models.Index(fields=['tenant', 'department']),
+            tenant_index('department'),
         ]
     
     def __str__(self):
@@ -437,8 +528,8 @@ class TeacherSubjectAssignment(BaseModel):
         db_table = 'teacher_subject_assignments'
         unique_together = ['teacher', 'subject', 'section', 'academic_year']
         indexes = [
-            models.Index(fields=['tenant', 'teacher']),
-            models.Index(fields=['tenant', 'section']),
+            tenant_index('teacher'),
+            tenant_index('section'),
         ]
     
     def __str__(self):
@@ -470,8 +561,8 @@ class StudentEnrollment(BaseModel):
         db_table = 'student_enrollments'
         unique_together = ['tenant', 'student', 'section', 'academic_year']
         indexes = [
-            models.Index(fields=['tenant', 'student']),
-            models.Index(fields=['tenant', 'section']),
+            tenant_index('student'),
+            tenant_index('section', 'roll_number'),
             models.Index(fields=['roll_number']),
         ]
     
@@ -503,17 +594,167 @@ class ParentStudentLink(BaseModel):
         db_table = 'parent_student_links'
         unique_together = ['parent', 'student']
         indexes = [
-            models.Index(fields=['tenant', 'parent']),
-            models.Index(fields=['tenant', 'student']),
+            tenant_index('parent'),
+            tenant_index('student'),
         ]
     
     def __str__(self):
         return f"{self.parent.get_full_name()} -> {self.student.get_full_name()}"
 
 
+class Notification(BaseModel):
+    """System notifications"""
+    tenant = models.ForeignKey(Tenant, on_delete=models.CASCADE, null=True, blank=True, related_name='notifications')
+    user = models.ForeignKey(UserAccount, on_delete=models.CASCADE, related_name='notifications')
+    
+    title = models.CharField(max_length=200)
+    message = models.TextField()
+    
+    notification_type = models.CharField(
+        max_length=20,
+        choices=[
+            ('info', 'Information'),
+            ('success', 'Success'),
+            ('warning', 'Warning'),
+            ('error', 'Error'),
+            ('announcement', 'Announcement'),
+        ],
+        default='info'
+    )
+    
+    link = models.CharField(max_length=500, null=True, blank=True)
+    is_read = models.BooleanField(default=False)
+    read_at = models.DateTimeField(null=True, blank=True)
+    # Set once the notification email went out (retries skip it)
+    email_sent_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        db_table = 'notifications'
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['user', 'is_read']),
+            tenant_index('created_at'),
+            # Keyset-paginated inbox (core.inbox)
+            tenant_index('user', 'created_at', 'id'),
+        ]
+    
+    def __str__(self):
+        return f"{self.user.get_full_name()} - {self.title}"
+
+
+class Message(BaseModel):
+    """Internal messaging system"""
+    tenant = models.ForeignKey(Tenant, on_delete=models.CASCADE, related_name='messages')
+    
+    sender = models.ForeignKey(UserAccount, on_delete=models.CASCADE, related_name='messages_sent')
+    recipient = models.ForeignKey(UserAccount, on_delete=models.CASCADE, related_name='messages_received')
+    
+    subject = models.CharField(max_length=200)
+    body = models.TextField()
+    
+    is_read = models.BooleanField(default=False)
+    read_at = models.DateTimeField(null=True, blank=True)
+    
+    parent_message = models.ForeignKey('self', on_delete=models.CASCADE, null=True, blank=True, related_name='replies')
+    
+    class Meta:
+        db_table = 'messages'
+        ordering = ['-created_at']
+        indexes = [
+            tenant_index('recipient', 'is_read'),
+            tenant_index('sender'),
+            # Keyset-paginated inbox (core.inbox)
+            tenant_index('recipient', 'created_at', 'id'),
+        ]
+    
+    def __str__(self):
+        return f"{self.sender.get_full_name()} to {self.recipient.get_full_name()} - {self.subject}"
+
+
+class UploadSession(BaseModel):
+    """Resumable chunked upload (core.uploads)"""
+    tenant = models.ForeignKey(Tenant, on_delete=models.CASCADE, null=True, blank=True, related_name='upload_sessions')
+    user = models.ForeignKey(UserAccount, on_delete=models.CASCADE, related_name='upload_sessions')
+
+    # Model field the finished file is meant for (core.uploads.UPLOAD_TARGETS)
+    purpose = models.CharField(max_length=30)
+    filename = models.CharField(max_length=255)
+    content_type = models.CharField(max_length=100, blank=True)
+    size = models.BigIntegerField()
+    chunk_size = models.IntegerField()
+
+    status = models.CharField(
+        max_length=20,
+        choices=[
+            ('open', 'Open'),
+            ('complete', 'Complete'),
+            ('claimed', 'Claimed'),
+        ],
+        default='open'
+    )
+    sha256 = models.CharField(max_length=64, blank=True)
+    stored_name = models.CharField(max_length=500, blank=True)
+    expires_at = models.DateTimeField()
+
+    class Meta:
+        db_table = 'upload_sessions'
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['user', 'status']),
+            models.Index(fields=['expires_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.filename} ({self.status})"
+
+    @property
+    def total_chunks(self):
+        return max(1, -(-self.size // self.chunk_size))
+
+
+class UploadChunk(BaseModel):
+    """One received chunk of an upload session, stored until assembly"""
+    session = models.ForeignKey(UploadSession, on_delete=models.CASCADE, related_name='chunks')
+    index = models.IntegerField()
+    size = models.IntegerField()
+    sha256 = models.CharField(max_length=64)
+    storage_name = models.CharField(max_length=500)
+
+    class Meta:
+        db_table = 'upload_chunks'
+        ordering = ['index']
+        unique_together = ['session', 'index']
+
+    def __str__(self):
+        return f"{self.session_id} #{self.index}"
+
+
+class FileBlob(BaseModel):
+    """
+    Stored object of the content-addressed file storage (core.blobs)
+    One per tenant and SHA-256; file fields of every copy point at it.
+    """
+    tenant = models.ForeignKey(Tenant, on_delete=models.CASCADE, related_name='file_blobs')
+    sha256 = models.CharField(max_length=64)
+    size = models.BigIntegerField()
+    storage_name = models.CharField(max_length=500, unique=True)
+    ref_count = models.IntegerField(default=0)
+
+    class Meta:
+        db_table = 'file_blobs'
+        ordering = ['-created_at']
+        unique_together = ['tenant', 'sha256']
+        indexes = [
+            models.Index(fields=['ref_count', 'updated_at']),  # Garbage collection sweep
+        ]
+
+    def __str__(self):
+        return f"{self.sha256[:12]} x{self.ref_count}"
+
+
 class AuditLog(models.Model):
     """System-wide audit log"""
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
     timestamp = models.DateTimeField(auto_now_add=True)
     
     # Actor
@@ -545,7 +786,40 @@ class AuditLog(models.Model):
             models.Index(fields=['tenant', 'timestamp']),
             models.Index(fields=['user', 'timestamp']),
             models.Index(fields=['action']),
+            models.Index(fields=['timestamp']),  # Retention/archival range scans
         ]
     
     def __str__(self):
         return f"{self.user} - {self.action} - {self.timestamp}"
+
+
+class AuditLogArchive(models.Model):
+    """
+    Manifest entry for a segment of audit logs moved out of the hot table.
+    Each segment holds one tenant's rows for one calendar month.
+    """
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    tenant = models.ForeignKey(Tenant, on_delete=models.SET_NULL, null=True, related_name='audit_archives')
+    
+    # Time range covered by the segment
+    period_start = models.DateTimeField()
+    period_end = models.DateTimeField()
+    
+    # Storage location of the gzip-compressed JSONL file
+    storage_path = models.CharField(max_length=500, unique=True)
+    row_count = models.IntegerField(default=0)
+    size_bytes = models.BigIntegerField(default=0)
+    checksum = models.CharField(max_length=64, help_text="SHA-256 of the compressed file")
+    
+    class Meta:
+        db_table = 'audit_log_archives'
+        ordering = ['-period_start']
+        indexes = [
+            models.Index(fields=['tenant', 'period_start']),
+            models.Index(fields=['period_start', 'period_end']),
+        ]
+    
+    def __str__(self):
+        return f"{self.tenant_id or 'system'} - {self.period_start:%Y-%m} ({self.row_count} rows)"
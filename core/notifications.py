@@ -0,0 +1,247 @@
+"""
+Notification Fan-out
+- Audience resolution: turns an announcement target (all, role, department,
+  section) into user IDs with a single set-based query
+- Fan-out: bulk-creates Notification rows in chunks and queues email/SMS
+  delivery in batches, honoring the tenant's CollegeSettings toggles
+- Unread counters: incremented per recipient on fan-out and decremented on
+  mark-read (core.inbox)
+- Live push: recipients with an open page get a `notification` event, and
+  tenant-wide announcements an `announcement` event (core.events)
+"""
+
+from itertools import islice
+import logging
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils.module_loading import import_string
+
+from .events import publish, tenant_channel, user_channel
+from .inbox import adjust_unread, mark_read, unread_count
+from .models import (
+    Notification, ParentStudentLink, StudentEnrollment, TeacherSubjectAssignment, UserAccount
+)
+
+logger = logging.getLogger(__name__)
+
+# Audience name -> role names (covers college and department announcement choices)
+AUDIENCE_ROLES = {
+    'students': ['student'],
+    'teachers': ['teacher'],
+    'faculty': ['teacher', 'department_admin'],
+    'parents': ['parent'],
+}
+
+
+def resolve_audience(tenant, audience='all', department=None, section=None, roles=None):
+    """
+    Resolve an announcement audience into active user IDs
+
+    Args:
+        tenant: Tenant the announcement belongs to
+        audience: 'all', 'students', 'teachers', 'faculty', 'parents',
+            'department', 'section' or 'role'
+        department: Restrict to members of this department
+        section: Restrict to members of this section
+        roles: Role names for the 'role' audience
+
+    Returns:
+        QuerySet: flat user IDs, evaluated as one query with subqueries;
+        empty for a 'department' or 'section' audience without its scope
+    """
+    users = UserAccount.objects.filter(tenant=tenant, is_active=True)
+
+    if audience == 'department' and department is None or audience == 'section' and section is None:
+        logger.warning(f"'{audience}' audience without a {audience} (tenant {getattr(tenant, 'pk', tenant)})")
+        return users.none().values_list('id', flat=True)
+
+    if audience == 'role':
+        users = users.filter(role__name__in=roles or [])
+    elif audience in AUDIENCE_ROLES:
+        users = users.filter(role__name__in=AUDIENCE_ROLES[audience])
+
+    if section is not None:
+        students = StudentEnrollment.objects.filter(
+            tenant=tenant, section=section, status='active'
+        ).values('student_id')
+        teachers = TeacherSubjectAssignment.objects.filter(
+            tenant=tenant, section=section, is_active=True
+        ).values('teacher_id')
+        members = Q(id__in=students) | Q(id__in=teachers)
+    elif department is not None:
+        students = StudentEnrollment.objects.filter(
+            tenant=tenant, section__department=department, status='active'
+        ).values('student_id')
+        teachers = TeacherSubjectAssignment.objects.filter(
+            tenant=tenant, subject__department=department, is_active=True
+        ).values('teacher_id')
+        members = Q(id__in=students) | Q(id__in=teachers)
+        if department.hod_id:
+            members |= Q(id=department.hod_id)
+    else:
+        return users.values_list('id', flat=True)
+
+    parents = ParentStudentLink.objects.filter(
+        tenant=tenant, student_id__in=students
+    ).values('parent_id')
+    members |= Q(id__in=parents)
+
+    return users.filter(members).values_list('id', flat=True)
+
+
+def _chunked(iterable, size):
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def get_delivery_channels(tenant):
+    """Return the delivery channels enabled for a tenant"""
+    from college_management.models import CollegeSettings
+
+    college_settings = CollegeSettings.objects.filter(tenant=tenant).only(
+        'email_notifications_enabled', 'sms_notifications_enabled'
+    ).first()
+    if college_settings is None:
+        return {'email': True, 'sms': False}
+    return {
+        'email': college_settings.email_notifications_enabled,
+        'sms': college_settings.sms_notifications_enabled,
+    }
+
+
+def _enqueue_delivery(task, notification_ids, tenant_id):
+    try:
+        task.delay([str(pk) for pk in notification_ids], tenant_id=str(tenant_id))
+    except Exception as e:
+        logger.error(f"Error queueing {task.name} for {len(notification_ids)} notifications: {str(e)}")
+
+
+def fan_out(tenant, user_ids, title, message, notification_type='announcement', link=None, exclude=None):
+    """
+    Create one notification per recipient and queue delivery
+
+    Args:
+        tenant: Tenant the notifications belong to
+        user_ids: Iterable of recipient user IDs (e.g. from resolve_audience)
+        title: Notification title
+        message: Notification body
+        notification_type: Notification type choice
+        link: Optional URL shown with the notification
+        exclude: User ID to skip (usually the author)
+
+    Returns:
+        int: Number of notifications created
+    """
+    from .tasks import deliver_notification_emails, deliver_notification_sms
+
+    if hasattr(user_ids, 'iterator'):
+        user_ids = user_ids.iterator(chunk_size=settings.NOTIFICATION_FANOUT_BATCH_SIZE)
+
+    channels = get_delivery_channels(tenant)
+    delivery_batch = settings.NOTIFICATION_DELIVERY_BATCH_SIZE
+    created = 0
+
+    for chunk in _chunked(user_ids, settings.NOTIFICATION_FANOUT_BATCH_SIZE):
+        if exclude is not None:
+            chunk = [user_id for user_id in chunk if user_id != exclude]
+
+        notifications = Notification.objects.bulk_create([
+            Notification(
+                tenant=tenant,
+                user_id=user_id,
+                title=title,
+                message=message,
+                notification_type=notification_type,
+                link=link,
+            )
+            for user_id in chunk
+        ])
+        created += len(notifications)
+        transaction.on_commit(lambda chunk=chunk: adjust_unread('notifications', chunk, 1))
+        transaction.on_commit(lambda chunk=chunk: publish(
+            [user_channel(user_id) for user_id in chunk],
+            'notification',
+            {'title': title, 'type': notification_type, 'link': link},
+        ))
+
+        notification_ids = [notification.pk for notification in notifications]
+        for batch in _chunked(notification_ids, delivery_batch):
+            # After commit, so workers never look for rows that are not there yet
+            if channels['email']:
+                transaction.on_commit(
+                    lambda batch=batch: _enqueue_delivery(deliver_notification_emails, batch, tenant.pk)
+                )
+            if channels['sms']:
+                transaction.on_commit(
+                    lambda batch=batch: _enqueue_delivery(deliver_notification_sms, batch, tenant.pk)
+                )
+
+    logger.info(f"Fanned out '{title}' to {created} users (tenant {tenant.pk})")
+    return created
+
+
+def notify_announcement(announcement, department=None):
+    """
+    Fan out a college or department announcement to its audience
+
+    Args:
+        announcement: college_management.Announcement or
+            department_management.DepartmentAnnouncement instance
+        department: Department scope for department announcements
+    """
+    department = department or getattr(announcement, 'target_department', None)
+    user_ids = resolve_audience(
+        announcement.tenant,
+        audience=announcement.target_audience,
+        department=department,
+        section=getattr(announcement, 'target_section', None),
+    )
+    created = fan_out(
+        announcement.tenant,
+        user_ids,
+        title=announcement.title,
+        message=announcement.content,
+        exclude=announcement.created_by_id,
+    )
+    if announcement.target_audience == 'all' and department is None and getattr(announcement, 'target_section', None) is None:
+        tenant_id = announcement.tenant_id
+        transaction.on_commit(lambda: publish(
+            [tenant_channel(tenant_id)], 'announcement', {'title': announcement.title}
+        ))
+    return created
+
+
+def get_unread_count(user):
+    """Return the user's unread notification count (cached counter)"""
+    return unread_count(user, 'notifications')
+
+
+def mark_notifications_read(user, notification_ids=None):
+    """
+    Mark a user's notifications as read
+
+    Args:
+        user: Notification owner
+        notification_ids: Specific notifications (default: all unread)
+
+    Returns:
+        int: Number of notifications updated
+    """
+    return mark_read(user, 'notifications', notification_ids)
+
+
+class LoggingSMSBackend:
+    """Default SMS backend: logs messages instead of sending them"""
+
+    def send_messages(self, messages):
+        for phone, text in messages:
+            logger.info(f"SMS to {phone}: {text}")
+        return len(messages)
+
+
+def get_sms_backend():
+    """Instantiate the configured SMS backend"""
+    return import_string(settings.SMS_BACKEND)()
@@ -0,0 +1,113 @@
+"""
+SQL Query Instrumentation
+QueryRecorder hooks every database connection through execute wrappers and
+collects, for one request, the number of queries, the total database time and
+how often each normalized statement (fingerprint) ran. Views declare their
+allowed query count with core.decorators.query_budget; the middleware reports
+the numbers per view and tenant and flags views over budget.
+"""
+
+from collections import Counter
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+import re
+import threading
+import time
+
+from django.conf import settings
+from django.db import connections
+
+_WHITESPACE_RE = re.compile(r'\s+')
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_RE = re.compile(r'\b\d+(?:\.\d+)?\b')
+_IN_LIST_RE = re.compile(r'\bIN \((?:[^()]*)\)', re.IGNORECASE)
+
+# Recorder of the current request; worker threads running queries on its
+# behalf (core.concurrency) attach to it through this
+current_recorder = ContextVar('current_recorder', default=None)
+
+
+def fingerprint(sql):
+    """
+    Normalize a statement so repeats with different parameters compare equal
+
+    Literals become '?' and IN (...) lists collapse, so the same query issued
+    once per row of a loop (an N+1) shares one fingerprint.
+    """
+    sql = _WHITESPACE_RE.sub(' ', sql).strip()
+    sql = _STRING_RE.sub('?', sql)
+    sql = _NUMBER_RE.sub('?', sql)
+    sql = sql.replace('%s', '?')
+    return _IN_LIST_RE.sub('IN (...)', sql)
+
+
+class QueryRecorder:
+    """
+    Context manager recording every query run on any database alias
+
+    Usage:
+        with QueryRecorder() as recorder:
+            ...
+        recorder.count, recorder.duration, recorder.duplicates()
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.fingerprints = Counter()
+        self._lock = threading.Lock()
+        self._attached = None
+        self._token = None
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self.duration += elapsed
+                self.count += 1
+                self.fingerprints[fingerprint(sql)] += 1
+
+    @contextmanager
+    def attach(self):
+        """Record queries on the current thread's connections"""
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(self))
+            yield self
+
+    def __enter__(self):
+        self._attached = self.attach()
+        self._attached.__enter__()
+        self._token = current_recorder.set(self)
+        return self
+
+    def __exit__(self, *exc_info):
+        current_recorder.reset(self._token)
+        self._attached.__exit__(*exc_info)
+        return False
+
+    @property
+    def duration_ms(self):
+        return round(self.duration * 1000, 2)
+
+    def duplicates(self, limit=None):
+        """Statements that ran more than once, most repeated first"""
+        repeated = [(sql, count) for sql, count in self.fingerprints.most_common() if count > 1]
+        return repeated[:limit] if limit else repeated
+
+    @property
+    def duplicate_count(self):
+        """Queries that repeated an earlier statement"""
+        return sum(count - 1 for _, count in self.duplicates())
+
+
+def get_view_budget(view_func):
+    """Query budget declared on a view, or QUERY_BUDGET_DEFAULT"""
+    budget = getattr(view_func, 'query_budget', None)
+    if budget is None:
+        view_class = getattr(view_func, 'view_class', None)
+        budget = getattr(view_class, 'query_budget', None)
+    return budget if budget is not None else settings.QUERY_BUDGET_DEFAULT
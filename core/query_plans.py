@@ -0,0 +1,325 @@
+"""
+Query Plan Capture and Index Advice
+Replays every portal journey (core.loadtest.JOURNEYS) once per role and
+tenant through the in-process WSGI stack, keeps one sample of each distinct
+SQL statement (fingerprint) and runs EXPLAIN on it (EXPLAIN QUERY PLAN on
+SQLite). Plans with full table scans, filesorts or temporary tables on
+tables above a size threshold are flagged, and for each flagged table a
+composite index is proposed from the statement itself: equality columns
+first (tenant_id and is_deleted leading, as core.managers.tenant_index
+does), then the sort or range column. Proposals already covered by an
+existing index prefix are dropped; the rest can be written out as draft
+migrations for review (manage.py advise_indexes).
+"""
+
+from dataclasses import dataclass, field
+import re
+import time
+
+from django.apps import apps
+from django.db import connections, migrations, models
+from django.db.migrations.autodetector import MigrationAutodetector
+from django.db.migrations.loader import MigrationLoader
+from django.db.migrations.writer import MigrationWriter
+from django.test import override_settings
+from django.urls import reverse
+
+from .loadtest import JOURNEYS, LOADTEST_AUTHENTICATION_BACKENDS, LoadTestOptions, WSGITransport, credentials
+from .query_budget import QueryRecorder, fingerprint
+
+FULL_SCAN = 'full scan'
+FILESORT = 'filesort'
+TEMPORARY = 'temporary table'
+
+_SQLITE_SCAN_RE = re.compile(r'^SCAN (\w+)(?: AS \w+)?(?P<index> USING (?:COVERING )?INDEX)?')
+_FROM_RE = re.compile(r'\bFROM "(\w+)"')
+_CLAUSE_END_RE = re.compile(r' (?:GROUP BY|ORDER BY|HAVING|LIMIT) ')
+_ORDER_BY_RE = re.compile(r' ORDER BY (.+?)(?: LIMIT | OFFSET |$)')
+
+
+@dataclass
+class CapturedQuery:
+    """First sample of a statement and how often it ran"""
+    fingerprint: str
+    sql: str
+    params: tuple
+    alias: str
+    count: int = 0
+    duration: float = 0.0
+    urls: set = field(default_factory=set)
+    problems: list = field(default_factory=list)
+    plan: list = field(default_factory=list)
+
+
+@dataclass
+class IndexSuggestion:
+    """Composite index proposed for a flagged table"""
+    model: type
+    fields: list
+    problems: set = field(default_factory=set)
+    queries: int = 0
+
+    @property
+    def label(self):
+        return f"{self.model._meta.label}({', '.join(self.fields)})"
+
+
+class PlanCapture(QueryRecorder):
+    """
+    QueryRecorder that also keeps one sample (SQL, params, alias) of each
+    SELECT fingerprint, tagged with the URL being replayed
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.queries = {}
+        self.url = None
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return super().__call__(execute, sql, params, many, context)
+        finally:
+            if not many and sql.lstrip()[:6].upper() == 'SELECT':
+                key = fingerprint(sql)
+                with self._lock:
+                    query = self.queries.get(key)
+                    if query is None:
+                        query = self.queries[key] = CapturedQuery(
+                            key, sql, tuple(params or ()), context['connection'].alias
+                        )
+                    query.count += 1
+                    query.duration += time.perf_counter() - start
+                    if self.url:
+                        query.urls.add(self.url)
+
+
+def replay_portals(tenants=1, prefix='synthetic', password=None, admin_email=None, admin_password=None):
+    """
+    Log in as one generated user per role and tenant and request every
+    journey URL once, capturing the statements they run
+
+    Returns:
+        tuple: (PlanCapture, {url_name: [status, ...]})
+    """
+    options = LoadTestOptions(tenants=tenants, prefix=prefix, admin_email=admin_email,
+                              admin_password=admin_password)
+    if password:
+        options.password = password
+    login_path = reverse('auth:login')
+    statuses = {}
+    capture = PlanCapture()
+    with capture, override_settings(AUTHENTICATION_BACKENDS=LOADTEST_AUTHENTICATION_BACKENDS):
+        for role, steps in JOURNEYS.items():
+            if role == 'super_admin' and not admin_email:
+                continue
+            for number in range(1 if role == 'super_admin' else tenants):
+                transport = WSGITransport()
+                email, user_password = credentials(role, number, options)
+                capture.url = 'auth:login'
+                if transport.post(login_path, {'email': email, 'password': user_password}) != 302:
+                    statuses.setdefault('auth:login', []).append(f'{email} failed')
+                    continue
+                for name, _ in steps:
+                    capture.url = name
+                    statuses.setdefault(name, []).append(transport.get(reverse(name)))
+        capture.url = None
+    return capture, statuses
+
+
+def explain(query):
+    """Plan rows of a captured statement as dicts"""
+    connection = connections[query.alias]
+    prefix = connection.ops.explain_query_prefix()
+    with connection.cursor() as cursor:
+        cursor.execute(f'{prefix} {query.sql}', query.params)
+        columns = [column[0].lower() for column in cursor.description]
+        return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+
+def plan_problems(vendor, plan, main_table=None):
+    """
+    Full scans, filesorts and temporary tables in an EXPLAIN result
+
+    Returns:
+        list: (table, problem) pairs
+    """
+    problems = []
+    for row in plan:
+        if vendor == 'mysql':
+            table, extra = row.get('table'), row.get('extra') or ''
+            if row.get('type') == 'ALL':
+                problems.append((table, FULL_SCAN))
+            if 'Using filesort' in extra:
+                problems.append((table, FILESORT))
+            if 'Using temporary' in extra:
+                problems.append((table, TEMPORARY))
+        else:
+            detail = row.get('detail', '')
+            match = _SQLITE_SCAN_RE.match(detail)
+            if match and not match.group('index'):
+                problems.append((match.group(1), FULL_SCAN))
+            elif detail.startswith('USE TEMP B-TREE FOR') and 'ORDER BY' in detail:
+                problems.append((main_table, FILESORT))
+            elif detail.startswith('USE TEMP B-TREE FOR'):
+                problems.append((main_table, TEMPORARY))
+    return problems
+
+
+def _normalize(sql):
+    return sql.replace('`', '"')
+
+
+def main_table(sql):
+    """Table of the outermost FROM clause"""
+    match = _FROM_RE.search(_normalize(sql))
+    return match.group(1) if match else None
+
+
+def index_columns(sql, table, problems=()):
+    """
+    Columns of a composite index serving the statement on one table:
+    equality predicates (tenant_id and is_deleted first), then the ORDER BY
+    columns when the plan sorts, otherwise the first range predicate.
+    Descending sort columns come back prefixed with '-'.
+    """
+    sql = _normalize(sql)
+    where = sql.split(' WHERE ', 1)[1] if ' WHERE ' in sql else ''
+    where = _CLAUSE_END_RE.split(where, 1)[0]
+    column = rf'"{re.escape(table)}"\."(\w+)"'
+
+    equality, ranges = [], []
+    # Booleans render as a bare (or NOT-ed) column on some backends
+    predicates = re.findall(column + r'(?: (=|IN \(|IS NULL|>=|<=|>|<|BETWEEN)|(?=\)| AND | OR |$))', where)
+    for name, operator in predicates:
+        target = ranges if operator in ('>=', '<=', '>', '<', 'BETWEEN') else equality
+        if name not in target:
+            target.append(name)
+    leading = [name for name in ('tenant_id', 'is_deleted') if name in equality]
+    columns = leading + [name for name in equality if name not in leading]
+
+    trailing = []
+    order_by = _ORDER_BY_RE.search(sql)
+    if FILESORT in problems and order_by:
+        for name, direction in re.findall(column + r'( DESC)?', order_by.group(1)):
+            if name not in columns:
+                trailing.append(f'-{name}' if direction else name)
+    elif ranges:
+        trailing = [name for name in ranges[:1] if name not in columns]
+    if not columns and not trailing:
+        return []
+    return columns + trailing
+
+
+def model_for_table(table):
+    for model in apps.get_models(include_auto_created=True):
+        if model._meta.db_table == table:
+            return model
+    return None
+
+
+def existing_indexes(connection, table):
+    """Column lists of every index and key on a table in the database"""
+    with connection.cursor() as cursor:
+        constraints = connection.introspection.get_constraints(cursor, table)
+    return [
+        constraint['columns'] for constraint in constraints.values()
+        if (constraint['index'] or constraint['unique'] or constraint['primary_key']) and constraint['columns']
+    ]
+
+
+def table_rows(connection, table):
+    """Row count (the InnoDB estimate on MySQL)"""
+    with connection.cursor() as cursor:
+        if connection.vendor == 'mysql':
+            cursor.execute(
+                'SELECT table_rows FROM information_schema.tables '
+                'WHERE table_schema = DATABASE() AND table_name = %s', [table]
+            )
+        else:
+            cursor.execute(f'SELECT COUNT(*) FROM {connection.ops.quote_name(table)}')
+        row = cursor.fetchone()
+    return (row[0] or 0) if row else 0
+
+
+def advise(capture, min_rows=1000):
+    """
+    EXPLAIN every captured statement and propose indexes
+
+    Args:
+        capture: PlanCapture from replay_portals()
+        min_rows: Ignore problems on tables smaller than this
+
+    Returns:
+        list: IndexSuggestion, most frequent first
+    """
+    suggestions = {}
+    sizes = {}
+    for query in capture.queries.values():
+        connection = connections[query.alias]
+        table = main_table(query.sql)
+        try:
+            query.plan = explain(query)
+        except Exception as e:
+            query.problems = [(table, f'explain failed: {e}')]
+            continue
+        for problem_table, problem in plan_problems(connection.vendor, query.plan, table):
+            # Derived tables (subqueries) have no indexes to add
+            if problem_table is None or model_for_table(problem_table) is None:
+                continue
+            key = (query.alias, problem_table)
+            if key not in sizes:
+                sizes[key] = table_rows(connection, problem_table)
+            if sizes[key] < min_rows:
+                continue
+            query.problems.append((problem_table, problem))
+
+        by_table = {}
+        for problem_table, problem in query.problems:
+            by_table.setdefault(problem_table, set()).add(problem)
+        for problem_table, problems in by_table.items():
+            model = model_for_table(problem_table)
+            columns = index_columns(query.sql, problem_table, problems)
+            if model is None or not columns:
+                continue
+            plain = [name.lstrip('-') for name in columns]
+            if any(existing[:len(plain)] == plain for existing in existing_indexes(connection, problem_table)):
+                continue
+            names = {field.column: field.name for field in model._meta.concrete_fields}
+            fields = [('-' if name.startswith('-') else '') + names.get(name.lstrip('-'), name.lstrip('-'))
+                      for name in columns]
+            suggestion = suggestions.setdefault(
+                (model._meta.label, tuple(fields)), IndexSuggestion(model, fields)
+            )
+            suggestion.problems |= problems
+            suggestion.queries += query.count
+    return sorted(suggestions.values(), key=lambda suggestion: -suggestion.queries)
+
+
+def draft_migrations(suggestions):
+    """
+    Render the suggestions as one migration per app
+
+    Returns:
+        dict: {app_label: (file name, source)}
+    """
+    loader = MigrationLoader(None, ignore_no_migrations=True)
+    by_app = {}
+    for suggestion in suggestions:
+        by_app.setdefault(suggestion.model._meta.app_label, []).append(suggestion)
+
+    drafts = {}
+    for app_label, app_suggestions in sorted(by_app.items()):
+        leaves = loader.graph.leaf_nodes(app_label)
+        number = max((MigrationAutodetector.parse_number(name) or 0 for _, name in leaves), default=0) + 1
+        name = f'{number:04d}_index_advice'
+        migration = migrations.Migration(name, app_label)
+        migration.dependencies = leaves
+        for suggestion in app_suggestions:
+            index = models.Index(fields=suggestion.fields)
+            index.set_name_with_model(suggestion.model)
+            migration.operations.append(
+                migrations.AddIndex(model_name=suggestion.model._meta.model_name, index=index)
+            )
+        drafts[app_label] = (f'{name}.py', MigrationWriter(migration).as_string())
+    return drafts
@@ -0,0 +1,156 @@
+"""
+Image Renditions
+Tenant logos and profile pictures are shown far smaller than they are
+uploaded. When one of these images changes, a background task
+(core.tasks.generate_image_renditions) decodes it once with Pillow and
+writes WebP variants sized for where the image is displayed, at 1x and 2x.
+Variants live next to the original under renditions/ with the content hash
+in the name, e.g. tenants/<id>/tenant_logos/renditions/crest.sm.3f9a1c2b4d5e.webp,
+and are listed on the row in <field>_renditions:
+
+    {'source': <original name>, 'sm': {'name': ..., 'width': 128, 'height': 32}, ...}
+
+A changed image gets new names, so the download gateway serves variants
+with a year-long immutable Cache-Control. The {% rendition_img %} tag
+(core.templatetags.renditions) picks the variant for a display size and
+falls back to the original until the variants exist.
+"""
+
+from dataclasses import dataclass
+import hashlib
+import io
+import logging
+import posixpath
+
+from django.apps import apps
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps
+
+from .storage import tenant_id_from_path
+from .usage import adjust_usage
+
+logger = logging.getLogger(__name__)
+
+RENDITION_DIR = 'renditions'
+WEBP_QUALITY = 82
+
+
+@dataclass(frozen=True)
+class RenditionSpec:
+    """Display box of a variant; crop fills the box, otherwise the image fits inside it"""
+    width: int
+    height: int
+    crop: bool = False
+
+
+def _with_retina(sizes, crop=False):
+    specs = {}
+    for size, (width, height) in sizes.items():
+        specs[size] = RenditionSpec(width, height, crop)
+        specs[f'{size}@2x'] = RenditionSpec(width * 2, height * 2, crop)
+    return specs
+
+
+# (model, image field) -> variants; sizes follow templates/base.html and the profile page
+RENDITIONS = {
+    ('core.Tenant', 'logo'): _with_retina({'sm': (180, 32), 'md': (360, 96)}),
+    ('core.UserAccount', 'profile_picture'): _with_retina({'sm': (40, 40), 'lg': (150, 150)}, crop=True),
+}
+
+
+def renditions_field(field_name):
+    return f'{field_name}_renditions'
+
+
+def specs_for(instance, field_name):
+    return RENDITIONS.get((instance._meta.label, field_name))
+
+
+def needs_renditions(instance, field_name):
+    """Whether the image changed since its variants were made"""
+    current = getattr(instance, field_name).name or ''
+    recorded = getattr(instance, renditions_field(field_name)) or {}
+    return current != recorded.get('source', '')
+
+
+def render(image, spec):
+    """Resized WebP bytes and the final size"""
+    if spec.crop:
+        resized = ImageOps.fit(image, (spec.width, spec.height), Image.Resampling.LANCZOS)
+    else:
+        resized = image.copy()
+        resized.thumbnail((spec.width, spec.height), Image.Resampling.LANCZOS)
+    buffer = io.BytesIO()
+    resized.save(buffer, 'WEBP', quality=WEBP_QUALITY, method=6)
+    return buffer.getvalue(), resized.size
+
+
+def rendition_name(source, size, content):
+    """<dir>/renditions/<stem>.<size>.<hash>.webp"""
+    directory, filename = posixpath.split(source)
+    stem = posixpath.splitext(filename)[0][:60]
+    fingerprint = hashlib.sha256(content).hexdigest()[:12]
+    size = size.replace('@', '-')
+    return posixpath.join(directory, RENDITION_DIR, f'{stem}.{size}.{fingerprint}.webp')
+
+
+def _save(storage, name, content):
+    """Store a variant; names under a tenant prefix are charged to that tenant"""
+    stored = storage.save(name, ContentFile(content))
+    tenant_id = tenant_id_from_path(stored)
+    if tenant_id:
+        adjust_usage(tenant_id, 'storage', len(content))
+    return stored
+
+
+def _delete(storage, entries):
+    for entry in entries:
+        try:
+            storage.delete(entry['name'])
+        except Exception as e:
+            logger.warning(f"Could not delete rendition {entry['name']}: {e}")
+
+
+def generate(instance, field_name):
+    """
+    Write the variants of one image and record them on the row
+
+    Returns:
+        dict: The recorded renditions
+    """
+    specs = specs_for(instance, field_name)
+    field_file = getattr(instance, field_name)
+    storage = field_file.storage
+    previous = getattr(instance, renditions_field(field_name)) or {}
+    stale = [entry for key, entry in previous.items() if key != 'source']
+
+    renditions = {'source': field_file.name or ''}
+    if field_file.name:
+        with storage.open(field_file.name, 'rb') as fh:
+            image = Image.open(fh)
+            image = ImageOps.exif_transpose(image)
+            image = image.convert('RGBA' if image.mode in ('RGBA', 'LA', 'P') else 'RGB')
+        for size, spec in specs.items():
+            content, (width, height) = render(image, spec)
+            name = rendition_name(field_file.name, size, content)
+            renditions[size] = {'name': _save(storage, name, content), 'width': width, 'height': height}
+
+    setattr(instance, renditions_field(field_name), renditions)
+    instance.save(update_fields=[renditions_field(field_name)])
+    _delete(storage, stale)
+    return renditions
+
+
+def generate_for(label, pk, field_name):
+    """Task entry point: skip rows that are gone or already up to date"""
+    model = apps.get_model(label)
+    instance = model._base_manager.filter(pk=pk).first()
+    if instance is None or not needs_renditions(instance, field_name):
+        return None
+    return generate(instance, field_name)
+
+
+def pick(renditions, size):
+    """(1x entry, 2x entry) of a size, either possibly None"""
+    renditions = renditions or {}
+    return renditions.get(size), renditions.get(f'{size}@2x')
@@ -0,0 +1,155 @@
+"""
+Role Registry
+The roles table is tiny and read on every request, so it is loaded once per
+process into frozen descriptors with a compiled permission bitmask. A version
+key in the shared cache is bumped whenever a Role changes; each process
+reloads its registry when it sees a new version (checked at most every
+ROLE_REGISTRY_CHECK_SECONDS).
+"""
+
+from dataclasses import dataclass
+import threading
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+
+ROLE_VERSION_KEY = 'roles:version'
+
+# Role permission flags, in bit order (append only: positions are the bits)
+PERMISSIONS = [
+    'can_manage_tenants',
+    'can_manage_users',
+    'can_manage_departments',
+    'can_manage_subjects',
+    'can_manage_attendance',
+    'can_manage_assessments',
+    'can_view_reports',
+    'can_manage_billing',
+]
+PERMISSION_BITS = {name: 1 << position for position, name in enumerate(PERMISSIONS)}
+ALL_PERMISSIONS = (1 << len(PERMISSIONS)) - 1
+
+
+@dataclass(frozen=True)
+class RoleDescriptor:
+    """Immutable snapshot of a Role row"""
+    id: uuid.UUID
+    name: str
+    display_name: str
+    scope_level: int
+    permissions: int
+    is_active: bool = True
+
+    @property
+    def is_super_admin(self):
+        return self.name == 'super_admin'
+
+    def has_permission(self, permission_name):
+        """Constant-time bit test; unknown permissions are denied"""
+        return bool(self.permissions & PERMISSION_BITS.get(permission_name, 0))
+
+    def __str__(self):
+        return self.display_name
+
+
+def compile_permissions(role):
+    """Fold a Role's can_* flags into a bitmask"""
+    if role.name == 'super_admin':
+        return ALL_PERMISSIONS
+    mask = 0
+    for name, bit in PERMISSION_BITS.items():
+        if getattr(role, name, False):
+            mask |= bit
+    return mask
+
+
+class RoleRegistry:
+    """Process-local role cache, reloaded when the shared version changes"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._version = None
+        self._checked_at = 0.0
+        self._by_id = {}
+        self._by_name = {}
+        self._misses = set()
+
+    def _load(self, version):
+        from .models import Role
+
+        descriptors = [
+            RoleDescriptor(
+                id=role.id,
+                name=role.name,
+                display_name=role.display_name,
+                scope_level=role.scope_level,
+                permissions=compile_permissions(role),
+                is_active=role.is_active,
+            )
+            for role in Role.objects.all()
+        ]
+        # Inactive roles are kept: users holding one still see their role
+        self._by_id = {descriptor.id: descriptor for descriptor in descriptors}
+        self._by_name = {descriptor.name: descriptor for descriptor in descriptors if descriptor.is_active}
+        self._misses = set()
+        self._version = version
+
+    def _ensure_current(self):
+        now = time.monotonic()
+        if self._version is not None and now - self._checked_at < settings.ROLE_REGISTRY_CHECK_SECONDS:
+            return
+        self._checked_at = now
+
+        version = cache.get(ROLE_VERSION_KEY)
+        if version is None:
+            version = uuid.uuid4().hex
+            if not cache.add(ROLE_VERSION_KEY, version, timeout=None):
+                version = cache.get(ROLE_VERSION_KEY)
+        if version != self._version:
+            with self._lock:
+                if version != self._version:
+                    self._load(version)
+
+    def get(self, role_id):
+        """Descriptor for a role ID, or None"""
+        if role_id is None:
+            return None
+        role_id = role_id if isinstance(role_id, uuid.UUID) else uuid.UUID(str(role_id))
+        self._ensure_current()
+        descriptor = self._by_id.get(role_id)
+        if descriptor is None and role_id not in self._misses:
+            # Role created since the last check: reload once, then remember
+            # the miss until the next reload
+            self._version = None
+            self._ensure_current()
+            descriptor = self._by_id.get(role_id)
+            if descriptor is None:
+                self._misses.add(role_id)
+        return descriptor
+
+    def get_by_name(self, name):
+        """Descriptor for an active role name, or None"""
+        self._ensure_current()
+        return self._by_name.get(name)
+
+    def invalidate(self):
+        """Publish a new version so every process reloads"""
+        cache.set(ROLE_VERSION_KEY, uuid.uuid4().hex, timeout=None)
+        self._version = None
+
+
+registry = RoleRegistry()
+
+
+def get_role(role_id):
+    """Shortcut for registry.get"""
+    return registry.get(role_id)
+
+
+def get_user_role(user):
+    """Role descriptor for a user (None when anonymous or unassigned)"""
+    if not getattr(user, 'is_authenticated', False):
+        return None
+    return registry.get(getattr(user, 'role_id', None))
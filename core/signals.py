@@ -0,0 +1,143 @@
+"""
+Signals for core app
+Keeps tenant usage counters in step with user and department changes and
+the role registry in step with Role edits; counts new database connections for
+the health endpoint and keeps tenant shards' reference rows and the shard
+directory cache current; queues image renditions for changed logos and
+profile pictures; keeps inbox unread counters in step with new and
+removed notifications and messages and pushes new messages to the
+recipient's live event stream
+"""
+from django.db import transaction
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from .db.pool import PooledDatabaseWrapperMixin, record_connection_opened
+from .db.sharding import directory, is_shard, sync_reference_rows
+from .events import publish, user_channel
+from .inbox import adjust_unread, invalidate_unread
+from .models import Department, Message, Notification, Role, Tenant, TenantShard, UserAccount
+from .renditions import RENDITIONS, needs_renditions
+from .roles import registry
+from .tasks import generate_image_renditions
+from .usage import adjust_usage, adjust_usage_for_user
+
+
+@receiver(post_save, sender=UserAccount)
+def count_new_user(sender, instance, created, **kwargs):
+    """Count new users against their tenant's limits once committed"""
+    if created and instance.is_active:
+        transaction.on_commit(lambda: adjust_usage_for_user(instance, 1))
+
+
+@receiver(post_delete, sender=UserAccount)
+def uncount_deleted_user(sender, instance, **kwargs):
+    """Release a deleted user's slot"""
+    if instance.is_active:
+        transaction.on_commit(lambda: adjust_usage_for_user(instance, -1))
+
+
+@receiver(post_save, sender=Department)
+def count_new_department(sender, instance, created, **kwargs):
+    """Count new departments against the tenant limit"""
+    if created:
+        transaction.on_commit(lambda: adjust_usage(instance.tenant, 'departments', 1))
+
+
+@receiver(post_delete, sender=Department)
+def uncount_deleted_department(sender, instance, **kwargs):
+    """Release a deleted department's slot"""
+    transaction.on_commit(lambda: adjust_usage(instance.tenant_id, 'departments', -1))
+
+
+@receiver(post_save, sender=Role)
+@receiver(post_delete, sender=Role)
+def invalidate_role_registry(sender, instance, **kwargs):
+    """Make every process reload roles after the change commits"""
+    transaction.on_commit(registry.invalidate)
+
+
+@receiver(connection_created)
+def count_connection(sender, connection, **kwargs):
+    """Count connection churn per alias; pooled backends count their own opens"""
+    if not isinstance(connection, PooledDatabaseWrapperMixin):
+        record_connection_opened(connection.alias)
+
+
+@receiver(post_save, sender=Tenant)
+def sync_shard_tenant(sender, instance, **kwargs):
+    """Copy tenant changes to the tenant's shard"""
+    alias = directory.shard_for(instance.pk)
+    if is_shard(alias):
+        transaction.on_commit(lambda: sync_reference_rows(instance.pk, alias, users=False, roles=False))
+
+
+@receiver(post_save, sender=UserAccount)
+def sync_shard_user(sender, instance, **kwargs):
+    """Copy user changes to the user's tenant's shard"""
+    alias = directory.shard_for(instance.tenant_id) if instance.tenant_id else None
+    if is_shard(alias):
+        transaction.on_commit(
+            lambda: sync_reference_rows(instance.tenant_id, alias, users=[instance.pk], roles=False)
+        )
+
+
+@receiver(post_save, sender=Role)
+def sync_shard_roles(sender, instance, **kwargs):
+    """Copy role changes to every shard"""
+    for alias in filter(is_shard, directory.aliases()):
+        transaction.on_commit(lambda alias=alias: sync_reference_rows(None, alias, users=False))
+
+
+@receiver(post_save, sender=TenantShard)
+@receiver(post_delete, sender=TenantShard)
+def invalidate_shard_directory(sender, **kwargs):
+    """Reload the shard directory in every process"""
+    transaction.on_commit(directory.invalidate)
+
+
+@receiver(post_save, sender=Tenant)
+@receiver(post_save, sender=UserAccount)
+def queue_image_renditions(sender, instance, **kwargs):
+    """Resize a changed logo or profile picture in the background"""
+    for label, field_name in RENDITIONS:
+        if label == sender._meta.label and needs_renditions(instance, field_name):
+            transaction.on_commit(
+                lambda label=label, field_name=field_name: generate_image_renditions.delay(
+                    label, str(instance.pk), field_name
+                )
+            )
+
+
+def _inbox_item(sender, instance):
+    if sender is Notification:
+        return 'notifications', instance.user_id
+    return 'messages', instance.recipient_id
+
+
+@receiver(post_save, sender=Notification)
+@receiver(post_save, sender=Message)
+def count_inbox_item(sender, instance, created, **kwargs):
+    """Count a new unread item; recount after any other edit (after commit)"""
+    kind, user_id = _inbox_item(sender, instance)
+    if created:
+        if not instance.is_read:
+            transaction.on_commit(lambda: adjust_unread(kind, [user_id], 1))
+    else:
+        transaction.on_commit(lambda: invalidate_unread(kind, [user_id]))
+
+
+@receiver(post_delete, sender=Notification)
+@receiver(post_delete, sender=Message)
+def uncount_inbox_item(sender, instance, **kwargs):
+    kind, user_id = _inbox_item(sender, instance)
+    if not instance.is_read:
+        transaction.on_commit(lambda: adjust_unread(kind, [user_id], -1))
+
+
+@receiver(post_save, sender=Message)
+def push_new_message(sender, instance, created, **kwargs):
+    if created:
+        transaction.on_commit(lambda: publish(
+            [user_channel(instance.recipient_id)], 'message', {'subject': instance.subject}
+        ))
@@ -0,0 +1,213 @@
+"""
+Tenant Storage Accounting
+- TenantStorage: wraps the configured file storage (filesystem or S3), stores
+  uploads under tenants/<tenant_id>/ and meters bytes on save and delete
+- QuotaUploadHandler: rejects uploads over the tenant quota from the
+  Content-Length header, before the body is read
+- reconcile_storage: rescans each tenant prefix in parallel and resets the
+  storage counters to the real totals
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import ContextVar
+import logging
+import posixpath
+import re
+
+from django.conf import settings
+from django.contrib import messages
+from django.core.files.storage import Storage, default_storage
+from django.core.files.uploadhandler import FileUploadHandler, StopUpload
+from django.utils.deconstruct import deconstructible
+from django.utils.module_loading import import_string
+
+from .models import Tenant
+from .usage import adjust_usage, check_limit, set_usage
+
+logger = logging.getLogger(__name__)
+
+TENANT_PREFIX = 'tenants'
+TENANT_PATH_RE = re.compile(rf'^{TENANT_PREFIX}/(?P<tenant_id>[0-9a-f-]{{36}})/')
+
+# Request being served; set by StorageAccountingMiddleware
+current_request = ContextVar('current_request', default=None)
+
+
+class StorageQuotaExceeded(Exception):
+    """Raised when a save would take a tenant over its storage quota"""
+
+
+def get_request_tenant(request):
+    """Tenant an upload should be charged to"""
+    if request is None:
+        return None
+    user = getattr(request, 'user', None)
+    if user is not None and user.is_authenticated and user.tenant_id:
+        return user.tenant
+    return getattr(request, 'tenant', None) or None
+
+
+def tenant_id_from_path(name):
+    """Extract the owning tenant ID from a stored file name"""
+    match = TENANT_PATH_RE.match(name or '')
+    return match.group('tenant_id') if match else None
+
+
+@deconstructible
+class TenantStorage(Storage):
+    """
+    Storage wrapper that prefixes uploads with the tenant and meters their size
+    The wrapped backend is TENANT_STORAGE_BACKEND
+    """
+
+    def __init__(self, backend=None, **options):
+        backend_class = import_string(backend or settings.TENANT_STORAGE_BACKEND)
+        self.backend = backend_class(**options)
+
+    def save(self, name, content, max_length=None):
+        return self.save_for_tenant(get_request_tenant(current_request.get()), name, content, max_length)
+
+    def save_for_tenant(self, tenant, name, content, max_length=None):
+        """Save charged to an explicit tenant (work done outside its request)"""
+        if tenant is None or tenant_id_from_path(name):
+            return self.backend.save(name, content, max_length=max_length)
+
+        size = content.size
+        if not check_limit(tenant, 'storage', size):
+            raise StorageQuotaExceeded(f"Storage limit exceeded. Maximum: {tenant.max_storage_gb} GB")
+
+        name = posixpath.join(TENANT_PREFIX, str(tenant.pk), name)
+        name = self.backend.save(name, content, max_length=max_length)
+        adjust_usage(tenant, 'storage', size)
+        return name
+
+    def delete(self, name):
+        tenant_id = tenant_id_from_path(name)
+        size = 0
+        if tenant_id and self.backend.exists(name):
+            size = self.backend.size(name)
+        self.backend.delete(name)
+        if size:
+            adjust_usage(tenant_id, 'storage', -size)
+
+    # Everything else goes straight to the wrapped storage
+    def _open(self, name, mode='rb'):
+        return self.backend.open(name, mode)
+
+    def exists(self, name):
+        return self.backend.exists(name)
+
+    def listdir(self, path):
+        return self.backend.listdir(path)
+
+    def size(self, name):
+        return self.backend.size(name)
+
+    def url(self, name):
+        return self.backend.url(name)
+
+    def path(self, name):
+        return self.backend.path(name)
+
+    def get_valid_name(self, name):
+        return self.backend.get_valid_name(name)
+
+    def get_alternative_name(self, file_root, file_ext):
+        return self.backend.get_alternative_name(file_root, file_ext)
+
+    def get_available_name(self, name, max_length=None):
+        return self.backend.get_available_name(name, max_length=max_length)
+
+    def generate_filename(self, filename):
+        return self.backend.generate_filename(filename)
+
+    def get_accessed_time(self, name):
+        return self.backend.get_accessed_time(name)
+
+    def get_created_time(self, name):
+        return self.backend.get_created_time(name)
+
+    def get_modified_time(self, name):
+        return self.backend.get_modified_time(name)
+
+
+class QuotaUploadHandler(FileUploadHandler):
+    """
+    Stops file uploads that would exceed the tenant storage quota
+    Checked against Content-Length before any file data is read, and again
+    per chunk for bodies without a reliable length.
+    """
+
+    def handle_raw_input(self, input_data, META, content_length, boundary, encoding=None):
+        self.tenant = get_request_tenant(self.request)
+        self.received = 0
+        self.exceeded = bool(
+            self.tenant and content_length and not check_limit(self.tenant, 'storage', content_length)
+        )
+
+    def _stop(self):
+        self.request.storage_quota_exceeded = True
+        messages.error(
+            self.request, f"Storage limit exceeded. Maximum: {self.tenant.max_storage_gb} GB", fail_silently=True
+        )
+        raise StopUpload(connection_reset=True)
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        if self.exceeded:
+            self._stop()
+
+    def receive_data_chunk(self, raw_data, start):
+        if self.tenant:
+            self.received += len(raw_data)
+            if not check_limit(self.tenant, 'storage', self.received):
+                self._stop()
+        return raw_data
+
+    def file_complete(self, file_size):
+        return None
+
+
+def _walk_size(storage, path):
+    """Total bytes under a storage path"""
+    directories, files = storage.listdir(path)
+    total = sum(storage.size(posixpath.join(path, name)) for name in files)
+    for directory in directories:
+        total += _walk_size(storage, posixpath.join(path, directory))
+    return total
+
+
+def reconcile_storage(tenant_ids=None, workers=None, storage=None):
+    """
+    Scan each tenant's storage prefix in parallel and reset its storage usage
+
+    Args:
+        tenant_ids: Restrict to these tenants (default: all)
+        workers: Parallel scans (default STORAGE_RECONCILE_WORKERS)
+        storage: Storage to scan (default: default_storage)
+
+    Returns:
+        dict: {tenant_id: bytes used}
+    """
+    storage = storage or default_storage
+    storage = getattr(storage, 'backend', storage)
+    tenants = Tenant.objects.values_list('pk', flat=True)
+    if tenant_ids is not None:
+        tenants = tenants.filter(pk__in=tenant_ids)
+    tenants = list(tenants)
+
+    def scan(tenant_id):
+        path = posixpath.join(TENANT_PREFIX, str(tenant_id))
+        try:
+            return _walk_size(storage, path)
+        except FileNotFoundError:
+            return 0
+
+    with ThreadPoolExecutor(max_workers=workers or settings.STORAGE_RECONCILE_WORKERS) as pool:
+        totals = dict(zip(tenants, pool.map(scan, tenants)))
+
+    for tenant_id, used in totals.items():
+        set_usage(tenant_id, 'storage', used)
+
+    logger.info(f"Reconciled storage for {len(totals)} tenants ({sum(totals.values())} bytes)")
+    return totals
@@ -0,0 +1,129 @@
+"""
+Celery Tasks for Core App
+"""
+
+from celery import shared_task
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+def archive_audit_logs(older_than_days=None, batch_size=None):
+    """Nightly job: move audit logs past retention to archive storage"""
+    from .audit import archive_audit_logs as run_archiver
+    return run_archiver(older_than_days=older_than_days, batch_size=batch_size)
+
+
+@shared_task(bind=True, max_retries=3, default_retry_delay=60)
+def deliver_notification_emails(self, notification_ids, tenant_id=None):
+    """
+    Email a batch of notifications over a single SMTP connection
+
+    Each notification is stamped with email_sent_at once its message went
+    out, so a retry (EMAIL_MAX_RETRIES, backing off from EMAIL_RETRY_BACKOFF)
+    only sends the rest of the batch.
+    """
+    from django.conf import settings
+    from django.utils import timezone
+    from .db.sharding import tenant_shard
+    from .mail import build_email, send_mass_email
+    from .models import Notification
+    
+    with tenant_shard(tenant_id):
+        notifications = Notification.objects.filter(
+            id__in=notification_ids, email_sent_at__isnull=True
+        ).select_related('user')
+        owners = {}
+        for notification in notifications:
+            if notification.user.notification_preferences.get('email', True):
+                email = build_email(
+                    subject=notification.title,
+                    recipient_list=[notification.user.email],
+                    template_name='notification',
+                    context={'user': notification.user, 'notification': notification},
+                )
+                owners[id(email)] = (email, notification.pk)
+        
+        sent_ids = []
+        
+        def record_sent():
+            Notification.objects.filter(id__in=sent_ids).update(email_sent_at=timezone.now())
+        
+        try:
+            sent = send_mass_email(
+                [email for email, _ in owners.values()],
+                on_sent=lambda email: sent_ids.append(owners[id(email)][1]),
+            )
+        except Exception as e:
+            record_sent()
+            logger.error(f"Error sending notification emails ({len(sent_ids)} sent): {str(e)}")
+            raise self.retry(
+                exc=e,
+                countdown=settings.EMAIL_RETRY_BACKOFF * 2 ** self.request.retries,
+                max_retries=settings.EMAIL_MAX_RETRIES,
+            )
+        record_sent()
+    
+    return sent
+
+
+@shared_task(bind=True, max_retries=3, default_retry_delay=60)
+def deliver_notification_sms(self, notification_ids, tenant_id=None):
+    """Send a batch of notifications by SMS through the configured backend"""
+    from .db.sharding import tenant_shard
+    from .models import Notification
+    from .notifications import get_sms_backend
+    
+    with tenant_shard(tenant_id):
+        notifications = Notification.objects.filter(
+            id__in=notification_ids, user__phone__isnull=False
+        ).select_related('user')
+        messages = [
+            (notification.user.phone, f"{notification.title}: {notification.message}"[:160])
+            for notification in notifications
+            if notification.user.notification_preferences.get('sms', True)
+        ]
+        
+        try:
+            sent = get_sms_backend().send_messages(messages) if messages else 0
+        except Exception as e:
+            logger.error(f"Error sending notification SMS: {str(e)}")
+            raise self.retry(exc=e)
+    
+    return sent
+
+
+@shared_task
+def reconcile_tenant_usage(tenant_ids=None):
+    """Periodic job: recompute tenant usage and reset the counters"""
+    from .usage import reconcile_usage
+    return reconcile_usage(tenant_ids=tenant_ids)
+
+
+@shared_task
+def reconcile_tenant_storage(tenant_ids=None):
+    """Nightly job: rescan tenant storage and reset the storage counters"""
+    from .storage import reconcile_storage
+    return len(reconcile_storage(tenant_ids=tenant_ids))
+
+
+@shared_task
+def purge_expired_uploads():
+    """Hourly job: drop expired upload sessions and their chunks"""
+    from .uploads import purge_expired
+    return purge_expired()
+
+
+@shared_task
+def collect_blob_garbage():
+    """Nightly job: recount blob references and remove unreferenced blobs"""
+    from .blobs import collect_garbage
+    return collect_garbage()
+
+
+@shared_task
+def generate_image_renditions(label, pk, field_name):
+    """Write the WebP variants of an uploaded logo or profile picture"""
+    from .renditions import generate_for
+    return sorted(generate_for(label, pk, field_name) or {})
@@ -0,0 +1,42 @@
+"""
+Template tags for image renditions (core.renditions)
+
+Usage:
+    {% load renditions %}
+    {% rendition_img tenant 'tenant_logo' 'sm' alt=tenant.name style='height: 32px;' %}
+"""
+
+import posixpath
+
+from django import template
+from django.forms.utils import flatatt
+from django.urls import reverse
+from django.utils.html import format_html
+
+from core.downloads import DOWNLOAD_TARGETS
+from core.renditions import pick, renditions_field
+
+register = template.Library()
+
+
+def rendition_url(kind, pk, entry):
+    return reverse('files:rendition', args=[kind, pk, posixpath.basename(entry['name'])])
+
+
+@register.simple_tag
+def rendition_img(obj, kind, size, **attrs):
+    """
+    <img> of the `size` rendition with its 2x variant in srcset; the
+    original image until the renditions have been generated
+    """
+    target = DOWNLOAD_TARGETS[kind]
+    one, two = pick(getattr(obj, renditions_field(target.field), None), size)
+    if one is None:
+        src = reverse('files:download', args=[kind, obj.pk]) + '?inline=1'
+    else:
+        src = rendition_url(kind, obj.pk, one)
+        attrs.setdefault('width', one['width'])
+        attrs.setdefault('height', one['height'])
+        if two is not None:
+            attrs['srcset'] = f'{src} 1x, {rendition_url(kind, obj.pk, two)} 2x'
+    return format_html('<img src="{}"{}>', src, flatatt(attrs))
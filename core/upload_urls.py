@@ -0,0 +1,15 @@
+"""
+Resumable Upload URLs
+"""
+
+from django.urls import path
+from . import upload_views
+
+app_name = 'uploads'
+
+urlpatterns = [
+    path('', upload_views.upload_create, name='create'),
+    path('<uuid:upload_id>/', upload_views.upload_status, name='status'),
+    path('<uuid:upload_id>/chunks/<int:index>/', upload_views.upload_chunk, name='chunk'),
+    path('<uuid:upload_id>/complete/', upload_views.upload_complete, name='complete'),
+]
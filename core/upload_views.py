@@ -0,0 +1,69 @@
+"""
+Resumable upload endpoints (see core.uploads)
+"""
+
+from django.contrib.auth.decorators import login_required
+from django.http import JsonResponse
+from django.shortcuts import get_object_or_404
+from django.views.decorators.http import require_http_methods
+
+from .models import UploadSession
+from .uploads import UploadError, complete, open_session, session_state, write_chunk
+
+
+def _error(e):
+    return JsonResponse({'error': str(e)}, status=e.status)
+
+
+@login_required
+@require_http_methods(["POST"])
+def upload_create(request):
+    """Open an upload session: filename, size, purpose[, content_type]"""
+    try:
+        session = open_session(
+            request.user,
+            filename=request.POST.get('filename'),
+            size=request.POST.get('size'),
+            purpose=request.POST.get('purpose'),
+            content_type=request.POST.get('content_type', ''),
+        )
+    except UploadError as e:
+        return _error(e)
+    return JsonResponse(session_state(session), status=201)
+
+
+@login_required
+@require_http_methods(["GET"])
+def upload_status(request, upload_id):
+    """Progress of an upload, including the chunks already received"""
+    session = get_object_or_404(UploadSession, pk=upload_id, user=request.user)
+    return JsonResponse(session_state(session))
+
+
+@login_required
+@require_http_methods(["PUT"])
+def upload_chunk(request, upload_id, index):
+    """
+    Store one chunk; the raw request body is the chunk's bytes
+    Optional X-Chunk-SHA256 header is verified against the received data.
+    """
+    session = get_object_or_404(UploadSession, pk=upload_id, user=request.user)
+    try:
+        length = int(request.META.get('CONTENT_LENGTH') or 0)
+        # Read from the request stream, never request.body
+        chunk = write_chunk(session, index, request, length, sha256=request.headers.get('X-Chunk-SHA256'))
+    except UploadError as e:
+        return _error(e)
+    return JsonResponse({'index': chunk.index, 'size': chunk.size, 'sha256': chunk.sha256})
+
+
+@login_required
+@require_http_methods(["POST"])
+def upload_complete(request, upload_id):
+    """Assemble the received chunks into the stored file"""
+    session = get_object_or_404(UploadSession, pk=upload_id, user=request.user)
+    try:
+        session = complete(session)
+    except UploadError as e:
+        return _error(e)
+    return JsonResponse(session_state(session))
@@ -0,0 +1,354 @@
+"""
+Resumable Chunked Uploads
+Large files are sent as a series of fixed-size chunks instead of one
+multipart body that a web worker buffers in memory or a temp file:
+1. POST /uploads/ with the filename, size and purpose opens an
+   UploadSession (the tenant quota is checked against the declared size
+   plus the declared sizes of the tenant's other unfinished uploads)
+2. PUT /uploads/<id>/chunks/<n>/ streams each chunk's raw body to the
+   storage backend, hashing it on the way; chunks can arrive in any order
+   and be re-sent. Sessions and chunks are rows and the bytes live in
+   storage, so GET /uploads/<id>/ tells a client which chunks to resend
+   after a dropped connection or a worker restart
+3. POST /uploads/<id>/complete/ streams the chunks in order into the
+   purpose's upload_to directory through the field's storage (metered,
+   and deduplicated by core.blobs), records the file's SHA-256 and
+   removes the chunks
+The form that needed the file then attaches it with claim_upload(). No
+step holds more than UPLOAD_STREAM_BLOCK_SIZE bytes of the file in memory.
+"""
+
+from datetime import timedelta
+import hashlib
+import io
+import logging
+import posixpath
+
+from django.apps import apps
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.db.models import Sum
+from django.utils import timezone
+
+from .db.sharding import directory, each_shard
+from .models import UploadChunk, UploadSession
+from .storage import StorageQuotaExceeded
+from .usage import check_limit
+
+logger = logging.getLogger(__name__)
+
+CHUNK_PREFIX = 'uploads'
+
+# purpose -> (model, file field) the finished upload is stored for
+UPLOAD_TARGETS = {
+    'submission': ('teacher.AssignmentSubmission', 'attachment'),
+    'teacher_resource': ('teacher.TeacherResource', 'file'),
+    'student_resource': ('student.StudentResource', 'file'),
+    'department_resource': ('department_management.DepartmentResource', 'file'),
+}
+
+
+class UploadError(Exception):
+    """Rejected upload request; status is the HTTP status to answer with"""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+class _Stream(io.RawIOBase):
+    """Forward-only readable stream with a known size, hashed as it is read"""
+
+    def __init__(self, name, size):
+        super().__init__()
+        self.name = name
+        self.size = size
+        self.read_bytes = 0
+        self.hasher = hashlib.sha256()
+
+    def readable(self):
+        return True
+
+    def read(self, size=-1):
+        remaining = self.size - self.read_bytes
+        if size is None or size < 0 or size > remaining:
+            size = remaining
+        data = self._read(min(size, settings.UPLOAD_STREAM_BLOCK_SIZE)) if size else b''
+        self.read_bytes += len(data)
+        self.hasher.update(data)
+        return data
+
+    def readall(self):
+        raise io.UnsupportedOperation('read the stream in blocks')
+
+
+class BodyStream(_Stream):
+    """The next `size` bytes of a request body"""
+
+    def __init__(self, source, size, name='chunk'):
+        super().__init__(name, size)
+        self.source = source
+
+    def _read(self, size):
+        return self.source.read(size)
+
+
+class ChunkStream(_Stream):
+    """An upload's chunks read back from storage, in order, as one stream"""
+
+    def __init__(self, storage, chunks, name):
+        super().__init__(name, sum(chunk.size for chunk in chunks))
+        self.storage = storage
+        self.pending = [chunk.storage_name for chunk in chunks]
+        self.current = None
+
+    def _read(self, size):
+        while True:
+            if self.current is None:
+                if not self.pending:
+                    return b''
+                self.current = self.storage.open(self.pending.pop(0), 'rb')
+            data = self.current.read(size)
+            if data:
+                return data
+            self.current.close()
+            self.current = None
+
+    def close(self):
+        if self.current is not None:
+            self.current.close()
+            self.current = None
+        super().close()
+
+
+def chunk_storage():
+    """Backend chunks are written to (unmetered: outside the tenants/ prefix)"""
+    return getattr(default_storage, 'backend', default_storage)
+
+
+def target_field(purpose):
+    try:
+        label, field_name = UPLOAD_TARGETS[purpose]
+    except KeyError:
+        raise UploadError(f'Unknown upload purpose: {purpose}')
+    return apps.get_model(label)._meta.get_field(field_name)
+
+
+def reserved_bytes(tenant):
+    """Declared bytes of the tenant's unfinished uploads, not yet metered"""
+    return UploadSession.objects.filter(
+        tenant=tenant, status='open', expires_at__gt=timezone.now()
+    ).aggregate(total=Sum('size'))['total'] or 0
+
+
+def open_session(user, filename, size, purpose, content_type=''):
+    """
+    Start an upload
+
+    Args:
+        user: Uploading UserAccount
+        filename: Client file name
+        size: Total bytes the client will send
+        purpose: Key of UPLOAD_TARGETS
+
+    Returns:
+        UploadSession
+    """
+    target_field(purpose)
+    filename = posixpath.basename((filename or '').replace('\\', '/')).strip()
+    if not filename:
+        raise UploadError('A file name is required')
+    try:
+        size = int(size)
+    except (TypeError, ValueError):
+        raise UploadError('Size must be a number of bytes')
+    if size <= 0:
+        raise UploadError('Empty files cannot be uploaded')
+    if size > settings.UPLOAD_MAX_SIZE:
+        raise UploadError(f'Files are limited to {settings.UPLOAD_MAX_SIZE} bytes', status=413)
+
+    tenant = user.tenant if user.tenant_id else None
+    if tenant and not check_limit(tenant, 'storage', reserved_bytes(tenant) + size):
+        raise UploadError(f'Storage limit exceeded. Maximum: {tenant.max_storage_gb} GB', status=413)
+
+    return UploadSession.objects.create(
+        tenant=tenant,
+        user=user,
+        purpose=purpose,
+        filename=filename[:255],
+        content_type=(content_type or '')[:100],
+        size=size,
+        chunk_size=settings.UPLOAD_CHUNK_SIZE,
+        expires_at=timezone.now() + timedelta(hours=settings.UPLOAD_SESSION_TTL_HOURS),
+    )
+
+
+def _check_open(session):
+    if session.status != 'open':
+        raise UploadError('Upload is already complete', status=409)
+    if session.expires_at <= timezone.now():
+        raise UploadError('Upload session has expired', status=410)
+
+
+def chunk_length(session, index):
+    """Exact byte count chunk `index` must have"""
+    if not 0 <= index < session.total_chunks:
+        raise UploadError(f'Chunk index must be between 0 and {session.total_chunks - 1}')
+    return min(session.chunk_size, session.size - index * session.chunk_size)
+
+
+def write_chunk(session, index, source, length, sha256=None):
+    """
+    Stream one chunk from `source` to storage
+
+    Args:
+        session: Open UploadSession
+        index: Chunk number (0-based)
+        source: File-like body (e.g. the request), read in blocks
+        length: Content-Length the client declared
+        sha256: Optional hex digest the client computed for the chunk
+
+    Returns:
+        UploadChunk
+    """
+    _check_open(session)
+    expected = chunk_length(session, index)
+    if length != expected:
+        raise UploadError(f'Chunk {index} must be {expected} bytes, got {length}')
+
+    storage = chunk_storage()
+    name = posixpath.join(CHUNK_PREFIX, str(session.pk), f'{index:06d}')
+    # A resent chunk replaces the earlier copy under the same name
+    storage.delete(name)
+    stream = BodyStream(source, expected, name=name)
+    stored = storage.save(name, stream)
+
+    digest = stream.hasher.hexdigest()
+    problem = None
+    if stream.read_bytes != expected:
+        problem = f'Chunk {index} ended after {stream.read_bytes} of {expected} bytes'
+    elif sha256 and sha256.lower() != digest:
+        problem = f'Chunk {index} checksum mismatch'
+    if problem:
+        storage.delete(stored)
+        raise UploadError(problem)
+
+    chunk, _ = UploadChunk.objects.update_or_create(
+        session=session, index=index,
+        defaults={'size': expected, 'sha256': digest, 'storage_name': stored},
+    )
+    return chunk
+
+
+def received_chunks(session):
+    return list(session.chunks.values_list('index', flat=True))
+
+
+def complete(session):
+    """
+    Assemble the chunks into the purpose's upload_to directory
+
+    Returns:
+        UploadSession: with stored_name and sha256 set
+    """
+    _check_open(session)
+    chunks = list(session.chunks.order_by('index'))
+    missing = sorted(set(range(session.total_chunks)) - {chunk.index for chunk in chunks})
+    if missing:
+        raise UploadError(f'Missing chunks: {missing[:20]}', status=409)
+
+    field = target_field(session.purpose)
+    name = field.generate_filename(None, session.filename)
+    source = chunk_storage()
+    storage = field.storage
+    digest = None
+    if getattr(storage, 'content_addressed', False):
+        # Content-addressed storage needs the hash before it writes anything
+        with ChunkStream(source, chunks, name=session.filename) as hashing:
+            while hashing.read():
+                pass
+            digest = hashing.hasher.hexdigest()
+    stream = ChunkStream(source, chunks, name=session.filename)
+    stream.sha256 = digest
+    try:
+        if hasattr(storage, 'save_for_tenant'):
+            stored = storage.save_for_tenant(session.tenant, name, stream, max_length=field.max_length)
+        else:
+            stored = storage.save(name, stream, max_length=field.max_length)
+    except StorageQuotaExceeded as e:
+        raise UploadError(str(e), status=413)
+    finally:
+        stream.close()
+
+    with transaction.atomic():
+        session.sha256 = digest or stream.hasher.hexdigest()
+        session.stored_name = stored
+        session.status = 'complete'
+        session.save(update_fields=['sha256', 'stored_name', 'status', 'updated_at'])
+        session.chunks.all().delete()
+    for chunk in chunks:
+        source.delete(chunk.storage_name)
+    return session
+
+
+def claim_upload(user, upload_id, purpose):
+    """
+    Take a completed upload for a model's file field; each upload can be
+    claimed once
+
+    Returns:
+        str: Stored file name to assign to the field
+    """
+    try:
+        session = UploadSession.objects.get(pk=upload_id, user=user, purpose=purpose)
+    except (UploadSession.DoesNotExist, ValueError, TypeError):
+        raise UploadError('Upload not found', status=404)
+    claimed = UploadSession.objects.filter(pk=session.pk, status='complete').update(
+        status='claimed', updated_at=timezone.now()
+    )
+    if not claimed:
+        raise UploadError('Upload is not complete or was already used', status=409)
+    return session.stored_name
+
+
+def purge_expired(now=None):
+    """
+    Remove expired sessions: chunks of unfinished uploads and files that
+    were assembled but never claimed
+
+    Returns:
+        int: Sessions removed
+    """
+    now = now or timezone.now()
+    source = chunk_storage()
+    purged = 0
+    for alias in each_shard():
+        expired = UploadSession.all_objects.filter(expires_at__lte=now).exclude(
+            tenant_id__in=directory.tenants_elsewhere(alias)
+        )
+        for session in expired.exclude(status='claimed').iterator():
+            for name in session.chunks.values_list('storage_name', flat=True):
+                source.delete(name)
+            if session.status == 'complete' and session.stored_name:
+                target_field(session.purpose).storage.delete(session.stored_name)
+            session.delete()
+            purged += 1
+        expired.filter(status='claimed').delete()
+    logger.info(f"Purged {purged} expired upload sessions")
+    return purged
+
+
+def session_state(session):
+    """JSON-serializable progress of an upload"""
+    return {
+        'id': str(session.pk),
+        'filename': session.filename,
+        'size': session.size,
+        'chunk_size': session.chunk_size,
+        'total_chunks': session.total_chunks,
+        'received': received_chunks(session) if session.status == 'open' else [],
+        'status': session.status,
+        'sha256': session.sha256,
+        'expires_at': session.expires_at.isoformat(),
+    }
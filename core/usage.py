@@ -0,0 +1,211 @@
+"""
+Tenant Usage Metering
+Usage counters (students, teachers, departments, storage) live in the cache
+(Redis in production) and are updated with atomic INCR/DECR, so concurrent
+enrollments never lock or rewrite the Tenant row. A periodic reconciliation
+recomputes real counts and persists them to the Tenant usage columns.
+"""
+
+import logging
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models import Count
+
+from .db.sharding import directory
+from .models import Department, Tenant, UserAccount
+
+logger = logging.getLogger(__name__)
+
+USAGE_TYPES = ['students', 'teachers', 'departments', 'storage']
+
+# Usage type -> Tenant column holding the last reconciled value
+USAGE_FIELDS = {
+    'students': 'current_students_count',
+    'teachers': 'current_teachers_count',
+    'departments': 'current_departments_count',
+    'storage': 'current_storage_used_gb',
+}
+
+# Usage type -> Tenant column holding the plan limit
+LIMIT_FIELDS = {
+    'students': 'max_students',
+    'teachers': 'max_teachers',
+    'departments': 'max_departments',
+    'storage': 'max_storage_gb',
+}
+
+# Role name -> counted usage type
+ROLE_USAGE = {
+    'student': 'students',
+    'teacher': 'teachers',
+}
+
+GB = 1024 ** 3
+
+
+def _cache():
+    return caches[settings.USAGE_CACHE_ALIAS]
+
+
+def _key(tenant_id, usage_type):
+    return f'usage:{tenant_id}:{usage_type}'
+
+
+def _snapshot(tenant, usage_type):
+    """Last reconciled value from the Tenant row (storage in bytes)"""
+    value = getattr(tenant, USAGE_FIELDS[usage_type])
+    return int(value * GB) if usage_type == 'storage' else int(value)
+
+
+def get_usage(tenant, usage_type):
+    """
+    Current usage for a tenant (storage in bytes)
+
+    Falls back to the reconciled Tenant column when the counter is missing,
+    seeding the counter from it; never queries the database.
+    """
+    cache = _cache()
+    key = _key(tenant.pk, usage_type)
+    value = cache.get(key)
+    if value is None:
+        value = _snapshot(tenant, usage_type)
+        cache.add(key, value, timeout=None)
+    return value
+
+
+def adjust_usage(tenant, usage_type, delta):
+    """
+    Atomically add delta to a tenant usage counter (storage in bytes)
+
+    Args:
+        tenant: Tenant instance or tenant ID (loaded only on a cold counter)
+        usage_type: 'students', 'teachers', 'departments' or 'storage'
+        delta: Amount to add (negative to subtract)
+
+    Returns:
+        int: New counter value (None when the tenant no longer exists)
+    """
+    if usage_type not in USAGE_FIELDS:
+        raise ValueError(f"Unknown usage type: {usage_type}")
+
+    cache = _cache()
+    key = _key(getattr(tenant, 'pk', tenant), usage_type)
+    try:
+        return cache.incr(key, delta)
+    except ValueError:
+        # Counter missing (cold cache or evicted): seed from the snapshot first
+        if not isinstance(tenant, Tenant):
+            tenant = Tenant.objects.only(USAGE_FIELDS[usage_type]).filter(pk=tenant).first()
+            if tenant is None:
+                # Tenant deleted (e.g. cascading deletes of its users): nothing to count
+                return None
+        cache.add(key, _snapshot(tenant, usage_type), timeout=None)
+        return cache.incr(key, delta)
+
+
+def set_usage(tenant_id, usage_type, value):
+    """Persist a recounted usage value to the Tenant row and its counter"""
+    persisted = round(value / GB, 2) if usage_type == 'storage' else value
+    Tenant.objects.filter(pk=tenant_id).update(**{USAGE_FIELDS[usage_type]: persisted})
+    _cache().set(_key(tenant_id, usage_type), value, timeout=None)
+
+
+def adjust_usage_for_user(user, delta):
+    """Count a user against the tenant limit matching their role"""
+    if not user.tenant_id or not user.role_id:
+        return
+    usage_type = ROLE_USAGE.get(user.role_name)
+    if usage_type:
+        adjust_usage(user.tenant_id, usage_type, delta)
+
+
+def check_limit(tenant, usage_type, amount=1):
+    """
+    Check whether adding amount stays within the tenant's plan limit
+
+    Args:
+        tenant: Tenant instance
+        usage_type: 'students', 'teachers', 'departments' or 'storage'
+        amount: Resources to add (storage in bytes)
+
+    Returns:
+        bool: True when within limit
+    """
+    limit = getattr(tenant, LIMIT_FIELDS[usage_type])
+    if usage_type == 'storage':
+        limit *= GB
+    return get_usage(tenant, usage_type) + amount <= limit
+
+
+def _grouped_counts(queryset):
+    return dict(queryset.values('tenant_id').annotate(total=Count('id')).values_list('tenant_id', 'total'))
+
+
+def reconcile_usage(tenant_ids=None):
+    """
+    Recompute real usage, persist it to the Tenant columns and correct counters
+
+    Storage is recounted by scanning file storage (core.storage.reconcile_storage);
+    here its current counter value is persisted as-is.
+
+    Args:
+        tenant_ids: Restrict to these tenants (default: all)
+
+    Returns:
+        int: Number of tenants reconciled
+    """
+    tenants = Tenant.objects.all()
+    users = UserAccount.objects.filter(is_active=True)
+    departments = Department.objects.filter(is_active=True)
+    if tenant_ids is not None:
+        tenants = tenants.filter(pk__in=tenant_ids)
+        users = users.filter(tenant_id__in=tenant_ids)
+        departments = departments.filter(tenant_id__in=tenant_ids)
+
+    cache = _cache()
+    tenants = list(tenants.only('id', *USAGE_FIELDS.values()))
+    counted = ('students', 'teachers', 'departments')
+    # Counter values just before counting: the difference to the real count is
+    # applied with INCR, so adjusts landing while this runs are kept
+    before = cache.get_many([_key(tenant.pk, usage_type) for tenant in tenants for usage_type in counted])
+
+    # One grouped query per usage type for every tenant at once; departments
+    # are counted on each shard for the tenants it holds (core.db.sharding)
+    counts = {
+        'students': _grouped_counts(users.filter(role__name='student')),
+        'teachers': _grouped_counts(users.filter(role__name='teacher')),
+        'departments': {},
+    }
+    for alias in directory.aliases():
+        for tenant_id, total in _grouped_counts(departments.using(alias)).items():
+            if directory.shard_for(tenant_id) == alias:
+                counts['departments'][tenant_id] = total
+
+    reconciled = 0
+    for tenant in tenants:
+        values = {usage_type: counts[usage_type].get(tenant.pk, 0) for usage_type in counted}
+        values['storage'] = get_usage(tenant, 'storage')
+
+        Tenant.objects.filter(pk=tenant.pk).update(
+            current_students_count=values['students'],
+            current_teachers_count=values['teachers'],
+            current_departments_count=values['departments'],
+            current_storage_used_gb=round(values['storage'] / GB, 2),
+        )
+        for usage_type in counted:
+            key = _key(tenant.pk, usage_type)
+            if key not in before:
+                # add(): a counter seeded meanwhile is corrected next run
+                cache.add(key, values[usage_type], timeout=None)
+                continue
+            delta = values[usage_type] - before[key]
+            if delta:
+                try:
+                    cache.incr(key, delta)
+                except ValueError:
+                    cache.add(key, values[usage_type], timeout=None)
+        reconciled += 1
+
+    logger.info(f"Reconciled usage for {reconciled} tenants")
+    return reconciled
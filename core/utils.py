@@ -2,9 +2,6 @@
 Utility Functions for Core App
 """
 
-from django.core.mail import send_mail, EmailMultiAlternatives
-from django.template.loader import render_to_string
-from django.conf import settings
 import logging
 
 logger = logging.getLogger(__name__)
@@ -30,25 +27,15 @@ def send_email_notification(subject, recipient_list, template_name, context, fro
         template_name: Template name (without extension)
         context: Context dictionary for template
         from_email: From email address (optional)
+    
+    For many recipients build the messages with core.mail.build_email and
+    send them together with core.mail.send_mass_email.
     """
+    from .mail import build_email, send_mass_email
+    
     try:
-        # Render HTML content
-        html_content = render_to_string(f'emails/{template_name}.html', context)
-        
-        # Render plain text content
-        text_content = render_to_string(f'emails/{template_name}.txt', context)
-        
-        # Create email
-        email = EmailMultiAlternatives(
-            subject=subject,
-            body=text_content,
-            from_email=from_email or settings.DEFAULT_FROM_EMAIL,
-            to=recipient_list
-        )
-        email.attach_alternative(html_content, "text/html")
-        
-        # Send email
-        email.send()
+        email = build_email(subject, recipient_list, template_name, context, from_email)
+        send_mass_email([email])
         logger.info(f"Email sent to {recipient_list}: {subject}")
         return True
     
@@ -138,15 +125,18 @@ def check_user_permission(user, permission_name):
     Returns:
         bool: True if user has permission
     """
-    if not user.is_authenticated or not user.role:
+    from .roles import get_user_role
+    
+    role = get_user_role(user)
+    if role is None:
         return False
     
     # Super admin has all permissions
-    if user.is_super_admin() or user.is_superuser:
+    if role.is_super_admin or user.is_superuser:
         return True
     
-    # Check role permissions
-    return getattr(user.role, permission_name, False)
+    # Check role permissions (compiled bitmask)
+    return role.has_permission(permission_name)
 
 
 def create_audit_log(user, action, resource_type, resource_id=None, description='', tenant=None, request=None):
@@ -186,30 +176,30 @@ def create_audit_log(user, action, resource_type, resource_id=None, description=
 def validate_tenant_limits(tenant, check_type, count=1):
     """
     Validate if tenant can add more resources based on subscription limits
+    Usage is read from the counter store (core.usage), not the database
     
     Args:
         tenant: Tenant instance
         check_type: Type of check ('students', 'teachers', 'departments', 'storage')
-        count: Number of resources to add (default 1)
+        count: Number of resources to add (default 1; GB for storage)
     
     Returns:
         tuple: (bool, str) - (is_valid, error_message)
     """
-    if check_type == 'students':
-        if tenant.current_students_count + count > tenant.max_students:
-            return False, f"Student limit exceeded. Maximum: {tenant.max_students}"
-    
-    elif check_type == 'teachers':
-        if tenant.current_teachers_count + count > tenant.max_teachers:
-            return False, f"Teacher limit exceeded. Maximum: {tenant.max_teachers}"
+    from .usage import GB, check_limit
     
-    elif check_type == 'departments':
-        if tenant.current_departments_count + count > tenant.max_departments:
-            return False, f"Department limit exceeded. Maximum: {tenant.max_departments}"
+    messages = {
+        'students': f"Student limit exceeded. Maximum: {tenant.max_students}",
+        'teachers': f"Teacher limit exceeded. Maximum: {tenant.max_teachers}",
+        'departments': f"Department limit exceeded. Maximum: {tenant.max_departments}",
+        'storage': f"Storage limit exceeded. Maximum: {tenant.max_storage_gb} GB",
+    }
+    if check_type not in messages:
+        return True, ""
     
-    elif check_type == 'storage':
-        if tenant.current_storage_used_gb + count > tenant.max_storage_gb:
-            return False, f"Storage limit exceeded. Maximum: {tenant.max_storage_gb} GB"
+    amount = int(count * GB) if check_type == 'storage' else count
+    if not check_limit(tenant, check_type, amount):
+        return False, messages[check_type]
     
     return True, ""
 
@@ -221,21 +211,15 @@ def increment_tenant_usage(tenant, usage_type, count=1):
     Args:
         tenant: Tenant instance
         usage_type: Type of usage ('students', 'teachers', 'departments', 'storage')
-        count: Amount to increment (default 1)
-    """
-    from django.db.models import F
+        count: Amount to increment (default 1; GB for storage)
     
-    if usage_type == 'students':
-        tenant.current_students_count = F('current_students_count') + count
-    elif usage_type == 'teachers':
-        tenant.current_teachers_count = F('current_teachers_count') + count
-    elif usage_type == 'departments':
-        tenant.current_departments_count = F('current_departments_count') + count
-    elif usage_type == 'storage':
-        tenant.current_storage_used_gb = F('current_storage_used_gb') + count
+    Returns:
+        int: New usage value (bytes for storage)
+    """
+    from .usage import GB, adjust_usage
     
-    tenant.save()
-    tenant.refresh_from_db()
+    amount = int(count * GB) if usage_type == 'storage' else count
+    return adjust_usage(tenant, usage_type, amount)
 
 
 def decrement_tenant_usage(tenant, usage_type, count=1):
@@ -245,18 +229,9 @@ def decrement_tenant_usage(tenant, usage_type, count=1):
     Args:
         tenant: Tenant instance
         usage_type: Type of usage ('students', 'teachers', 'departments', 'storage')
-        count: Amount to decrement (default 1)
-    """
-    from django.db.models import F
+        count: Amount to decrement (default 1; GB for storage)
     
-    if usage_type == 'students':
-        tenant.current_students_count = F('current_students_count') - count
-    elif usage_type == 'teachers':
-        tenant.current_teachers_count = F('current_teachers_count') - count
-    elif usage_type == 'departments':
-        tenant.current_departments_count = F('current_departments_count') - count
-    elif usage_type == 'storage':
-        tenant.current_storage_used_gb = F('current_storage_used_gb') - count
-    
-    tenant.save()
-    tenant.refresh_from_db()
+    Returns:
+        int: New usage value (bytes for storage)
+    """
+    return increment_tenant_usage(tenant, usage_type, -count)
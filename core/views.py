@@ -380,7 +380,7 @@ def dashboard_redirect(request):
     """Redirect to appropriate dashboard based on user role"""
     user = request.user
     
-    if not user.role:
+    if not user.role_id:
         messages.error(request, 'No role assigned. Contact administrator.')
         return redirect('auth:profile')
     
@@ -393,7 +393,7 @@ def dashboard_redirect(request):
         'parent': 'parent:home',
     }
     
-    dashboard = role_dashboards.get(user.role.name)
+    dashboard = role_dashboards.get(user.role_name)
     if dashboard:
         return redirect(dashboard)
     
@@ -0,0 +1,57 @@
+# Generated by Django 5.0 on 2026-10-19 00:07
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("core", "0006_tenant_scoped_indexes"),
+        ("department_management", "0002_uuid7_primary_keys"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="departmentannouncement",
+            name="department__departm_6e3159_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="facultymeeting",
+            name="faculty_mee_departm_ccfe5e_idx",
+        ),
+        migrations.AddField(
+            model_name="departmentannouncement",
+            name="is_deleted",
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name="departmentresource",
+            name="is_deleted",
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name="departmentsettings",
+            name="is_deleted",
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name="facultymeeting",
+            name="is_deleted",
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddIndex(
+            model_name="departmentannouncement",
+            index=models.Index(
+                fields=["tenant", "is_deleted", "department", "created_at"],
+                name="department__tenant__2b1eb4_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="facultymeeting",
+            index=models.Index(
+                fields=["tenant", "is_deleted", "department", "meeting_date"],
+                name="faculty_mee_tenant__a9251a_idx",
+            ),
+        ),
+    ]
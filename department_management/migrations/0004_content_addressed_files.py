@@ -0,0 +1,22 @@
+# Generated by Django 5.0 on 2026-10-19 00:28
+
+import core.blobs
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("department_management", "0003_tenant_scoped_indexes"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="departmentresource",
+            name="file",
+            field=models.FileField(
+                max_length=255,
+                storage=core.blobs.get_blob_storage,
+                upload_to="department_resources/%Y/%m/",
+            ),
+        ),
+    ]
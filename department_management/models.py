@@ -4,6 +4,8 @@ HOD (Head of Department) specific functionality
 """
 from django.db import models
 from django.core.validators import MinValueValidator, MaxValueValidator
+from core.blobs import get_blob_storage
+from core.managers import tenant_index
 from core.models import BaseModel, Tenant, Department, UserAccount, Subject, Section
 
 
@@ -45,7 +47,7 @@ class DepartmentAnnouncement(BaseModel):
         db_table = 'department_announcements'
         ordering = ['-is_pinned', '-priority', '-created_at']
         indexes = [
-            models.Index(fields=['department', 'created_at']),
+            tenant_index('department', 'created_at'),
             models.Index(fields=['is_pinned', 'priority']),
         ]
     
@@ -85,7 +87,7 @@ class FacultyMeeting(BaseModel):
         db_table = 'faculty_meetings'
         ordering = ['-meeting_date', '-start_time']
         indexes = [
-            models.Index(fields=['department', 'meeting_date']),
+            tenant_index('department', 'meeting_date'),
             models.Index(fields=['status']),
         ]
     
@@ -114,7 +116,7 @@ class DepartmentResource(BaseModel):
     title = models.CharField(max_length=200)
     description = models.TextField(blank=True)
     resource_type = models.CharField(max_length=20, choices=RESOURCE_TYPES)
-    file = models.FileField(upload_to='department_resources/%Y/%m/')
+    file = models.FileField(upload_to='department_resources/%Y/%m/', storage=get_blob_storage, max_length=255)
     
     subject = models.ForeignKey(Subject, on_delete=models.SET_NULL, null=True, blank=True, related_name='resources')
     is_public = models.BooleanField(default=True, help_text='Visible to all department members')
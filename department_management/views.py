@@ -12,6 +12,7 @@ from datetime import timedelta
 
 from core.models import Department, UserAccount, Section, Subject, AcademicYear
 from core.decorators import role_required
+from core.notifications import notify_announcement
 from .models import DepartmentAnnouncement, FacultyMeeting, DepartmentResource, DepartmentSettings
 
 
@@ -34,7 +35,6 @@ def dashboard(request):
         tenant=user.tenant,
         role__name='teacher',
         is_active=True,
-        is_deleted=False
     ).filter(
         Q(teaching_subjects__department=department)
     ).distinct().count()
@@ -43,19 +43,16 @@ def dashboard(request):
     from core.models import StudentEnrollment
     student_count = StudentEnrollment.objects.filter(
         section__department=department,
-        is_deleted=False
     ).values('student').distinct().count()
     
     # Section count
     section_count = Section.objects.filter(
         department=department,
-        is_deleted=False
     ).count()
     
     # Subject count
     subject_count = Subject.objects.filter(
         department=department,
-        is_deleted=False
     ).count()
     
     # Recent announcements
@@ -100,7 +97,6 @@ def faculty_list(request):
         tenant=request.user.tenant,
         role__name='teacher',
         is_active=True,
-        is_deleted=False
     ).filter(
         Q(teaching_subjects__department=department)
     ).distinct().order_by('first_name', 'last_name')
@@ -143,7 +139,6 @@ def students_list(request):
     from core.models import StudentEnrollment
     enrollments = StudentEnrollment.objects.filter(
         section__department=department,
-        is_deleted=False
     ).select_related('student', 'section').order_by('section__name', 'roll_number')
     
     # Filters
@@ -168,7 +163,6 @@ def students_list(request):
     # Sections for filter
     sections = Section.objects.filter(
         department=department,
-        is_deleted=False
     ).order_by('name')
     
     context = {
@@ -275,7 +269,6 @@ def subject_management(request):
     
     subjects = Subject.objects.filter(
         department=department,
-        is_deleted=False
     ).order_by('name')
     
     context = {
@@ -336,7 +329,7 @@ def announcement_create(request):
         is_pinned = request.POST.get('is_pinned') == 'on'
         priority = request.POST.get('priority', 3)
         
-        DepartmentAnnouncement.objects.create(
+        announcement = DepartmentAnnouncement.objects.create(
             tenant=request.user.tenant,
             department=department,
             created_by=request.user,
@@ -347,8 +340,9 @@ def announcement_create(request):
             is_pinned=is_pinned,
             priority=int(priority)
         )
+        recipients = notify_announcement(announcement, department=department)
         
-        messages.success(request, 'Announcement created successfully.')
+        messages.success(request, f'Announcement created and sent to {recipients} users.')
         return redirect('department_management:announcements')
     
     context = {
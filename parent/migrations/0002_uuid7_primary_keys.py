@@ -0,0 +1,23 @@
+# Generated by Django 5.0 on 2026-10-19 00:01
+
+import core.ids
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("parent", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="parentcommunication",
+            name="id",
+            field=models.UUIDField(
+                default=core.ids.uuid7,
+                editable=False,
+                primary_key=True,
+                serialize=False,
+            ),
+        ),
+    ]
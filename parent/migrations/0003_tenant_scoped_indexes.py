@@ -0,0 +1,17 @@
+# Generated by Django 5.0 on 2026-10-19 00:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("parent", "0002_uuid7_primary_keys"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="parentcommunication",
+            name="is_deleted",
+            field=models.BooleanField(default=False),
+        ),
+    ]
@@ -6,11 +6,11 @@ Views for parent portal (10 pages)
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.core.paginator import Paginator
-from django.utils import timezone
 from django.db.models import Count, Avg, Q, Sum
-from core.decorators import role_required
+from core.decorators import query_budget, role_required
 from core.models import Section, Subject, AcademicYear, ParentStudentLink
-from teacher.models import Attendance, Assignment, Grade
+from teacher.assignment_status import completion, pending_counts
+from teacher.models import Attendance, Grade
 from college_management.models import Timetable, ExamSchedule, Announcement
 from student.models import FeePayment
 from .models import ParentCommunication
@@ -30,6 +30,8 @@ def dashboard(request):
     total_pending_fees = 0
     total_pending_assignments = 0
     children_data = []
+    # One indexed count for all children (teacher.assignment_status projection)
+    pending_by_child = pending_counts(children)
     
     for child in children:
         # Get section
@@ -51,13 +53,7 @@ def dashboard(request):
         ).aggregate(avg=Avg('percentage'))['avg'] or 0
         
         # Pending assignments
-        pending_assignments = Assignment.objects.filter(
-            section=section,
-            status='published',
-            due_date__gte=timezone.now().date()
-        ).exclude(
-            assignmentsubmission__student=child
-        ).count()
+        pending_assignments = pending_by_child.get(child.pk, 0)
         total_pending_assignments += pending_assignments
         
         # Pending fees
@@ -117,29 +113,16 @@ def child_performance(request, student_id):
     ).aggregate(avg=Avg('percentage'))['avg'] or 0
     
     # Assignment completion rate
-    total_assignments = Assignment.objects.filter(
-        section=section,
-        status='published'
-    ).count()
-    
-    completed_assignments = Assignment.objects.filter(
-        section=section,
-        status='published',
-        assignmentsubmission__student=child
-    ).count()
-    
-    completion_rate = 0
-    if total_assignments > 0:
-        completion_rate = (completed_assignments / total_assignments) * 100
+    assignments = completion(child, section)
     
     context = {
         'child': child,
         'section': section,
         'recent_grades': recent_grades,
         'avg_percentage': round(avg_percentage, 2),
-        'completion_rate': round(completion_rate, 2),
-        'total_assignments': total_assignments,
-        'completed_assignments': completed_assignments,
+        'completion_rate': assignments['rate'],
+        'total_assignments': assignments['total'],
+        'completed_assignments': assignments['completed'],
     }
     return render(request, 'parent/child_performance.html', context)
 
@@ -297,6 +280,7 @@ def announcements(request):
 
 @login_required
 @role_required(['parent'])
+@query_budget(11)
 def communication(request):
     """Communication with teachers"""
     parent = request.user
@@ -406,6 +390,7 @@ def timetable(request, student_id):
 
 @login_required
 @role_required(['parent'])
+@query_budget(10)
 def reports(request):
     """Generate reports for children (placeholder)"""
     parent = request.user
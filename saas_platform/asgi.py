@@ -2,6 +2,11 @@
 ASGI config for saas_platform project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+Served by gunicorn with uvicorn workers (docker-compose.asgi.yml), it holds
+the /events/ server-sent event streams (core.events): each idle stream is a
+coroutine on the worker's event loop, and the worker shares one Redis
+pub/sub subscription between all of them. Page views, the dashboards
+included, are sync and run in the worker's thread pool.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.0/howto/deployment/asgi/
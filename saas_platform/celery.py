@@ -0,0 +1,24 @@
+"""
+Celery application for saas_platform
+Background tasks and periodic jobs (see CELERY_BEAT_SCHEDULE in settings)
+"""
+
+import os
+
+from celery import Celery
+from celery.signals import worker_process_init
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'saas_platform.settings')
+
+app = Celery('saas_platform')
+app.config_from_object('django.conf:settings', namespace='CELERY')
+app.autodiscover_tasks()
+
+
+@worker_process_init.connect
+def configure_database_connections(**kwargs):
+    """Worker processes use their own connection tuning (WORKER_DB_*)"""
+    from django.conf import settings
+    from core.db.pool import configure_worker_connections
+
+    configure_worker_connections(settings.WORKER_DB_CONN_MAX_AGE, settings.WORKER_DB_POOL_SIZE)
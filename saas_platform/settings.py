@@ -63,6 +63,8 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'core.middleware.QueryInstrumentationMiddleware',  # SQL query budgets (QUERY_INSTRUMENTATION)
+    'core.middleware.ReplicaRoutingMiddleware',  # Read replicas (DB_REPLICA_HOSTS)
     # 'whitenoise.middleware.WhiteNoiseMiddleware',  # Static files serving - install later
     'django.contrib.sessions.middleware.SessionMiddleware',
     # 'corsheaders.middleware.CorsMiddleware',  # Install later
@@ -73,6 +75,7 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     'core.middleware.TenantMiddleware',  # Multi-tenant middleware
     'core.middleware.RoleBasedAccessMiddleware',  # RBAC middleware
+    'core.middleware.StorageAccountingMiddleware',  # Tenant storage metering
     # 'axes.middleware.AxesMiddleware',  # Security middleware - install later
 ]
 
@@ -104,14 +107,28 @@ WSGI_APPLICATION = 'saas_platform.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.0/ref/settings/#databases
 
+# Connections persist for DB_CONN_MAX_AGE seconds per thread and are pinged
+# before reuse. With DB_POOL_SIZE set, threads instead share a bounded
+# per-process pool (core.db.pool) and hand connections back after each
+# request; size it for the worker's threads plus DASHBOARD_QUERY_WORKERS.
+DB_POOL_SIZE = env.int('DB_POOL_SIZE', default=0)
+
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.mysql',
+        'ENGINE': 'core.db.backends.mysql' if DB_POOL_SIZE else 'django.db.backends.mysql',
         'NAME': env('DB_NAME'),
         'USER': env('DB_USER'),
         'PASSWORD': env('DB_PASSWORD'),
         'HOST': env('DB_HOST'),
         'PORT': env('DB_PORT'),
+        'CONN_MAX_AGE': 0 if DB_POOL_SIZE else env.int('DB_CONN_MAX_AGE', default=60),
+        'CONN_HEALTH_CHECKS': env.bool('DB_CONN_HEALTH_CHECKS', default=True),
+        'POOL': {
+            'SIZE': DB_POOL_SIZE,
+            'TIMEOUT': env.float('DB_POOL_TIMEOUT', default=10.0),
+            # Below MySQL's wait_timeout
+            'RECYCLE': env.int('DB_POOL_RECYCLE', default=1800),
+        },
         'OPTIONS': {
             'init_command': "SET sql_mode='STRICT_TRANS_TABLES'",
             'charset': 'utf8mb4',
@@ -119,6 +136,43 @@ DATABASES = {
     }
 }
 
+# Read replicas (comma-separated DB_REPLICA_HOSTS) serve reads of GET
+# requests through core.db.routers.ReplicaRouter; after a write the user
+# reads from the primary for REPLICA_PIN_SECONDS
+DB_REPLICA_HOSTS = env.list('DB_REPLICA_HOSTS', default=[])
+DATABASE_REPLICAS = []
+for index, host in enumerate(DB_REPLICA_HOSTS, start=1):
+    DATABASES[f'replica{index}'] = {
+        **DATABASES['default'],
+        'HOST': host,
+        'TEST': {'MIRROR': 'default'},
+    }
+    DATABASE_REPLICAS.append(f'replica{index}')
+REPLICA_PIN_SECONDS = env.int('REPLICA_PIN_SECONDS', default=10)
+REPLICA_PIN_COOKIE = 'db_primary'
+# Apps always read from the primary
+REPLICA_EXCLUDED_APPS = ['sessions', 'django_celery_beat']
+
+# Tenant shards (comma-separated DB_SHARD_HOSTS become aliases shard1..N).
+# Tenants live on SHARD_DEFAULT unless the core.TenantShard directory says
+# otherwise; manage.py move_tenant copies a tenant between shards
+DB_SHARD_HOSTS = env.list('DB_SHARD_HOSTS', default=[])
+DATABASE_SHARDS = []
+for index, host in enumerate(DB_SHARD_HOSTS, start=1):
+    DATABASES[f'shard{index}'] = {**DATABASES['default'], 'HOST': host}
+    DATABASE_SHARDS.append(f'shard{index}')
+SHARD_DEFAULT = 'default'
+SHARD_DIRECTORY_CHECK_SECONDS = env.int('SHARD_DIRECTORY_CHECK_SECONDS', default=5)
+# Apps whose models live on the tenant's shard, minus the global models
+SHARDED_APPS = ['core', 'college_management', 'department_management', 'teacher', 'student', 'parent']
+SHARD_GLOBAL_MODELS = ['core.Tenant', 'core.TenantDomain', 'core.TenantShard', 'core.Role', 'core.UserAccount']
+# Isolated tenants get a database of their own on the default server
+# (manage.py isolate_tenant); aliases are registered from the directory
+ISOLATED_TENANT_ALIAS_PREFIX = 'tenant_'
+ISOLATED_TENANT_DB_NAME = env('ISOLATED_TENANT_DB_NAME', default='{default}_{alias}')
+
+DATABASE_ROUTERS = ['core.db.routers.TenantShardRouter', 'core.db.routers.ReplicaRouter']
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.0/ref/settings/#auth-password-validators
@@ -144,7 +198,7 @@ AUTH_USER_MODEL = 'core.UserAccount'
 
 # Authentication Backends
 AUTHENTICATION_BACKENDS = (
-    'django.contrib.auth.backends.ModelBackend',
+    'core.authentication.UserModelBackend',  # Loads the user with role and tenant
     'guardian.backends.ObjectPermissionBackend',
     'axes.backends.AxesBackend',
 )
@@ -165,8 +219,11 @@ STATICFILES_DIRS = [BASE_DIR / 'static']
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
-# WhiteNoise configuration
-STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
+# Storage backends (static files are served by WhiteNoise)
+STORAGES = {
+    'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+    'staticfiles': {'BACKEND': 'whitenoise.storage.CompressedManifestStaticFilesStorage'},
+}
 
 # Default primary key field type
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
@@ -232,6 +289,31 @@ CELERY_TASK_SERIALIZER = 'json'
 CELERY_RESULT_SERIALIZER = 'json'
 CELERY_TIMEZONE = TIME_ZONE
 CELERY_BEAT_SCHEDULER = 'django_celery_beat.schedulers:DatabaseScheduler'
+# One task at a time per worker process; children are recycled so
+# connections and memory don't live forever
+CELERY_WORKER_PREFETCH_MULTIPLIER = env.int('CELERY_WORKER_PREFETCH_MULTIPLIER', default=1)
+CELERY_WORKER_MAX_TASKS_PER_CHILD = env.int('CELERY_WORKER_MAX_TASKS_PER_CHILD', default=1000)
+# Database connections in worker processes (applied by saas_platform.celery):
+# tasks run back to back on one thread, so keep the connection longer and
+# the pool small
+WORKER_DB_CONN_MAX_AGE = env.int('WORKER_DB_CONN_MAX_AGE', default=600)
+WORKER_DB_POOL_SIZE = env.int('WORKER_DB_POOL_SIZE', default=2)
+
+from celery.schedules import crontab
+CELERY_BEAT_SCHEDULE = {
+    'archive-audit-logs': {
+        'task': 'core.tasks.archive_audit_logs',
+        'schedule': crontab(hour=2, minute=30),
+    },
+    'reconcile-tenant-usage': {
+        'task': 'core.tasks.reconcile_tenant_usage',
+        'schedule': crontab(minute='*/15'),
+    },
+    'reconcile-tenant-storage': {
+        'task': 'core.tasks.reconcile_tenant_storage',
+        'schedule': crontab(hour=3, minute=0),
+    },
+}
 
 # ============================================
 # EMAIL CONFIGURATION
@@ -244,6 +326,15 @@ EMAIL_HOST_USER = env('EMAIL_HOST_USER')
 EMAIL_HOST_PASSWORD = env('EMAIL_HOST_PASSWORD')
 DEFAULT_FROM_EMAIL = env('DEFAULT_FROM_EMAIL')
 
+# Batched dispatch (core.mail): one connection per batch, rate limit in messages/second (0 = off)
+# Local stand-ins: django.core.mail.backends.console.EmailBackend or .filebased.EmailBackend
+EMAIL_FILE_PATH = env('EMAIL_FILE_PATH', default=str(BASE_DIR / 'sent_emails'))
+EMAIL_BATCH_SIZE = env.int('EMAIL_BATCH_SIZE', default=100)
+EMAIL_RATE_LIMIT = env.int('EMAIL_RATE_LIMIT', default=0)
+# Celery retries of notification email batches; web requests never wait
+EMAIL_MAX_RETRIES = env.int('EMAIL_MAX_RETRIES', default=3)
+EMAIL_RETRY_BACKOFF = env.int('EMAIL_RETRY_BACKOFF', default=60)  # Seconds, doubled per retry
+
 # ============================================
 # STRIPE CONFIGURATION
 # ============================================
@@ -263,8 +354,140 @@ if USE_S3:
     AWS_S3_CUSTOM_DOMAIN = f'{AWS_STORAGE_BUCKET_NAME}.s3.amazonaws.com'
     AWS_S3_OBJECT_PARAMETERS = {'CacheControl': 'max-age=86400'}
     AWS_DEFAULT_ACL = 'public-read'
-    DEFAULT_FILE_STORAGE = 'storages.backends.s3boto3.S3Boto3Storage'
-    STATICFILES_STORAGE = 'storages.backends.s3boto3.S3StaticStorage'
+    TENANT_STORAGE_BACKEND = 'storages.backends.s3boto3.S3Boto3Storage'
+    STORAGES['staticfiles'] = {'BACKEND': 'storages.backends.s3boto3.S3StaticStorage'}
+else:
+    TENANT_STORAGE_BACKEND = 'django.core.files.storage.FileSystemStorage'
+
+# ============================================
+# STORAGE ACCOUNTING
+# ============================================
+# Uploads go through core.storage.TenantStorage, which wraps the backend above,
+# stores files under tenants/<tenant_id>/ and meters bytes per tenant
+STORAGES['default'] = {'BACKEND': 'core.storage.TenantStorage'}
+FILE_UPLOAD_HANDLERS = [
+    'core.storage.QuotaUploadHandler',  # Rejects over-quota uploads before reading the body
+    'django.core.files.uploadhandler.MemoryFileUploadHandler',
+    'django.core.files.uploadhandler.TemporaryFileUploadHandler',
+]
+STORAGE_RECONCILE_WORKERS = env.int('STORAGE_RECONCILE_WORKERS', default=8)
+
+# ============================================
+# RESUMABLE UPLOADS
+# ============================================
+# Large files are sent in chunks to /uploads/ (core.uploads): each chunk is
+# streamed to the storage backend, sessions are rows so a client can resume
+# after a dropped connection or a worker restart
+UPLOAD_CHUNK_SIZE = env.int('UPLOAD_CHUNK_SIZE', default=8 * 1024 * 1024)  # S3 multipart parts must be >= 5 MiB
+UPLOAD_MAX_SIZE = env.int('UPLOAD_MAX_SIZE', default=2 * 1024 * 1024 * 1024)
+UPLOAD_SESSION_TTL_HOURS = env.int('UPLOAD_SESSION_TTL_HOURS', default=24)
+UPLOAD_STREAM_BLOCK_SIZE = env.int('UPLOAD_STREAM_BLOCK_SIZE', default=64 * 1024)  # Bytes held in memory per read
+
+# ============================================
+# CONTENT-ADDRESSED FILE STORAGE
+# ============================================
+# Resource, assignment and submission files are stored once per tenant and
+# SHA-256 (core.blobs); unreferenced blobs are removed by manage.py gc_blobs
+# once they have had no references for the grace period
+BLOB_GC_GRACE_HOURS = env.int('BLOB_GC_GRACE_HOURS', default=24)
+
+# ============================================
+# DOWNLOAD GATEWAY
+# ============================================
+# /files/<kind>/<id>/ authorizes the download, then hands the transfer to
+# nginx ('accel': X-Accel-Redirect to the internal DOWNLOAD_ACCEL_PREFIX
+# location), to S3 ('signed': short-lived presigned URL) or streams it from
+# the worker ('django', development)
+DOWNLOAD_BACKEND = env('DOWNLOAD_BACKEND', default='signed' if USE_S3 else 'django')
+DOWNLOAD_ACCEL_PREFIX = env('DOWNLOAD_ACCEL_PREFIX', default='/protected-media/')
+DOWNLOAD_URL_EXPIRY = env.int('DOWNLOAD_URL_EXPIRY', default=300)  # Seconds
+DOWNLOAD_CACHE_MAX_AGE = env.int('DOWNLOAD_CACHE_MAX_AGE', default=3600)  # Seconds
+
+# ============================================
+# AUDIT LOG RETENTION & ARCHIVAL
+# ============================================
+# Rows older than the retention window are moved to gzip JSONL segments.
+# For MinIO/S3 use 'storages.backends.s3boto3.S3Boto3Storage' with
+# bucket_name/endpoint_url/access_key/secret_key in the options.
+AUDIT_LOG_RETENTION_DAYS = env.int('AUDIT_LOG_RETENTION_DAYS', default=90)
+AUDIT_ARCHIVE_BATCH_SIZE = env.int('AUDIT_ARCHIVE_BATCH_SIZE', default=5000)
+AUDIT_ARCHIVE_STORAGE = env('AUDIT_ARCHIVE_STORAGE', default='django.core.files.storage.FileSystemStorage')
+if AUDIT_ARCHIVE_STORAGE.endswith('S3Boto3Storage'):
+    AUDIT_ARCHIVE_STORAGE_OPTIONS = {
+        'bucket_name': env('AUDIT_ARCHIVE_BUCKET', default='audit-archive'),
+        'endpoint_url': env('AUDIT_ARCHIVE_ENDPOINT_URL', default=None),
+        'access_key': env('AUDIT_ARCHIVE_ACCESS_KEY', default=None),
+        'secret_key': env('AUDIT_ARCHIVE_SECRET_KEY', default=None),
+        'default_acl': 'private',
+        'file_overwrite': False,
+    }
+else:
+    AUDIT_ARCHIVE_STORAGE_OPTIONS = {
+        'location': env('AUDIT_ARCHIVE_LOCATION', default=str(BASE_DIR / 'archives')),
+    }
+AUDIT_QUERY_MAX_RESULTS = env.int('AUDIT_QUERY_MAX_RESULTS', default=5000)
+
+# ============================================
+# SQL QUERY INSTRUMENTATION
+# ============================================
+# Per-view query count, DB time and duplicate statements (core.query_budget).
+# Views declare budgets with core.decorators.query_budget; undeclared views
+# get QUERY_BUDGET_DEFAULT
+QUERY_INSTRUMENTATION = env.bool('QUERY_INSTRUMENTATION', default=DEBUG)
+QUERY_INSTRUMENTATION_HEADERS = env.bool('QUERY_INSTRUMENTATION_HEADERS', default=DEBUG)
+QUERY_BUDGET_DEFAULT = env.int('QUERY_BUDGET_DEFAULT', default=30)
+
+# ============================================
+# DASHBOARD QUERIES
+# ============================================
+# Dashboards can run their independent aggregates on a bounded thread pool
+# (core.concurrency); each worker holds a DB connection. Off until
+# manage.py benchmark_dashboards shows a gain on the production database
+DASHBOARD_QUERY_WORKERS = env.int('DASHBOARD_QUERY_WORKERS', default=8)
+DASHBOARD_CONCURRENT_QUERIES = env.bool('DASHBOARD_CONCURRENT_QUERIES', default=False)
+
+# ============================================
+# ROLE REGISTRY
+# ============================================
+# Roles are cached per process (core.roles); Role edits bump a cache version
+# that processes check at most this often
+ROLE_REGISTRY_CHECK_SECONDS = env.int('ROLE_REGISTRY_CHECK_SECONDS', default=5)
+
+# ============================================
+# TENANT USAGE METERING
+# ============================================
+# Counters use atomic cache INCR/DECR (Redis in production) and are
+# reconciled against real counts by core.tasks.reconcile_tenant_usage
+USAGE_CACHE_ALIAS = env('USAGE_CACHE_ALIAS', default='default')
+
+# ============================================
+# NOTIFICATIONS
+# ============================================
+NOTIFICATION_FANOUT_BATCH_SIZE = env.int('NOTIFICATION_FANOUT_BATCH_SIZE', default=1000)
+NOTIFICATION_DELIVERY_BATCH_SIZE = env.int('NOTIFICATION_DELIVERY_BATCH_SIZE', default=100)
+# Unread counters are kept current with INCR/DECR (core.inbox); the timeout
+# only bounds drift from rolled-back creates and soft deletes
+NOTIFICATION_UNREAD_CACHE_TIMEOUT = env.int('NOTIFICATION_UNREAD_CACHE_TIMEOUT', default=3600)
+INBOX_PAGE_SIZE = env.int('INBOX_PAGE_SIZE', default=20)
+INBOX_BADGE_POLL_SECONDS = env.int('INBOX_BADGE_POLL_SECONDS', default=60)
+SMS_BACKEND = env('SMS_BACKEND', default='core.notifications.LoggingSMSBackend')
+
+# ============================================
+# LIVE EVENTS (SERVER-SENT EVENTS)
+# ============================================
+# /events/ streams notifications, messages, announcements and grade
+# publications to open pages (core.events). Streams need the ASGI app
+# (docker-compose.asgi.yml); under WSGI pages poll the inbox badge instead.
+# 'redis' fans events out to every worker through pub/sub; 'memory' only
+# reaches streams in the publishing process (development, tests)
+EVENTS_BROKER = env('EVENTS_BROKER', default='memory' if DEBUG else 'redis')
+EVENTS_REDIS_URL = env('EVENTS_REDIS_URL', default=CELERY_BROKER_URL)
+EVENTS_MAX_CONNECTIONS = env.int('EVENTS_MAX_CONNECTIONS', default=5000)  # Per worker process
+EVENTS_MAX_PER_USER = env.int('EVENTS_MAX_PER_USER', default=5)  # Per worker process
+EVENTS_QUEUE_SIZE = env.int('EVENTS_QUEUE_SIZE', default=100)  # Events buffered per stream
+EVENTS_HEARTBEAT_SECONDS = env.int('EVENTS_HEARTBEAT_SECONDS', default=20)
+EVENTS_MAX_STREAM_SECONDS = env.int('EVENTS_MAX_STREAM_SECONDS', default=3600)
+EVENTS_RETRY_MS = env.int('EVENTS_RETRY_MS', default=5000)  # Client reconnect delay
 
 # ============================================
 # CORS CONFIGURATION
@@ -348,5 +571,10 @@ LOGGING = {
             'level': 'INFO',
             'propagate': False,
         },
+        'core.queries': {
+            'handlers': ['console', 'file'],
+            'level': 'DEBUG' if DEBUG else 'WARNING',
+            'propagate': False,
+        },
     },
 }
@@ -10,14 +10,14 @@ from .settings import *
 DEBUG = False
 ALLOWED_HOSTS = env.list('ALLOWED_HOSTS', default=['localhost'])
 
-# Database connection pooling
+# Database options (connection persistence and pooling: see settings.py)
 DATABASES['default']['OPTIONS'] = {
     'init_command': "SET sql_mode='STRICT_TRANS_TABLES'",
     'charset': 'utf8mb4',
 }
 
 # Static files (WhiteNoise)
-STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
+STORAGES['staticfiles'] = {'BACKEND': 'whitenoise.storage.CompressedManifestStaticFilesStorage'}
 
 # Security settings
 SECURE_SSL_REDIRECT = env.bool('SECURE_SSL_REDIRECT', default=True)
@@ -125,6 +125,9 @@ CELERY_TASK_SERIALIZER = 'json'
 CELERY_RESULT_SERIALIZER = 'json'
 CELERY_TIMEZONE = TIME_ZONE
 
+# Downloads are streamed by nginx (X-Accel-Redirect) or S3 (presigned URLs)
+DOWNLOAD_BACKEND = env('DOWNLOAD_BACKEND', default='signed' if env.bool('USE_S3', default=False) else 'accel')
+
 # AWS S3 settings (if enabled)
 if env.bool('USE_S3', default=False):
     AWS_ACCESS_KEY_ID = env('AWS_ACCESS_KEY_ID')
@@ -137,8 +140,8 @@ if env.bool('USE_S3', default=False):
     AWS_S3_FILE_OVERWRITE = False
     
     # Static and media files on S3
-    STATICFILES_STORAGE = 'storages.backends.s3boto3.S3Boto3Storage'
-    DEFAULT_FILE_STORAGE = 'storages.backends.s3boto3.S3Boto3Storage'
+    STORAGES['staticfiles'] = {'BACKEND': 'storages.backends.s3boto3.S3Boto3Storage'}
+    TENANT_STORAGE_BACKEND = 'storages.backends.s3boto3.S3Boto3Storage'  # Wrapped by core.storage.TenantStorage
     STATIC_URL = f'https://{AWS_S3_CUSTOM_DOMAIN}/static/'
     MEDIA_URL = f'https://{AWS_S3_CUSTOM_DOMAIN}/media/'
 
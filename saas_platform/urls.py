@@ -21,6 +21,18 @@ urlpatterns = [
     # Core (Authentication, etc.)
     path('auth/', include('core.urls', namespace='auth')),
     
+    # Resumable chunked uploads
+    path('uploads/', include('core.upload_urls', namespace='uploads')),
+    
+    # File downloads (authorized, offloaded to nginx or S3)
+    path('files/', include('core.download_urls', namespace='files')),
+    
+    # Notification and message inbox
+    path('inbox/', include('core.inbox_urls', namespace='inbox')),
+    
+    # Live events (server-sent events, ASGI only)
+    path('events/', include('core.event_urls', namespace='events')),
+    
     # Company Admin App (Super Admin)
     path('company/', include('company_admin.urls', namespace='company_admin')),
     
@@ -0,0 +1,24 @@
+# Generated by Django 5.0 on 2026-10-19 00:28
+
+import core.blobs
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("student", "0003_tenant_scoped_indexes"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="studentresource",
+            name="file",
+            field=models.FileField(
+                blank=True,
+                max_length=255,
+                null=True,
+                storage=core.blobs.get_blob_storage,
+                upload_to="student_resources/",
+            ),
+        ),
+    ]
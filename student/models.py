@@ -5,6 +5,7 @@ Student-specific models for managing student notes, resources, library, and fees
 
 from django.db import models
 from django.core.validators import MinValueValidator, MaxValueValidator
+from core.blobs import get_blob_storage
 from core.models import BaseModel, Tenant, UserAccount, Section, Subject
 
 
@@ -73,7 +74,9 @@ class StudentResource(BaseModel):
         blank=True,
         related_name='student_resources'
     )
-    file = models.FileField(upload_to='student_resources/', blank=True, null=True)
+    file = models.FileField(
+        upload_to='student_resources/', storage=get_blob_storage, max_length=255, blank=True, null=True
+    )
     url = models.URLField(blank=True, null=True)
     accessed_date = models.DateTimeField(auto_now_add=True)
     download_count = models.PositiveIntegerField(default=0)
@@ -13,7 +13,7 @@ urlpatterns = [
     path('attendance/', views.attendance_view, name='attendance'),
     path('grades/', views.grades, name='grades'),
     path('assignments/', views.assignments, name='assignments'),
-    path('assignments/<int:assignment_id>/', views.assignment_detail, name='assignment_detail'),
+    path('assignments/<uuid:assignment_id>/', views.assignment_detail, name='assignment_detail'),
     path('exam-schedule/', views.exam_schedule, name='exam_schedule'),
     path('timetable/', views.timetable, name='timetable'),
     path('announcements/', views.announcements, name='announcements'),
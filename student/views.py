@@ -4,12 +4,15 @@ Views for student portal (12 pages)
 """
 
 from django.shortcuts import render, redirect, get_object_or_404
+from django.contrib import messages
 from django.contrib.auth.decorators import login_required
 from django.core.paginator import Paginator
 from django.utils import timezone
 from django.db.models import Count, Avg, Q, Sum
-from core.decorators import role_required
+from core.decorators import query_budget, role_required
 from core.models import Section, Subject, AcademicYear
+from core.uploads import UploadError, claim_upload
+from teacher.assignment_status import pending_work
 from teacher.models import Attendance, Assignment, AssignmentSubmission, Grade, TeacherResource
 from college_management.models import Timetable, ExamSchedule, Holiday, Announcement
 from .models import StudentNote, StudentResource, LibraryTransaction, FeePayment
@@ -38,14 +41,12 @@ def dashboard(request):
             academic_year__is_active=True
         ).order_by('period_number')
     
-    # Pending assignments
-    pending_assignments = Assignment.objects.filter(
-        section=section,
-        status='published',
-        due_date__gte=today
-    ).exclude(
-        assignmentsubmission__student=student
-    ).order_by('due_date')[:5]
+    # Pending assignments (teacher.assignment_status projection)
+    pending = pending_work(student)
+    pending_assignment_count = pending.count()
+    pending_assignments = [
+        status.assignment for status in pending.select_related('assignment__subject')[:5]
+    ]
     
     # Recent grades
     recent_grades = Grade.objects.filter(
@@ -77,6 +78,7 @@ def dashboard(request):
         'section': section,
         'todays_classes': todays_classes,
         'pending_assignments': pending_assignments,
+        'pending_assignment_count': pending_assignment_count,
         'recent_grades': recent_grades,
         'attendance_percentage': round(attendance_percentage, 2),
         'pending_fees': pending_fees,
@@ -113,6 +115,7 @@ def attendance_view(request):
 
 @login_required
 @role_required(['student'])
+@query_budget(17)
 def grades(request):
     """View grades and marks"""
     student = request.user
@@ -180,8 +183,16 @@ def assignment_detail(request, assignment_id):
     ).first()
     
     if request.method == 'POST' and not submission:
-        # Handle submission
-        file = request.FILES.get('file')
+        # Handle submission: a finished chunked upload, or a small direct file
+        upload_id = request.POST.get('upload_id')
+        if upload_id:
+            try:
+                file = claim_upload(student, upload_id, 'submission')
+            except UploadError as e:
+                messages.error(request, str(e))
+                return redirect('student:assignment_detail', assignment_id=assignment.id)
+        else:
+            file = request.FILES.get('file')
         remarks = request.POST.get('remarks', '')
         
         AssignmentSubmission.objects.create(
@@ -189,7 +200,7 @@ def assignment_detail(request, assignment_id):
             student=student,
             attachment=file,
             submission_date=timezone.now(),
-            is_late=timezone.now().date() > assignment.due_date,
+            is_late=timezone.now() > assignment.due_date,
             status='submitted'
         )
         return redirect('student:assignments')
@@ -296,6 +307,7 @@ def resources(request):
 
 @login_required
 @role_required(['student'])
+@query_budget(9)
 def communication(request):
     """Communication portal (placeholder)"""
     return render(request, 'student/communication.html')
@@ -316,6 +328,7 @@ def profile(request):
 
 @login_required
 @role_required(['student'])
+@query_budget(12)
 def fees(request):
     """View fee payments and dues"""
     student = request.user
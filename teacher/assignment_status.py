@@ -0,0 +1,216 @@
+"""
+Student Assignment Status Projection
+StudentAssignmentStatus holds one row per (student, assignment) for every
+published or closed assignment: pending, submitted, late or graded. It is
+kept in step by teacher.signals inside the same transaction as the change:
+- publishing an assignment bulk-creates a pending row for each student
+  enrolled in its section; closing it deactivates the rows, moving it back
+  to draft removes them
+- creating, grading or deleting a submission updates the student's row
+- a new or moved enrollment gets rows for the section's published
+  assignments; leaving a section drops its pending rows
+Pending work and completion rates are then counts on one indexed table
+instead of anti-joins between assignments and submissions. rebuild() (manage.py
+rebuild_assignment_statuses) recomputes the rows from scratch, e.g. after
+bulk updates that bypass signals.
+"""
+
+from django.db import transaction
+from django.db.models import Count
+from django.utils import timezone
+
+from core.db.sharding import directory, each_shard, get_current_shard, tenant_shard
+from core.models import StudentEnrollment
+from .models import Assignment, AssignmentSubmission, StudentAssignmentStatus
+
+# Assignments students see; drafts have no rows
+VISIBLE_STATUSES = ('published', 'closed')
+
+
+def submission_status(submission):
+    """Projection status for a submission"""
+    if submission.status in ('graded', 'returned'):
+        return 'graded'
+    return 'late' if submission.is_late else 'submitted'
+
+
+def sync_assignment(assignment, rebuild=False):
+    """
+    Bring an assignment's rows in line with its status, roster and due date
+
+    Args:
+        assignment: Assignment
+        rebuild: Recreate existing rows instead of keeping their status
+
+    Returns:
+        int: Students the assignment is given to
+    """
+    rows = StudentAssignmentStatus.all_objects.filter(assignment=assignment)
+    if assignment.status not in VISIBLE_STATUSES or assignment.is_deleted:
+        rows.delete()
+        return 0
+    if rebuild:
+        rows.delete()
+
+    submissions = {
+        submission.student_id: submission
+        for submission in AssignmentSubmission.objects.filter(assignment=assignment)
+    }
+    students = set(
+        StudentEnrollment.objects.filter(section_id=assignment.section_id, is_active=True)
+        .values_list('student_id', flat=True)
+    ) | set(submissions)
+    is_open = assignment.status == 'published'
+
+    StudentAssignmentStatus.objects.bulk_create([
+        StudentAssignmentStatus(
+            tenant_id=assignment.tenant_id,
+            assignment=assignment,
+            student_id=student_id,
+            status=submission_status(submissions[student_id]) if student_id in submissions else 'pending',
+            submitted_at=submissions[student_id].submission_date if student_id in submissions else None,
+            due_date=assignment.due_date,
+            is_active=is_open,
+        )
+        for student_id in students
+    ], batch_size=1000, ignore_conflicts=True)
+    rows.exclude(due_date=assignment.due_date, is_active=is_open).update(
+        due_date=assignment.due_date, is_active=is_open, updated_at=timezone.now()
+    )
+    return len(students)
+
+
+def sync_submission(submission, deleted=False):
+    """Update the submitting student's row"""
+    if deleted:
+        # Only reset existing rows: during a cascade the assignment is on its way out
+        StudentAssignmentStatus.objects.filter(
+            assignment_id=submission.assignment_id, student_id=submission.student_id
+        ).update(status='pending', submitted_at=None, updated_at=timezone.now())
+        return
+    assignment = submission.assignment
+    if assignment.status not in VISIBLE_STATUSES:
+        return
+    StudentAssignmentStatus.objects.update_or_create(
+        assignment=assignment,
+        student_id=submission.student_id,
+        defaults={
+            'tenant_id': assignment.tenant_id,
+            'status': submission_status(submission),
+            'submitted_at': submission.submission_date,
+            'due_date': assignment.due_date,
+            'is_active': assignment.status == 'published',
+        },
+    )
+
+
+def sync_enrollment(enrollment):
+    """
+    Bring a student's rows in line with their enrollments: pending rows of
+    sections they no longer attend are removed (handed-in work is kept, as
+    rebuild() does) and an active enrollment gets rows for its section's
+    open assignments
+    """
+    sections = StudentEnrollment.objects.filter(
+        student_id=enrollment.student_id, is_active=True
+    ).values('section_id')
+    StudentAssignmentStatus.objects.filter(student_id=enrollment.student_id, status='pending').exclude(
+        assignment__section_id__in=sections
+    ).delete()
+    if not enrollment.is_active or enrollment.is_deleted:
+        return
+
+    StudentAssignmentStatus.objects.bulk_create([
+        StudentAssignmentStatus(
+            tenant_id=assignment.tenant_id,
+            assignment_id=assignment.pk,
+            student_id=enrollment.student_id,
+            due_date=assignment.due_date,
+        )
+        for assignment in Assignment.objects.filter(section_id=enrollment.section_id, status='published')
+        .only('tenant_id', 'due_date')
+    ], ignore_conflicts=True)
+
+
+def pending_work(student):
+    """
+    Open assignments the student has not submitted, soonest due first
+
+    Served by the (tenant, is_deleted, student, is_active, status, due_date) index
+    """
+    return StudentAssignmentStatus.objects.filter(
+        student=student,
+        is_active=True,
+        status='pending',
+        due_date__gte=timezone.now(),
+    ).order_by('due_date')
+
+
+def pending_counts(students):
+    """Pending assignment count per student ID"""
+    return dict(
+        StudentAssignmentStatus.objects.filter(
+            student__in=students,
+            is_active=True,
+            status='pending',
+            due_date__gte=timezone.now(),
+        ).values_list('student_id').annotate(count=Count('id')).order_by()
+    )
+
+
+def completion(student, section):
+    """
+    Published assignments of the student's section and how many were handed in
+
+    Returns:
+        dict: total, completed and rate (percent)
+    """
+    counts = dict(
+        StudentAssignmentStatus.objects.filter(student=student, assignment__section=section, is_active=True)
+        .values_list('status').annotate(count=Count('id')).order_by()
+    )
+    total = sum(counts.values())
+    completed = total - counts.get('pending', 0)
+    return {
+        'total': total,
+        'completed': completed,
+        'rate': round(completed / total * 100, 2) if total else 0,
+    }
+
+
+def _rebuild_shard(alias, tenant, stdout):
+    assignments = Assignment.all_objects.exclude(tenant_id__in=directory.tenants_elsewhere(alias))
+    orphaned = StudentAssignmentStatus.all_objects.exclude(
+        assignment__status__in=VISIBLE_STATUSES, assignment__is_deleted=False
+    ).exclude(tenant_id__in=directory.tenants_elsewhere(alias))
+    if tenant is not None:
+        assignments = assignments.filter(tenant=tenant)
+        orphaned = orphaned.filter(tenant=tenant)
+    orphaned.delete()
+
+    written = 0
+    visible = assignments.filter(status__in=VISIBLE_STATUSES, is_deleted=False)
+    for number, assignment in enumerate(visible.iterator(), 1):
+        with transaction.atomic(using=alias):
+            written += sync_assignment(assignment, rebuild=True)
+        if stdout and number % 100 == 0:
+            stdout.write(f'  {number} assignments, {written} rows')
+    return written
+
+
+def rebuild(tenant=None, stdout=None):
+    """
+    Recompute every row, one assignment per transaction, on the tenant's
+    shard or on every shard in turn
+
+    Args:
+        tenant: Optional Tenant (or ID) to limit the rebuild to
+        stdout: Optional stream for progress lines
+
+    Returns:
+        int: Rows written
+    """
+    if tenant is not None:
+        with tenant_shard(tenant):
+            return _rebuild_shard(get_current_shard(), tenant, stdout)
+    return sum(_rebuild_shard(alias, None, stdout) for alias in each_shard())
@@ -0,0 +1,102 @@
+# Generated by Django 5.0 on 2026-10-19 00:07
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("core", "0006_tenant_scoped_indexes"),
+        ("teacher", "0002_uuid7_primary_keys"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="attendance",
+            name="attendances_student_1e9785_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="attendance",
+            name="attendances_teacher_2353cc_idx",
+        ),
+        migrations.AddField(
+            model_name="assignment",
+            name="is_deleted",
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name="assignmentsubmission",
+            name="is_deleted",
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name="attendance",
+            name="is_deleted",
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name="grade",
+            name="is_deleted",
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name="teachernote",
+            name="is_deleted",
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name="teacherresource",
+            name="is_deleted",
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddIndex(
+            model_name="assignment",
+            index=models.Index(
+                fields=["tenant", "is_deleted", "section", "status", "due_date"],
+                name="assignments_tenant__4c367f_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="assignment",
+            index=models.Index(
+                fields=["tenant", "is_deleted", "teacher", "created_at"],
+                name="assignments_tenant__c89333_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="attendance",
+            index=models.Index(
+                fields=["tenant", "is_deleted", "student", "date"],
+                name="attendances_tenant__c3c8db_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="attendance",
+            index=models.Index(
+                fields=["tenant", "is_deleted", "teacher", "date"],
+                name="attendances_tenant__9fa120_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="grade",
+            index=models.Index(
+                fields=["tenant", "is_deleted", "student", "is_published", "exam_date"],
+                name="grades_tenant__0a384e_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="grade",
+            index=models.Index(
+                fields=["tenant", "is_deleted", "teacher", "exam_date"],
+                name="grades_tenant__0ab1f6_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="teacherresource",
+            index=models.Index(
+                fields=["tenant", "is_deleted", "teacher", "created_at"],
+                name="teacher_res_tenant__c1db5d_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,92 @@
+# Generated by Django 5.0 on 2026-10-19 00:19
+
+import core.ids
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("core", "0006_tenant_scoped_indexes"),
+        ("teacher", "0003_tenant_scoped_indexes"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="StudentAssignmentStatus",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=core.ids.uuid7,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                ("is_active", models.BooleanField(default=True)),
+                ("is_deleted", models.BooleanField(default=False)),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("pending", "Pending"),
+                            ("submitted", "Submitted"),
+                            ("late", "Submitted Late"),
+                            ("graded", "Graded"),
+                        ],
+                        default="pending",
+                        max_length=10,
+                    ),
+                ),
+                ("due_date", models.DateTimeField()),
+                ("submitted_at", models.DateTimeField(blank=True, null=True)),
+                (
+                    "assignment",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="student_statuses",
+                        to="teacher.assignment",
+                    ),
+                ),
+                (
+                    "student",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="assignment_statuses",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                (
+                    "tenant",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="assignment_statuses",
+                        to="core.tenant",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "student_assignment_statuses",
+                "ordering": ["due_date"],
+                "indexes": [
+                    models.Index(
+                        fields=[
+                            "tenant",
+                            "is_deleted",
+                            "student",
+                            "is_active",
+                            "status",
+                            "due_date",
+                        ],
+                        name="student_ass_tenant__2c421e_idx",
+                    )
+                ],
+                "unique_together": {("assignment", "student")},
+            },
+        ),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 5.0 on 2026-10-19 00:28
+
+import core.blobs
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("teacher", "0004_student_assignment_status"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="assignment",
+            name="attachment",
+            field=models.FileField(
+                blank=True,
+                max_length=255,
+                null=True,
+                storage=core.blobs.get_blob_storage,
+                upload_to="assignments/%Y/%m/",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="assignmentsubmission",
+            name="attachment",
+            field=models.FileField(
+                max_length=255,
+                storage=core.blobs.get_blob_storage,
+                upload_to="submissions/%Y/%m/",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="teacherresource",
+            name="file",
+            field=models.FileField(
+                blank=True,
+                max_length=255,
+                null=True,
+                storage=core.blobs.get_blob_storage,
+                upload_to="teacher_resources/%Y/%m/",
+            ),
+        ),
+    ]
@@ -5,6 +5,8 @@ Teacher portal functionality for attendance, assignments, grades, etc.
 from django.db import models
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.utils import timezone
+from core.blobs import get_blob_storage
+from core.managers import tenant_index
 from core.models import BaseModel, Tenant, UserAccount, Section, Subject, AcademicYear
 
 
@@ -35,8 +37,8 @@ class Attendance(BaseModel):
         unique_together = ['student', 'section', 'subject', 'date']
         indexes = [
             models.Index(fields=['date', 'section']),
-            models.Index(fields=['student', 'date']),
-            models.Index(fields=['teacher', 'date']),
+            tenant_index('student', 'date'),
+            tenant_index('teacher', 'date'),
         ]
     
     def __str__(self):
@@ -61,7 +63,9 @@ class Assignment(BaseModel):
     
     title = models.CharField(max_length=200)
     description = models.TextField()
-    attachment = models.FileField(upload_to='assignments/%Y/%m/', null=True, blank=True)
+    attachment = models.FileField(
+        upload_to='assignments/%Y/%m/', storage=get_blob_storage, max_length=255, null=True, blank=True
+    )
     
     due_date = models.DateTimeField()
     max_marks = models.DecimalField(max_digits=6, decimal_places=2, default=100)
@@ -74,12 +78,35 @@ class Assignment(BaseModel):
         ordering = ['-created_at']
         indexes = [
             models.Index(fields=['section', 'subject']),
+            tenant_index('section', 'status', 'due_date'),
+            tenant_index('teacher', 'created_at'),
             models.Index(fields=['due_date']),
             models.Index(fields=['status']),
         ]
     
+    # Fields the StudentAssignmentStatus projection depends on (teacher.signals)
+    PROJECTED_FIELDS = ('status', 'due_date', 'section_id', 'is_deleted')
+    
     def __str__(self):
         return f"{self.title} - {self.section.name}"
+    
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance.mark_projected()
+        return instance
+    
+    def _projected_values(self):
+        # Deferred fields read as None, so they count as changed
+        return tuple(self.__dict__.get(field) for field in self.PROJECTED_FIELDS)
+    
+    def mark_projected(self):
+        """Remember the projected fields as saved"""
+        self._projected = self._projected_values()
+    
+    def projected_fields_changed(self):
+        """Whether a projected field differs from when it was loaded or last synced"""
+        return getattr(self, '_projected', None) != self._projected_values()
 
 
 class AssignmentSubmission(BaseModel):
@@ -96,7 +123,7 @@ class AssignmentSubmission(BaseModel):
     student = models.ForeignKey(UserAccount, on_delete=models.CASCADE, related_name='assignment_submissions')
     
     submission_date = models.DateTimeField(auto_now_add=True)
-    attachment = models.FileField(upload_to='submissions/%Y/%m/')
+    attachment = models.FileField(upload_to='submissions/%Y/%m/', storage=get_blob_storage, max_length=255)
     comments = models.TextField(blank=True)
     
     marks_obtained = models.DecimalField(max_digits=6, decimal_places=2, null=True, blank=True)
@@ -116,6 +143,40 @@ class AssignmentSubmission(BaseModel):
         return f"{self.assignment.title} - {self.student.get_full_name()}"
 
 
+class StudentAssignmentStatus(BaseModel):
+    """
+    Per-student state of each published assignment, maintained from
+    assignments, submissions and enrollments (teacher.assignment_status)
+    so pending work and completion rates are indexed counts
+    """
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('submitted', 'Submitted'),
+        ('late', 'Submitted Late'),
+        ('graded', 'Graded'),
+    ]
+    
+    tenant = models.ForeignKey(Tenant, on_delete=models.CASCADE, related_name='assignment_statuses')
+    assignment = models.ForeignKey(Assignment, on_delete=models.CASCADE, related_name='student_statuses')
+    student = models.ForeignKey(UserAccount, on_delete=models.CASCADE, related_name='assignment_statuses')
+    
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    # Copied from the assignment so pending work is filtered and sorted on this table
+    due_date = models.DateTimeField()
+    submitted_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        db_table = 'student_assignment_statuses'
+        ordering = ['due_date']
+        unique_together = ['assignment', 'student']
+        indexes = [
+            tenant_index('student', 'is_active', 'status', 'due_date'),
+        ]
+    
+    def __str__(self):
+        return f"{self.assignment.title} - {self.student.get_full_name()} - {self.status}"
+
+
 class Grade(BaseModel):
     """
     Grades/marks given by teachers for exams
@@ -144,6 +205,8 @@ class Grade(BaseModel):
         indexes = [
             models.Index(fields=['student', 'academic_year']),
             models.Index(fields=['subject', 'exam_date']),
+            tenant_index('student', 'is_published', 'exam_date'),
+            tenant_index('teacher', 'exam_date'),
             models.Index(fields=['is_published']),
         ]
     
@@ -178,7 +241,9 @@ class TeacherResource(BaseModel):
     title = models.CharField(max_length=200)
     description = models.TextField(blank=True)
     resource_type = models.CharField(max_length=20, choices=RESOURCE_TYPES)
-    file = models.FileField(upload_to='teacher_resources/%Y/%m/', null=True, blank=True)
+    file = models.FileField(
+        upload_to='teacher_resources/%Y/%m/', storage=get_blob_storage, max_length=255, null=True, blank=True
+    )
     url = models.URLField(blank=True, help_text='For video links or external resources')
     
     is_public = models.BooleanField(default=True, help_text='Visible to students')
@@ -189,6 +254,7 @@ class TeacherResource(BaseModel):
         indexes = [
             models.Index(fields=['subject', 'section']),
             models.Index(fields=['teacher', 'resource_type']),
+            tenant_index('teacher', 'created_at'),
         ]
     
     def __str__(self):
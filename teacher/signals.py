@@ -0,0 +1,62 @@
+"""
+Signals for teacher app
+Keep the StudentAssignmentStatus projection in step with assignments,
+submissions and enrollments (see teacher.assignment_status). Updates run in
+the same transaction as the change, so the projection never disagrees with
+committed data. Published grades are pushed to the student's and parents'
+live event streams once committed.
+"""
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from core.events import publish, user_channel
+from core.models import ParentStudentLink, StudentEnrollment
+from .assignment_status import sync_assignment, sync_enrollment, sync_submission
+from .models import Assignment, AssignmentSubmission, Grade
+
+
+@receiver(post_save, sender=Assignment)
+def sync_assignment_statuses(sender, instance, created, **kwargs):
+    """
+    Create, deactivate or remove students' rows as the assignment changes;
+    edits that leave status, due date, section and deletion alone skip it
+    """
+    if not created and not instance.projected_fields_changed():
+        return
+    sync_assignment(instance)
+    instance.mark_projected()
+
+
+@receiver(post_save, sender=AssignmentSubmission)
+def sync_submission_status(sender, instance, **kwargs):
+    """Mark the student's row submitted, late or graded"""
+    sync_submission(instance, deleted=instance.is_deleted)
+
+
+@receiver(post_delete, sender=AssignmentSubmission)
+def reset_submission_status(sender, instance, **kwargs):
+    """Put the student's row back to pending"""
+    sync_submission(instance, deleted=True)
+
+
+@receiver(post_save, sender=StudentEnrollment)
+def sync_enrollment_statuses(sender, instance, created, **kwargs):
+    """
+    Give new or moved students rows for the section's published assignments;
+    deactivating or moving an enrollment drops the old section's pending rows
+    """
+    if created and not instance.is_active:
+        return
+    sync_enrollment(instance)
+
+
+@receiver(post_save, sender=Grade)
+def push_published_grade(sender, instance, **kwargs):
+    """Tell the student and their parents a grade was published or changed"""
+    if not instance.is_published or instance.is_deleted:
+        return
+    recipients = [instance.student_id, *ParentStudentLink.objects.filter(
+        student_id=instance.student_id, is_active=True
+    ).values_list('parent_id', flat=True)]
+    data = {'subject': instance.subject.name, 'exam': instance.exam_name}
+    transaction.on_commit(lambda: publish([user_channel(user_id) for user_id in recipients], 'grade', data))
@@ -11,7 +11,7 @@ from django.core.paginator import Paginator
 from datetime import datetime, timedelta
 
 from core.models import UserAccount, Section, Subject, AcademicYear
-from core.decorators import role_required
+from core.decorators import query_budget, role_required
 from .models import Attendance, Assignment, AssignmentSubmission, Grade, TeacherResource, TeacherNote
 from college_management.models import Timetable, ExamSchedule
 
@@ -28,13 +28,11 @@ def dashboard(request):
     teaching_subjects = Subject.objects.filter(
         tenant=teacher.tenant,
         teachers=teacher,
-        is_deleted=False
     ).distinct()
     
     # Get teacher's sections
     teaching_sections = Section.objects.filter(
         tenant=teacher.tenant,
-        is_deleted=False
     ).filter(
         Q(class_teacher=teacher) | Q(timetable__teacher=teacher)
     ).distinct()
@@ -88,7 +86,6 @@ def my_classes(request):
     
     sections = Section.objects.filter(
         tenant=teacher.tenant,
-        is_deleted=False
     ).filter(
         Q(class_teacher=teacher) | Q(timetable__teacher=teacher)
     ).distinct().annotate(
@@ -123,7 +120,6 @@ def attendance_marking(request):
         from core.models import StudentEnrollment
         enrollments = StudentEnrollment.objects.filter(
             section=section,
-            is_deleted=False
         ).select_related('student')
         
         for enrollment in enrollments:
@@ -150,7 +146,6 @@ def attendance_marking(request):
     # Get sections and subjects for teacher
     sections = Section.objects.filter(
         tenant=teacher.tenant,
-        is_deleted=False
     ).filter(
         Q(class_teacher=teacher) | Q(timetable__teacher=teacher)
     ).distinct()
@@ -158,7 +153,6 @@ def attendance_marking(request):
     subjects = Subject.objects.filter(
         tenant=teacher.tenant,
         teachers=teacher,
-        is_deleted=False
     )
     
     context = {
@@ -171,6 +165,7 @@ def attendance_marking(request):
 
 @login_required
 @role_required(['teacher'])
+@query_budget(11)
 def grade_management(request):
     """
     Manage grades for students
@@ -195,6 +190,7 @@ def grade_management(request):
 
 @login_required
 @role_required(['teacher'])
+@query_budget(10)
 def assignments(request):
     """
     List all assignments created by teacher
@@ -257,7 +253,6 @@ def assignment_create(request):
     
     sections = Section.objects.filter(
         tenant=teacher.tenant,
-        is_deleted=False
     ).filter(
         Q(class_teacher=teacher) | Q(timetable__teacher=teacher)
     ).distinct()
@@ -265,7 +260,6 @@ def assignment_create(request):
     subjects = Subject.objects.filter(
         tenant=teacher.tenant,
         teachers=teacher,
-        is_deleted=False
     )
     
     context = {
@@ -299,6 +293,7 @@ def assignment_submissions(request, assignment_id):
 
 @login_required
 @role_required(['teacher'])
+@query_budget(9)
 def student_performance(request):
     """
     View student performance analytics
@@ -312,6 +307,7 @@ def student_performance(request):
 
 @login_required
 @role_required(['teacher'])
+@query_budget(10)
 def my_timetable(request):
     """
     Teacher's timetable
@@ -339,6 +335,7 @@ def my_timetable(request):
 
 @login_required
 @role_required(['teacher'])
+@query_budget(10)
 def exam_schedules(request):
     """
     View exam schedules
@@ -359,6 +356,7 @@ def exam_schedules(request):
 
 @login_required
 @role_required(['teacher'])
+@query_budget(10)
 def resources(request):
     """
     Teaching resources
@@ -382,6 +380,7 @@ def resources(request):
 
 @login_required
 @role_required(['teacher'])
+@query_budget(9)
 def communication(request):
     """
     Communication with students/parents
@@ -393,6 +392,7 @@ def communication(request):
 
 @login_required
 @role_required(['teacher'])
+@query_budget(9)
 def profile(request):
     """
     Teacher profile
@@ -408,6 +408,7 @@ def profile(request):
 
 @login_required
 @role_required(['teacher'])
+@query_budget(9)
 def reports(request):
     """
     Generate various reports
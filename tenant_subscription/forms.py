@@ -135,7 +135,7 @@ class TenantSignupForm(forms.Form):
         subdomain = self.cleaned_data['subdomain'].lower()
         
         # Check if subdomain already exists
-        if Tenant.objects.filter(subdomain=subdomain).exists():
+        if Tenant.all_objects.filter(subdomain=subdomain).exists():
             raise forms.ValidationError('This subdomain is already taken. Please choose another.')
         
         # Reserved subdomains
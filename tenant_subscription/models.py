@@ -6,6 +6,7 @@ from django.db import models
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.utils import timezone
 from decimal import Decimal
+from core.managers import tenant_index
 from core.models import BaseModel, Tenant, UserAccount
 
 
@@ -254,7 +255,7 @@ class Payment(BaseModel):
         db_table = 'payments'
         ordering = ['-created_at']
         indexes = [
-            models.Index(fields=['tenant', '-created_at']),
+            tenant_index('-created_at'),
             models.Index(fields=['status']),
             models.Index(fields=['transaction_id']),
             models.Index(fields=['stripe_payment_intent_id']),
@@ -360,7 +361,7 @@ class Invoice(BaseModel):
         db_table = 'invoices'
         ordering = ['-issue_date', '-created_at']
         indexes = [
-            models.Index(fields=['tenant', '-issue_date']),
+            tenant_index('-issue_date'),
             models.Index(fields=['status']),
             models.Index(fields=['invoice_number']),
             models.Index(fields=['due_date']),
@@ -423,7 +424,7 @@ class PaymentMethod(BaseModel):
         db_table = 'payment_methods'
         ordering = ['-is_default', '-created_at']
         indexes = [
-            models.Index(fields=['tenant', '-is_default']),
+            tenant_index('-is_default'),
         ]
     
     def __str__(self):
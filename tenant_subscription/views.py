@@ -28,6 +28,7 @@ from .forms import (
 from .stripe_utils import StripeService
 from core.models import Tenant, UserAccount, Role
 from core.utils import send_email_notification
+from core.mail import build_email, send_mass_email
 
 
 def pricing_page(request):
@@ -295,7 +296,7 @@ def onboarding_wizard(request):
     Onboarding Wizard Page
     Step-by-step setup guide
     """
-    if request.user.role.name != 'tenant_admin':
+    if request.user.role_name != 'tenant_admin':
         messages.error(request, 'Access denied. Only tenant admins can access onboarding.')
         return redirect('core:dashboard')
     
@@ -326,7 +327,7 @@ def import_users_page(request):
     Import Users Page
     Bulk import teachers/students from CSV
     """
-    if request.user.role.name != 'tenant_admin':
+    if request.user.role_name != 'tenant_admin':
         messages.error(request, 'Access denied.')
         return redirect('core:dashboard')
     
@@ -345,6 +346,7 @@ def import_users_page(request):
                 
                 imported_count = 0
                 errors = []
+                welcome_emails = []
                 
                 # Get role
                 role = Role.objects.get(name=user_type)
@@ -364,17 +366,25 @@ def import_users_page(request):
                         )
                         
                         if send_welcome:
-                            send_email_notification(
-                                to_email=user.email,
+                            welcome_emails.append(build_email(
                                 subject='Welcome to our platform',
-                                message=f'Your account has been created. Email: {user.email}'
-                            )
+                                recipient_list=[user.email],
+                                template_name='welcome',
+                                context={'user': user, 'tenant': request.user.tenant}
+                            ))
                         
                         imported_count += 1
                         
                     except Exception as e:
                         errors.append(f"Row {reader.line_num}: {str(e)}")
                 
+                # One connection per batch instead of one per user
+                if welcome_emails:
+                    try:
+                        send_mass_email(welcome_emails)
+                    except Exception as e:
+                        errors.append(f"Welcome emails: {str(e)}")
+                
                 if imported_count > 0:
                     messages.success(request, f'Successfully imported {imported_count} users!')
                 if errors:
@@ -421,20 +431,10 @@ def contact_sales_page(request):
         if form.is_valid():
             # Send email to sales team
             send_email_notification(
-                to_email=settings.SALES_EMAIL if hasattr(settings, 'SALES_EMAIL') else settings.DEFAULT_FROM_EMAIL,
                 subject=f'Sales Inquiry from {form.cleaned_data["institution_name"]}',
-                message=f"""
-                New sales inquiry:
-                
-                Name: {form.cleaned_data['name']}
-                Email: {form.cleaned_data['email']}
-                Phone: {form.cleaned_data['phone']}
-                Institution: {form.cleaned_data['institution_name']}
-                Students: {form.cleaned_data['number_of_students']}
-                
-                Message:
-                {form.cleaned_data['message']}
-                """
+                recipient_list=[getattr(settings, 'SALES_EMAIL', settings.DEFAULT_FROM_EMAIL)],
+                template_name='sales_inquiry',
+                context=form.cleaned_data
             )
             
             messages.success(request, 'Thank you! Our sales team will contact you shortly.')
@@ -0,0 +1,143 @@
+"""
+Tests for the per-student assignment status projection
+"""
+
+from datetime import date, timedelta
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+
+from core.datagen import DatasetOptions, generate_dataset
+from core.models import AcademicYear, Section, StudentEnrollment, Subject, UserAccount
+from teacher.assignment_status import completion, pending_counts, pending_work
+from teacher.models import Assignment, AssignmentSubmission, StudentAssignmentStatus
+
+
+@pytest.fixture
+def section(db):
+    generate_dataset(DatasetOptions(students=10, departments=1, sections_per_year=1,
+                                    audit_events_per_user=1, end_date=date(2026, 3, 31)))
+    return Section.objects.filter(student_enrollments__isnull=False).distinct().first()
+
+
+def make_assignment(section, status='published', days=7):
+    return Assignment.objects.create(
+        tenant=section.tenant,
+        teacher=UserAccount.objects.filter(tenant=section.tenant, role__name='teacher').first(),
+        section=section,
+        subject=Subject.objects.filter(department=section.department).first(),
+        academic_year=AcademicYear.objects.filter(tenant=section.tenant).first(),
+        title='Essay',
+        description='-',
+        due_date=timezone.now() + timedelta(days=days),
+        status=status,
+    )
+
+
+def submit(assignment, student, **kwargs):
+    return AssignmentSubmission.objects.create(assignment=assignment, student=student, attachment='a.pdf', **kwargs)
+
+
+@pytest.mark.integration
+class TestAssignmentStatusProjection:
+    """Test rows follow assignments, submissions and enrollments"""
+
+    def test_publishing_creates_pending_rows(self, section):
+        students = set(StudentEnrollment.objects.filter(section=section).values_list('student_id', flat=True))
+        draft = make_assignment(section, status='draft')
+        assert not StudentAssignmentStatus.objects.filter(assignment=draft).exists()
+
+        draft.status = 'published'
+        draft.save()
+        rows = StudentAssignmentStatus.objects.filter(assignment=draft)
+        assert set(rows.values_list('student_id', flat=True)) == students
+        assert set(rows.values_list('status', flat=True)) == {'pending'}
+
+        draft.status = 'draft'
+        draft.save()
+        assert not rows.exists()
+
+    def test_unrelated_edits_skip_the_projection(self, section, django_assert_num_queries):
+        assignment = Assignment.objects.get(pk=make_assignment(section).pk)
+        assignment.title = 'Long essay'
+        with django_assert_num_queries(1):
+            assignment.save()
+
+        assignment.due_date += timedelta(days=1)
+        assignment.save()
+        rows = StudentAssignmentStatus.objects.filter(assignment=assignment)
+        assert set(rows.values_list('due_date', flat=True)) == {assignment.due_date}
+
+    def test_submission_lifecycle(self, section):
+        assignment = make_assignment(section)
+        student = UserAccount.objects.get(pk=StudentEnrollment.objects.filter(section=section).first().student_id)
+        row = lambda: StudentAssignmentStatus.objects.get(assignment=assignment, student=student)
+
+        submission = submit(assignment, student, is_late=True)
+        assert row().status == 'late'
+        submission.status = 'graded'
+        submission.save()
+        assert row().status == 'graded'
+        submission.delete()
+        assert row().status == 'pending' and row().submitted_at is None
+
+    def test_pending_work_and_completion(self, section):
+        first, second = make_assignment(section), make_assignment(section, days=3)
+        make_assignment(section, days=-1)  # overdue
+        student = UserAccount.objects.get(pk=StudentEnrollment.objects.filter(section=section).first().student_id)
+        submit(first, student)
+
+        assert list(pending_work(student).values_list('assignment_id', flat=True)) == [second.pk]
+        assert pending_counts([student])[student.pk] == 1
+        assert completion(student, section) == {'total': 3, 'completed': 1, 'rate': 33.33}
+
+        # Closed assignments leave the completion rate, as in the section's list
+        second.status = 'closed'
+        second.save()
+        assert not pending_work(student).exists()
+        assert completion(student, section)['total'] == 2
+
+    def test_new_enrollment_gets_open_assignments(self, section):
+        assignment = make_assignment(section)
+        make_assignment(section, status='draft')
+        student = UserAccount.objects.filter(tenant=section.tenant, role__name='student').exclude(
+            enrollments__section=section
+        ).first() or UserAccount.objects.create_user(
+            email='new@example.edu', password='x', first_name='New', last_name='Student', tenant=section.tenant
+        )
+        StudentEnrollment.objects.create(tenant=section.tenant, student=student, section=section,
+                                         academic_year=section.academic_year, roll_number='R-99')
+
+        assert list(StudentAssignmentStatus.objects.filter(student=student).values_list(
+            'assignment_id', flat=True)) == [assignment.pk]
+
+    def test_leaving_a_section_drops_pending_rows(self, section):
+        make_assignment(section)
+        other = Section.objects.filter(tenant=section.tenant).exclude(pk=section.pk).first()
+        other_assignment = make_assignment(other)
+        enrollment = StudentEnrollment.objects.filter(section=section).exclude(
+            student__enrollments__section=other
+        ).first()
+        rows = StudentAssignmentStatus.objects.filter(student_id=enrollment.student_id)
+
+        enrollment.section = other
+        enrollment.save()
+        assert list(rows.values_list('assignment_id', flat=True)) == [other_assignment.pk]
+
+        enrollment.is_active = False
+        enrollment.save()
+        assert not rows.exists()
+
+    def test_rebuild_command(self, section):
+        assignment = make_assignment(section)
+        student = StudentEnrollment.objects.filter(section=section).first().student
+        submit(assignment, student)
+        expected = set(StudentAssignmentStatus.objects.values_list('student_id', 'status'))
+        StudentAssignmentStatus.objects.all().delete()
+
+        out = StringIO()
+        call_command('rebuild_assignment_statuses', '--tenant', section.tenant.slug, stdout=out)
+        assert set(StudentAssignmentStatus.objects.values_list('student_id', 'status')) == expected
+        assert (student.pk, 'submitted') in expected
@@ -0,0 +1,138 @@
+"""
+Tests for audit log archival and archive-spanning queries
+"""
+
+from datetime import timedelta
+
+import pytest
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from core.audit import archive_audit_logs, get_archive_storage, query_audit_logs
+from core.models import AuditLog, AuditLogArchive, Role, Tenant, UserAccount
+
+
+@pytest.fixture
+def archive_storage(tmp_path):
+    """Point archive storage at a temporary directory"""
+    options = {'location': str(tmp_path)}
+    with override_settings(
+        AUDIT_ARCHIVE_STORAGE='django.core.files.storage.FileSystemStorage',
+        AUDIT_ARCHIVE_STORAGE_OPTIONS=options,
+    ):
+        get_archive_storage.cache_clear()
+        yield tmp_path
+    get_archive_storage.cache_clear()
+
+
+@pytest.fixture
+def tenant(db):
+    return Tenant.objects.create(
+        name='Archive College',
+        slug='archive-college',
+        email='admin@archive.edu',
+        phone='1234567890',
+        address_line1='1 Main St',
+        city='City',
+        state='State',
+        country='Country',
+        postal_code='00000',
+    )
+
+
+def make_log(tenant, days_ago, action='update'):
+    log = AuditLog.objects.create(
+        tenant=tenant,
+        action=action,
+        resource_type='Student',
+        description=f'{action} {days_ago} days ago',
+    )
+    AuditLog.objects.filter(pk=log.pk).update(timestamp=timezone.now() - timedelta(days=days_ago))
+    return log
+
+
+@pytest.mark.unit
+@pytest.mark.django_db
+class TestAuditArchive:
+    """Test the audit archive pipeline"""
+
+    def test_archives_only_rows_past_retention(self, archive_storage, tenant):
+        """Old rows move to a segment, recent rows stay hot"""
+        old = [make_log(tenant, 200), make_log(tenant, 201)]
+        recent = make_log(tenant, 1)
+
+        totals = archive_audit_logs(older_than_days=90)
+
+        assert totals['rows'] == 2
+        assert list(AuditLog.objects.values_list('id', flat=True)) == [recent.id]
+
+        archives = AuditLogArchive.objects.filter(tenant=tenant)
+        assert sum(archive.row_count for archive in archives) == len(old)
+        for archive in archives:
+            assert (archive_storage / archive.storage_path).exists()
+
+    def test_segments_split_by_month(self, archive_storage, tenant):
+        """Each segment covers a single calendar month"""
+        make_log(tenant, 200)
+        make_log(tenant, 260)
+
+        totals = archive_audit_logs(older_than_days=90)
+
+        assert totals == {'rows': 2, 'segments': 2}
+
+    def test_batches_write_their_own_segments(self, archive_storage, tenant):
+        """A tenant-month archived over several batches spans several segments"""
+        make_log(tenant, 200)
+        make_log(tenant, 200)
+
+        totals = archive_audit_logs(older_than_days=90, batch_size=1)
+
+        assert totals == {'rows': 2, 'segments': 2}
+        assert AuditLogArchive.objects.filter(tenant=tenant).count() == 2
+
+    def test_query_spans_hot_and_archived(self, archive_storage, tenant):
+        """Query API merges archived and hot rows newest first"""
+        archived = make_log(tenant, 200, action='delete')
+        hot = make_log(tenant, 1)
+        archive_audit_logs(older_than_days=90)
+
+        results = list(query_audit_logs(tenant_id=tenant.id))
+
+        assert [log.id for log in results] == [hot.id, archived.id]
+        assert results[1].is_archived
+        assert results[1].action == 'delete'
+
+    def test_query_filters_archived_records(self, archive_storage, tenant):
+        """Filters apply to records read from segments"""
+        make_log(tenant, 200, action='delete')
+        kept = make_log(tenant, 201, action='create')
+        archive_audit_logs(older_than_days=90)
+
+        results = list(query_audit_logs(action='create', start=timezone.now() - timedelta(days=365)))
+
+        assert [log.id for log in results] == [kept.id]
+
+    def test_query_without_archives(self, archive_storage, tenant):
+        """include_archived=False reads the hot table only"""
+        make_log(tenant, 200)
+        archive_audit_logs(older_than_days=90)
+
+        assert list(query_audit_logs(include_archived=False)) == []
+
+    def test_audit_trail_rejects_impossible_dates(self, client, settings):
+        """An out-of-range date is reported instead of raising"""
+        settings.STORAGES = {
+            **settings.STORAGES,
+            'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+        }
+        role = Role.objects.create(name='super_admin', display_name='Super Admin', description='super_admin')
+        admin = UserAccount.objects.create_user(
+            email='admin@archive.edu', password='pass', first_name='Super', last_name='Admin', role=role,
+        )
+        client.force_login(admin)
+
+        response = client.get(reverse('company_admin:audit_trail'), {'start': '2024-02-30'}, HTTP_HOST='localhost')
+
+        assert response.status_code == 200
+        assert 'Enter valid dates' in response.content.decode()
@@ -0,0 +1,135 @@
+"""
+Tests for content-addressed file storage
+"""
+
+from io import StringIO
+
+import pytest
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from django.test import RequestFactory
+
+from core.blobs import adopt_existing, blob_storage, collect_garbage, count_references
+from core.models import FileBlob, Tenant, UserAccount
+from core.storage import TenantStorage, current_request
+from core.usage import get_usage
+from student.models import StudentResource
+
+DECK = b'%PDF slide deck ' * 64
+
+
+def make_tenant(slug):
+    return Tenant.objects.create(
+        name=slug, slug=slug, email=f'admin@{slug}.edu', phone='1234567890', address_line1='1 Main St',
+        city='City', state='State', country='Country', postal_code='00000', max_storage_gb=1,
+    )
+
+
+@pytest.fixture
+def user(db, settings, tmp_path):
+    cache.clear()
+    settings.TENANT_STORAGE_BACKEND = 'django.core.files.storage.FileSystemStorage'
+    settings.MEDIA_ROOT = str(tmp_path)
+    user = UserAccount.objects.create_user(
+        email='teacher@blob.edu', password='pass', first_name='T', last_name='U', tenant=make_tenant('blob-college')
+    )
+    request = RequestFactory().post('/upload/')
+    request.user = user
+    token = current_request.set(request)
+    yield user
+    current_request.reset(token)
+
+
+def resource(user, name, content):
+    row = StudentResource(student=user, resource_title=name)
+    row.file.save(name, ContentFile(content))
+    return row
+
+
+@pytest.mark.unit
+@pytest.mark.django_db
+class TestBlobStorage:
+    """Test deduplicated saves and reference counting"""
+
+    def test_identical_uploads_share_one_blob(self, user):
+        first = resource(user, 'deck.pdf', DECK)
+        second = resource(user, 'deck-copy.pdf', DECK)
+        other = resource(user, 'notes.pdf', b'other notes')
+
+        assert first.file.name == second.file.name != other.file.name
+        assert first.file.name.startswith(f'tenants/{user.tenant_id}/blobs/')
+        assert FileBlob.objects.get(storage_name=first.file.name).ref_count == 2
+        assert get_usage(user.tenant, 'storage') == len(DECK) + len(b'other notes')
+        assert blob_storage.open(second.file.name).read() == DECK
+
+    def test_blobs_are_per_tenant(self, user):
+        first = resource(user, 'deck.pdf', DECK)
+        other_tenant = make_tenant('other-college')
+        name = blob_storage.save_for_tenant(other_tenant, 'deck.pdf', ContentFile(DECK))
+
+        assert name != first.file.name
+        assert FileBlob.objects.filter(sha256=FileBlob.objects.get(storage_name=name).sha256).count() == 2
+        assert get_usage(other_tenant, 'storage') == len(DECK)
+
+    def test_delete_defers_to_garbage_collection(self, user):
+        first = resource(user, 'deck.pdf', DECK)
+        second = resource(user, 'deck.pdf', DECK)
+        name = first.file.name
+
+        first.file.delete()
+        assert FileBlob.objects.get(storage_name=name).ref_count == 1
+        assert collect_garbage(grace_hours=0)['removed'] == 0
+
+        second.file.delete()
+        assert collect_garbage(grace_hours=24)['removed'] == 0  # Within the grace period
+        assert blob_storage.exists(name)
+        assert collect_garbage(grace_hours=0) == {'recounted': 0, 'removed': 1, 'bytes': len(DECK)}
+        assert not blob_storage.exists(name)
+        assert not FileBlob.objects.exists()
+        assert get_usage(user.tenant, 'storage') == 0
+
+
+@pytest.mark.unit
+@pytest.mark.django_db
+class TestBlobGarbageCollection:
+    """Test reference recounting and adoption of older files"""
+
+    def test_recount_follows_rows(self, user):
+        kept = resource(user, 'deck.pdf', DECK)
+        dropped = resource(user, 'notes.pdf', b'notes')
+        StudentResource.objects.filter(pk=dropped.pk).delete()  # Row gone, storage never told
+        FileBlob.objects.update(ref_count=5)
+
+        assert count_references() == {kept.file.name: 1}
+        assert collect_garbage(grace_hours=0, dry_run=True) == {'recounted': 2, 'removed': 1, 'bytes': 5}
+        assert set(FileBlob.objects.values_list('ref_count', flat=True)) == {5}
+
+        assert collect_garbage(grace_hours=0)['removed'] == 1
+        assert list(FileBlob.objects.values_list('storage_name', 'ref_count')) == [(kept.file.name, 1)]
+
+    def test_soft_deleted_rows_keep_their_blob(self, user):
+        row = resource(user, 'deck.pdf', DECK)
+        row.soft_delete()
+
+        assert collect_garbage(grace_hours=0)['removed'] == 0
+
+    def test_adopt_existing_files(self, user):
+        plain = TenantStorage()
+        names = [plain.save(f'student_resources/deck{n}.pdf', ContentFile(DECK)) for n in range(3)]
+        for n, name in enumerate(names):
+            StudentResource.objects.create(student=user, resource_title=f'Deck {n}', file=name)
+        StudentResource.objects.create(student=user, resource_title='Shared', file=names[0])
+        assert get_usage(user.tenant, 'storage') == 3 * len(DECK)
+
+        out = StringIO()
+        call_command('gc_blobs', '--adopt-existing', '--grace-hours', '0', stdout=out)
+
+        assert 'Adopted 3 files' in out.getvalue()
+        blob = FileBlob.objects.get()
+        assert set(StudentResource.objects.values_list('file', flat=True)) == {blob.storage_name}
+        assert blob.ref_count == 4
+        assert not any(plain.exists(name) for name in names)
+        assert get_usage(user.tenant, 'storage') == len(DECK)
+        # Adopted files are blobs now; a second pass finds nothing
+        assert adopt_existing() == 0
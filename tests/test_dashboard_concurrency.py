@@ -0,0 +1,99 @@
+"""
+Tests for the dashboards and concurrent dashboard queries
+"""
+
+from datetime import date
+import threading
+
+import pytest
+from django.urls import reverse
+
+from core.concurrency import gather_queries
+from core.datagen import DatasetOptions, generate_dataset
+from core.models import Department, Role, UserAccount
+from core.query_budget import QueryRecorder
+
+
+def thread_name():
+    return threading.current_thread().name
+
+
+@pytest.mark.unit
+@pytest.mark.django_db
+class TestGatherQueries:
+    """Test running independent queries on the pool (workers check their connection first)"""
+
+    @pytest.fixture(autouse=True)
+    def concurrent(self, settings):
+        settings.DASHBOARD_CONCURRENT_QUERIES = True
+
+    def test_results_keep_names_and_run_on_pool(self):
+        results = gather_queries({'a': lambda: 1, 'b': thread_name, 'c': lambda: [3]})
+
+        assert list(results) == ['a', 'b', 'c']
+        assert results['a'] == 1 and results['c'] == [3]
+        assert results['b'].startswith('dashboard-query')
+
+    def test_exceptions_propagate(self):
+        def fail():
+            raise ValueError('boom')
+
+        with pytest.raises(ValueError):
+            gather_queries({'ok': lambda: 1, 'fail': fail})
+
+    def test_sequential_when_disabled(self, settings):
+        settings.DASHBOARD_CONCURRENT_QUERIES = False
+        results = gather_queries({'a': thread_name, 'b': thread_name})
+
+        assert not results['a'].startswith('dashboard-query')
+        assert results['a'] == results['b']
+
+
+@pytest.mark.integration
+@pytest.mark.django_db(transaction=True)
+class TestDashboards:
+    """Test the dashboards end to end (pool threads use their own connections)"""
+
+    @pytest.fixture
+    def tenant_admin(self, settings):
+        settings.STORAGES = {
+            **settings.STORAGES,
+            'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+        }
+        generate_dataset(DatasetOptions(students=5, departments=2, sections_per_year=1,
+                                        audit_events_per_user=1, end_date=date(2026, 3, 31)))
+        return UserAccount.objects.get(role__name='tenant_admin')
+
+    def test_pool_queries_are_recorded(self, settings, tenant_admin):
+        settings.DASHBOARD_CONCURRENT_QUERIES = True
+        with QueryRecorder() as recorder:
+            results = gather_queries({
+                'departments': lambda: Department.objects.count(),
+                'roles': lambda: Role.objects.count(),
+            })
+
+        assert results['departments'] == 2
+        assert recorder.count == 2
+
+    @pytest.mark.parametrize('concurrent', [False, True])
+    def test_college_dashboard_renders_metrics(self, client, settings, tenant_admin, concurrent):
+        settings.DASHBOARD_CONCURRENT_QUERIES = concurrent
+        client.force_login(tenant_admin)
+        response = client.get(reverse('college:dashboard'), HTTP_HOST='localhost')
+
+        assert response.status_code == 200
+        assert response.context['total_departments'] == 2
+        assert response.context['total_students'] == 5
+
+    def test_anonymous_user_is_redirected(self, client, settings):
+        response = client.get(reverse('college:dashboard'), HTTP_HOST='localhost')
+
+        assert response.status_code == 302
+        assert response.url.startswith(settings.LOGIN_URL)
+
+    def test_wrong_role_is_redirected(self, client, tenant_admin):
+        client.force_login(tenant_admin)
+        response = client.get(reverse('company_admin:dashboard'), HTTP_HOST='localhost')
+
+        assert response.status_code == 302
+        assert response.url == reverse('auth:dashboard')
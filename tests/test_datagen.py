@@ -0,0 +1,82 @@
+"""
+Tests for the synthetic dataset generator
+"""
+
+from datetime import date
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+from core.datagen import DatasetOptions, generate_dataset
+from core.models import AuditLog, StudentEnrollment, Tenant, UserAccount
+from core.usage import get_usage
+from teacher.models import Attendance, Grade
+from tenant_subscription.models import Payment
+
+END_DATE = date(2026, 3, 31)
+
+
+def small_dataset(**overrides):
+    options = dict(students=40, departments=2, sections_per_year=1, years=2, audit_events_per_user=3,
+                   end_date=END_DATE, chunk_size=100)
+    options.update(overrides)
+    return generate_dataset(DatasetOptions(**options))
+
+
+@pytest.mark.unit
+@pytest.mark.django_db
+class TestDatasetGenerator:
+    """Test generated volumes, distributions and determinism"""
+
+    def test_generates_every_model(self):
+        summary = small_dataset()
+        tenant = Tenant.objects.get(pk=summary.tenant_ids[0])
+
+        assert UserAccount.objects.filter(tenant=tenant, role__name='student').count() == 40
+        assert StudentEnrollment.objects.filter(tenant=tenant).count() == summary.counts['StudentEnrollment']
+        assert Attendance.objects.filter(tenant=tenant).count() == summary.counts['Attendance'] > 40 * 100
+        assert Grade.objects.filter(tenant=tenant).exists()
+        assert Payment.objects.filter(tenant=tenant).count() == summary.counts['Payment'] >= 12
+        assert get_usage(tenant, 'students') == 40
+
+    def test_history_keeps_generated_timestamps(self):
+        small_dataset()
+
+        oldest = AuditLog.objects.order_by('timestamp').first()
+        assert oldest.timestamp.date() < date(2025, 6, 1)
+        assert Attendance.objects.order_by('date').first().created_at.date() < date(2025, 6, 1)
+        assert not Attendance.objects.filter(date__gt=END_DATE).exists()
+
+    def test_attendance_is_mostly_present(self):
+        small_dataset()
+        present = Attendance.objects.filter(status='present').count()
+        assert present / Attendance.objects.count() > 0.75
+
+    def test_same_seed_same_dataset(self):
+        def fingerprint():
+            return (
+                list(Attendance.objects.order_by('id').values_list('id', 'status')[:200]),
+                list(Grade.objects.order_by('id').values_list('id', 'marks_obtained')[:200]),
+            )
+
+        small_dataset()
+        first = fingerprint()
+        Tenant.objects.all().delete()
+        small_dataset()
+
+        assert fingerprint() == first
+
+    def test_command_refuses_to_overwrite(self):
+        args = ['--students', '10', '--departments', '1', '--sections-per-year', '1',
+                '--audit-events', '1', '--end-date', '2026-03-31']
+        call_command('generate_dataset', *args, stdout=StringIO())
+
+        with pytest.raises(CommandError):
+            call_command('generate_dataset', *args, stdout=StringIO())
+
+        out = StringIO()
+        call_command('generate_dataset', *args, '--replace', stdout=out)
+        assert 'Generated' in out.getvalue()
+        assert Tenant.objects.count() == 1
@@ -0,0 +1,163 @@
+"""
+Tests for database connection pooling and connection metrics
+"""
+
+import json
+import sqlite3
+import threading
+import time
+
+import pytest
+from django.db.utils import ConnectionHandler
+from django.test import RequestFactory
+
+from core.db import pool as db_pool
+from core.db.pool import ConnectionPool, PoolTimeout, configure_worker_connections, connection_stats
+from core.health_views import health_check
+
+
+class FakeConnection:
+    def __init__(self):
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.mark.unit
+class TestConnectionPool:
+    """Test checkout, bounds, health checks and recycling"""
+
+    def test_released_connection_is_reused(self):
+        pool = ConnectionPool('default', size=2)
+        raw = pool.acquire(FakeConnection)
+        pool.release(raw)
+
+        assert pool.acquire(FakeConnection) is raw
+        assert pool.stats()['opened'] == 1
+        assert pool.stats()['reused'] == 1
+
+    def test_full_pool_times_out(self):
+        pool = ConnectionPool('default', size=1, timeout=0.05)
+        pool.acquire(FakeConnection)
+
+        with pytest.raises(PoolTimeout):
+            pool.acquire(FakeConnection)
+        assert pool.stats()['timeouts'] == 1
+        assert pool.stats()['in_use'] == 1
+
+    def test_waiter_gets_released_connection(self):
+        pool = ConnectionPool('default', size=1, timeout=5)
+        raw = pool.acquire(FakeConnection)
+        threading.Timer(0.05, pool.release, args=(raw,)).start()
+
+        assert pool.acquire(FakeConnection) is raw
+        stats = pool.stats()
+        assert stats['waits'] == 1
+        assert stats['wait_ms_max'] >= 40
+
+    def test_failed_ping_replaces_connection(self):
+        pool = ConnectionPool('default', size=1)
+        stale = pool.acquire(FakeConnection)
+        pool.release(stale)
+
+        fresh = pool.acquire(FakeConnection, ping=lambda raw: False)
+        assert fresh is not stale
+        assert stale.closed
+        assert pool.stats()['closed'] == 1
+
+    def test_expired_and_broken_connections_are_closed_on_release(self):
+        pool = ConnectionPool('default', size=2, recycle=0)
+        raw = pool.acquire(FakeConnection)
+        time.sleep(0.01)
+        pool.release(raw)
+        assert raw.closed
+
+        pool = ConnectionPool('default', size=2)
+        raw = pool.acquire(FakeConnection)
+        pool.release(raw, reset=lambda conn: conn.missing_method())
+        assert raw.closed
+        assert pool.stats()['idle'] == 0
+
+
+@pytest.mark.integration
+@pytest.mark.django_db
+class TestPooledBackend:
+    """Test the pooled SQLite backend and the metrics endpoint"""
+
+    def test_threads_share_pooled_connections(self, tmp_path):
+        # Pools live for the process; a fresh alias gets a fresh one
+        alias = f'pooled-{tmp_path.name}'
+        handler = ConnectionHandler({
+            'default': {'ENGINE': 'django.db.backends.sqlite3', 'NAME': ':memory:'},
+            alias: {
+                'ENGINE': 'core.db.backends.sqlite3',
+                'NAME': str(tmp_path / 'pooled.sqlite3'),
+                'POOL': {'SIZE': 1, 'TIMEOUT': 5},
+            }
+        })
+        raws = []
+
+        def use_connection():
+            connection = handler[alias]
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT 1')
+            raws.append(connection.connection)
+            connection.close()
+
+        for _ in range(3):
+            thread = threading.Thread(target=use_connection)
+            thread.start()
+            thread.join()
+
+        assert len(set(map(id, raws))) == 1
+        assert isinstance(raws[0], sqlite3.Connection)
+        stats = handler[alias].get_pool().stats()
+        assert stats['opened'] == 1
+        assert stats['reused'] == 2
+        assert stats['idle'] == 1
+        # Checkouts of the pooled connection are not new connections
+        assert db_pool._opened[alias] == 1
+
+    def test_in_memory_database_is_not_pooled(self):
+        alias = 'pooled-memory'
+        handler = ConnectionHandler({
+            'default': {'ENGINE': 'django.db.backends.sqlite3', 'NAME': ':memory:'},
+            alias: {'ENGINE': 'core.db.backends.sqlite3', 'NAME': ':memory:', 'POOL': {'SIZE': 1, 'TIMEOUT': 0.1}},
+        })
+
+        def use_connection():
+            connection = handler[alias]
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT 1')
+            connection.close()
+
+        # Each thread keeps its own connection; none waits for a pool slot
+        for _ in range(2):
+            thread = threading.Thread(target=use_connection)
+            thread.start()
+            thread.join()
+
+        assert handler[alias].get_pool().stats()['checkouts'] == 0
+        assert db_pool._opened[alias] == 2
+
+    def test_health_reports_connection_metrics(self):
+        response = health_check(RequestFactory().get('/health/'))
+
+        default = json.loads(response.content)['database_connections']['default']
+        assert default['connections_opened'] >= 1
+        assert 'conn_max_age' in default
+        assert default == connection_stats()['default']
+
+    def test_worker_tuning(self):
+        from django.db import connections
+
+        settings_dict = connections.settings['default']
+        before = settings_dict['CONN_MAX_AGE'], settings_dict.get('POOL')
+        settings_dict['POOL'] = {'SIZE': 20, 'TIMEOUT': 5}
+        try:
+            configure_worker_connections(600, 2)
+            assert settings_dict['CONN_MAX_AGE'] == 600
+            assert settings_dict['POOL'] == {'SIZE': 2, 'TIMEOUT': 5}
+        finally:
+            settings_dict['CONN_MAX_AGE'], settings_dict['POOL'] = before
@@ -0,0 +1,181 @@
+"""
+Tests for the download gateway
+"""
+
+from datetime import date, timedelta
+import hashlib
+from types import SimpleNamespace
+
+import pytest
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.urls import reverse
+from django.utils import timezone
+
+from core.blobs import blob_storage
+from core.datagen import DatasetOptions, generate_dataset
+from core.downloads import parse_range, signed_response
+from core.models import AcademicYear, ParentStudentLink, Section, StudentEnrollment, Subject, UserAccount
+from teacher.models import Assignment, AssignmentSubmission, TeacherResource
+
+DATA = bytes(range(256)) * 8
+
+
+@pytest.fixture
+def school(db, settings, tmp_path):
+    cache.clear()
+    settings.TENANT_STORAGE_BACKEND = 'django.core.files.storage.FileSystemStorage'
+    settings.MEDIA_ROOT = str(tmp_path)
+    settings.DOWNLOAD_BACKEND = 'django'
+    generate_dataset(DatasetOptions(tenants=2, students=6, departments=1, sections_per_year=1,
+                                    audit_events_per_user=1, end_date=date(2026, 3, 31)))
+    section = Section.objects.filter(student_enrollments__isnull=False).first()
+    tenant = section.tenant
+    enrolled = StudentEnrollment.objects.filter(section=section).values_list('student_id', flat=True)
+    teacher = UserAccount.objects.filter(tenant=tenant, role__name='teacher').first()
+    student = UserAccount.objects.get(pk=enrolled[0])
+    name = blob_storage.save_for_tenant(tenant, 'deck.pdf', ContentFile(DATA))
+
+    common = {'tenant': tenant, 'teacher': teacher, 'subject': Subject.objects.filter(tenant=tenant).first()}
+    assignment = Assignment.objects.create(
+        section=section, academic_year=AcademicYear.objects.filter(tenant=tenant).first(), title='Lab Report',
+        description='-', due_date=timezone.now() + timedelta(days=3), status='published', attachment=name, **common,
+    )
+    return SimpleNamespace(
+        tenant=tenant, section=section, teacher=teacher, student=student, blob=name, assignment=assignment,
+        resource=TeacherResource.objects.create(section=section, title='Week 1 Slides', resource_type='notes',
+                                                file=name, **common),
+        submission=AssignmentSubmission.objects.create(assignment=assignment, student=student, attachment=name),
+        outsider=UserAccount.objects.filter(role__name='student').exclude(tenant=tenant).first(),
+        classmate=UserAccount.objects.get(pk=enrolled[1]),
+        parent=ParentStudentLink.objects.filter(student=student).first().parent,
+    )
+
+
+def url(kind, pk):
+    return reverse('files:download', args=[kind, pk])
+
+
+@pytest.mark.integration
+class TestDownloadAuthorization:
+    """Test tenant, role and ownership checks"""
+
+    def test_access_rules(self, client, school):
+        cases = [
+            (school.teacher, 'teacher_resource', school.resource, 200),
+            (school.student, 'teacher_resource', school.resource, 200),
+            (school.outsider, 'teacher_resource', school.resource, 404),
+            (school.student, 'assignment', school.assignment, 200),
+            (school.parent, 'assignment', school.assignment, 200),
+            (school.student, 'submission', school.submission, 200),
+            (school.parent, 'submission', school.submission, 200),
+            (school.teacher, 'submission', school.submission, 200),
+            (school.classmate, 'submission', school.submission, 404),
+        ]
+        for user, kind, obj, status in cases:
+            client.force_login(user)
+            assert client.get(url(kind, obj.pk)).status_code == status, (user.email, kind)
+
+    def test_private_resource_hidden_from_students(self, client, school):
+        TeacherResource.objects.filter(pk=school.resource.pk).update(is_public=False)
+        client.force_login(school.student)
+        assert client.get(url('teacher_resource', school.resource.pk)).status_code == 404
+
+    def test_login_required_except_branding(self, client, school):
+        assert client.get(url('teacher_resource', school.resource.pk)).status_code == 302
+        assert client.get(url('tenant_logo', school.tenant.pk)).status_code == 404  # No logo uploaded
+        assert client.get(url('unknown', school.tenant.pk)).status_code == 404
+
+
+@pytest.mark.integration
+class TestDownloadServing:
+    """Test offload, Range and cache headers"""
+
+    def test_streamed_download(self, client, school):
+        client.force_login(school.student)
+        response = client.get(url('teacher_resource', school.resource.pk))
+
+        assert b''.join(response.streaming_content) == DATA
+        assert response['Content-Disposition'] == 'attachment; filename="week-1-slides.pdf"'
+        assert response['Content-Type'] == 'application/pdf'
+        assert response['ETag'] == f'"{hashlib.sha256(DATA).hexdigest()}"'
+        assert response['Cache-Control'] == 'private, max-age=3600'
+        assert response['Accept-Ranges'] == 'bytes'
+
+    def test_range_requests(self, client, school):
+        client.force_login(school.student)
+        path = url('teacher_resource', school.resource.pk)
+
+        response = client.get(path, HTTP_RANGE='bytes=10-19')
+        assert response.status_code == 206
+        assert response['Content-Range'] == f'bytes 10-19/{len(DATA)}'
+        assert b''.join(response.streaming_content) == DATA[10:20]
+
+        response = client.get(path, HTTP_RANGE='bytes=-5')
+        assert b''.join(response.streaming_content) == DATA[-5:]
+
+        response = client.get(path, HTTP_RANGE=f'bytes={len(DATA)}-')
+        assert response.status_code == 416
+        assert response['Content-Range'] == f'bytes */{len(DATA)}'
+
+        # If-Range with a stale validator gets the whole file
+        assert client.get(path, HTTP_RANGE='bytes=0-0', HTTP_IF_RANGE='"stale"').status_code == 200
+
+    def test_revalidation(self, client, school):
+        client.force_login(school.student)
+        etag = f'"{hashlib.sha256(DATA).hexdigest()}"'
+        response = client.get(url('teacher_resource', school.resource.pk), HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304
+
+    def test_accel_redirect(self, client, school, settings):
+        settings.DOWNLOAD_BACKEND = 'accel'
+        client.force_login(school.student)
+        response = client.get(url('submission', school.submission.pk) + '?inline=1')
+
+        assert response.status_code == 200
+        assert response.content == b''
+        assert response['X-Accel-Redirect'] == f'/protected-media/{school.blob}'
+        assert response['Content-Disposition'] == 'inline; filename="lab-report.pdf"'
+
+    def test_html_upload_is_never_inline(self, client, school):
+        name = blob_storage.save_for_tenant(school.tenant, 'essay.html', ContentFile(b'<script>alert(1)</script>'))
+        AssignmentSubmission.objects.filter(pk=school.submission.pk).update(attachment=name)
+        client.force_login(school.teacher)
+        response = client.get(url('submission', school.submission.pk) + '?inline=1')
+
+        assert response.status_code == 200
+        assert response['Content-Disposition'] == 'attachment; filename="lab-report.html"'
+        assert response['Content-Security-Policy'] == 'sandbox'
+        assert response['X-Content-Type-Options'] == 'nosniff'
+
+    def test_signed_redirect(self, settings):
+        calls = []
+        client = SimpleNamespace(generate_presigned_url=lambda *args, **kwargs: calls.append(kwargs) or 'https://s3/x?sig')
+        backend = SimpleNamespace(
+            bucket=SimpleNamespace(name='media', meta=SimpleNamespace(client=client)),
+            _normalize_name=lambda name: f'media/{name}',
+        )
+        response = signed_response(
+            SimpleNamespace(backend=backend), 'a.pdf', 'attachment; filename="a.pdf"', 'private', 'application/pdf'
+        )
+
+        assert response.status_code == 302 and response['Location'] == 'https://s3/x?sig'
+        assert calls[0]['ExpiresIn'] == settings.DOWNLOAD_URL_EXPIRY
+        assert calls[0]['Params']['Key'] == 'media/a.pdf'
+        assert calls[0]['Params']['ResponseContentDisposition'] == 'attachment; filename="a.pdf"'
+        assert calls[0]['Params']['ResponseContentType'] == 'application/pdf'
+
+
+@pytest.mark.unit
+class TestParseRange:
+    """Test Range header parsing"""
+
+    def test_ranges(self):
+        assert parse_range('bytes=0-9', 100) == (0, 9)
+        assert parse_range('bytes=90-', 100) == (90, 99)
+        assert parse_range('bytes=50-500', 100) == (50, 99)
+        assert parse_range('bytes=-10', 100) == (90, 99)
+        assert parse_range('bytes=0-1,5-6', 100) is None  # Multipart ranges: whole file
+        assert parse_range(None, 100) is None
+        with pytest.raises(ValueError):
+            parse_range('bytes=100-', 100)
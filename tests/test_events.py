@@ -0,0 +1,215 @@
+"""
+Tests for live event streams
+"""
+
+import asyncio
+from datetime import date
+
+import pytest
+from asgiref.sync import async_to_sync, sync_to_async
+from django.test import AsyncClient
+from django.urls import reverse
+
+from core import events
+from core.datagen import DatasetOptions, generate_dataset
+from core.events import (
+    StreamLimitExceeded, event_stream, get_hub, publish, tenant_channel, user_channel
+)
+from core.models import Message, ParentStudentLink, Role, Tenant, UserAccount
+
+
+@pytest.fixture(autouse=True)
+def memory_broker(settings):
+    settings.EVENTS_BROKER = 'memory'
+    settings.EVENTS_HEARTBEAT_SECONDS = 5
+    events.reset_broker()
+    yield
+    events.reset_broker()
+
+
+async def frames(stream, count):
+    return [await asyncio.wait_for(anext(stream), 1) for _ in range(count)]
+
+
+@pytest.mark.unit
+class TestHub:
+    """Test channels, backpressure and caps"""
+
+    def test_events_reach_subscribed_channels_only(self):
+        async def run():
+            hub = get_hub()
+            stream = event_stream(hub, await hub.open('u1', [user_channel('u1'), tenant_channel('t1')]))
+            assert (await frames(stream, 1))[0].startswith('retry: ')
+
+            publish([user_channel('u2')], 'notification', {'title': 'Not yours'})
+            publish([user_channel('u1')], 'notification', {'title': 'Exam'})
+            publish([tenant_channel('t1')], 'announcement', {'title': 'Holiday'})
+            received = await frames(stream, 2)
+            await stream.aclose()
+            return received, hub
+
+        received, hub = async_to_sync(run)()
+        assert received == [
+            'event: notification\ndata: {"title": "Exam"}\n\n',
+            'event: announcement\ndata: {"title": "Holiday"}\n\n',
+        ]
+        assert hub.count == 0 and not hub.streams
+
+    def test_slow_client_is_told_to_resync(self, settings):
+        settings.EVENTS_QUEUE_SIZE = 2
+
+        async def run():
+            hub = get_hub()
+            stream = event_stream(hub, await hub.open('u1', [user_channel('u1')]))
+            await frames(stream, 1)
+            for n in range(5):
+                publish([user_channel('u1')], 'notification', {'n': n})
+            await asyncio.sleep(0)
+            received = [frame async for frame in stream]
+            return received, hub
+
+        received, hub = async_to_sync(run)()
+        assert received == ['event: resync\ndata: {}\n\n']
+        assert hub.count == 0
+
+    def test_heartbeat_and_lifetime(self, settings):
+        settings.EVENTS_HEARTBEAT_SECONDS = 0.05
+        settings.EVENTS_MAX_STREAM_SECONDS = 0.3
+
+        async def run():
+            hub = get_hub()
+            stream = event_stream(hub, await hub.open('u1', [user_channel('u1')]))
+            return [frame async for frame in stream]
+
+        received = async_to_sync(run)()
+        assert received[0].startswith('retry: ')
+        assert set(received[1:]) == {': keep-alive\n\n'}
+
+    def test_connection_caps(self, settings):
+        settings.EVENTS_MAX_PER_USER = 2
+        settings.EVENTS_MAX_CONNECTIONS = 3
+
+        async def run():
+            hub = get_hub()
+            await hub.open('u1', [user_channel('u1')])
+            await hub.open('u1', [user_channel('u1')])
+            with pytest.raises(StreamLimitExceeded) as per_user:
+                await hub.open('u1', [user_channel('u1')])
+            await hub.open('u2', [user_channel('u2')])
+            with pytest.raises(StreamLimitExceeded) as total:
+                await hub.open('u3', [user_channel('u3')])
+            return per_user.value.status, total.value.status
+
+        assert async_to_sync(run)() == (429, 503)
+
+
+@pytest.mark.integration
+@pytest.mark.django_db(transaction=True)
+class TestEventStreamView:
+    """Test the /events/ endpoint under ASGI"""
+
+    @pytest.fixture
+    def users(self):
+        tenant = Tenant.objects.create(
+            name='Live College', slug='live-college', email='admin@live.edu', phone='1234567890',
+            address_line1='1 Main St', city='City', state='State', country='Country', postal_code='00000',
+        )
+        role = Role.objects.create(name='student', display_name='Student', description='student')
+        return [
+            UserAccount.objects.create_user(
+                email=f'{name}@live.edu', password='pass', first_name=name, last_name='User',
+                tenant=tenant, role=role,
+            )
+            for name in ['ada', 'bob']
+        ]
+
+    def test_new_message_is_pushed(self, users):
+        ada, bob = users
+
+        async def run():
+            client = AsyncClient()
+            await client.aforce_login(ada)
+            response = await client.get(reverse('events:stream'))
+            stream = aiter(response.streaming_content)
+            first = await asyncio.wait_for(anext(stream), 1)
+
+            await sync_to_async(Message.objects.create)(
+                tenant_id=ada.tenant_id, sender=bob, recipient=ada, subject='Lab moved', body='Room 4'
+            )
+            pushed = await asyncio.wait_for(anext(stream), 1)
+            await stream.aclose()
+            return response, first, pushed, get_hub()
+
+        response, first, pushed, hub = async_to_sync(run)()
+        assert response['Content-Type'] == 'text/event-stream'
+        assert response['X-Accel-Buffering'] == 'no'
+        assert first.startswith(b'retry: ')
+        assert pushed == b'event: message\ndata: {"subject": "Lab moved"}\n\n'
+        assert hub.count == 0
+
+    def test_anonymous_is_refused(self):
+        async def run():
+            return (await AsyncClient().get(reverse('events:stream'))).status_code
+
+        assert async_to_sync(run)() == 401
+
+    def test_wsgi_tells_client_to_stop(self, client, users):
+        client.force_login(users[0])
+        assert client.get(reverse('events:stream')).status_code == 204
+
+
+@pytest.mark.integration
+@pytest.mark.django_db
+class TestPublishers:
+    """Test events published after commits"""
+
+    @pytest.fixture
+    def published(self, monkeypatch):
+        calls = []
+
+        def record(channels, event, data):
+            calls.append((sorted(channels), event, data))
+
+        from core import notifications
+        from teacher import signals
+        monkeypatch.setattr(notifications, 'publish', record)
+        monkeypatch.setattr(signals, 'publish', record)
+        return calls
+
+    def test_grade_publication_reaches_student_and_parents(self, published, django_capture_on_commit_callbacks):
+        from teacher.models import Grade
+
+        generate_dataset(DatasetOptions(tenants=1, students=2, departments=1, sections_per_year=1,
+                                        audit_events_per_user=1, end_date=date(2026, 3, 31)))
+        link = ParentStudentLink.objects.first()
+        grade = Grade.objects.filter(student_id=link.student_id).first()
+        grade.is_published = False
+        with django_capture_on_commit_callbacks(execute=True):
+            grade.save()
+        assert published == []
+
+        grade.is_published = True
+        with django_capture_on_commit_callbacks(execute=True):
+            grade.save()
+        parents = ParentStudentLink.objects.filter(student_id=link.student_id).values_list('parent_id', flat=True)
+        channels, event, data = published[0]
+        assert event == 'grade' and data['exam'] == grade.exam_name
+        assert channels == sorted(user_channel(pk) for pk in [link.student_id, *parents])
+
+    def test_fan_out_pushes_to_recipients(self, published, monkeypatch, django_capture_on_commit_callbacks):
+        from core import tasks
+        from core.notifications import fan_out
+
+        monkeypatch.setattr(tasks.deliver_notification_emails, 'delay', lambda ids, tenant_id: None)
+        generate_dataset(DatasetOptions(tenants=1, students=2, departments=1, sections_per_year=1,
+                                        audit_events_per_user=1, end_date=date(2026, 3, 31)))
+        tenant = Tenant.objects.first()
+        students = list(UserAccount.objects.filter(role__name='student').values_list('pk', flat=True))
+
+        with django_capture_on_commit_callbacks(execute=True):
+            fan_out(tenant, students, 'Results', 'Out now', link='/student/grades/')
+
+        assert published == [(
+            sorted(user_channel(pk) for pk in students), 'notification',
+            {'title': 'Results', 'type': 'announcement', 'link': '/student/grades/'},
+        )]
@@ -0,0 +1,189 @@
+"""
+Tests for the notification inbox
+"""
+
+from datetime import timedelta
+
+import pytest
+from django.core.cache import cache
+from django.db import transaction
+from django.urls import reverse
+from django.utils import timezone
+
+from core import tasks
+from core.inbox import inbox_page, mark_read, unread_counts
+from core.models import Message, Notification, Role, Tenant, UserAccount
+from core.notifications import fan_out
+
+
+@pytest.fixture
+def tenant(db, monkeypatch):
+    cache.clear()
+    monkeypatch.setattr(tasks.deliver_notification_emails, 'delay', lambda ids, tenant_id: None)
+    monkeypatch.setattr(tasks.deliver_notification_sms, 'delay', lambda ids, tenant_id: None)
+    return Tenant.objects.create(
+        name='Inbox College',
+        slug='inbox-college',
+        email='admin@inbox.edu',
+        phone='1234567890',
+        address_line1='1 Main St',
+        city='City',
+        state='State',
+        country='Country',
+        postal_code='00000',
+    )
+
+
+@pytest.fixture
+def users(tenant):
+    roles = {
+        name: Role.objects.create(name=name, display_name=name.title(), description=name)
+        for name in ['teacher', 'student']
+    }
+    return {
+        role: UserAccount.objects.create_user(
+            email=f'{role}@inbox.edu', password='pass', first_name=role.title(), last_name='User',
+            tenant=tenant, role=roles[role],
+        )
+        for role in roles
+    }
+
+
+def send_message(tenant, sender, recipient, subject='Hello'):
+    return Message.objects.create(tenant=tenant, sender=sender, recipient=recipient, subject=subject, body='Body')
+
+
+@pytest.mark.unit
+class TestUnreadCounters:
+    """Test counters maintained on create and read"""
+
+    def test_counters_follow_creates_and_reads(
+        self, tenant, users, django_assert_num_queries, django_capture_on_commit_callbacks
+    ):
+        student, teacher = users['student'], users['teacher']
+        assert unread_counts(student) == {'notifications': 0, 'messages': 0, 'total': 0}
+
+        with django_capture_on_commit_callbacks(execute=True):
+            fan_out(tenant, [student.pk], 'Exam', 'Tomorrow')
+            fan_out(tenant, [student.pk], 'Holiday', 'Friday')
+            send_message(tenant, teacher, student)
+        with django_assert_num_queries(0):
+            assert unread_counts(student) == {'notifications': 2, 'messages': 1, 'total': 3}
+
+        assert mark_read(student, 'notifications') == 2
+        assert mark_read(student, 'notifications') == 0
+        with django_assert_num_queries(0):
+            assert unread_counts(student)['total'] == 1
+
+    def test_cold_counter_is_seeded_once(self, tenant, users, django_assert_num_queries):
+        student = users['student']
+        fan_out(tenant, [student.pk], 'Exam', 'Tomorrow')
+        cache.clear()
+
+        with django_assert_num_queries(2):
+            assert unread_counts(student)['notifications'] == 1
+        with django_assert_num_queries(0):
+            assert unread_counts(student)['notifications'] == 1
+
+    def test_selected_items_and_deletes(self, tenant, users, django_capture_on_commit_callbacks):
+        student, teacher = users['student'], users['teacher']
+        first, second, third = (send_message(tenant, teacher, student, f'#{n}') for n in range(3))
+        unread_counts(student)
+
+        assert mark_read(student, 'messages', [first.pk, second.pk]) == 2
+        assert mark_read(student, 'messages', [first.pk]) == 0
+        assert unread_counts(student)['messages'] == 1
+
+        with django_capture_on_commit_callbacks(execute=True):
+            Message.all_objects.filter(pk=first.pk).get().delete()
+        assert unread_counts(student)['messages'] == 1
+        with django_capture_on_commit_callbacks(execute=True):
+            third.delete()
+        assert unread_counts(student)['messages'] == 0
+
+    def test_rolled_back_create_is_not_counted(self, tenant, users):
+        student, teacher = users['student'], users['teacher']
+        assert unread_counts(student)['messages'] == 0
+
+        with pytest.raises(RuntimeError):
+            with transaction.atomic():
+                send_message(tenant, teacher, student)
+                raise RuntimeError('rollback')
+        assert unread_counts(student)['messages'] == 0
+
+
+@pytest.mark.unit
+class TestKeysetPagination:
+    """Test cursor pages"""
+
+    def test_pages_cover_every_row_once(self, tenant, users):
+        student = users['student']
+        fan_out(tenant, [student.pk] * 25, 'Notice', 'Body')
+        # Ties on created_at are broken by id
+        same = timezone.now()
+        Notification.objects.filter(user=student).update(created_at=same)
+
+        seen, cursor = [], None
+        while True:
+            items, cursor = inbox_page(student, 'notifications', cursor=cursor, limit=10)
+            seen.extend(item.pk for item in items)
+            if cursor is None:
+                break
+            # New arrivals never shift the pages already being read
+            fan_out(tenant, [student.pk], 'Late', 'Body')
+
+        assert len(seen) == len(set(seen)) == 25
+
+    def test_unread_only(self, tenant, users):
+        student = users['student']
+        fan_out(tenant, [student.pk] * 3, 'Notice', 'Body')
+        oldest = Notification.objects.filter(user=student).order_by('created_at', 'id').first()
+        Notification.objects.filter(pk=oldest.pk).update(created_at=timezone.now() - timedelta(days=1))
+        mark_read(student, 'notifications', [oldest.pk])
+
+        items, cursor = inbox_page(student, 'notifications', unread_only=True)
+        assert len(items) == 2 and oldest.pk not in [item.pk for item in items] and cursor is None
+
+
+@pytest.mark.integration
+class TestInboxViews:
+    """Test the inbox page, bulk mark-read and badge endpoint"""
+
+    def test_badge(self, client, tenant, users):
+        student = users['student']
+        fan_out(tenant, [student.pk], 'Exam', 'Tomorrow')
+        client.force_login(student)
+
+        response = client.get(reverse('inbox:badge'))
+        assert response.status_code == 200
+        assert response.json() == {'notifications': 1, 'messages': 0, 'total': 1}
+        assert 'no-cache' in response['Cache-Control']
+
+    def test_listing_and_mark_read(self, client, settings, tenant, users):
+        settings.STORAGES = {
+            **settings.STORAGES,
+            'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+        }
+        student, teacher = users['student'], users['teacher']
+        fan_out(tenant, [student.pk] * 3, 'Notice', 'Body')
+        message = send_message(tenant, teacher, student, 'Office hours')
+        client.force_login(student)
+
+        response = client.get(reverse('inbox:index'), {'kind': 'messages'})
+        assert response.status_code == 200
+        assert b'Office hours' in response.content
+        assert client.get(reverse('inbox:index'), {'cursor': 'not-a-cursor'}).status_code == 400
+
+        response = client.post(
+            reverse('inbox:mark_read'), {'kind': 'messages', 'ids': [str(message.pk)]},
+            HTTP_ACCEPT='application/json',
+        )
+        assert response.json() == {'updated': 1, 'notifications': 3, 'messages': 0, 'total': 3}
+
+        # No selection marks nothing; all=1 marks everything
+        response = client.post(reverse('inbox:mark_read'), {'kind': 'notifications'})
+        assert response.status_code == 302
+        assert unread_counts(student)['notifications'] == 3
+        client.post(reverse('inbox:mark_read'), {'kind': 'notifications', 'all': '1'})
+        assert unread_counts(student)['notifications'] == 0
+        assert not Notification.objects.filter(user=student, is_read=False).exists()
@@ -0,0 +1,80 @@
+"""
+Tests for the role-based load test harness
+"""
+
+from datetime import date
+
+import pytest
+from django.urls import NoReverseMatch, reverse
+
+from core.datagen import DatasetOptions, generate_dataset
+from core.loadtest import (
+    JOURNEYS, LoadTestOptions, LoadTestResult, Sample, compare_reports, credentials, percentile, run_load_test
+)
+
+
+@pytest.mark.unit
+class TestReport:
+    """Test percentiles, aggregation and comparison"""
+
+    def test_nearest_rank_percentiles(self):
+        values = list(range(1, 101))
+        assert percentile(values, 50) == 50
+        assert percentile(values, 95) == 95
+        assert percentile(values, 99) == 99
+        assert percentile([], 95) == 0.0
+
+    def test_report_groups_by_portal_and_url(self):
+        result = LoadTestResult(elapsed=2.0, samples=[
+            Sample('teacher', 'teacher:dashboard', 200, 0.010),
+            Sample('teacher', 'teacher:dashboard', 500, 0.030),
+            Sample('student', 'student:grades', 200, 0.020),
+        ])
+        report = result.report()
+
+        assert report['overall']['requests'] == 3
+        assert report['overall']['rps'] == 1.5
+        assert report['portals']['teacher']['errors'] == 1
+        assert report['urls']['teacher:dashboard']['p99_ms'] == 30.0
+
+    def test_compare_reports(self):
+        baseline = {'portals': {'teacher': {'p50_ms': 10, 'p95_ms': 20, 'p99_ms': 40, 'rps': 5}}}
+        current = {'portals': {'teacher': {'p50_ms': 10, 'p95_ms': 30, 'p99_ms': 40, 'rps': 5},
+                               'student': {'p50_ms': 1, 'p95_ms': 1, 'p99_ms': 1, 'rps': 1}}}
+
+        changes = compare_reports(current, baseline)
+        assert changes['teacher']['p95_ms'] == (20, 30, 50.0)
+        assert 'student' not in changes
+
+    def test_journeys_reference_real_urls(self):
+        for steps in JOURNEYS.values():
+            for name, _ in steps:
+                try:
+                    reverse(name)
+                except NoReverseMatch:
+                    pytest.fail(f'Journey step {name} does not resolve')
+
+    def test_credentials_match_generated_users(self):
+        options = LoadTestOptions(tenants=2)
+        assert credentials('teacher', 3, options)[0] == 'teacher2@synthetic-college-2.example.edu'
+        assert credentials('tenant_admin', 7, options)[0] == 'tenant_admin1@synthetic-college-2.example.edu'
+
+
+@pytest.mark.integration
+@pytest.mark.django_db
+class TestInProcessRun:
+    """Test a short run through the WSGI stack"""
+
+    def test_virtual_user_logs_in_and_replays_journey(self, settings):
+        settings.STORAGES = {
+            **settings.STORAGES,
+            'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+        }
+        generate_dataset(DatasetOptions(students=5, departments=1, sections_per_year=1,
+                                        audit_events_per_user=1, end_date=date(2026, 3, 31)))
+
+        result = run_load_test(LoadTestOptions(users=1, iterations=3, duration=60))
+
+        assert result.logins == {'succeeded': 1}
+        assert [sample.url_name for sample in result.samples][0] == 'auth:login'
+        assert len(result.samples) == 4
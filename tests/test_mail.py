@@ -0,0 +1,105 @@
+"""
+Tests for batched mail dispatch
+"""
+
+import smtplib
+
+import pytest
+from django.core import mail
+from django.core.mail.backends.locmem import EmailBackend as LocmemBackend
+
+from core import mail as dispatch
+from core.utils import send_email_notification
+
+
+class FlakyBackend(LocmemBackend):
+    """Fails the first send, then behaves like the locmem backend"""
+    opened = 0
+    failures = 1
+
+    def open(self):
+        FlakyBackend.opened += 1
+
+    def send_messages(self, messages):
+        if FlakyBackend.failures:
+            FlakyBackend.failures -= 1
+            raise smtplib.SMTPServerDisconnected('connection lost')
+        return super().send_messages(messages)
+
+
+@pytest.fixture
+def mail_settings(settings):
+    settings.EMAIL_BACKEND = 'django.core.mail.backends.locmem.EmailBackend'
+    settings.EMAIL_BATCH_SIZE = 2
+    settings.EMAIL_RATE_LIMIT = 0
+    settings.EMAIL_MAX_RETRIES = 2
+    settings.EMAIL_RETRY_BACKOFF = 0
+    mail.outbox = []
+    return settings
+
+
+def welcome(email):
+    user = {'first_name': 'Asha', 'email': email}
+    return dispatch.build_email('Welcome', [email], 'welcome', {'user': user, 'tenant': {'name': 'Demo'}})
+
+
+@pytest.mark.unit
+class TestMailDispatch:
+    """Test templated, batched sending"""
+
+    def test_templates_compiled_once(self, mail_settings):
+        dispatch.get_email_templates.cache_clear()
+        welcome('a@example.com')
+        welcome('b@example.com')
+        assert dispatch.get_email_templates.cache_info().hits == 1
+
+    def test_text_and_html_parts(self, mail_settings):
+        email = welcome('a@example.com')
+        assert 'a@example.com' in email.body
+        assert email.alternatives[0][1] == 'text/html'
+
+    def test_one_connection_per_batch(self, mail_settings, monkeypatch):
+        connections = []
+        real_get_connection = dispatch.get_connection
+
+        def counting_get_connection(*args, **kwargs):
+            connections.append(1)
+            return real_get_connection(*args, **kwargs)
+
+        monkeypatch.setattr(dispatch, 'get_connection', counting_get_connection)
+
+        sent = dispatch.send_mass_email([welcome(f'user{i}@example.com') for i in range(5)])
+
+        assert sent == 5
+        assert len(mail.outbox) == 5
+        assert len(connections) == 3
+
+    def test_reconnects_once(self, mail_settings):
+        mail_settings.EMAIL_BACKEND = f'{__name__}.FlakyBackend'
+        FlakyBackend.opened, FlakyBackend.failures = 0, 1
+
+        assert dispatch.send_mass_email([welcome('a@example.com')]) == 1
+        assert FlakyBackend.opened == 2
+
+    def test_gives_up_without_waiting(self, mail_settings, monkeypatch):
+        """Backoff is left to Celery; a web request never sleeps here"""
+        mail_settings.EMAIL_BACKEND = f'{__name__}.FlakyBackend'
+        FlakyBackend.opened, FlakyBackend.failures = 0, 10
+        monkeypatch.setattr(dispatch.time, 'sleep', lambda seconds: pytest.fail('slept'))
+
+        with pytest.raises(smtplib.SMTPServerDisconnected):
+            dispatch.send_mass_email([welcome('a@example.com')])
+        assert FlakyBackend.opened == 2
+
+    def test_reports_each_sent_message(self, mail_settings):
+        messages = [welcome(f'user{i}@example.com') for i in range(3)]
+        sent = []
+
+        dispatch.send_mass_email(messages, on_sent=sent.append)
+
+        assert sent == messages
+
+    def test_send_email_notification(self, mail_settings):
+        context = {'user': {'first_name': 'Asha'}, 'reset_url': 'https://example.com/reset'}
+        assert send_email_notification('Reset', ['a@example.com'], 'password_reset', context)
+        assert 'https://example.com/reset' in mail.outbox[0].body
@@ -0,0 +1,206 @@
+"""
+Tests for announcement notification fan-out
+"""
+
+from datetime import date
+
+import smtplib
+
+import pytest
+from django.core import mail
+from django.core.cache import cache
+from django.test import RequestFactory
+
+from college_management.views import announcement_target
+from core import tasks
+from core.models import (
+    AcademicYear, Department, Notification, ParentStudentLink, Role, Section,
+    StudentEnrollment, Tenant, UserAccount
+)
+from core.notifications import (
+    fan_out, get_unread_count, mark_notifications_read, resolve_audience
+)
+
+
+@pytest.fixture
+def tenant(db):
+    return Tenant.objects.create(
+        name='Fanout College',
+        slug='fanout-college',
+        email='admin@fanout.edu',
+        phone='1234567890',
+        address_line1='1 Main St',
+        city='City',
+        state='State',
+        country='Country',
+        postal_code='00000',
+    )
+
+
+@pytest.fixture
+def campus(tenant):
+    """Two departments with one section each, students, a teacher and a parent"""
+    roles = {
+        name: Role.objects.create(name=name, display_name=name.title(), description=name)
+        for name in ['teacher', 'student', 'parent']
+    }
+    year = AcademicYear.objects.create(
+        tenant=tenant, name='2025-2026', start_date=date(2025, 6, 1), end_date=date(2026, 5, 31)
+    )
+
+    def user(email, role):
+        return UserAccount.objects.create_user(
+            email=email, password='pass', first_name='Test', last_name='User',
+            tenant=tenant, role=roles[role],
+        )
+
+    data = {'teacher': user('teacher@fanout.edu', 'teacher'), 'parent': user('parent@fanout.edu', 'parent')}
+    for code in ['CSE', 'ECE']:
+        department = Department.objects.create(tenant=tenant, name=code, code=code)
+        section = Section.objects.create(
+            tenant=tenant, department=department, academic_year=year,
+            name=f'{code} A', code=f'{code}A', semester=1, year=1,
+        )
+        student = user(f'student-{code.lower()}@fanout.edu', 'student')
+        StudentEnrollment.objects.create(
+            tenant=tenant, student=student, section=section, academic_year=year, roll_number='1'
+        )
+        data[code] = {'department': department, 'section': section, 'student': student}
+
+    ParentStudentLink.objects.create(
+        tenant=tenant, parent=data['parent'], student=data['CSE']['student'], relationship='mother'
+    )
+    return data
+
+
+@pytest.fixture
+def queued(monkeypatch):
+    """Capture delivery batches instead of sending them to the broker"""
+    calls = {'email': [], 'sms': []}
+    monkeypatch.setattr(tasks.deliver_notification_emails, 'delay',
+                        lambda ids, tenant_id: calls['email'].append((ids, tenant_id)))
+    monkeypatch.setattr(tasks.deliver_notification_sms, 'delay',
+                        lambda ids, tenant_id: calls['sms'].append((ids, tenant_id)))
+    cache.clear()
+    return calls
+
+
+@pytest.mark.unit
+@pytest.mark.django_db
+class TestResolveAudience:
+    """Test audience resolution"""
+
+    def test_role_audience(self, tenant, campus):
+        ids = set(resolve_audience(tenant, 'students'))
+        assert ids == {campus['CSE']['student'].id, campus['ECE']['student'].id}
+
+    def test_department_audience_includes_parents(self, tenant, campus):
+        ids = set(resolve_audience(tenant, 'department', department=campus['CSE']['department']))
+        assert ids == {campus['CSE']['student'].id, campus['parent'].id}
+
+    def test_scoped_audience_without_scope_is_empty(self, tenant, campus):
+        assert list(resolve_audience(tenant, 'department')) == []
+        assert list(resolve_audience(tenant, 'section')) == []
+
+    def test_announcement_form_requires_the_scope(self, tenant, campus):
+        department = campus['CSE']['department']
+        post = RequestFactory().post('/', {'target_audience': 'department', 'target_department': str(department.pk)})
+        assert announcement_target(post, tenant) == ('department', department, None)
+
+        for data in ({'target_audience': 'section'}, {'target_audience': 'section', 'target_section': 'junk'}):
+            with pytest.raises(ValueError):
+                announcement_target(RequestFactory().post('/', data), tenant)
+
+    def test_single_query(self, tenant, campus, django_assert_num_queries):
+        with django_assert_num_queries(1):
+            list(resolve_audience(tenant, 'all', section=campus['ECE']['section']))
+
+
+@pytest.mark.unit
+@pytest.mark.django_db
+class TestFanOut:
+    """Test notification creation and delivery queueing"""
+
+    def test_creates_notifications_in_chunks(
+        self, settings, tenant, campus, queued, django_capture_on_commit_callbacks
+    ):
+        settings.NOTIFICATION_FANOUT_BATCH_SIZE = 2
+        settings.NOTIFICATION_DELIVERY_BATCH_SIZE = 1
+
+        with django_capture_on_commit_callbacks(execute=True):
+            created = fan_out(tenant, resolve_audience(tenant, 'all'), 'Exam', 'Exams start Monday')
+            # Nothing is queued before the rows commit
+            assert queued['email'] == []
+
+        assert created == 4
+        assert Notification.objects.filter(tenant=tenant).count() == 4
+        assert len(queued['email']) == 4
+        # Tasks bind the tenant's shard
+        assert {tenant_id for _, tenant_id in queued['email']} == {str(tenant.pk)}
+        assert queued['sms'] == []
+
+    def test_respects_college_settings(self, tenant, campus, queued, django_capture_on_commit_callbacks):
+        from college_management.models import CollegeSettings
+        CollegeSettings.objects.create(
+            tenant=tenant, email_notifications_enabled=False, sms_notifications_enabled=True
+        )
+
+        with django_capture_on_commit_callbacks(execute=True):
+            fan_out(tenant, resolve_audience(tenant, 'parents'), 'PTM', 'Meeting on Friday')
+
+        assert queued['email'] == []
+        assert len(queued['sms']) == 1
+
+    def test_excludes_author(self, tenant, campus, queued):
+        teacher = campus['teacher']
+        created = fan_out(tenant, resolve_audience(tenant, 'teachers'), 'Note', 'Body', exclude=teacher.id)
+        assert created == 0
+
+
+@pytest.mark.unit
+@pytest.mark.django_db
+class TestUnreadCounter:
+    """Test cached unread counts"""
+
+    def test_counter_is_cached_and_invalidated(
+        self, tenant, campus, queued, django_assert_num_queries, django_capture_on_commit_callbacks
+    ):
+        student = campus['CSE']['student']
+        assert get_unread_count(student) == 0
+
+        with django_capture_on_commit_callbacks(execute=True):
+            fan_out(tenant, [student.id], 'Hello', 'World')
+        assert get_unread_count(student) == 1
+        with django_assert_num_queries(0):
+            assert get_unread_count(student) == 1
+
+        assert mark_notifications_read(student) == 1
+        assert get_unread_count(student) == 0
+
+
+@pytest.mark.unit
+@pytest.mark.django_db
+class TestEmailDelivery:
+    """Test the email delivery task"""
+
+    def test_retry_sends_only_the_rest(self, settings, tenant, campus, monkeypatch):
+        settings.EMAIL_BACKEND = 'django.core.mail.backends.locmem.EmailBackend'
+        mail.outbox = []
+        ids = [
+            str(Notification.objects.create(tenant=tenant, user=campus[code]['student'], title='Hi', message='Body').pk)
+            for code in ['CSE', 'ECE']
+        ]
+
+        def drop_after_first(messages, on_sent=None):
+            on_sent(messages[0])
+            raise smtplib.SMTPServerDisconnected('connection lost')
+
+        with monkeypatch.context() as patch:
+            patch.setattr('core.mail.send_mass_email', drop_after_first)
+            with pytest.raises(smtplib.SMTPServerDisconnected):
+                tasks.deliver_notification_emails(ids, tenant_id=str(tenant.pk))
+
+        assert Notification.objects.filter(pk__in=ids, email_sent_at__isnull=False).count() == 1
+        assert tasks.deliver_notification_emails(ids, tenant_id=str(tenant.pk)) == 1
+        assert len(mail.outbox) == 1
+        assert not Notification.objects.filter(pk__in=ids, email_sent_at__isnull=True).exists()
@@ -0,0 +1,195 @@
+"""
+Tests for SQL query instrumentation and the per-view query budget benchmark
+
+The benchmark renders every argument-free portal URL as a user of the
+portal's role against a seeded large tenant and fails when a view runs more
+queries than its declared budget. The dataset is generated once for the
+module; skip the benchmark locally with
+    pytest -m "not benchmark"
+Views that cannot render yet are listed in BROKEN_VIEWS and expected to fail.
+"""
+
+from datetime import date
+import logging
+
+import pytest
+from django.core.cache import cache
+from django.db import transaction
+from django.http import HttpResponse
+from django.test import RequestFactory
+from django.urls import get_resolver, resolve, reverse
+
+from core.db.sharding import directory
+from core.decorators import query_budget
+from core.middleware import QueryInstrumentationMiddleware
+from core.datagen import DatasetOptions, generate_dataset
+from core.models import Role, Tenant, UserAccount
+from core.query_budget import QueryRecorder, fingerprint, get_view_budget
+from core.roles import registry
+
+# URL namespace -> role that uses the portal
+PORTALS = {
+    'college': 'tenant_admin',
+    'department': 'department_admin',
+    'teacher': 'teacher',
+    'student': 'student',
+    'parent': 'parent',
+    'company_admin': 'super_admin',
+}
+
+
+# (namespace, url name) -> why the view cannot render yet; each is a strict
+# xfail, so a fixed view fails the run until it is removed from here
+BROKEN_VIEWS = {
+    ('college', 'department_list'): 'template reverses department_detail with a UUID; the URL expects an int',
+    ('college', 'section_list'): "select_related('class_teacher'): Section has no class_teacher",
+    ('college', 'user_list'): 'template reverses user_detail with a UUID; the URL expects an int',
+    ('company_admin', 'audit_trail'): 'template reverses tenant_detail with a UUID; the URL expects an int',
+    ('company_admin', 'billing_management'): 'template reverses tenant_detail with a UUID; the URL expects an int',
+    ('company_admin', 'subscription_oversight'): 'filters on trial_end; the field is trial_end_date',
+    ('company_admin', 'system_health'): 'queries information_schema, which only exists on MySQL',
+    ('company_admin', 'tenant_list'): 'template reverses tenant_detail with a UUID; the URL expects an int',
+    ('company_admin', 'user_management'): 'template reverses tenant_detail with a UUID; the URL expects an int',
+    ('parent', 'announcements'): 'filters Section on students; the relation is student_enrollments',
+    ('parent', 'dashboard'): 'filters Section on students; the relation is student_enrollments',
+    ('student', 'announcements'): 'filters Section on students; the relation is student_enrollments',
+    ('student', 'assignments'): 'filters Section on students; the relation is student_enrollments',
+    ('student', 'attendance'): 'filters Section on students; the relation is student_enrollments',
+    ('student', 'dashboard'): 'filters Section on students; the relation is student_enrollments',
+    ('student', 'exam_schedule'): 'filters Section on students; the relation is student_enrollments',
+    ('student', 'profile'): 'filters Section on students; the relation is student_enrollments',
+    ('student', 'resources'): 'filters Section on students; the relation is student_enrollments',
+    ('student', 'timetable'): 'filters Section on students; the relation is student_enrollments',
+    ('teacher', 'assignment_create'): 'filters Section on class_teacher, which does not exist',
+    ('teacher', 'attendance_marking'): 'filters Section on class_teacher, which does not exist',
+    ('teacher', 'dashboard'): 'filters Subject on teachers; the relation is teacher_assignments',
+    ('teacher', 'my_classes'): 'filters Section on class_teacher, which does not exist',
+}
+
+
+def portal_urls():
+    """(namespace, url name) for every portal URL without arguments"""
+    resolver = get_resolver()
+    urls = []
+    for namespace in PORTALS:
+        _, sub_resolver = resolver.namespace_dict[namespace]
+        for name, (bits, *_) in sub_resolver.reverse_dict.items():
+            if isinstance(name, str) and not bits[0][1]:
+                urls.append((namespace, name))
+    return sorted(urls)
+
+
+def benchmark_params():
+    return [
+        pytest.param(*url, marks=pytest.mark.xfail(reason=BROKEN_VIEWS[url], strict=True))
+        if url in BROKEN_VIEWS else url
+        for url in portal_urls()
+    ]
+
+
+@pytest.mark.unit
+class TestFingerprint:
+    """Test statement normalization"""
+
+    def test_parameters_share_a_fingerprint(self):
+        assert fingerprint("SELECT * FROM t WHERE id = 1") == fingerprint("SELECT  *\nFROM t WHERE id = 42")
+        assert fingerprint("SELECT * FROM t WHERE name = 'a'") == fingerprint("SELECT * FROM t WHERE name = %s")
+
+    def test_in_lists_collapse(self):
+        assert fingerprint("SELECT * FROM t WHERE id IN (%s, %s)") == fingerprint("SELECT * FROM t WHERE id IN (%s)")
+
+
+@pytest.mark.unit
+@pytest.mark.django_db
+class TestQueryInstrumentation:
+    """Test recording and reporting"""
+
+    def test_recorder_counts_duplicates(self):
+        with QueryRecorder() as recorder:
+            for _ in range(3):
+                list(Role.objects.filter(name='teacher'))
+            Tenant.objects.count()
+
+        assert recorder.count == 4
+        assert recorder.duplicate_count == 2
+        assert recorder.duplicates()[0][1] == 3
+
+    def test_budget_declared_through_decorators(self):
+        from teacher.views import my_timetable
+
+        assert get_view_budget(my_timetable) == 10
+        assert get_view_budget(lambda request: None) == 30
+
+    def test_middleware_reports_headers_and_warns(self, settings, caplog):
+        settings.QUERY_INSTRUMENTATION = True
+        settings.QUERY_INSTRUMENTATION_HEADERS = True
+
+        @query_budget(1)
+        def view(request):
+            Role.objects.count()
+            Role.objects.count()
+            return HttpResponse('ok')
+
+        def get_response(request):
+            middleware.process_view(request, view, (), {})
+            return view(request)
+
+        middleware = QueryInstrumentationMiddleware(get_response)
+        request = RequestFactory().get('/')
+        with caplog.at_level(logging.WARNING, logger='core.queries'):
+            response = middleware(request)
+
+        assert response['X-DB-Query-Count'] == '2'
+        assert response['X-DB-Duplicate-Queries'] == '1'
+        assert response['X-DB-Query-Budget'] == '1'
+        assert 'Query budget exceeded' in caplog.text
+
+
+@pytest.fixture(scope='module')
+def large_tenant(django_db_setup, django_db_blocker):
+    """
+    A generated tenant with a term of attendance, grades and audit history
+
+    Generated once for the module inside a transaction that is rolled back
+    afterwards; each test's own transaction nests inside it.
+    """
+    with django_db_blocker.unblock():
+        with transaction.atomic():
+            cache.clear()
+            summary = generate_dataset(DatasetOptions(students=600, end_date=date(2026, 3, 31)))
+            tenant = Tenant.objects.get(pk=summary.tenant_ids[0])
+            tenant.portal_users = {
+                role: UserAccount.objects.get(email=f'{role}1@{tenant.slug}.example.edu')
+                for role in PORTALS.values() if role != 'super_admin'
+            }
+            tenant.portal_users['super_admin'] = UserAccount.objects.create_superuser(
+                email='bench-admin@example.com', password='pass', first_name='Bench', last_name='Admin',
+                role=Role.objects.get(name='super_admin'),
+            )
+            yield tenant
+            transaction.set_rollback(True)
+
+
+@pytest.mark.benchmark
+@pytest.mark.slow
+@pytest.mark.django_db
+@pytest.mark.parametrize('namespace,name', benchmark_params())
+def test_portal_view_within_query_budget(client, settings, large_tenant, namespace, name):
+    settings.STORAGES = {
+        **settings.STORAGES,
+        'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+    }
+    # Budgets are cold-cache counts
+    cache.clear()
+    registry.invalidate()
+    directory.invalidate()
+    path = reverse(f'{namespace}:{name}')
+    client.force_login(large_tenant.portal_users[PORTALS[namespace]])
+    budget = get_view_budget(resolve(path).func)
+
+    with QueryRecorder() as recorder:
+        response = client.get(path)
+
+    assert response.status_code < 500
+    duplicates = '\n'.join(f'{count}x {sql}' for sql, count in recorder.duplicates(limit=5))
+    assert recorder.count <= budget, f'{path}: {recorder.count} queries (budget {budget})\n{duplicates}'
@@ -0,0 +1,81 @@
+"""
+Tests for query plan capture and the index advisor
+"""
+
+from datetime import date
+from io import StringIO
+import json
+
+import pytest
+from django.core.management import call_command
+
+from core.datagen import DatasetOptions, generate_dataset
+from core.models import AcademicYear
+from core.query_plans import (
+    FILESORT, FULL_SCAN, TEMPORARY, IndexSuggestion, draft_migrations, index_columns, main_table, plan_problems
+)
+
+
+@pytest.mark.unit
+class TestPlanAnalysis:
+    """Test reading plans and deriving index columns"""
+
+    def test_mysql_plan_problems(self):
+        plan = [
+            {'table': 'attendances', 'type': 'ALL', 'extra': 'Using where; Using filesort'},
+            {'table': 'sections', 'type': 'eq_ref', 'extra': 'Using temporary'},
+        ]
+        assert plan_problems('mysql', plan) == [
+            ('attendances', FULL_SCAN), ('attendances', FILESORT), ('sections', TEMPORARY)
+        ]
+
+    def test_sqlite_plan_problems(self):
+        plan = [
+            {'detail': 'SCAN grades'},
+            {'detail': 'SCAN sections USING INDEX sections_tenant_idx'},
+            {'detail': 'SEARCH departments USING INTEGER PRIMARY KEY (rowid=?)'},
+            {'detail': 'USE TEMP B-TREE FOR ORDER BY'},
+            {'detail': 'USE TEMP B-TREE FOR GROUP BY'},
+        ]
+        assert plan_problems('sqlite', plan, 'grades') == [
+            ('grades', FULL_SCAN), ('grades', FILESORT), ('grades', TEMPORARY)
+        ]
+
+    def test_index_columns_lead_with_scope(self):
+        sql = ('SELECT "grades"."id" FROM "grades" WHERE ("grades"."student_id" = %s AND '
+               '"grades"."is_published" AND "grades"."tenant_id" = %s AND NOT "grades"."is_deleted") '
+               'ORDER BY "grades"."exam_date" DESC LIMIT 10')
+        assert main_table(sql) == 'grades'
+        assert index_columns(sql, 'grades', {FILESORT}) == [
+            'tenant_id', 'is_deleted', 'student_id', 'is_published', '-exam_date'
+        ]
+
+    def test_index_columns_mysql_range(self):
+        sql = ('SELECT `holidays`.`id` FROM `holidays` WHERE (`holidays`.`tenant_id` = %s '
+               'AND `holidays`.`date` >= %s)')
+        assert index_columns(sql, 'holidays', {FULL_SCAN}) == ['tenant_id', 'date']
+        assert index_columns('SELECT COUNT(*) FROM "holidays"', 'holidays', {FULL_SCAN}) == []
+
+    def test_draft_migration(self):
+        drafts = draft_migrations([IndexSuggestion(AcademicYear, ['tenant', 'is_deleted', '-end_date'])])
+        name, source = drafts['core']
+        assert name.endswith('_index_advice.py')
+        assert "fields=['tenant', 'is_deleted', '-end_date']" in source
+        compile(source, name, 'exec')
+
+
+@pytest.mark.integration
+def test_advise_indexes_replays_portals(transactional_db, settings, tmp_path):
+    settings.ALLOWED_HOSTS = ['testserver']
+    generate_dataset(DatasetOptions(students=10, departments=2, sections_per_year=1,
+                                    audit_events_per_user=1, end_date=date(2026, 3, 31)))
+    out = StringIO()
+    call_command('advise_indexes', '--min-rows', '0', '--output-dir', str(tmp_path),
+                 '--report', str(tmp_path / 'plans.json'), stdout=out)
+
+    report = json.loads((tmp_path / 'plans.json').read_text())
+    assert 'distinct statements' in out.getvalue()
+    assert any('college:dashboard' in query['urls'] for query in report)
+    assert all(query['plan'] for query in report)
+    for draft in tmp_path.glob('*_index_advice.py'):
+        compile(draft.read_text(), str(draft), 'exec')
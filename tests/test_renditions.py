@@ -0,0 +1,114 @@
+"""
+Tests for image renditions
+"""
+
+import io
+
+import pytest
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.template import Context, Template
+from django.urls import reverse
+from PIL import Image
+
+from core import tasks
+from core.models import Tenant, UserAccount
+from core.renditions import generate_for
+
+
+def png(width, height, color=(200, 30, 30, 255)):
+    buffer = io.BytesIO()
+    Image.new('RGBA', (width, height), color).save(buffer, 'PNG')
+    return ContentFile(buffer.getvalue())
+
+
+@pytest.fixture
+def tenant(db, settings, tmp_path, monkeypatch, django_capture_on_commit_callbacks):
+    cache.clear()
+    settings.TENANT_STORAGE_BACKEND = 'django.core.files.storage.FileSystemStorage'
+    settings.MEDIA_ROOT = str(tmp_path)
+    settings.DOWNLOAD_BACKEND = 'django'
+    # Run the background task inline
+    monkeypatch.setattr(tasks.generate_image_renditions, 'delay', tasks.generate_image_renditions)
+    tenant = Tenant.objects.create(
+        name='Crest College', slug='crest-college', email='admin@crest.edu', phone='1234567890',
+        address_line1='1 Main St', city='City', state='State', country='Country', postal_code='00000',
+    )
+    with django_capture_on_commit_callbacks(execute=True):
+        tenant.logo.save('crest.png', png(1200, 300))
+    tenant.refresh_from_db()
+    return tenant
+
+
+@pytest.mark.unit
+class TestRenditionGeneration:
+    """Test variants written on upload"""
+
+    def test_logo_variants(self, tenant):
+        renditions = tenant.logo_renditions
+        assert renditions['source'] == tenant.logo.name
+        assert set(renditions) == {'source', 'sm', 'sm@2x', 'md', 'md@2x'}
+        assert (renditions['sm']['width'], renditions['sm']['height']) == (128, 32)
+        assert (renditions['sm@2x']['width'], renditions['sm@2x']['height']) == (256, 64)
+        assert renditions['sm']['name'].startswith(tenant.logo.name.rsplit('/', 1)[0] + '/renditions/crest.sm.')
+
+        with tenant.logo.storage.open(renditions['md']['name']) as fh:
+            image = Image.open(fh)
+            assert (image.format, image.size) == ('WEBP', (360, 90))
+
+    def test_avatar_is_cropped(self, tenant, django_capture_on_commit_callbacks):
+        user = UserAccount.objects.create_user(
+            email='s@crest.edu', password='pass', first_name='S', last_name='U', tenant=tenant
+        )
+        with django_capture_on_commit_callbacks(execute=True):
+            user.profile_picture.save('me.png', png(500, 300))
+        user.refresh_from_db()
+
+        assert {size: (e['width'], e['height']) for size, e in user.profile_picture_renditions.items()
+                if size != 'source'} == {'sm': (40, 40), 'sm@2x': (80, 80), 'lg': (150, 150), 'lg@2x': (300, 300)}
+
+    def test_only_changed_images_are_processed(self, tenant, django_capture_on_commit_callbacks):
+        with django_capture_on_commit_callbacks() as callbacks:
+            tenant.primary_color = '#000000'
+            tenant.save()
+        assert not any('generate_image_renditions' in repr(callback) for callback in callbacks)
+        assert generate_for('core.Tenant', tenant.pk, 'logo') is None
+
+        old = tenant.logo_renditions['sm']['name']
+        with django_capture_on_commit_callbacks(execute=True):
+            tenant.logo.save('crest.png', png(800, 400, (0, 0, 255, 255)))
+        tenant.refresh_from_db()
+
+        assert tenant.logo_renditions['sm']['name'] != old
+        assert not tenant.logo.storage.exists(old)
+
+
+@pytest.mark.integration
+class TestRenditionServing:
+    """Test the template tag and immutable responses"""
+
+    def test_tag_uses_renditions(self, tenant):
+        html = Template("{% load renditions %}{% rendition_img tenant 'tenant_logo' 'sm' alt='Crest' %}").render(
+            Context({'tenant': tenant})
+        )
+        one = reverse('files:rendition', args=['tenant_logo', tenant.pk, tenant.logo_renditions['sm']['name'].rsplit('/', 1)[1]])
+        assert f'src="{one}"' in html
+        assert 'srcset="' in html and ' 2x"' in html
+        assert 'width="128"' in html and 'height="32"' in html and 'alt="Crest"' in html
+
+    def test_tag_falls_back_to_original(self, tenant):
+        Tenant.objects.filter(pk=tenant.pk).update(logo_renditions={})
+        tenant.refresh_from_db()
+        html = Template("{% load renditions %}{% rendition_img tenant 'tenant_logo' 'sm' %}").render(
+            Context({'tenant': tenant})
+        )
+        assert reverse('files:download', args=['tenant_logo', tenant.pk]) + '?inline=1' in html
+
+    def test_renditions_are_immutable(self, client, tenant):
+        filename = tenant.logo_renditions['sm']['name'].rsplit('/', 1)[1]
+        response = client.get(reverse('files:rendition', args=['tenant_logo', tenant.pk, filename]))
+
+        assert response.status_code == 200
+        assert response['Content-Type'] == 'image/webp'
+        assert response['Cache-Control'] == 'public, max-age=31536000, immutable'
+        assert client.get(reverse('files:rendition', args=['tenant_logo', tenant.pk, 'other.webp'])).status_code == 404
@@ -0,0 +1,98 @@
+"""
+Tests for read replica routing and read-your-writes stickiness
+"""
+
+import pytest
+from django.db import connections, transaction
+from django.http import HttpResponse
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+
+from core.db.routers import force_primary, use_replicas
+from core.middleware import ReplicaRoutingMiddleware
+from core.models import Role
+
+
+@pytest.fixture
+def replica(transactional_db, settings):
+    """A second SQLite alias on the test database standing in for a replica"""
+    connections.settings['replica'] = dict(connections.settings['default'])
+    settings.DATABASE_REPLICAS = ['replica']
+    settings.DATABASE_ROUTERS = ['core.db.routers.ReplicaRouter']
+    Role.objects.create(name='teacher', display_name='Teacher', description='-', scope_level=4)
+    yield 'replica'
+    connections['replica'].close()
+    del connections['replica']
+    del connections.settings['replica']
+
+
+def run_request(method='get', cookies=None, view=None):
+    request = getattr(RequestFactory(), method)('/reports/')
+    request.COOKIES.update(cookies or {})
+    seen = {}
+
+    def get_response(request):
+        if view:
+            view()
+        seen['db'] = Role.objects.all().db
+        return HttpResponse()
+
+    response = ReplicaRoutingMiddleware(get_response)(request)
+    return seen['db'], response
+
+
+@pytest.mark.integration
+class TestReplicaRouter:
+    """Test where reads go"""
+
+    def test_safe_request_reads_from_replica(self, replica):
+        with CaptureQueriesContext(connections['replica']) as queries:
+            db, response = run_request()
+            assert Role.objects.using(db).count() == 1
+
+        assert db == 'replica'
+        assert len(queries) == 1
+        assert 'db_primary' not in response.cookies
+
+    def test_outside_requests_reads_use_primary(self, replica):
+        assert Role.objects.all().db == 'default'
+        with use_replicas():
+            assert Role.objects.all().db == 'replica'
+
+    def test_write_pins_request_and_sets_cookie(self, replica):
+        db, response = run_request(view=lambda: Role.objects.filter(name='teacher').update(display_name='T'))
+
+        assert db == 'default'
+        assert response.cookies['db_primary']['max-age'] == 10
+
+    def test_pin_cookie_and_unsafe_methods_read_primary(self, replica):
+        assert run_request(cookies={'db_primary': '1'})[0] == 'default'
+        assert run_request(method='post')[0] == 'default'
+
+    def test_force_primary_and_transactions(self, replica):
+        with use_replicas():
+            with force_primary():
+                assert Role.objects.all().db == 'default'
+
+            @force_primary()
+            def read():
+                return Role.objects.all().db
+
+            assert read() == 'default'
+            with transaction.atomic():
+                assert Role.objects.all().db == 'default'
+            assert Role.objects.all().db == 'replica'
+
+    def test_excluded_apps_read_primary_without_pinning(self, replica):
+        from django.contrib.sessions.models import Session
+
+        with use_replicas() as state:
+            assert Session.objects.all().db == 'default'
+            Session.objects.filter(session_key='missing').delete()
+            assert not state.pinned
+
+    def test_replicas_are_not_migrated(self, replica):
+        from django.db import router
+
+        assert router.allow_migrate('replica', 'core') is False
+        assert router.allow_migrate('default', 'core') is True
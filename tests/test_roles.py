@@ -0,0 +1,100 @@
+"""
+Tests for the role registry and permission bitmask
+"""
+
+import uuid
+
+import pytest
+from django.core.cache import cache
+from django.test import RequestFactory
+
+from core.decorators import role_required
+from core.models import Role, UserAccount
+from core.roles import PERMISSION_BITS, RoleDescriptor, registry
+from core.utils import check_user_permission
+
+
+@pytest.fixture
+def roles(db, settings):
+    settings.ROLE_REGISTRY_CHECK_SECONDS = 60
+    cache.clear()
+    registry.invalidate()
+    return {
+        'super_admin': Role.objects.create(name='super_admin', display_name='Super Admin', description='-', scope_level=1),
+        'teacher': Role.objects.create(
+            name='teacher', display_name='Teacher', description='-', scope_level=4,
+            can_manage_attendance=True, can_manage_assessments=True,
+        ),
+    }
+
+
+@pytest.fixture
+def teacher(roles):
+    return UserAccount.objects.create_user(
+        email='teacher@roles.edu', password='pass', first_name='T', last_name='U', role=roles['teacher']
+    )
+
+
+@pytest.mark.unit
+@pytest.mark.django_db
+class TestRoleRegistry:
+    """Test cached role descriptors"""
+
+    def test_descriptor_is_compiled(self, roles):
+        descriptor = registry.get(roles['teacher'].id)
+
+        assert isinstance(descriptor, RoleDescriptor)
+        assert descriptor.permissions == (
+            PERMISSION_BITS['can_manage_attendance'] | PERMISSION_BITS['can_manage_assessments']
+        )
+        assert registry.get_by_name('super_admin').has_permission('can_manage_billing')
+
+    def test_descriptor_is_frozen(self, roles):
+        descriptor = registry.get(roles['teacher'].id)
+        with pytest.raises(Exception):
+            descriptor.name = 'super_admin'
+
+    def test_checks_cost_no_queries(self, teacher, django_assert_num_queries):
+        registry.get(teacher.role_id)
+        with django_assert_num_queries(0):
+            assert teacher.is_teacher()
+            assert not teacher.is_super_admin()
+            assert check_user_permission(teacher, 'can_manage_attendance')
+            assert not check_user_permission(teacher, 'can_manage_billing')
+            assert not check_user_permission(teacher, 'no_such_permission')
+
+    def test_role_edit_propagates(self, roles, teacher, django_capture_on_commit_callbacks):
+        assert not check_user_permission(teacher, 'can_view_reports')
+
+        role = roles['teacher']
+        role.can_view_reports = True
+        with django_capture_on_commit_callbacks(execute=True):
+            role.save()
+
+        assert check_user_permission(teacher, 'can_view_reports')
+
+    def test_inactive_role_is_still_resolved(self, roles, teacher, django_assert_num_queries):
+        Role.objects.filter(pk=roles['teacher'].pk).update(is_active=False)
+        registry.invalidate()
+
+        assert teacher.is_teacher()
+        assert not registry.get(teacher.role_id).is_active
+        assert registry.get_by_name('teacher') is None
+        with django_assert_num_queries(0):
+            assert teacher.role_name == 'teacher'
+
+    def test_misses_reload_once(self, roles, django_assert_num_queries):
+        registry.get(roles['teacher'].id)
+        missing = uuid.uuid4()
+        assert registry.get(missing) is None
+        with django_assert_num_queries(0):
+            assert registry.get(missing) is None
+
+    def test_role_required_uses_descriptor(self, teacher, django_assert_num_queries):
+        registry.get(teacher.role_id)
+        view = role_required(['teacher'])(lambda request: 'ok')
+        request = RequestFactory().get('/teacher/')
+        request.user = teacher
+
+        with django_assert_num_queries(0):
+            assert view(request) == 'ok'
@@ -0,0 +1,148 @@
+"""
+Tests for tenant-to-shard routing and moving tenants between shards
+"""
+
+from datetime import date
+
+import pytest
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connections
+from django.http import HttpResponse
+from django.test import RequestFactory, override_settings
+
+from core.datagen import DatasetOptions, generate_dataset
+from core import mail, tasks
+from core.audit import archive_audit_logs, get_archive_storage
+from core.db import sharding
+from core.db.sharding import directory, move_tenant, tenant_lookup, tenant_shard
+from core.middleware import TenantMiddleware
+from core.models import AuditLog, AuditLogArchive, Department, Notification, Tenant, TenantShard, UserAccount
+from teacher.models import Attendance, AssignmentSubmission
+
+
+@pytest.fixture
+def shard(transactional_db, settings, tmp_path):
+    """A second SQLite database standing in for a shard"""
+    connections.settings['shard_test'] = {
+        **connections.settings['default'],
+        'NAME': str(tmp_path / 'shard.sqlite3'),
+        'TEST': {'NAME': str(tmp_path / 'shard.sqlite3')},
+    }
+    settings.DATABASE_SHARDS = ['shard_test']
+    settings.SHARD_DIRECTORY_CHECK_SECONDS = 0
+    call_command('migrate', database='shard_test', run_syncdb=True, verbosity=0)
+    cache.clear()
+    directory.invalidate()
+    yield 'shard_test'
+    directory.invalidate()
+    connections['shard_test'].close()
+    del connections['shard_test']
+    del connections.settings['shard_test']
+
+
+@pytest.fixture
+def tenant(shard):
+    generate_dataset(DatasetOptions(students=10, departments=2, sections_per_year=1,
+                                    audit_events_per_user=1, end_date=date(2026, 3, 31)))
+    return Tenant.objects.get()
+
+
+@pytest.mark.unit
+class TestShardModels:
+    """Test which models follow the tenant"""
+
+    def test_tenant_lookup_paths(self):
+        assert tenant_lookup(Department) == 'tenant'
+        assert tenant_lookup(AssignmentSubmission) == 'assignment__tenant'
+
+
+@pytest.mark.integration
+class TestTenantShards:
+    """Test routing and moving a tenant"""
+
+    def test_unassigned_tenant_stays_on_default(self, tenant):
+        with tenant_shard(tenant):
+            assert Department.objects.all().db == 'default'
+            assert Department.objects.count() == 2
+
+    def test_move_copies_rows_and_routes_to_shard(self, tenant, shard):
+        attendance = Attendance.objects.filter(tenant=tenant).count()
+        copied = move_tenant(tenant, shard, batch_size=50)
+
+        assert copied['core.Department'] == 2
+        assert copied['teacher.Attendance'] == attendance
+        assert TenantShard.objects.get(tenant=tenant).alias == shard
+        with tenant_shard(tenant):
+            assert Department.objects.all().db == shard
+            assert Attendance.objects.count() == attendance
+            # Global models stay on the default database
+            assert UserAccount.objects.all().db == 'default'
+            department = Department.objects.first()
+            assert department._state.db == shard
+            assert department.tenant == tenant
+
+    def test_writes_follow_the_shard(self, tenant, shard):
+        move_tenant(tenant, shard)
+        with tenant_shard(tenant):
+            Department.objects.create(tenant=tenant, name='Physics', code='PHY')
+
+        assert Department.objects.using(shard).filter(code='PHY').exists()
+        assert not Department.objects.using('default').filter(code='PHY').exists()
+
+    def test_purge_source(self, tenant, shard):
+        logs = AuditLog.objects.filter(tenant=tenant).count()
+        call_command('move_tenant', tenant.slug, shard, '--purge-source', verbosity=0)
+
+        assert not Department.objects.using('default').filter(tenant=tenant).exists()
+        assert AuditLog.objects.using(shard).filter(tenant=tenant).count() == logs
+        assert Tenant.objects.using('default').filter(pk=tenant.pk).exists()
+
+    def test_moving_tenant_gets_503(self, tenant, shard):
+        TenantShard.objects.create(tenant=tenant, alias='default', status='moving')
+        directory.invalidate()
+        request = RequestFactory().get('/college/', HTTP_X_TENANT_ID=str(tenant.pk))
+        request.session = {}
+
+        response = TenantMiddleware(lambda request: HttpResponse())(request)
+        assert response.status_code == 503
+
+    def test_move_waits_for_processes_to_see_the_mark(self, tenant, shard, settings, monkeypatch):
+        settings.SHARD_DIRECTORY_CHECK_SECONDS = 7
+        waits = []
+        monkeypatch.setattr(sharding.time, 'sleep', lambda seconds: waits.append(
+            (seconds, TenantShard.objects.get(tenant=tenant).status)
+        ))
+
+        move_tenant(tenant, shard)
+
+        assert waits == [(7, 'moving')]
+
+    def test_delivery_task_reads_the_tenant_shard(self, tenant, shard, monkeypatch):
+        move_tenant(tenant, shard)
+        user = UserAccount.objects.filter(tenant=tenant).first()
+        with tenant_shard(tenant):
+            notification = Notification.objects.create(tenant=tenant, user=user, title='Moved', message='Hi')
+        sent = []
+        monkeypatch.setattr(mail, 'send_mass_email', lambda emails, on_sent: sent.extend(emails) or len(emails))
+
+        assert tasks.deliver_notification_emails([str(notification.pk)], tenant_id=str(tenant.pk)) == 1
+        assert sent[0].to == [user.email]
+
+    def test_archiver_walks_every_shard(self, tenant, shard, tmp_path):
+        move_tenant(tenant, shard)
+        logs = AuditLog.objects.using(shard).filter(tenant=tenant).count()
+
+        with override_settings(
+            AUDIT_ARCHIVE_STORAGE='django.core.files.storage.FileSystemStorage',
+            AUDIT_ARCHIVE_STORAGE_OPTIONS={'location': str(tmp_path / 'archive')},
+        ):
+            get_archive_storage.cache_clear()
+            totals = archive_audit_logs(older_than_days=0)
+        get_archive_storage.cache_clear()
+
+        assert totals['rows'] == logs
+        assert not AuditLog.objects.using(shard).filter(tenant=tenant).exists()
+        assert AuditLogArchive.objects.using(shard).filter(tenant=tenant).exists()
+        # The copy left on the old shard is not archived a second time
+        assert AuditLog.objects.using('default').filter(tenant=tenant).count() == logs
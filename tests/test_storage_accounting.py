@@ -0,0 +1,122 @@
+"""
+Tests for tenant storage accounting
+"""
+
+import io
+
+import pytest
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.uploadhandler import MemoryFileUploadHandler
+from django.http.multipartparser import MultiPartParser
+from django.test import RequestFactory
+from django.test.client import BOUNDARY, MULTIPART_CONTENT, encode_multipart
+
+from core.models import Tenant, UserAccount
+from core.storage import (
+    QuotaUploadHandler, StorageQuotaExceeded, TenantStorage, current_request, reconcile_storage
+)
+from core.usage import get_usage
+
+
+@pytest.fixture
+def tenant(db):
+    cache.clear()
+    return Tenant.objects.create(
+        name='Storage College',
+        slug='storage-college',
+        email='admin@storage.edu',
+        phone='1234567890',
+        address_line1='1 Main St',
+        city='City',
+        state='State',
+        country='Country',
+        postal_code='00000',
+        max_storage_gb=1,
+    )
+
+
+@pytest.fixture
+def tenant_request(tenant):
+    """Request from a tenant user, exposed to the storage like the middleware does"""
+    request = RequestFactory().post('/upload/')
+    request.user = UserAccount.objects.create_user(
+        email='teacher@storage.edu', password='pass', first_name='T', last_name='U', tenant=tenant
+    )
+    token = current_request.set(request)
+    yield request
+    current_request.reset(token)
+
+
+@pytest.fixture
+def storage(settings, tmp_path):
+    settings.TENANT_STORAGE_BACKEND = 'django.core.files.storage.FileSystemStorage'
+    return TenantStorage(location=str(tmp_path))
+
+
+@pytest.mark.unit
+@pytest.mark.django_db
+class TestTenantStorage:
+    """Test metered saves and deletes"""
+
+    def test_save_prefixes_and_meters(self, storage, tenant, tenant_request):
+        name = storage.save('resources/notes.txt', ContentFile(b'x' * 100))
+
+        assert name.startswith(f'tenants/{tenant.pk}/resources/')
+        assert get_usage(tenant, 'storage') == 100
+
+    def test_delete_releases_bytes(self, storage, tenant, tenant_request):
+        name = storage.save('resources/notes.txt', ContentFile(b'x' * 100))
+        storage.save('resources/other.txt', ContentFile(b'x' * 50))
+
+        storage.delete(name)
+
+        assert not storage.exists(name)
+        assert get_usage(tenant, 'storage') == 50
+
+    def test_quota_enforced_on_save(self, storage, tenant, tenant_request):
+        tenant.max_storage_gb = 0
+        with pytest.raises(StorageQuotaExceeded):
+            storage.save('resources/notes.txt', ContentFile(b'x'))
+
+    def test_saves_outside_requests_are_not_metered(self, storage, tenant):
+        name = storage.save('system/report.txt', ContentFile(b'x' * 10))
+        assert name.startswith('system/')
+        assert get_usage(tenant, 'storage') == 0
+
+    def test_reconcile_scans_tenant_prefixes(self, storage, tenant, tenant_request):
+        storage.save('a/one.txt', ContentFile(b'x' * 30))
+        storage.save('b/c/two.txt', ContentFile(b'x' * 70))
+        cache.clear()
+
+        totals = reconcile_storage(workers=2, storage=storage)
+
+        assert totals[tenant.pk] == 100
+        assert get_usage(tenant, 'storage') == 100
+
+
+@pytest.mark.unit
+@pytest.mark.django_db
+class TestQuotaUploadHandler:
+    """Test quota checks while parsing uploads"""
+
+    def parse(self, request, payload):
+        body = encode_multipart(BOUNDARY, {'file': ContentFile(payload, name='big.bin')})
+        meta = {'CONTENT_TYPE': MULTIPART_CONTENT, 'CONTENT_LENGTH': str(len(body))}
+        stream = io.BytesIO(body)
+        handlers = [QuotaUploadHandler(request), MemoryFileUploadHandler(request)]
+        return MultiPartParser(meta, stream, handlers).parse(), stream
+
+    def test_rejects_before_reading_body(self, tenant, tenant_request):
+        tenant_request.user.tenant.max_storage_gb = 0
+
+        payload = b'x' * (1024 * 1024)
+        (post, files), stream = self.parse(tenant_request, payload)
+
+        assert 'file' not in files
+        assert tenant_request.storage_quota_exceeded
+        assert stream.tell() < len(payload)
+
+    def test_allows_upload_within_quota(self, tenant, tenant_request):
+        (post, files), stream = self.parse(tenant_request, b'x' * 100)
+        assert files['file'].size == 100
@@ -0,0 +1,78 @@
+"""
+Tests for isolating large tenants in databases of their own
+"""
+
+from datetime import date
+from io import StringIO
+
+import pytest
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connections
+
+from core.datagen import DatasetOptions, generate_dataset
+from core.db.sharding import directory, isolated_alias, tenant_shard
+from core.models import Department, Tenant, UserAccount
+from teacher.models import Grade
+
+
+@pytest.fixture
+def tenants(transactional_db, settings, tmp_path):
+    settings.ISOLATED_TENANT_DB_NAME = str(tmp_path / '{alias}.sqlite3')
+    cache.clear()
+    directory.invalidate()
+    generate_dataset(DatasetOptions(tenants=2, students=6, departments=2, sections_per_year=1,
+                                    audit_events_per_user=1, end_date=date(2026, 3, 31)))
+    big, small = Tenant.objects.order_by('slug')
+    yield big, small
+    directory.invalidate()
+    for tenant in (big, small):
+        alias = isolated_alias(tenant)
+        if alias in connections.settings:
+            connections[alias].close()
+            del connections[alias]
+            del connections.settings[alias]
+
+
+@pytest.mark.integration
+class TestTenantIsolation:
+    """Test the hybrid shared / per-tenant database mode"""
+
+    def test_isolated_tenant_uses_its_own_database(self, tenants):
+        big, small = tenants
+        grades = Grade.objects.filter(tenant=big).count()
+        call_command('isolate_tenant', big.slug, '--purge-source', stdout=StringIO())
+
+        alias = isolated_alias(big)
+        with tenant_shard(big):
+            assert Department.objects.all().db == alias
+            assert Grade.objects.count() == grades
+            assert UserAccount.objects.all().db == 'default'
+        # Other tenants stay on the shared tables
+        with tenant_shard(small):
+            assert Department.objects.all().db == 'default'
+            assert Department.objects.count() == 2
+        assert not Grade.objects.using('default').filter(tenant=big).exists()
+
+    def test_alias_is_registered_from_the_directory(self, tenants):
+        big, _ = tenants
+        call_command('isolate_tenant', big.slug, stdout=StringIO())
+        alias = isolated_alias(big)
+        # A fresh process only knows the directory
+        connections[alias].close()
+        del connections[alias]
+        del connections.settings[alias]
+        directory.invalidate()
+
+        with tenant_shard(big):
+            assert Department.objects.count() == 2
+        assert alias in connections.settings
+
+    def test_list_excludes_isolated_tenants(self, tenants):
+        big, small = tenants
+        call_command('isolate_tenant', big.slug, stdout=StringIO())
+        out = StringIO()
+        call_command('isolate_tenant', '--list', '5', stdout=out)
+
+        assert small.slug in out.getvalue()
+        assert big.slug not in out.getvalue()
@@ -0,0 +1,107 @@
+"""
+Tests for tenant-scoped default managers and soft-delete filtering
+"""
+
+from datetime import date
+
+import pytest
+from django.core.exceptions import NON_FIELD_ERRORS, ValidationError
+from django.db import connection
+from django.http import HttpResponse
+from django.test import RequestFactory
+
+from core.datagen import DatasetOptions, generate_dataset
+from core.managers import get_current_tenant, tenant_scope
+from core.middleware import TenantMiddleware
+from core.models import Department, Role, Tenant, UserAccount
+from teacher.models import Attendance
+
+
+@pytest.fixture
+def tenants(db):
+    generate_dataset(DatasetOptions(tenants=2, students=10, departments=2, sections_per_year=1,
+                                    audit_events_per_user=1, end_date=date(2026, 3, 31)))
+    return list(Tenant.objects.order_by('slug'))
+
+
+@pytest.mark.integration
+class TestTenantScopedManager:
+    """Test the predicates the default manager applies"""
+
+    def test_unbound_sees_every_tenant(self, tenants):
+        assert get_current_tenant() is None
+        assert Department.objects.count() == 4
+
+    def test_bound_tenant_restricts_tenant_owned_models(self, tenants):
+        first, second = tenants
+        with tenant_scope(first):
+            assert Department.objects.count() == 2
+            assert set(Department.objects.values_list('tenant_id', flat=True)) == {first.pk}
+            assert first.departments.count() == 2
+            # Models without a tenant key are not restricted
+            assert Tenant.objects.count() == 2
+            assert Role.objects.exists()
+            assert not Department.objects.filter(tenant=second).exists()
+            assert Department.objects.unscoped().filter(tenant=second).count() == 2
+
+    def test_soft_delete_hides_rows(self, tenants):
+        department = Department.objects.filter(tenant=tenants[0]).first()
+        department.soft_delete()
+        assert Department.objects.filter(tenant=tenants[0]).count() == 1
+        assert Department.all_objects.deleted().get() == department
+
+        assert Attendance.objects.filter(tenant=tenants[1]).soft_delete() > 0
+        assert not Attendance.objects.filter(tenant=tenants[1]).exists()
+        assert Attendance.all_objects.filter(tenant=tenants[1]).exists()
+
+    def test_unique_checks_see_soft_deleted_rows(self, tenants):
+        department = Department.objects.filter(tenant=tenants[0]).first()
+        department.soft_delete()
+        duplicate = Department(tenant=tenants[0], name='Again', code=department.code)
+
+        with pytest.raises(ValidationError) as error:
+            duplicate.validate_unique()
+        assert NON_FIELD_ERRORS in error.value.message_dict
+        # The soft-deleted row itself still validates
+        department.validate_unique()
+
+    def test_predicates_lead_the_index(self, tenants):
+        student = UserAccount.objects.filter(tenant=tenants[0], role__name='student').first()
+        with tenant_scope(tenants[0]):
+            queryset = Attendance.objects.filter(student=student)
+            sql = str(queryset.query)
+            plan = queryset.explain()
+
+        assert '"attendances"."tenant_id" = ' in sql and '"attendances"."is_deleted"' in sql
+        assert 'SEARCH attendances USING INDEX' in plan
+        with connection.cursor() as cursor:
+            constraints = connection.introspection.get_constraints(cursor, 'attendances')
+        assert ['tenant_id', 'is_deleted', 'student_id', 'date'] in [
+            constraint['columns'] for constraint in constraints.values() if constraint['index']
+        ]
+
+    def test_login_lookup_ignores_bound_tenant(self, tenants):
+        user = UserAccount.objects.filter(tenant=tenants[1]).first()
+        with tenant_scope(tenants[0]):
+            assert UserAccount.objects.get_by_natural_key(user.email) == user
+            assert not UserAccount.objects.filter(pk=user.pk).exists()
+        user.soft_delete()
+        with pytest.raises(UserAccount.DoesNotExist):
+            UserAccount.objects.get_by_natural_key(user.email)
+
+
+@pytest.mark.integration
+def test_middleware_binds_request_tenant(tenants):
+    seen = {}
+
+    def view(request):
+        seen['tenant'] = get_current_tenant()
+        seen['departments'] = Department.objects.count()
+        return HttpResponse()
+
+    request = RequestFactory().get('/college/', HTTP_X_TENANT_ID=str(tenants[1].pk))
+    request.session = {}
+    TenantMiddleware(view)(request)
+
+    assert seen == {'tenant': tenants[1].pk, 'departments': 2}
+    assert get_current_tenant() is None
@@ -0,0 +1,197 @@
+"""
+Tests for resumable chunked uploads
+"""
+
+from datetime import timedelta
+import hashlib
+import io
+
+import pytest
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+from django.urls import reverse
+from django.utils import timezone
+
+from core.blobs import collect_garbage
+from core.models import Tenant, UploadChunk, UploadSession, UserAccount
+from core.uploads import (
+    BodyStream, UploadError, chunk_storage, claim_upload, complete, open_session, purge_expired, write_chunk
+)
+from core.usage import GB, get_usage
+
+DATA = bytes(range(256)) * 4 + b'tail'  # 1028 bytes: 4 chunks of 300 and one of 128
+
+
+@pytest.fixture
+def user(db, settings, tmp_path):
+    cache.clear()
+    settings.TENANT_STORAGE_BACKEND = 'django.core.files.storage.FileSystemStorage'
+    settings.MEDIA_ROOT = str(tmp_path)
+    settings.UPLOAD_CHUNK_SIZE = 300
+    settings.UPLOAD_STREAM_BLOCK_SIZE = 64
+    tenant = Tenant.objects.create(
+        name='Upload College', slug='upload-college', email='admin@upload.edu', phone='1234567890',
+        address_line1='1 Main St', city='City', state='State', country='Country', postal_code='00000',
+        max_storage_gb=1,
+    )
+    return UserAccount.objects.create_user(
+        email='student@upload.edu', password='pass', first_name='S', last_name='U', tenant=tenant
+    )
+
+
+def send(session, index):
+    start = index * session.chunk_size
+    body = DATA[start:start + session.chunk_size]
+    return write_chunk(session, index, io.BytesIO(body), len(body))
+
+
+class RecordingStream(io.BytesIO):
+    max_read = 0
+
+    def read(self, size=-1):
+        self.max_read = max(self.max_read, size)
+        return super().read(size)
+
+
+@pytest.mark.unit
+@pytest.mark.django_db
+class TestChunkedUploads:
+    """Test chunk storage, resumption and assembly"""
+
+    def test_out_of_order_chunks_assemble_in_order(self, user):
+        session = open_session(user, 'essay.pdf', len(DATA), 'submission')
+        assert session.total_chunks == 4
+        for index in (3, 1, 0, 2, 1):  # chunk 1 resent
+            send(session, index)
+        assert UploadChunk.objects.filter(session=session).count() == 4
+
+        session = complete(session)
+
+        assert session.status == 'complete'
+        assert session.stored_name.startswith(f'tenants/{user.tenant_id}/blobs/')
+        assert session.sha256 == hashlib.sha256(DATA).hexdigest()
+        with default_storage.open(session.stored_name) as fh:
+            assert fh.read() == DATA
+        assert get_usage(user.tenant, 'storage') == len(DATA)
+        assert not UploadChunk.objects.filter(session=session).exists()
+        assert chunk_storage().listdir(f'uploads/{session.pk}')[1] == []
+
+    def test_body_is_read_in_blocks(self, user):
+        session = open_session(user, 'essay.pdf', len(DATA), 'submission')
+        source = RecordingStream(DATA[:300])
+        write_chunk(session, 0, source, 300)
+        assert 0 < source.max_read <= 64
+
+        stream = BodyStream(io.BytesIO(DATA), 100)
+        assert stream.read() == DATA[:64] and stream.read(1000) == DATA[64:100] and stream.read() == b''
+
+    def test_rejects_bad_chunks(self, user):
+        session = open_session(user, 'essay.pdf', len(DATA), 'submission')
+        with pytest.raises(UploadError, match='must be 300 bytes'):
+            write_chunk(session, 0, io.BytesIO(DATA[:10]), 10)
+        with pytest.raises(UploadError, match='ended after'):
+            write_chunk(session, 0, io.BytesIO(DATA[:10]), 300)
+        with pytest.raises(UploadError, match='checksum'):
+            write_chunk(session, 0, io.BytesIO(DATA[:300]), 300, sha256='0' * 64)
+        with pytest.raises(UploadError, match='between 0 and 3'):
+            write_chunk(session, 4, io.BytesIO(b''), 0)
+        assert not UploadChunk.objects.filter(session=session).exists()
+
+        send(session, 0)
+        with pytest.raises(UploadError, match=r'Missing chunks: \[1, 2, 3\]') as excinfo:
+            complete(session)
+        assert excinfo.value.status == 409
+
+    def test_session_limits(self, user, settings):
+        with pytest.raises(UploadError, match='Unknown upload purpose'):
+            open_session(user, 'a.pdf', 10, 'avatar')
+        settings.UPLOAD_MAX_SIZE = 100
+        with pytest.raises(UploadError) as excinfo:
+            open_session(user, 'a.pdf', 101, 'submission')
+        assert excinfo.value.status == 413
+
+        user.tenant.max_storage_gb = 0
+        with pytest.raises(UploadError, match='Storage limit'):
+            open_session(user, 'a.pdf', 10, 'submission')
+
+    def test_open_sessions_count_against_the_quota(self, user, settings):
+        settings.UPLOAD_MAX_SIZE = 2 * GB
+        first = open_session(user, 'a.mp4', 600 * 1024 ** 2, 'submission')
+        with pytest.raises(UploadError, match='Storage limit'):
+            open_session(user, 'b.mp4', 600 * 1024 ** 2, 'submission')
+
+        # Expired sessions no longer hold their reservation
+        UploadSession.objects.filter(pk=first.pk).update(expires_at=timezone.now())
+        open_session(user, 'b.mp4', 600 * 1024 ** 2, 'submission')
+
+    def test_claim_once(self, user):
+        session = open_session(user, 'essay.pdf', 100, 'submission')
+        with pytest.raises(UploadError, match='not complete'):
+            claim_upload(user, session.pk, 'submission')
+        write_chunk(session, 0, io.BytesIO(DATA[:100]), 100)
+        complete(session)
+
+        with pytest.raises(UploadError, match='not found'):
+            claim_upload(user, session.pk, 'teacher_resource')
+        assert claim_upload(user, session.pk, 'submission') == session.stored_name
+        with pytest.raises(UploadError, match='already used'):
+            claim_upload(user, session.pk, 'submission')
+
+    def test_purge_expired(self, user):
+        unfinished = open_session(user, 'a.pdf', len(DATA), 'submission')
+        send(unfinished, 0)
+        finished = open_session(user, 'b.pdf', 100, 'submission')
+        write_chunk(finished, 0, io.BytesIO(DATA[:100]), 100)
+        complete(finished)
+        UploadSession.objects.update(expires_at=timezone.now() - timedelta(minutes=1))
+
+        assert purge_expired() == 2
+        assert not UploadSession.all_objects.exists()
+        # The assembled file is a blob: removed by garbage collection
+        collect_garbage(grace_hours=0)
+        assert not default_storage.exists(finished.stored_name)
+        assert get_usage(user.tenant, 'storage') == 0
+        assert chunk_storage().listdir(f'uploads/{unfinished.pk}')[1] == []
+
+
+@pytest.mark.integration
+@pytest.mark.django_db
+class TestUploadEndpoints:
+    """Test the HTTP protocol a browser client follows"""
+
+    def test_resumable_upload_over_http(self, client, user):
+        client.force_login(user)
+        response = client.post(reverse('uploads:create'), {
+            'filename': 'essay.pdf', 'size': len(DATA), 'purpose': 'submission',
+        })
+        assert response.status_code == 201
+        upload = response.json()
+        assert upload['total_chunks'] == 4 and upload['received'] == []
+
+        for index in (0, 2):
+            body = DATA[index * 300:(index + 1) * 300]
+            response = client.put(
+                reverse('uploads:chunk', args=[upload['id'], index]), body,
+                content_type='application/octet-stream', HTTP_X_CHUNK_SHA256=hashlib.sha256(body).hexdigest(),
+            )
+            assert response.status_code == 200
+
+        # Resume: the client asks which chunks still need sending
+        status = client.get(reverse('uploads:status', args=[upload['id']])).json()
+        assert status['received'] == [0, 2]
+        assert client.post(reverse('uploads:complete', args=[upload['id']])).status_code == 409
+
+        for index in (1, 3):
+            client.put(reverse('uploads:chunk', args=[upload['id'], index]), DATA[index * 300:(index + 1) * 300],
+                       content_type='application/octet-stream')
+        response = client.post(reverse('uploads:complete', args=[upload['id']]))
+        assert response.status_code == 200
+        assert response.json()['sha256'] == hashlib.sha256(DATA).hexdigest()
+
+    def test_sessions_are_private(self, client, user):
+        session = open_session(user, 'essay.pdf', 100, 'submission')
+        other = UserAccount.objects.create_user(
+            email='other@upload.edu', password='pass', first_name='O', last_name='U', tenant=user.tenant
+        )
+        client.force_login(other)
+        assert client.get(reverse('uploads:status', args=[session.pk])).status_code == 404
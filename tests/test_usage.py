@@ -0,0 +1,110 @@
+"""
+Tests for tenant usage metering
+"""
+
+import pytest
+from django.core.cache import cache
+
+from core.models import Department, Role, Tenant, UserAccount
+from core import usage
+from core.usage import get_usage, reconcile_usage
+from core.utils import decrement_tenant_usage, increment_tenant_usage, validate_tenant_limits
+
+
+@pytest.fixture
+def tenant(db):
+    cache.clear()
+    return Tenant.objects.create(
+        name='Usage College',
+        slug='usage-college',
+        email='admin@usage.edu',
+        phone='1234567890',
+        address_line1='1 Main St',
+        city='City',
+        state='State',
+        country='Country',
+        postal_code='00000',
+        max_students=2,
+    )
+
+
+@pytest.fixture
+def student_role(db):
+    return Role.objects.create(name='student', display_name='Student', description='Student')
+
+
+def create_student(tenant, role, email):
+    return UserAccount.objects.create_user(
+        email=email, password='pass', first_name='Test', last_name='Student', tenant=tenant, role=role
+    )
+
+
+@pytest.mark.unit
+@pytest.mark.django_db
+class TestUsageCounters:
+    """Test cache-backed usage counters"""
+
+    def test_counters_do_not_touch_database(self, tenant, django_assert_num_queries):
+        with django_assert_num_queries(0):
+            assert increment_tenant_usage(tenant, 'students') == 1
+            assert increment_tenant_usage(tenant, 'students') == 2
+            assert decrement_tenant_usage(tenant, 'students') == 1
+            assert validate_tenant_limits(tenant, 'students') == (True, "")
+
+        tenant.refresh_from_db()
+        assert tenant.current_students_count == 0
+
+    def test_limit_enforced_from_counter(self, tenant):
+        increment_tenant_usage(tenant, 'students', 2)
+        is_valid, error = validate_tenant_limits(tenant, 'students')
+        assert not is_valid
+        assert 'Maximum: 2' in error
+
+    def test_storage_counted_in_bytes(self, tenant):
+        increment_tenant_usage(tenant, 'storage', 0.5)
+        assert get_usage(tenant, 'storage') == 512 * 1024 ** 2
+        assert validate_tenant_limits(tenant, 'storage', 9.5) == (True, "")
+        assert not validate_tenant_limits(tenant, 'storage', 10)[0]
+
+    def test_cold_counter_seeds_from_tenant_row(self, tenant):
+        tenant.current_students_count = 5
+        assert increment_tenant_usage(tenant, 'students') == 6
+
+    def test_signals_track_users_and_departments(self, tenant, student_role, django_capture_on_commit_callbacks):
+        with django_capture_on_commit_callbacks(execute=True):
+            student = create_student(tenant, student_role, 's1@usage.edu')
+            Department.objects.create(tenant=tenant, name='CSE', code='CSE')
+        assert get_usage(tenant, 'students') == 1
+        assert get_usage(tenant, 'departments') == 1
+
+        with django_capture_on_commit_callbacks(execute=True):
+            student.delete()
+        assert get_usage(tenant, 'students') == 0
+
+    def test_reconcile_fixes_drift(self, tenant, student_role):
+        create_student(tenant, student_role, 's1@usage.edu')
+        increment_tenant_usage(tenant, 'students', 7)
+
+        assert reconcile_usage() == 1
+
+        tenant.refresh_from_db()
+        assert tenant.current_students_count == 1
+        assert get_usage(tenant, 'students') == 1
+
+    def test_reconcile_keeps_adjusts_made_while_counting(self, tenant, student_role, monkeypatch):
+        create_student(tenant, student_role, 's1@usage.edu')
+        increment_tenant_usage(tenant, 'students', 3)
+        grouped_counts = usage._grouped_counts
+
+        def counting_with_enrollment(queryset):
+            counted = grouped_counts(queryset)
+            if not getattr(counting_with_enrollment, 'done', False):
+                # Another worker's enrollment lands between counting and writing
+                counting_with_enrollment.done = True
+                increment_tenant_usage(tenant, 'students')
+            return counted
+
+        monkeypatch.setattr(usage, '_grouped_counts', counting_with_enrollment)
+        reconcile_usage()
+
+        assert get_usage(tenant, 'students') == 2
@@ -0,0 +1,97 @@
+"""
+Tests for loading the authenticated user
+"""
+
+import pytest
+from django.contrib.auth import BACKEND_SESSION_KEY, HASH_SESSION_KEY, SESSION_KEY, get_user
+from django.contrib.auth.middleware import AuthenticationMiddleware
+from django.contrib.sessions.backends.cache import SessionStore
+from django.core.cache import cache
+from django.test import RequestFactory
+
+from core.models import Role, Tenant, UserAccount
+
+
+@pytest.fixture
+def user(db):
+    cache.clear()
+    tenant = Tenant.objects.create(
+        name='Load College',
+        slug='load-college',
+        email='admin@load.edu',
+        phone='1234567890',
+        address_line1='1 Main St',
+        city='City',
+        state='State',
+        country='Country',
+        postal_code='00000',
+    )
+    role = Role.objects.create(name='teacher', display_name='Teacher', description='-', scope_level=4)
+    return UserAccount.objects.create_user(
+        email='teacher@load.edu', password='pass', first_name='T', last_name='U', tenant=tenant, role=role
+    )
+
+
+def make_request(user, session_hash=None):
+    request = RequestFactory().get('/teacher/')
+    request.session = SessionStore()
+    request.session[SESSION_KEY] = str(user.pk)
+    request.session[BACKEND_SESSION_KEY] = 'core.authentication.UserModelBackend'
+    request.session[HASH_SESSION_KEY] = session_hash or user.get_session_auth_hash()
+    return request
+
+
+@pytest.mark.unit
+@pytest.mark.django_db
+class TestUserLoading:
+    """Test loading the user with role and tenant"""
+
+    def test_load_is_one_query(self, user, django_assert_num_queries):
+        with django_assert_num_queries(1):
+            loaded = get_user(make_request(user))
+            assert loaded.role.name == 'teacher'
+            assert loaded.tenant.slug == 'load-college'
+
+    def test_middleware_sets_lazy_user(self, user, django_assert_num_queries):
+        request = make_request(user)
+        AuthenticationMiddleware(lambda request: None).process_request(request)
+
+        with django_assert_num_queries(1):
+            assert request.user.is_authenticated
+            assert request.user.tenant.slug == 'load-college'
+
+    def test_bad_session_hash_is_anonymous(self, user):
+        request = make_request(user, session_hash='not-the-hash')
+        assert not get_user(request).is_authenticated
+        assert SESSION_KEY not in request.session
+
+    def test_password_change_logs_out_old_sessions(self, user):
+        old_request = make_request(user)
+        get_user(old_request)
+
+        user.set_password('new-pass')
+        user.save()
+
+        assert not get_user(make_request(user, session_hash=old_request.session[HASH_SESSION_KEY])).is_authenticated
+
+    def test_queryset_updates_are_seen(self, user):
+        """Bulk updates bypass signals; the next request still sees them"""
+        get_user(make_request(user))
+        UserAccount.objects.filter(pk=user.pk).update(first_name='Changed')
+        Tenant.objects.filter(pk=user.tenant_id).update(name='Renamed College')
+
+        loaded = get_user(make_request(user))
+        assert loaded.first_name == 'Changed'
+        assert loaded.tenant.name == 'Renamed College'
+
+    def test_deactivated_by_update_is_anonymous(self, user):
+        get_user(make_request(user))
+        UserAccount.objects.filter(pk=user.pk).update(is_active=False)
+
+        assert not get_user(make_request(user)).is_authenticated
+
+    def test_missing_user_is_anonymous(self, user):
+        request = make_request(user)
+        user.delete()
+
+        assert not get_user(request).is_authenticated
@@ -0,0 +1,83 @@
+"""
+Tests for time-ordered UUID keys and rewriting existing keys
+"""
+
+from datetime import date, datetime, timezone as dt_timezone
+from io import StringIO
+import uuid
+
+import pytest
+from django.core.management import CommandError, call_command
+
+from core.datagen import DatasetOptions, generate_dataset
+from core.ids import rewrite_primary_keys, uuid7, uuid7_at, uuid7_time
+from core.models import AuditLog, Department, Section, StudentEnrollment, UserAccount
+from teacher.models import Attendance
+
+
+@pytest.mark.unit
+class TestUuid7:
+    """Test the generator"""
+
+    def test_version_and_variant(self):
+        value = uuid7()
+        assert value.version == 7
+        assert value.variant == uuid.RFC_4122
+
+    def test_keys_are_strictly_increasing(self):
+        keys = [uuid7() for _ in range(10000)]
+        assert keys == sorted(keys)
+        assert [key.hex for key in keys] == sorted(key.hex for key in keys)
+        assert len(set(keys)) == len(keys)
+
+    def test_timestamp_round_trip(self):
+        when = datetime(2026, 3, 1, 8, 30, 15, 250000, tzinfo=dt_timezone.utc)
+        assert uuid7_time(uuid7_at(when)) == when
+        assert uuid7_at(when) < uuid7_at(datetime(2026, 3, 1, 8, 30, 16, tzinfo=dt_timezone.utc))
+
+
+@pytest.mark.django_db
+@pytest.mark.integration
+class TestRewritePrimaryKeys:
+    """Test new defaults and converting existing keys"""
+
+    @pytest.fixture
+    def dataset(self):
+        generate_dataset(DatasetOptions(students=10, departments=2, sections_per_year=1,
+                                        audit_events_per_user=1, end_date=date(2026, 3, 31)))
+
+    def test_new_rows_get_uuid7(self, dataset):
+        assert Department.objects.first().pk.version == 4
+        department = Department.objects.create(tenant=Department.objects.first().tenant, name='Physics', code='PHY')
+        assert department.pk.version == 7
+        assert AuditLog.objects.create(action='login', resource_type='UserAccount').pk.version == 7
+        assert Attendance.objects.first().pk.version == 7
+
+    def test_rewrite_repoints_foreign_keys(self, dataset):
+        enrollments = {
+            (enrollment.student_id, enrollment.section.name)
+            for enrollment in StudentEnrollment.objects.select_related('section')
+        }
+        attendance = Attendance.objects.filter(section__isnull=False).count()
+
+        assert rewrite_primary_keys(Section, batch_size=2) == Section.objects.count()
+        for section in Section.objects.all():
+            assert section.pk.version == 7
+            assert abs((uuid7_time(section.pk) - section.created_at).total_seconds()) < 0.001
+        assert {
+            (enrollment.student_id, enrollment.section.name)
+            for enrollment in StudentEnrollment.objects.select_related('section')
+        } == enrollments
+        assert Attendance.objects.filter(section__in=Section.objects.all()).count() == attendance
+        # Already converted keys are skipped
+        assert rewrite_primary_keys(Section) == 0
+
+    def test_command_refuses_protected_models(self, dataset):
+        with pytest.raises(CommandError):
+            call_command('rewrite_primary_keys', 'core.UserAccount', stdout=StringIO())
+        assert UserAccount.objects.filter(pk__isnull=False).first().pk.version == 4
+
+    def test_benchmark_command(self):
+        out = StringIO()
+        call_command('benchmark_uuid_inserts', rows=200, batch_size=50, stdout=out)
+        assert 'uuid7' in out.getvalue() and 'rows/s' in out.getvalue()